@@ -0,0 +1,16 @@
+"""
+gunicorn 配置：gunicorn -c gunicorn.conf.py run:app
+
+每个 worker 加载应用后立即启动后台线程（持久化任务、MinerU 轮询等），
+不依赖 worker 收到第一个请求，重启后即可继续处理未完成的任务。
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5050")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+
+
+def post_worker_init(worker):
+    from neuink.utils.workers import start_workers
+
+    start_workers(worker.wsgi)
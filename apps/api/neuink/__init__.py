@@ -123,6 +123,15 @@ def create_app():
 
     prefix = app.config["API_PREFIX"]
 
+    # -----------------------
+    # JSON 序列化与响应压缩
+    # -----------------------
+    from neuink.utils.json_provider import init_app as init_json_provider
+    from neuink.utils.compression import init_app as init_compression
+
+    init_json_provider(app)
+    init_compression(app, [f"{prefix}/papers", f"{prefix}/public-papers"])
+
     # -----------------------
     # 注册蓝图
     # -----------------------
@@ -137,6 +146,45 @@ def create_app():
 
     init_paper_routes(app, prefix)
 
+    # -----------------------
+    # MongoDB 索引迁移（启动时执行一次 + ensure-indexes 命令）
+    # -----------------------
+    from neuink.models.indexes import init_app as init_indexes
+
+    init_indexes(app)
+
+    # 个人论文库统计：对账命令 + 定期对账
+    from neuink.models.userStats import init_app as init_user_stats
+
+    init_user_stats(app)
+
+    # 笔记检索字段回填命令
+    from neuink.models.note import init_app as init_notes
+
+    init_notes(app)
+
+    # 块级检索：索引补建命令 + 后台补建
+    from neuink.models.blockSearch import init_app as init_block_search
+
+    init_block_search(app)
+
+    # 持久化后台任务：先导入处理函数所在模块完成注册，再按配置启动工作线程
+    import neuink.services.paperContentService  # noqa: F401
+    import neuink.services.mineruIngestService  # noqa: F401
+    from neuink.utils.job_queue import init_app as init_job_queue
+
+    init_job_queue(app)
+
+    # MinerU 解析状态：服务端统一轮询，状态接口只读本地任务记录
+    from neuink.services.mineruPollerService import init_app as init_mineru_poller
+
+    init_mineru_poller(app)
+
+    # 以上后台线程只在服务进程中启动（python run.py、flask run、gunicorn.conf.py、run-jobs），见 utils/workers.py
+    from neuink.utils.workers import init_app as init_workers
+
+    init_workers(app)
+
     # -----------------------
     # 请求/响应日志：改用 app.logger
     # -----------------------
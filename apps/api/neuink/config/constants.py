@@ -49,6 +49,9 @@ class BusinessCode:
     NOTE_UPDATE_FAILED = 3003
     NOTE_DELETE_FAILED = 3004
 
+    # 后台任务相关 4000-4099
+    TASK_QUEUE_FULL = 4001         # 任务队列已满，请稍后重试
+
 
 # 响应消息
 class ResponseMessage:
@@ -99,6 +102,11 @@ class Collections:
     SECTION = "Section"
     PARSE_BLOCKS = "ParseBlocks"
     PDF_PARSE_TASKS = "PdfParseTasks"  # PDF解析任务集合
+    USER_STATS = "UserStats"  # 个人论文库统计（增量维护）
+    BLOCK_SEARCH = "BlockSearch"  # 章节内容块级全文检索索引
+    COUNTERS = "Counters"  # 计数器（内容同步序号等）
+    BACKGROUND_JOBS = "BackgroundJobs"  # 持久化后台任务队列
+    PAPER_DELETIONS = "PaperDeletions"  # 论文删除记录（供各进程的全文检索索引同步删除）
 
 
 # 论文状态
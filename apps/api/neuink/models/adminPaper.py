@@ -2,70 +2,39 @@
 AdminPaper 数据模型
 处理管理员论文相关的数据库操作
 """
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from .basePaper import BasePaperModel
+from .paperSearchIndex import search_paper_page
 from ..config.constants import Collections
-from .section import get_section_model, find_sections_by_ids
+from ..utils.pagination import (
+    InvalidCursorError,
+    cursor_condition,
+    fetch_page,
+    include_sort_field,
+    invalidate_cached_totals,
+    keyset_sort,
+    total_cache_key,
+)
+from .section import get_section_model, attach_sections, attach_section_stats
 
 
 class AdminPaperModel(BasePaperModel):
     """AdminPaper 数据模型类"""
 
+    SELECTABLE_FIELDS = BasePaperModel.SELECTABLE_FIELDS + (
+        "isPublic",
+        "createdBy",
+        "parseStatus",
+        "translationStatus",
+    )
+
+    # 列表筛选条件用到的字段，写入这些字段时清除缓存的列表总数
+    LIST_FILTER_FIELDS = ("isPublic", "createdBy", "parseStatus", "translationStatus", "metadata")
+
     def get_collection_name(self) -> str:
         """返回集合名称"""
         return Collections.ADMIN_PAPER
 
-    def _ensure_indexes(self):
-        """确保必要的索引存在"""
-        import logging
-        logger = logging.getLogger(__name__)
-        collection_name = self.get_collection_name()
-        
-        logger.info(f"开始为集合 {collection_name} 创建管理员论文特有索引")
-        
-        # 先调用父类的索引创建方法
-        super()._ensure_indexes()
-        
-        # 添加管理员论文特有的索引
-        try:
-            self.collection.create_index("isPublic")
-            logger.info(f"集合 {collection_name}: 创建索引 isPublic")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 isPublic 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("createdBy")
-            logger.info(f"集合 {collection_name}: 创建索引 createdBy")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 createdBy 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("parseStatus.status")
-            logger.info(f"集合 {collection_name}: 创建索引 parseStatus.status")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 parseStatus.status 索引失败 - {str(e)}")
-            
-        # 为管理员论文创建全文搜索索引
-        try:
-            self.collection.create_index([
-                ("metadata.title", "text"),
-                ("metadata.titleZh", "text"),
-                ("abstract.en", "text"),
-                ("abstract.zh", "text"),
-            ])
-            logger.info(f"集合 {collection_name}: 创建全文索引 metadata.title, metadata.titleZh, abstract.en, abstract.zh")
-        except Exception as e:
-            error_msg = str(e).lower()
-            logger.warning(f"集合 {collection_name}: 创建全文索引失败 - {str(e)}")
-            if any(keyword in error_msg for keyword in ["already exists", "indexoptionsconflict", "duplicate"]):
-                logger.info(f"集合 {collection_name}: 全文索引已存在，跳过创建")
-                pass
-            else:
-                logger.error(f"集合 {collection_name}: 创建全文索引时发生未知错误 - {str(e)}")
-                raise e
-            
-        logger.info(f"集合 {collection_name} 管理员论文特有索引创建完成")
-
     def get_specific_fields(self, paper_data: Dict[str, Any]) -> Dict[str, Any]:
         """获取管理员论文特有的字段"""
         return {
@@ -90,6 +59,43 @@ class AdminPaperModel(BasePaperModel):
             ),
         }
 
+    def _invalidate_list_totals(self, fields: Optional[Iterable[str]] = None) -> None:
+        """清除缓存的列表总数；fields 为写入的字段，未涉及列表筛选字段时不清除"""
+        if fields is not None and not any(
+            name.split(".")[0] in self.LIST_FILTER_FIELDS for name in fields
+        ):
+            return
+        invalidate_cached_totals(self.get_collection_name())
+
+    def create(self, paper_data: Dict[str, Any]) -> Dict[str, Any]:
+        """创建管理员论文并清除缓存的列表总数"""
+        paper = super().create(paper_data)
+        self._invalidate_list_totals()
+        return paper
+
+    def update(self, paper_id: str, update_data: Dict[str, Any]) -> bool:
+        """更新管理员论文；公开状态、元数据等筛选字段变化时清除缓存的列表总数"""
+        updated = super().update(paper_id, update_data)
+        if updated:
+            self._invalidate_list_totals(update_data)
+        return updated
+
+    def update_direct(self, paper_id: str, update_operation: Dict[str, Any]) -> bool:
+        """直接执行更新操作；涉及筛选字段时清除缓存的列表总数"""
+        updated = super().update_direct(paper_id, update_operation)
+        if updated:
+            self._invalidate_list_totals(
+                [name for fields in update_operation.values() for name in fields]
+            )
+        return updated
+
+    def delete(self, paper_id: str) -> bool:
+        """删除管理员论文并清除缓存的列表总数"""
+        deleted = super().delete(paper_id)
+        if deleted:
+            self._invalidate_list_totals()
+        return deleted
+
     def find_by_user_or_filters(
         self,
         skip: int,
@@ -100,21 +106,37 @@ class AdminPaperModel(BasePaperModel):
         filters: Optional[Dict[str, Any]],
         user_id: Optional[str] = None,
         is_public: Optional[bool] = None,
+        summary: bool = False,
+        cursor: Optional[str] = None,
+        cached_total: bool = False,
+        projection: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
         根据用户或筛选条件查询论文列表
+
+        summary 为 True 时管理端列表只返回概要字段（不含 abstract/references 等大字段）；
+        传入 projection（fields= 参数）时使用该投影代替默认投影；
+        当前页用索引查询取回，总数在本页未取满时直接得出，否则单独计数；
+        cached_total 为 True 时总数允许使用短时缓存（公开论文列表总是使用），命中时不再计数；
+        传入 cursor 时使用游标分页（忽略 skip），全文搜索按相关度排序，不支持游标
         """
         filters = filters.copy() if filters else {}
         
         if is_public is not None:
             # 查询公开论文
             base_query = self._build_public_filters(filters, user_id)
-            projection = self._public_summary_projection(include_score=bool(search))
+            projection = dict(projection) if projection else self._public_summary_projection(include_score=bool(search))
         else:
             # 管理员查询所有论文
             base_query = self._build_admin_filters(user_id, filters)
-            projection = self._full_document_projection(include_score=bool(search))
+            if projection:
+                projection = dict(projection)
+            elif summary:
+                projection = self._admin_summary_projection(include_score=bool(search))
+            else:
+                projection = self._full_document_projection(include_score=bool(search))
+        projection = include_sort_field(projection, sort_by)
 
         # 添加调试日志
         import logging
@@ -122,25 +144,27 @@ class AdminPaperModel(BasePaperModel):
         logger.info(f"查询论文 - is_public: {is_public}, user_id: {user_id}, base_query: {base_query}, projection: {projection}")
 
         if search:
-            query = dict(base_query)
-            query["$text"] = {"$search": search}
-            cursor = (
-                self.collection.find(query, projection)
-                .sort([("score", {"$meta": "textScore"}), (sort_by, sort_order)])
-                .skip(skip)
-                .limit(limit)
+            if cursor:
+                raise InvalidCursorError("全文搜索结果不支持游标分页")
+            # 全文检索走进程内倒排索引（支持中文）：公开列表只索引公开论文，管理端整个集合为一个分区
+            if is_public is not None:
+                partition_key, partition_query = "public", {"isPublic": True}
+            else:
+                partition_key, partition_query = None, {}
+            papers, total = search_paper_page(
+                self.collection, partition_key, partition_query, search, base_query, skip, limit, projection,
             )
-            total = self.collection.count_documents(query)
         else:
-            cursor = (
-                self.collection.find(base_query, projection)
-                .sort([(sort_by, sort_order)])
-                .skip(skip)
-                .limit(limit)
+            papers, total = fetch_page(
+                self.collection,
+                base_query,
+                keyset_sort(sort_by, sort_order),
+                limit=limit,
+                skip=0 if cursor else skip,
+                projection=projection,
+                page_filter=cursor_condition(cursor, sort_by, sort_order),
+                total_key=total_cache_key(self.get_collection_name(), user_id, base_query) if cached_total else None,
             )
-            total = self.collection.count_documents(base_query)
-        
-        papers = list(cursor)
         logger.info(f"查询结果 - 论文数量: {len(papers)}, 总数: {total}")
         
         for paper in papers:
@@ -156,9 +180,11 @@ class AdminPaperModel(BasePaperModel):
         search: Optional[str],
         filters: Optional[Dict[str, Any]],
         user_id: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
-        查询公开论文列表，仅返回概要信息（metadata 等）
+        查询公开论文列表，仅返回概要信息（metadata 等）；总数使用短时缓存，论文增删、
+        公开状态和元数据变化时清除
         """
         return self.find_by_user_or_filters(
             skip=skip,
@@ -168,15 +194,18 @@ class AdminPaperModel(BasePaperModel):
             search=search,
             filters=filters,
             user_id=user_id,
-            is_public=True
+            is_public=True,
+            cursor=cursor,
+            cached_total=True,
         )
 
-    def find_public_paper_by_id(self, paper_id: str) -> Optional[Dict[str, Any]]:
+    def find_public_paper_by_id(self, paper_id: str, include_sections: bool = True) -> Optional[Dict[str, Any]]:
         """
         查询公开论文详情，默认包含sections内容
         
         Args:
             paper_id: 论文ID
+            include_sections: 是否加载sections内容，为False时只返回sectionIds
         
         Returns:
             论文数据，包含完整的sections内容
@@ -187,12 +216,9 @@ class AdminPaperModel(BasePaperModel):
         if not paper:
             return None
              
-        # 默认从sectionIds查询sections并添加到返回结果中
-        if "sectionIds" in paper and paper["sectionIds"]:
-            sections = find_sections_by_ids(paper["sectionIds"])
-            paper["sections"] = sections
-        else:
-            paper["sections"] = []
+        # 默认按sectionIds顺序加载sections并添加到返回结果中
+        if include_sections:
+            attach_sections([paper])
         
         return paper
 
@@ -205,9 +231,21 @@ class AdminPaperModel(BasePaperModel):
         sort_order: int,
         search: Optional[str],
         filters: Optional[Dict[str, Any]],
+        cursor: Optional[str] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        with_stats: bool = True,
+        cached_total: bool = False,
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
-        管理端论文查询
+        管理端论文查询（列表模式）
+
+        只返回概要字段和每篇论文的 sectionCount / blockCount，
+        章节内容只由详情接口加载，列表的耗时和数据量不随论文长度增长
+
+        Args:
+            projection: 代替概要投影的字段投影（fields= 参数），统计章节数时需包含 sectionIds
+            with_stats: 是否统计 sectionCount / blockCount
+            cached_total: 总数是否允许使用短时缓存
         """
         # 添加调试日志
         import logging
@@ -222,22 +260,22 @@ class AdminPaperModel(BasePaperModel):
             search=search,
             filters=filters,
             user_id=user_id,
-            is_public=None  # 管理员可以看到所有论文
+            is_public=None,  # 管理员可以看到所有论文
+            summary=True,
+            cursor=cursor,
+            projection=projection,
+            cached_total=cached_total,
         )
         
         # 添加调试日志
         logger.info(f"find_admin_papers - 查询结果: papers数量: {len(papers)}, total: {total}")
         
-        # 确保每个论文都有 sections 字段
-        for paper in papers:
-            if "sections" not in paper:
-                # 如果有 sectionIds，则查询 sections
-                if "sectionIds" in paper and paper["sectionIds"]:
-                    from .section import find_sections_by_ids
-                    sections = find_sections_by_ids(paper["sectionIds"])
-                    paper["sections"] = sections
-                else:
-                    paper["sections"] = []
+        # 章节/block数量由一次聚合统计得出，不加载章节内容
+        if with_stats:
+            attach_section_stats(papers)
+        if projection is None:
+            for paper in papers:
+                paper.pop("sectionIds", None)
         
         return papers, total
 
@@ -432,6 +470,25 @@ class AdminPaperModel(BasePaperModel):
             projection["score"] = {"$meta": "textScore"}
         return projection
 
+    @staticmethod
+    def _admin_summary_projection(include_score: bool) -> Dict[str, Any]:
+        projection: Dict[str, Any] = {
+            "_id": 0,
+            "id": 1,
+            "isPublic": 1,
+            "createdBy": 1,
+            "metadata": 1,
+            "sectionIds": 1,
+            "attachments": 1,
+            "parseStatus": 1,
+            "translationStatus": 1,
+            "createdAt": 1,
+            "updatedAt": 1,
+        }
+        if include_score:
+            projection["score"] = {"$meta": "textScore"}
+        return projection
+
     @staticmethod
     def _full_document_projection(include_score: bool = False) -> Dict[str, Any]:
         projection: Dict[str, Any] = {
@@ -454,26 +511,42 @@ class AdminPaperModel(BasePaperModel):
             projection["score"] = {"$meta": "textScore"}
         return projection
 
-    def find_admin_paper_by_id(self, paper_id: str) -> Optional[Dict[str, Any]]:
+    def find_admin_paper_by_id(
+        self,
+        paper_id: str,
+        include_sections: bool = True,
+        projection: Optional[Dict[str, Any]] = None,
+        section_projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """
         管理员获取论文详情；可以查看所有论文（公开和私有的），默认包含sections内容
         
         Args:
             paper_id: 论文ID
+            include_sections: 是否加载sections内容，为False时只返回sectionIds
+            projection: 论文投影（fields= 参数），默认读取完整文档
+            section_projection: 章节投影，例如只读取章节标题，默认读取完整内容
         
         Returns:
             论文数据，包含完整的sections内容
         """
-        paper = self.collection.find_one({"id": paper_id}, self._full_document_projection())
+        paper = self.collection.find_one({"id": paper_id}, projection or self._full_document_projection())
         if not paper:
             return None
         
-        # 默认从sectionIds查询sections并添加到返回结果中
-        if "sectionIds" in paper and paper["sectionIds"]:
-            sections = find_sections_by_ids(paper["sectionIds"])
-            paper["sections"] = sections
-        else:
-            paper["sections"] = []
+        # 默认按sectionIds顺序加载sections并添加到返回结果中
+        if include_sections:
+            attach_sections([paper], section_projection)
         
         return paper
 
+
+_admin_paper_model: Optional[AdminPaperModel] = None
+
+
+def get_admin_paper_model() -> AdminPaperModel:
+    """获取 AdminPaperModel 进程级单例"""
+    global _admin_paper_model
+    if _admin_paper_model is None:
+        _admin_paper_model = AdminPaperModel()
+    return _admin_paper_model
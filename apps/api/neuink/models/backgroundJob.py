@@ -0,0 +1,370 @@
+"""
+持久化后台任务模型
+BackgroundJobs 集合保存需要在进程重启后继续执行的后台任务（LLM 解析、MinerU 结果处理等）。
+
+状态流转：
+
+- pending：等待执行（runAt 之后才可领取，重试时推迟 runAt）
+- running：已被某个工作线程通过租约领取，执行期间定期续约（heartbeat）
+- completed：执行成功
+- dead：重试次数用尽（死信），保留最后一次错误供排查
+- cancelled：已取消（排队中直接取消；执行中先标记 cancelRequested，由执行端中止后写入）
+
+已结束（completed / dead / cancelled）的任务在 completedAt 之后保留 JOB_RETENTION_SECONDS 秒
+（默认 7 天），由 TTL 索引自动删除（见 models/indexes.py）。
+
+领取通过 find_one_and_update 原子完成；续约、完成、重试都以 leaseOwner 为条件，
+租约过期后被重新领取的任务，原执行者的写入不会生效，多进程并行消费也不会重复执行。
+"""
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..utils.db import get_db
+from ..utils.common import generate_id, get_current_time
+from ..config.constants import Collections
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_DEAD = "dead"
+JOB_CANCELLED = "cancelled"
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class BackgroundJobModel:
+    """持久化后台任务数据模型（索引由 models/indexes.py 在启动时统一创建）"""
+
+    def __init__(self):
+        self.collection = get_db()[Collections.BACKGROUND_JOBS]
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        priority: int,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        job_id: Optional[str] = None,
+        revive: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        新建待执行任务
+
+        Args:
+            job_id: 指定任务ID时按ID去重，已存在同ID任务时直接返回已有任务
+            revive: 已存在的同ID任务已结束（完成、死信、取消）时，重置执行次数并重新排队
+
+        Returns:
+            任务文档
+        """
+        now = get_current_time()
+        job = {
+            "id": job_id or generate_id(),
+            "kind": kind,
+            "payload": payload,
+            "priority": priority,
+            "status": JOB_PENDING,
+            "attempts": 0,
+            "maxAttempts": max_attempts,
+            "runAt": now,
+            "leaseOwner": None,
+            "leaseExpiresAt": None,
+            "lastError": None,
+            "cancelRequested": False,
+            "result": None,
+            "createdAt": now,
+            "updatedAt": now,
+            "completedAt": None,
+        }
+        try:
+            self.collection.insert_one(job)
+        except DuplicateKeyError:
+            if revive:
+                revived = self._revive(job["id"], payload, priority, max_attempts)
+                if revived is not None:
+                    return revived
+            return self.find_by_id(job["id"])
+        job.pop("_id", None)
+        return job
+
+    def _revive(self, job_id: str, payload: Dict[str, Any], priority: int, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """已结束的任务重新排队；任务仍在排队或执行中时返回 None"""
+        now = get_current_time()
+        return self.collection.find_one_and_update(
+            {"id": job_id, "status": {"$in": [JOB_COMPLETED, JOB_DEAD, JOB_CANCELLED]}},
+            {
+                "$set": {
+                    "payload": payload,
+                    "priority": priority,
+                    "status": JOB_PENDING,
+                    "attempts": 0,
+                    "maxAttempts": max_attempts,
+                    "runAt": now,
+                    "leaseOwner": None,
+                    "leaseExpiresAt": None,
+                    "cancelRequested": False,
+                    "result": None,
+                    "updatedAt": now,
+                    "completedAt": None,
+                }
+            },
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def find_by_id(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    def count_pending(self, kind: str) -> int:
+        """等待执行的任务数（含等待重试的任务）"""
+        return self.collection.count_documents({"kind": kind, "status": JOB_PENDING})
+
+    def count_running(self, kind: str) -> int:
+        """所有进程中执行中的任务数（全局并发上限）"""
+        return self.collection.count_documents({"kind": kind, "status": JOB_RUNNING})
+
+    def claim(self, kind: str, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        原子领取一个可执行的任务：按优先级、runAt 顺序，领取后状态为 running 并持有租约
+
+        Returns:
+            领取到的任务文档（attempts 已加一）；没有可执行任务时返回 None
+        """
+        now = get_current_time()
+        return self.collection.find_one_and_update(
+            {"kind": kind, "status": JOB_PENDING, "runAt": {"$lte": now}},
+            {
+                "$set": {
+                    "status": JOB_RUNNING,
+                    "leaseOwner": worker_id,
+                    "leaseExpiresAt": now + timedelta(seconds=lease_seconds),
+                    "startedAt": now,
+                    "updatedAt": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", 1), ("runAt", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        续约
+
+        Returns:
+            {"cancelRequested": bool}；租约已丢失（已过期并被重新领取）时返回 None
+        """
+        now = get_current_time()
+        return self.collection.find_one_and_update(
+            {"id": job_id, "status": JOB_RUNNING, "leaseOwner": worker_id},
+            {"$set": {"leaseExpiresAt": now + timedelta(seconds=lease_seconds), "updatedAt": now}},
+            projection={"_id": 0, "cancelRequested": 1},
+        )
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """执行中的任务是否已被请求取消（执行端每秒检查一次）"""
+        job = self.collection.find_one({"id": job_id}, {"_id": 0, "cancelRequested": 1, "status": 1})
+        return bool(job and (job.get("cancelRequested") or job.get("status") == JOB_CANCELLED))
+
+    def request_cancel(self, job_id: str) -> bool:
+        """
+        请求取消任务：排队中的任务直接取消，执行中的任务标记 cancelRequested 等待执行端中止
+
+        Returns:
+            任务是否处于可取消的状态
+        """
+        now = get_current_time()
+        result = self.collection.update_one(
+            {"id": job_id, "status": JOB_PENDING},
+            {"$set": {"status": JOB_CANCELLED, "cancelRequested": True, "completedAt": now, "updatedAt": now}},
+        )
+        if result.modified_count:
+            return True
+        result = self.collection.update_one(
+            {"id": job_id, "status": JOB_RUNNING},
+            {"$set": {"cancelRequested": True, "updatedAt": now}},
+        )
+        return result.modified_count > 0
+
+    def mark_cancelled(self, job_id: str, worker_id: str, reason: str) -> bool:
+        """执行端响应取消后写入最终状态（仅租约持有者可写入）"""
+        now = get_current_time()
+        updated = self.collection.update_one(
+            {"id": job_id, "status": JOB_RUNNING, "leaseOwner": worker_id},
+            {
+                "$set": {
+                    "status": JOB_CANCELLED,
+                    "lastError": reason,
+                    "leaseOwner": None,
+                    "leaseExpiresAt": None,
+                    "completedAt": now,
+                    "updatedAt": now,
+                }
+            },
+        )
+        return updated.modified_count > 0
+
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        """标记任务成功（仅租约持有者可写入）"""
+        now = get_current_time()
+        updated = self.collection.update_one(
+            {"id": job_id, "status": JOB_RUNNING, "leaseOwner": worker_id},
+            {
+                "$set": {
+                    "status": JOB_COMPLETED,
+                    "result": result,
+                    "leaseOwner": None,
+                    "leaseExpiresAt": None,
+                    "completedAt": now,
+                    "updatedAt": now,
+                }
+            },
+        )
+        return updated.modified_count > 0
+
+    def retry(self, job_id: str, worker_id: str, error: str, delay_seconds: float) -> bool:
+        """执行失败，delay_seconds 后重新进入待执行状态（仅租约持有者可写入）"""
+        now = get_current_time()
+        updated = self.collection.update_one(
+            {"id": job_id, "status": JOB_RUNNING, "leaseOwner": worker_id},
+            {
+                "$set": {
+                    "status": JOB_PENDING,
+                    "runAt": now + timedelta(seconds=delay_seconds),
+                    "lastError": error,
+                    "leaseOwner": None,
+                    "leaseExpiresAt": None,
+                    "updatedAt": now,
+                }
+            },
+        )
+        return updated.modified_count > 0
+
+    def bury(self, job_id: str, worker_id: str, error: str) -> bool:
+        """重试次数用尽，转入死信状态（仅租约持有者可写入）"""
+        now = get_current_time()
+        updated = self.collection.update_one(
+            {"id": job_id, "status": JOB_RUNNING, "leaseOwner": worker_id},
+            {
+                "$set": {
+                    "status": JOB_DEAD,
+                    "lastError": error,
+                    "leaseOwner": None,
+                    "leaseExpiresAt": None,
+                    "completedAt": now,
+                    "updatedAt": now,
+                }
+            },
+        )
+        return updated.modified_count > 0
+
+    def requeue_expired(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        回收租约过期的任务（执行进程崩溃或失联）：还有重试次数的重新排队，否则转入死信
+
+        Returns:
+            {"requeued": [...], "dead": [...]}，每项为 {"id", "kind", "payload"}
+        """
+        now = get_current_time()
+        expired = {"status": JOB_RUNNING, "leaseExpiresAt": {"$lt": now}}
+        projection = {"_id": 0, "id": 1, "kind": 1, "payload": 1, "attempts": 1, "maxAttempts": 1}
+
+        recovered: Dict[str, List[Dict[str, Any]]] = {"requeued": [], "dead": []}
+        for job in self.collection.find(expired, projection):
+            exhausted = job.get("attempts", 0) >= job.get("maxAttempts", DEFAULT_MAX_ATTEMPTS)
+            update = {
+                "status": JOB_DEAD if exhausted else JOB_PENDING,
+                "lastError": "租约过期（执行进程退出或失联）",
+                "leaseOwner": None,
+                "leaseExpiresAt": None,
+                "updatedAt": now,
+            }
+            if exhausted:
+                update["completedAt"] = now
+            else:
+                update["runAt"] = now
+            # 以 leaseExpiresAt 仍已过期为条件，避免覆盖刚续约或被重新领取的任务
+            result = self.collection.update_one(
+                {"id": job["id"], **expired},
+                {"$set": update},
+            )
+            if result.modified_count:
+                entry = {"id": job["id"], "kind": job["kind"], "payload": job.get("payload") or {}}
+                recovered["dead" if exhausted else "requeued"].append(entry)
+        return recovered
+
+    def get_stats(
+        self,
+        kinds: Optional[List[str]] = None,
+        wait_window_seconds: float = 900,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        按任务类型统计队列指标
+
+        - pending / leased / buried：待执行、执行中和死信的任务数（只统计这三种状态，走 status 索引）
+        - oldestPendingSeconds：已到执行时间但仍在排队的任务中最长的等待时间，没有时为 0
+        - wait：最近 wait_window_seconds 秒内开始执行的任务的排队时间（startedAt - runAt，
+          不含重试退避），{"count", "avgSeconds", "maxSeconds"}（走 startedAt 索引）
+
+        kinds 中没有任务的类型计为 0
+        """
+        names = {JOB_PENDING: "pending", JOB_RUNNING: "leased", JOB_DEAD: "buried"}
+        now = get_current_time()
+
+        def empty() -> Dict[str, Any]:
+            return {
+                **{name: 0 for name in names.values()},
+                "oldestPendingSeconds": 0,
+                "wait": {"count": 0, "avgSeconds": 0, "maxSeconds": 0},
+            }
+
+        stats: Dict[str, Dict[str, Any]] = {kind: empty() for kind in kinds or []}
+        counts = [
+            {"$match": {"status": {"$in": list(names)}}},
+            {"$group": {"_id": {"kind": "$kind", "status": "$status"}, "count": {"$sum": 1}}},
+        ]
+        for row in self.collection.aggregate(counts):
+            entry = stats.setdefault(row["_id"]["kind"], empty())
+            entry[names[row["_id"]["status"]]] = row["count"]
+
+        oldest = [
+            {"$match": {"status": JOB_PENDING, "runAt": {"$lte": now}}},
+            {"$group": {"_id": "$kind", "runAt": {"$min": "$runAt"}}},
+        ]
+        for row in self.collection.aggregate(oldest):
+            entry = stats.setdefault(row["_id"], empty())
+            entry["oldestPendingSeconds"] = round((now - row["runAt"]).total_seconds(), 3)
+
+        waits = [
+            {"$match": {"startedAt": {"$gte": now - timedelta(seconds=wait_window_seconds)}}},
+            {"$project": {"kind": 1, "waitMs": {"$subtract": ["$startedAt", "$runAt"]}}},
+            {"$group": {
+                "_id": "$kind",
+                "count": {"$sum": 1},
+                "avgMs": {"$avg": "$waitMs"},
+                "maxMs": {"$max": "$waitMs"},
+            }},
+        ]
+        for row in self.collection.aggregate(waits):
+            entry = stats.setdefault(row["_id"], empty())
+            entry["wait"] = {
+                "count": row["count"],
+                "avgSeconds": round((row["avgMs"] or 0) / 1000, 3),
+                "maxSeconds": round((row["maxMs"] or 0) / 1000, 3),
+            }
+        return stats
+
+
+_background_job_model: Optional[BackgroundJobModel] = None
+
+
+def get_background_job_model() -> BackgroundJobModel:
+    """获取 BackgroundJobModel 进程级单例"""
+    global _background_job_model
+    if _background_job_model is None:
+        _background_job_model = BackgroundJobModel()
+    return _background_job_model
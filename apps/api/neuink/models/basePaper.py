@@ -6,82 +6,64 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional, Tuple
 from ..utils.db import get_db
 from ..utils.common import generate_id, get_current_time
+from .paperSearchIndex import get_paper_search_index, record_paper_deletion
+from .contentVersion import next_content_version
+
+
+# 论文内容版本号：论文文档、章节、block 的每次写入都递增，
+# 用作详情缓存键和条件请求校验，缺失视为 0
+VERSION_FIELD = "version"
+
+# 论文文档字段最近一次修改的内容同步序号（见 models/contentVersion.py），供增量同步使用
+SYNC_VERSION_FIELD = "syncVersion"
+
+
+def section_push(section_id: str, position: Optional[int]) -> Dict[str, Any]:
+    """
+    向 sectionIds 插入章节的 $push 参数
+
+    position 为 -1（或其他负数、None）时添加到末尾，0 表示最顶部，超出长度时 MongoDB 同样添加到末尾
+    """
+    if position is None or position < 0:
+        return {"$each": [section_id]}
+    return {"$each": [section_id], "$position": position}
 
 
 class BasePaperModel(ABC):
     """BasePaper 数据模型抽象基类"""
 
+    # fields= 参数可选择的顶层字段，子类追加特有字段
+    SELECTABLE_FIELDS: Tuple[str, ...] = (
+        "id",
+        "metadata",
+        "abstract",
+        "keywords",
+        "references",
+        "attachments",
+        "sectionIds",
+        "createdAt",
+        "updatedAt",
+    )
+
     def __init__(self):
-        """初始化 BasePaper 模型"""
+        """初始化 BasePaper 模型（索引由 models/indexes.py 在启动时统一创建）"""
         self.collection = get_db()[self.get_collection_name()]
-        self._ensure_indexes()
 
     @abstractmethod
     def get_collection_name(self) -> str:
         """返回集合名称"""
         pass
 
-    def _ensure_indexes(self):
-        """确保必要的索引存在"""
-        import logging
-        logger = logging.getLogger(__name__)
-        collection_name = self.get_collection_name()
-        
-        logger.info(f"开始为集合 {collection_name} 创建索引")
-        
-        try:
-            self.collection.create_index("id", unique=True)
-            logger.info(f"集合 {collection_name}: 创建唯一索引 id")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 id 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("createdAt")
-            logger.info(f"集合 {collection_name}: 创建索引 createdAt")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 createdAt 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("updatedAt")
-            logger.info(f"集合 {collection_name}: 创建索引 updatedAt")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 updatedAt 索引失败 - {str(e)}")
-            
-        # 注意：不在这里创建全文索引，让子类根据需要创建自己的全文索引
-        # 这样可以避免基类和子类之间的索引冲突
-        logger.info(f"集合 {collection_name}: 跳过全文索引创建，由子类负责")
-            
-        try:
-            self.collection.create_index("metadata.year")
-            logger.info(f"集合 {collection_name}: 创建索引 metadata.year")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 metadata.year 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("metadata.articleType")
-            logger.info(f"集合 {collection_name}: 创建索引 metadata.articleType")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 metadata.articleType 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("metadata.tags")
-            logger.info(f"集合 {collection_name}: 创建索引 metadata.tags")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 metadata.tags 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("metadata.authors.name")
-            logger.info(f"集合 {collection_name}: 创建索引 metadata.authors.name")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 metadata.authors.name 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("sectionIds")
-            logger.info(f"集合 {collection_name}: 创建索引 sectionIds")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 sectionIds 索引失败 - {str(e)}")
-            
-        logger.info(f"集合 {collection_name} 索引创建完成")
+    def _mark_search_dirty(self, paper_id: str, deleted: bool = False) -> None:
+        """
+        通知全文检索索引：该论文已被写入，下次搜索前重新读取
+
+        Args:
+            deleted: 论文已删除，同时写入删除记录，其他进程的索引同步时据此移除
+        """
+        get_paper_search_index().mark_dirty(self.get_collection_name(), paper_id)
+        if deleted:
+            record_paper_deletion(self.collection, paper_id)
 
     def create(self, paper_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -113,6 +95,7 @@ class BasePaperModel(ABC):
         paper.update(self.get_specific_fields(paper_data))
 
         self.collection.insert_one(paper)
+        self._mark_search_dirty(paper_id)
         # 返回前查询一次，确保不包含任何MongoDB特定对象
         return self.find_by_id(paper_id)
 
@@ -121,27 +104,33 @@ class BasePaperModel(ABC):
         """获取子类特有的字段"""
         pass
 
-    def find_by_id(self, paper_id: str) -> Optional[Dict[str, Any]]:
+    def find_by_id(
+        self,
+        paper_id: str,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """
         根据ID查找论文
+
+        Args:
+            projection: 可选的字段投影（如 fields= 参数转换而来），默认读取完整文档
         """
-        return self.collection.find_one({"id": paper_id}, {"_id": 0})
+        return self.collection.find_one({"id": paper_id}, projection or {"_id": 0})
 
     def update(self, paper_id: str, update_data: Dict[str, Any]) -> bool:
         """
         更新论文
         """
-        # 检查是否是嵌套字段更新（如 sections.0）
-        has_nested_fields = any('.' in key for key in update_data.keys())
-        
-        if has_nested_fields:
-            # 对于嵌套字段，不添加updatedAt到根级别
-            result = self.collection.update_one({"id": paper_id}, {"$set": update_data})
-        else:
-            # 对于非嵌套字段，添加updatedAt
-            update_data["updatedAt"] = get_current_time()
-            result = self.collection.update_one({"id": paper_id}, {"$set": update_data})
-        
+        # 嵌套字段更新（如 metadata.title）同样刷新根级 updatedAt，
+        # 其他进程的全文检索索引按 updatedAt 增量同步
+        update_data[SYNC_VERSION_FIELD] = next_content_version()
+        update_data["updatedAt"] = get_current_time()
+        result = self.collection.update_one(
+            {"id": paper_id}, {"$set": update_data, "$inc": {VERSION_FIELD: 1}}
+        )
+
+        if result.modified_count > 0:
+            self._mark_search_dirty(paper_id)
         return result.modified_count > 0
 
     def update_direct(self, paper_id: str, update_operation: Dict[str, Any]) -> bool:
@@ -151,15 +140,73 @@ class BasePaperModel(ABC):
         # 添加updatedAt到根级别
         update_operation["$set"] = update_operation.get("$set", {})
         update_operation["$set"]["updatedAt"] = get_current_time()
+        update_operation["$set"][SYNC_VERSION_FIELD] = next_content_version()
+        update_operation.setdefault("$inc", {})[VERSION_FIELD] = 1
         
         result = self.collection.update_one({"id": paper_id}, update_operation)
+        if result.modified_count > 0:
+            self._mark_search_dirty(paper_id)
+        return result.modified_count > 0
+
+    def bump_version(self, paper_id: str) -> bool:
+        """
+        递增论文内容版本号（章节、block 写入后调用，论文文档自身的写入已包含递增）
+        """
+        result = self.collection.update_one({"id": paper_id}, {"$inc": {VERSION_FIELD: 1}})
         return result.modified_count > 0
 
+    def get_version_info(
+        self,
+        paper_id: str,
+        query: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        只读取论文版本号和 sectionIds（用于计算 ETag），论文不存在或不满足 query 时返回 None
+        """
+        doc = self.collection.find_one(
+            {**(query or {}), "id": paper_id}, {"_id": 0, VERSION_FIELD: 1, "sectionIds": 1}
+        )
+        if doc is None:
+            return None
+        doc.setdefault(VERSION_FIELD, 0)
+        return doc
+
+    def get_sync_info(
+        self,
+        paper_id: str,
+        query: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        只读取增量同步需要的版本信息（version、syncVersion、sectionIds），
+        论文不存在或不满足 query 时返回 None
+        """
+        doc = self.collection.find_one(
+            {**(query or {}), "id": paper_id},
+            {"_id": 0, VERSION_FIELD: 1, SYNC_VERSION_FIELD: 1, "sectionIds": 1},
+        )
+        if doc is None:
+            return None
+        doc.setdefault(VERSION_FIELD, 0)
+        doc.setdefault(SYNC_VERSION_FIELD, 0)
+        doc.setdefault("sectionIds", [])
+        return doc
+
+    def get_version(self, paper_id: str, query: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        只读取论文版本号（投影查询），论文不存在或不满足 query 时返回 None
+        """
+        doc = self.collection.find_one({**(query or {}), "id": paper_id}, {"_id": 0, VERSION_FIELD: 1})
+        if doc is None:
+            return None
+        return doc.get(VERSION_FIELD, 0)
+
     def delete(self, paper_id: str) -> bool:
         """
         删除论文
         """
         result = self.collection.delete_one({"id": paper_id})
+        if result.deleted_count > 0:
+            self._mark_search_dirty(paper_id, deleted=True)
         return result.deleted_count > 0
 
     def exists(self, paper_id: str) -> bool:
@@ -176,7 +223,8 @@ class BasePaperModel(ABC):
             {"id": paper_id},
             {
                 "$push": {"sectionIds": section_id},
-                "$set": {"updatedAt": get_current_time()}
+                "$set": {"updatedAt": get_current_time()},
+                "$inc": {VERSION_FIELD: 1},
             }
         )
         return result.modified_count > 0
@@ -189,7 +237,26 @@ class BasePaperModel(ABC):
             {"id": paper_id},
             {
                 "$pull": {"sectionIds": section_id},
-                "$set": {"updatedAt": get_current_time()}
+                "$set": {"updatedAt": get_current_time()},
+                "$inc": {VERSION_FIELD: 1},
+            }
+        )
+        return result.modified_count > 0
+
+    def replace_section_id(self, paper_id: str, old_section_id: str, new_section_id: str) -> bool:
+        """
+        原位替换论文中的section ID引用（保持章节顺序）
+
+        old_section_id 不在该论文的 sectionIds 中时不做修改并返回False
+        """
+        result = self.collection.update_one(
+            {"id": paper_id, "sectionIds": old_section_id},
+            {
+                "$set": {
+                    "sectionIds.$": new_section_id,
+                    "updatedAt": get_current_time()
+                },
+                "$inc": {VERSION_FIELD: 1},
             }
         )
         return result.modified_count > 0
@@ -204,7 +271,8 @@ class BasePaperModel(ABC):
                 "$set": {
                     "sectionIds": section_ids,
                     "updatedAt": get_current_time()
-                }
+                },
+                "$inc": {VERSION_FIELD: 1},
             }
         )
         return result.modified_count > 0
@@ -221,58 +289,38 @@ class BasePaperModel(ABC):
         Returns:
             是否成功
         """
-        # 获取当前论文
-        paper = self.find_by_id(paper_id)
-        if not paper:
-            return False
-        
-        # 获取当前的sectionIds
-        section_ids = paper.get("sectionIds", [])
-        
-        # 添加调试日志
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"add_section_id_at_position - paper_id: {paper_id}, section_id: {section_id}, position: {position}, current_section_ids: {section_ids}")
-        
-        # 确定插入位置
-        if position == -1 or position >= len(section_ids):
-            # 在末尾添加
-            section_ids.append(section_id)
-            logger.info(f"在末尾添加section - final_section_ids: {section_ids}")
-        elif position == 0:
-            # 在最顶部插入
-            section_ids.insert(0, section_id)
-            logger.info(f"在顶部插入section - final_section_ids: {section_ids}")
-        elif position > 0:
-            # 在指定位置插入（确保position是正数）
-            section_ids.insert(position, section_id)
-            logger.info(f"在位置{position}插入section - final_section_ids: {section_ids}")
-        else:
-            # position是负数但不是-1，默认添加到末尾
-            section_ids.append(section_id)
-            logger.info(f"position为负数但不是-1，默认添加到末尾 - final_section_ids: {section_ids}")
-        
-        # 更新论文的sectionIds
-        result = self.update_section_ids(paper_id, section_ids)
-        logger.info(f"update_section_ids结果: {result}")
-        return result
+        # 单条 $push 原子插入，不与复制章节时的原位替换（replace_section_id）等并发写入互相覆盖
+        result = self.collection.update_one(
+            {"id": paper_id},
+            {
+                "$push": {"sectionIds": section_push(section_id, position)},
+                "$set": {"updatedAt": get_current_time()},
+                "$inc": {VERSION_FIELD: 1},
+            }
+        )
+        return result.modified_count > 0
 
-    def find_paper_with_sections(self, paper_id: str) -> Optional[Dict[str, Any]]:
+    def find_paper_with_sections(
+        self,
+        paper_id: str,
+        projection: Optional[Dict[str, Any]] = None,
+        section_projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """
         查找论文并包含完整的sections数据
+
+        Args:
+            projection: 论文投影（需包含 sectionIds），默认读取完整文档
+            section_projection: 章节投影，例如只读取标题生成目录，默认读取完整内容
         """
-        from .section import find_sections_by_ids
+        from .section import attach_sections
         
-        paper = self.find_by_id(paper_id)
+        paper = self.find_by_id(paper_id, projection)
         if not paper:
             return None
         
-        # 从sectionIds查询sections
-        if "sectionIds" in paper and paper["sectionIds"]:
-            sections = find_sections_by_ids(paper["sectionIds"])
-            paper["sections"] = sections
-        else:
-            paper["sections"] = []
+        # 按sectionIds顺序加载sections
+        attach_sections([paper], section_projection)
         
         return paper
 
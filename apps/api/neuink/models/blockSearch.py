@@ -0,0 +1,347 @@
+"""
+BlockSearch 数据模型
+章节内容块级全文检索：每个含可检索文本的 block 一条索引文档
+{sectionId, paperId, blockId, text, searchText}，通过 (paperId, searchText) 文本索引
+查找（default_language="none"，searchText 已按中文 bigram 切好词），命中结果直接定位到 block。
+paperId 为章节文档的所属论文，检索时按 paperId 等值限定，只扫描该论文的倒排表。
+
+- 写入：PaperContentService 的 block 写路径只增量更新被修改的 block
+  （SectionModel 的 keep_search_index 写入同时推进 searchIndexedAt）；
+  整章写入（新建章节、整体替换 content）重建所在章节的索引
+- 补齐：Section 文档记录 searchIndexedAt（建索引时读到的 updatedAt），
+  为 searchIndexedAt 与 updatedAt 不一致的章节补建索引，覆盖解析结果导入、后台任务等其他写入路径：
+  后台线程（BLOCK_SEARCH_SYNC_INTERVAL）只检查 Counters 中记录的时间水位之后修改过的章节，
+  全量检查只由 reindex-blocks 命令执行；检索本身不触发补建
+- 共享章节：个人论文引用的公共章节 paperId 为公共论文，检索时按章节范围内出现的
+  所属论文分别查询再合并，由调用方把命中的章节映射回论文
+- 索引迁移到 (paperId, searchText) 后，需执行一次 `flask --app run reindex-blocks --all`
+  为已有章节补写 paperId
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import click
+from pymongo import DeleteMany, DeleteOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from ..utils.db import get_db
+from ..utils.common import get_current_time
+from ..utils.pagination import fetch_page
+from ..utils.workers import register_worker
+from ..utils.text_search import block_plain_text, build_search_query, build_search_text, tokenize
+from ..config.constants import Collections
+
+logger = logging.getLogger(__name__)
+
+# 索引文档中保存的纯文本上限（只用于生成摘要片段）
+MAX_STORED_TEXT = 2000
+# 摘要片段长度
+SNIPPET_LENGTH = 80
+
+_RESULT_PROJECTION = {
+    "_id": 0,
+    "sectionId": 1,
+    "blockId": 1,
+    "text": 1,
+    "score": {"$meta": "textScore"},
+}
+_SECTION_PROJECTION = {"_id": 0, "id": 1, "paperId": 1, "content": 1, "updatedAt": 1}
+
+# 补建扫描的时间水位向前多取一段，覆盖各进程的时钟误差
+_SYNC_SKEW = timedelta(seconds=60)
+# 补建扫描的时间水位（Counters 集合中的一条文档，所有进程共享）
+_SYNC_WATERMARK_ID = "blockSearchSync"
+# 补建扫描每批读取的章节数
+_SYNC_BATCH_SIZE = 200
+
+
+def make_snippet(text: str, keyword: str, length: int = SNIPPET_LENGTH) -> str:
+    """截取命中位置附近的文本；找不到命中位置时取开头"""
+    if not text:
+        return ""
+    lowered = text.lower()
+    positions = [lowered.find(token) for token in tokenize(keyword)]
+    positions = [pos for pos in positions if pos >= 0]
+    hit = min(positions) if positions else 0
+
+    start = max(0, hit - length // 4)
+    end = min(len(text), start + length)
+    start = max(0, end - length)
+    snippet = " ".join(text[start:end].split())
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet += "…"
+    return snippet
+
+
+class BlockSearchModel:
+    """BlockSearch 数据模型类"""
+
+    def __init__(self):
+        """初始化 BlockSearch 模型（索引由 models/indexes.py 在启动时统一创建）"""
+        self.collection = get_db()[Collections.BLOCK_SEARCH]
+        self.sections = get_db()[Collections.SECTION]
+        self.counters = get_db()[Collections.COUNTERS]
+
+    @staticmethod
+    def _block_operation(section_id: str, paper_id: Optional[str], block: Dict[str, Any]) -> Any:
+        """单个 block 的索引写入：有可检索文本时 upsert，否则删除"""
+        text = block_plain_text(block)
+        search_text = build_search_text(text)
+        key = {"sectionId": section_id, "blockId": block["id"]}
+        if not search_text:
+            return DeleteOne(key)
+        return ReplaceOne(
+            key,
+            {**key, "paperId": paper_id, "text": text[:MAX_STORED_TEXT], "searchText": search_text},
+            upsert=True,
+        )
+
+    def index_blocks(
+        self,
+        section_id: str,
+        paper_id: str,
+        blocks: Iterable[Dict[str, Any]] = (),
+        removed_block_ids: Iterable[str] = (),
+    ) -> None:
+        """
+        增量更新章节中被修改的 block：blocks 为写入后的 block，removed_block_ids 为已删除的 block
+
+        Args:
+            paper_id: 章节文档的所属论文（Section.paperId）
+
+        写入失败时清除章节的 searchIndexedAt，交给后台补建整个章节
+        """
+        operations: List[Any] = [
+            self._block_operation(section_id, paper_id, block)
+            for block in blocks
+            if isinstance(block, dict) and block.get("id")
+        ]
+        removed = list(removed_block_ids)
+        if removed:
+            operations.append(DeleteMany({"sectionId": section_id, "blockId": {"$in": removed}}))
+        if not operations:
+            return
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"block 索引增量更新失败 section_id={section_id}: {exc}")
+            self.sections.update_one({"id": section_id}, {"$unset": {"searchIndexedAt": ""}})
+
+    def index_section(self, section_id: str, section: Optional[Dict[str, Any]] = None) -> int:
+        """
+        重建一个章节的块索引，返回索引的 block 数
+
+        Args:
+            section: 已读取的章节文档（需包含 paperId、content 和 updatedAt），不传时从数据库读取
+        """
+        if section is None:
+            section = self.sections.find_one({"id": section_id}, _SECTION_PROJECTION)
+            if section is None:
+                self.remove_section(section_id)
+                return 0
+
+        operations: List[Any] = []
+        block_ids: List[str] = []
+        for block in section.get("content") or []:
+            if not isinstance(block, dict) or not block.get("id"):
+                continue
+            operation = self._block_operation(section_id, section.get("paperId"), block)
+            if isinstance(operation, ReplaceOne):
+                block_ids.append(block["id"])
+                operations.append(operation)
+        operations.append(DeleteMany({"sectionId": section_id, "blockId": {"$nin": block_ids}}))
+
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as exc:
+            # 并发重建同一章节时 upsert 可能撞上唯一索引，另一方的结果同样有效
+            logger.warning(f"章节块索引部分写入失败 section_id={section_id}: {exc.details.get('writeErrors', [])[:1]}")
+            return len(block_ids)
+
+        # 只在章节未被再次修改时标记；期间有新的写入则留给下一次补齐
+        self.sections.update_one(
+            {"id": section_id, "updatedAt": section.get("updatedAt")},
+            {"$set": {"searchIndexedAt": section.get("updatedAt")}},
+        )
+        return len(block_ids)
+
+    def remove_section(self, section_id: str) -> None:
+        self.collection.delete_many({"sectionId": section_id})
+
+    def reindex_stale(self, since: Optional[datetime] = None, rebuild_all: bool = False) -> int:
+        """
+        为索引落后于内容的章节补建索引，返回补建的章节数
+
+        Args:
+            since: 只检查 updatedAt 不早于该时间的章节（走 updatedAt 索引）；None 时检查全部章节
+            rebuild_all: 重建全部章节的索引（索引结构变更后使用）
+        """
+        query: Dict[str, Any] = {} if rebuild_all else {"$expr": {"$ne": ["$searchIndexedAt", "$updatedAt"]}}
+        if since is not None:
+            query["updatedAt"] = {"$gte": since}
+        # 按 (updatedAt, id) 分批读取，每批只加载 _SYNC_BATCH_SIZE 个章节的内容
+        count = 0
+        after: Optional[Dict[str, Any]] = None
+        while True:
+            batch_query = query
+            if after is not None:
+                batch_query = {
+                    "$and": [
+                        query,
+                        {
+                            "$or": [
+                                {"updatedAt": {"$gt": after["updatedAt"]}},
+                                {"updatedAt": after["updatedAt"], "id": {"$gt": after["id"]}},
+                            ]
+                        },
+                    ]
+                }
+            batch = list(
+                self.sections.find(batch_query, _SECTION_PROJECTION)
+                .sort([("updatedAt", 1), ("id", 1)])
+                .limit(_SYNC_BATCH_SIZE)
+            )
+            for section in batch:
+                self.index_section(section["id"], section)
+            count += len(batch)
+            if len(batch) < _SYNC_BATCH_SIZE:
+                return count
+            after = batch[-1]
+
+    def get_sync_watermark(self) -> Optional[datetime]:
+        """后台补建已检查到的时间水位，尚未记录时返回 None"""
+        doc = self.counters.find_one({"_id": _SYNC_WATERMARK_ID}, {"_id": 0, "at": 1})
+        return doc.get("at") if doc else None
+
+    def advance_sync_watermark(self, at: datetime) -> None:
+        """推进补建时间水位（只前进不后退，多个进程并发推进时取最大值）"""
+        self.counters.update_one({"_id": _SYNC_WATERMARK_ID}, {"$max": {"at": at}}, upsert=True)
+
+    def sync_stale(self) -> int:
+        """
+        后台补建：只检查时间水位之后修改过的章节，完成后推进水位，返回补建的章节数
+
+        首次运行（数据库中还没有水位）只记录水位、不扫描全部章节；
+        已有章节的补建由 reindex-blocks 命令完成。
+        """
+        started = get_current_time()
+        watermark = self.get_sync_watermark()
+        count = 0
+        if watermark is not None:
+            count = self.reindex_stale(watermark - _SYNC_SKEW)
+        else:
+            logger.info("[SEARCH] no block index sync watermark yet; run `flask --app run reindex-blocks` for existing sections")
+        self.advance_sync_watermark(started)
+        return count
+
+    def search(
+        self,
+        section_ids: List[str],
+        keyword: str,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        在指定章节范围内检索 block，按相关度排序
+
+        Returns:
+            ([{"sectionId", "blockId", "snippet"}], 总数)
+        """
+        terms = build_search_query(keyword)
+        if not terms or not section_ids:
+            return [], 0
+
+        # 章节范围内出现的所属论文：通常只有一篇，个人论文引用公共章节时为两篇
+        owners = [
+            owner for owner in self.sections.distinct("paperId", {"id": {"$in": section_ids}})
+            if owner is not None
+        ]
+        sort = [("score", {"$meta": "textScore"}), ("sectionId", 1), ("blockId", 1)]
+        hits: List[Dict[str, Any]] = []
+        total = 0
+        for owner in owners:
+            # 多篇所属论文时各取前 skip + limit 条，合并排序后再截取当前页
+            page, count = fetch_page(
+                self.collection,
+                {"paperId": owner, "$text": {"$search": terms}, "sectionId": {"$in": section_ids}},
+                sort,
+                limit=limit if len(owners) == 1 else skip + limit,
+                skip=skip if len(owners) == 1 else 0,
+                projection=_RESULT_PROJECTION,
+            )
+            hits.extend(page)
+            total += count
+        if len(owners) > 1:
+            hits.sort(key=lambda hit: (-hit.get("score", 0), hit["sectionId"], hit["blockId"]))
+            hits = hits[skip:skip + limit]
+        return [
+            {
+                "sectionId": hit["sectionId"],
+                "blockId": hit["blockId"],
+                "snippet": make_snippet(hit.get("text", ""), keyword),
+            }
+            for hit in hits
+        ], total
+
+
+_block_search_model: Optional[BlockSearchModel] = None
+
+
+def get_block_search_model() -> BlockSearchModel:
+    """获取 BlockSearchModel 进程级单例"""
+    global _block_search_model
+    if _block_search_model is None:
+        _block_search_model = BlockSearchModel()
+    return _block_search_model
+
+
+_sync_thread: Optional[threading.Thread] = None
+
+
+def _sync_loop(app, interval: float) -> None:
+    # 每轮只检查数据库中记录的时间水位之后修改过的章节，进程重启不会触发全量扫描
+    while True:
+        time.sleep(interval)
+        try:
+            with app.app_context():
+                count = get_block_search_model().sync_stale()
+            if count:
+                app.logger.info("[SEARCH] rebuilt block index for %s sections", count)
+        except Exception as exc:  # pylint: disable=broad-except
+            app.logger.warning("[SEARCH] block index sync failed: %s", exc)
+
+
+def init_app(app) -> None:
+    """
+    注册块索引补建命令，并登记 Web 服务进程内的补建线程
+
+    BLOCK_SEARCH_SYNC_INTERVAL：补建间隔（秒），默认 30，0 表示只通过命令补建
+    """
+
+    @app.cli.command("reindex-blocks")
+    @click.option("--all", "rebuild_all", is_flag=True, help="重建全部章节的块索引")
+    def reindex_blocks_command(rebuild_all):
+        """检查全部章节，为块索引落后于内容的章节补建索引，并推进后台补建的时间水位"""
+        model = get_block_search_model()
+        started = get_current_time()
+        count = model.reindex_stale(rebuild_all=rebuild_all)
+        model.advance_sync_watermark(started - _SYNC_SKEW)
+        print(f"reindexed: {count}")
+
+    register_worker(app, _start_sync_thread)
+
+
+def _start_sync_thread(app) -> None:
+    global _sync_thread
+    interval = float(os.getenv("BLOCK_SEARCH_SYNC_INTERVAL", "30"))
+    if interval > 0 and _sync_thread is None:
+        _sync_thread = threading.Thread(
+            target=_sync_loop, args=(app, interval), name="block-search-sync", daemon=True
+        )
+        _sync_thread.start()
@@ -0,0 +1,59 @@
+"""
+内容同步序号
+Counters 集合中的一条计数文档提供全局单调递增的序号。章节、block 和论文文档
+写入时记录本次写入分配的序号，增量同步接口（/changes?since=）据此只返回
+某个序号之后变化的内容：
+
+- Section.version：章节最近一次写入的序号
+- Section.contentVersion：章节内容整体写入（创建、复制、整体替换 content）的序号
+- block.version：block 最近一次插入或修改的序号（删除和移动通过返回的 blockIds 体现）
+- Paper.syncVersion：论文文档字段最近一次修改的序号
+
+序号是全局的（而不是每篇论文一个），共享章节被任何一篇论文写入后，
+引用它的论文都能通过同一个序号发现变更。
+
+序号在写入落库之前分配，读取时可能看到序号更大的写入、而序号更小的写入尚未落库，
+因此返回给客户端的水位由 settled_version 计算，不能直接使用计数器的当前值。
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from ..utils.db import get_db
+from ..utils.common import get_current_time
+from ..config.constants import Collections
+
+CONTENT_VERSION_COUNTER = "contentVersion"
+
+# 分配序号到写入落库的最长耗时（含各进程的时钟误差）
+SETTLE_SECONDS = 10
+
+
+def next_content_version() -> int:
+    """分配一个新的内容同步序号"""
+    doc = get_db()[Collections.COUNTERS].find_one_and_update(
+        {"_id": CONTENT_VERSION_COUNTER},
+        {"$inc": {"seq": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["seq"]
+
+
+def settled_version(
+    since: int,
+    writes: Iterable[Tuple[Optional[int], Optional[datetime]]],
+) -> int:
+    """
+    根据本次读到的写入 [(序号, 写入时间 updatedAt)] 计算可以返回给客户端的同步水位
+
+    只计入写入时间早于 SETTLE_SECONDS 的序号：比它更早分配的序号此时都已落库（或写入已失败），
+    下次同步不会漏掉；更新的写入会在下次同步时重复返回，客户端按 id 覆盖即可。
+    """
+    cutoff = get_current_time() - timedelta(seconds=SETTLE_SECONDS)
+    watermark = max(since, 0)
+    for version, written_at in writes:
+        if version and written_at is not None and written_at <= cutoff:
+            watermark = max(watermark, version)
+    return watermark
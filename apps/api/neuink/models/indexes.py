@@ -0,0 +1,361 @@
+"""
+索引注册表
+集中声明各集合需要的 MongoDB 索引，并提供一次性的索引迁移步骤。
+
+模型构造函数不再创建索引：索引通过 `flask --app run ensure-indexes` 命令
+或启动钩子（环境变量 ENSURE_INDEXES_ON_STARTUP=1，默认开启）在进程启动时创建一次，
+请求处理过程中不再产生任何索引相关的数据库往返。
+"""
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Union, Tuple
+
+from ..config.constants import Collections
+
+logger = logging.getLogger(__name__)
+
+IndexKeys = Union[str, List[Tuple[str, Any]]]
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """单个索引声明"""
+    keys: IndexKeys
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+# 已结束的持久化后台任务保留时长（秒），修改后由 ensure_indexes 通过 collMod 更新 TTL
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+
+def _text_index(*fields: str) -> IndexSpec:
+    return IndexSpec([(name, "text") for name in fields])
+
+
+# 论文集合（AdminPaper / UserPaper）共用的索引
+# 注意：全文索引每个集合只能有一个，由具体集合分别声明
+_PAPER_BASE_INDEXES: List[IndexSpec] = [
+    IndexSpec("id", {"unique": True}),
+    IndexSpec("createdAt"),
+    IndexSpec("updatedAt"),
+    IndexSpec("metadata.year"),
+    IndexSpec("metadata.articleType"),
+    IndexSpec("metadata.tags"),
+    IndexSpec("metadata.authors.name"),
+    IndexSpec("sectionIds"),
+]
+
+_PAPER_TEXT_INDEX = _text_index(
+    "metadata.title",
+    "metadata.titleZh",
+    "abstract.en",
+    "abstract.zh",
+)
+
+
+INDEX_REGISTRY: Dict[str, List[IndexSpec]] = {
+    Collections.USER: [
+        IndexSpec("id", {"unique": True}),
+        IndexSpec("username", {"unique": True}),
+        IndexSpec("role"),
+        # 用户列表游标分页
+        IndexSpec([("createdAt", 1), ("id", 1)]),
+    ],
+    Collections.ADMIN_PAPER: _PAPER_BASE_INDEXES + [
+        IndexSpec("isPublic"),
+        IndexSpec("createdBy"),
+        IndexSpec("parseStatus.status"),
+        _PAPER_TEXT_INDEX,
+        # 列表游标分页：(过滤字段, 排序字段, id)
+        IndexSpec([("createdAt", -1), ("id", -1)]),
+        IndexSpec([("createdBy", 1), ("createdAt", -1), ("id", -1)]),
+        IndexSpec([("isPublic", 1), ("createdAt", -1), ("id", -1)]),
+    ],
+    Collections.USER_PAPER: _PAPER_BASE_INDEXES + [
+        IndexSpec("userId"),
+        IndexSpec("sourcePaperId"),
+        IndexSpec([("userId", 1), ("sourcePaperId", 1)]),
+        _PAPER_TEXT_INDEX,
+        IndexSpec("customTags"),
+        IndexSpec("readingStatus"),
+        IndexSpec("priority"),
+        IndexSpec("addedAt"),
+        IndexSpec("lastReadTime"),
+        # 列表游标分页：(过滤字段, 排序字段, id)
+        IndexSpec([("userId", 1), ("addedAt", -1), ("id", -1)]),
+        IndexSpec([("userId", 1), ("createdAt", -1), ("id", -1)]),
+        IndexSpec([("userId", 1), ("updatedAt", -1), ("id", -1)]),
+    ],
+    Collections.SECTION: [
+        IndexSpec("id", {"unique": True}),
+        IndexSpec("paperId"),
+        # 写时复制：查找个人论文已复制出的章节副本
+        IndexSpec([("paperId", 1), ("sourceSectionId", 1)]),
+        IndexSpec("createdAt"),
+        IndexSpec("updatedAt"),
+        # ETag 计算只读取章节 updatedAt（覆盖查询）
+        IndexSpec([("id", 1), ("updatedAt", 1)]),
+    ],
+    Collections.NOTE: [
+        IndexSpec("id", {"unique": True}),
+        IndexSpec("userId"),
+        IndexSpec("userPaperId"),
+        IndexSpec("blockId"),
+        IndexSpec([("userId", 1), ("userPaperId", 1)]),
+        IndexSpec([("userPaperId", 1), ("blockId", 1)]),
+        IndexSpec("createdAt"),
+        # 笔记全文检索：searchText 已按中文 bigram 切好词，不做语言相关处理
+        IndexSpec([("userId", 1), ("searchText", "text")], {"default_language": "none", "name": "note_search_text"}),
+        # 笔记列表游标分页
+        IndexSpec([("userPaperId", 1), ("createdAt", -1), ("id", -1)]),
+        IndexSpec([("userId", 1), ("createdAt", -1), ("id", -1)]),
+    ],
+    Collections.PARSE_BLOCKS: [
+        IndexSpec([("userId", 1), ("createdAt", -1)]),
+        # 读取章节时合并解析进度
+        IndexSpec([("sectionId", 1), ("status", 1)]),
+        IndexSpec("expiresAt"),
+    ],
+    Collections.PDF_PARSE_TASKS: [
+        IndexSpec([("userId", 1), ("createdAt", -1)]),
+        IndexSpec([("paperId", 1), ("isAdmin", 1), ("createdAt", -1)]),
+        # 服务端轮询：按到期时间领取进行中的任务
+        IndexSpec([("status", 1), ("nextPollAt", 1)]),
+        # 重新提交解析完成后长时间未开始处理的任务
+        IndexSpec([("ingestState", 1), ("updatedAt", 1)]),
+        # 回收执行者退出后领取租约已过期的结果处理
+        IndexSpec([("ingestState", 1), ("ingestLeaseExpiresAt", 1)]),
+    ],
+    Collections.USER_STATS: [
+        IndexSpec("userId", {"unique": True}),
+    ],
+    Collections.BACKGROUND_JOBS: [
+        IndexSpec("id", {"unique": True}),
+        # 领取任务：按类型取最早可执行的高优先级任务
+        IndexSpec([("kind", 1), ("status", 1), ("priority", 1), ("runAt", 1)]),
+        # 回收租约过期的任务
+        IndexSpec([("status", 1), ("leaseExpiresAt", 1)]),
+        # 队列指标：最近开始执行的任务的排队时间
+        IndexSpec("startedAt"),
+        # 已结束（完成、死信、取消）的任务连同 payload 和结果在保留期后自动删除；
+        # 排队和执行中的任务 completedAt 为空，不受影响
+        IndexSpec("completedAt", {"expireAfterSeconds": JOB_RETENTION_SECONDS, "name": "background_jobs_ttl"}),
+    ],
+    Collections.BLOCK_SEARCH: [
+        IndexSpec([("sectionId", 1), ("blockId", 1)], {"unique": True}),
+        # 块级全文检索：按章节所属论文 paperId 等值限定范围，只扫描该论文的倒排表；
+        # searchText 已按中文 bigram 切好词，不做语言相关处理
+        IndexSpec(
+            [("paperId", 1), ("searchText", "text")],
+            {"default_language": "none", "name": "block_search_paper_text"},
+        ),
+    ],
+    Collections.PAPER_DELETIONS: [
+        IndexSpec([("collection", 1), ("deletedAt", 1)]),
+        # 删除记录只需保留到所有进程的索引都同步过（见 paperSearchIndex.DELETION_RETENTION_SECONDS）
+        IndexSpec("deletedAt", {"expireAfterSeconds": 7 * 24 * 3600, "name": "paper_deletions_ttl"}),
+    ],
+}
+
+
+# 已被替换的索引（{集合: [索引名]}），ensure_indexes 创建索引前先删除
+# （每个集合只能有一个全文索引，替换全文索引时必须先删除旧索引）
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    Collections.BLOCK_SEARCH: ["block_search_text"],
+}
+
+
+def _drop_obsolete_indexes(collection, collection_name: str) -> None:
+    for index_name in OBSOLETE_INDEXES.get(collection_name, []):
+        try:
+            collection.drop_index(index_name)
+            logger.info(f"集合 {collection_name}: 已删除旧索引 {index_name}")
+        except Exception as e:
+            # 索引不存在（已删除或从未创建）
+            logger.debug(f"集合 {collection_name}: 跳过删除旧索引 {index_name} - {str(e)}")
+
+
+def _error_code(exc: Exception) -> Optional[int]:
+    return getattr(exc, "code", None)
+
+
+def _is_options_conflict(exc: Exception) -> bool:
+    """同名或同键索引已存在但选项不同（IndexOptionsConflict，错误码 85）"""
+    return _error_code(exc) == 85 or "indexoptionsconflict" in str(exc).lower()
+
+
+def _is_existing_index_error(exc: Exception) -> bool:
+    """
+    已存在同名或同键的索引（IndexOptionsConflict 85 / IndexKeySpecsConflict 86）；
+    是否可以忽略还要看已有索引是否与声明等价（见 _find_equivalent_index）
+    """
+    if _error_code(exc) in (85, 86):
+        return True
+    error_msg = str(exc).lower()
+    return any(keyword in error_msg for keyword in ["already exists", "indexoptionsconflict", "indexkeyspecsconflict"])
+
+
+def _is_duplicate_key_error(exc: Exception) -> bool:
+    """创建唯一索引时已有重复数据（E11000）"""
+    return _error_code(exc) == 11000 or "e11000" in str(exc).lower()
+
+
+def _key_signature(keys: IndexKeys, weights: Optional[Dict[str, Any]] = None) -> Tuple[Tuple[Tuple[str, Any], ...], frozenset]:
+    """
+    索引键的可比较形式：(普通键, 全文索引字段)
+
+    已有全文索引在 index_information 中的键为 _fts / _ftsx，字段记录在 weights 中
+    """
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    plain = []
+    text_fields = set(weights or {})
+    for name, direction in keys:
+        if name in ("_fts", "_ftsx"):
+            continue
+        if direction == "text":
+            text_fields.add(name)
+            continue
+        if isinstance(direction, (int, float)):
+            direction = int(direction)
+        plain.append((name, direction))
+    return tuple(plain), frozenset(text_fields)
+
+
+def _same_options(info: Dict[str, Any], options: Dict[str, Any]) -> bool:
+    """影响索引行为的选项（唯一、稀疏、TTL、部分索引）是否一致，索引名不参与比较"""
+    for option in ("unique", "sparse"):
+        if bool(info.get(option, False)) != bool(options.get(option, False)):
+            return False
+    for option in ("expireAfterSeconds", "partialFilterExpression"):
+        if info.get(option) != options.get(option):
+            return False
+    return True
+
+
+def _find_equivalent_index(collection, spec: IndexSpec) -> Optional[str]:
+    """已有索引中与声明的键和选项都相同的索引名（例如只是索引名不同），没有时返回 None"""
+    wanted = _key_signature(spec.keys)
+    try:
+        indexes = collection.index_information()
+    except Exception as e:
+        logger.warning(f"集合 {collection.name}: 读取已有索引失败 - {str(e)}")
+        return None
+    for name, info in indexes.items():
+        if _key_signature(info.get("key", []), info.get("weights")) == wanted and _same_options(info, spec.options):
+            return name
+    return None
+
+
+def _update_ttl(collection, spec: IndexSpec) -> bool:
+    """
+    同名 TTL 索引已存在但保留时长不同：通过 collMod 修改 expireAfterSeconds（无需重建索引）
+
+    Returns:
+        是否已更新；不是 TTL 索引或 collMod 失败时返回 False
+    """
+    expire_after = spec.options.get("expireAfterSeconds")
+    name = spec.options.get("name")
+    if expire_after is None or not name:
+        return False
+    try:
+        collection.database.command(
+            "collMod", collection.name, index={"name": name, "expireAfterSeconds": expire_after}
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"集合 {collection.name}: 更新 TTL 索引 {name} 失败 - {str(e)}")
+        return False
+
+
+def ensure_indexes(db=None, collections: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    按注册表创建索引（幂等）
+
+    Args:
+        db: 数据库句柄，默认使用 get_db()（需要应用上下文）
+        collections: 只处理指定集合，默认处理注册表中的全部集合
+
+    Returns:
+        每个集合成功确认的索引数量
+    """
+    if db is None:
+        from ..utils.db import get_db
+        db = get_db()
+
+    summary: Dict[str, int] = {}
+    for collection_name, specs in INDEX_REGISTRY.items():
+        if collections and collection_name not in collections:
+            continue
+
+        collection = db[collection_name]
+        _drop_obsolete_indexes(collection, collection_name)
+        ensured = 0
+        for spec in specs:
+            try:
+                collection.create_index(spec.keys, **spec.options)
+                ensured += 1
+            except Exception as e:
+                if _is_options_conflict(e) and _update_ttl(collection, spec):
+                    logger.info(f"集合 {collection_name}: 已更新 TTL 索引 {spec.options['name']} 的保留时长")
+                    ensured += 1
+                elif _is_existing_index_error(e) and _find_equivalent_index(collection, spec):
+                    logger.info(f"集合 {collection_name}: 索引 {spec.keys} 已存在，跳过创建")
+                    ensured += 1
+                elif _is_duplicate_key_error(e):
+                    # 唯一索引缺失时按唯一性去重/upsert 的逻辑会失效，需要清理重复数据后重新执行
+                    logger.error(f"集合 {collection_name}: 存在重复数据，唯一索引 {spec.keys} 未创建 - {str(e)}")
+                elif _is_existing_index_error(e):
+                    logger.error(
+                        f"集合 {collection_name}: 已有同名或同键但键、选项不同的索引，索引 {spec.keys} 未创建，"
+                        f"需要删除旧索引后重新执行 - {str(e)}"
+                    )
+                else:
+                    logger.warning(f"集合 {collection_name}: 创建索引 {spec.keys} 失败 - {str(e)}")
+
+        summary[collection_name] = ensured
+        logger.info(f"集合 {collection_name} 索引确认完成: {ensured}/{len(specs)}")
+
+    return summary
+
+
+_indexes_ensured = False
+_ensure_lock = threading.Lock()
+
+
+def ensure_indexes_once(db=None) -> bool:
+    """
+    进程内只执行一次的索引迁移，供启动钩子使用
+
+    Returns:
+        本次调用是否实际执行了索引迁移
+    """
+    global _indexes_ensured
+    with _ensure_lock:
+        if _indexes_ensured:
+            return False
+        ensure_indexes(db)
+        _indexes_ensured = True
+        return True
+
+
+def init_app(app) -> None:
+    """注册索引迁移命令，并按配置在启动时执行一次索引迁移"""
+
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        """按索引注册表创建 MongoDB 索引"""
+        summary = ensure_indexes()
+        for collection_name, ensured in summary.items():
+            print(f"{collection_name}: {ensured}/{len(INDEX_REGISTRY[collection_name])}")
+
+    if os.getenv("ENSURE_INDEXES_ON_STARTUP", "1") == "1":
+        try:
+            with app.app_context():
+                if ensure_indexes_once():
+                    app.logger.info("[CONFIG] MongoDB indexes ensured on startup")
+        except Exception as e:
+            # 数据库暂时不可用时不阻止应用启动，可稍后手动执行 ensure-indexes
+            app.logger.warning("[CONFIG] Failed to ensure MongoDB indexes on startup: %s", e)
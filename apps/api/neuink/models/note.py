@@ -6,26 +6,38 @@ from typing import Dict, Any, List, Optional, Tuple
 
 from ..utils.db import get_db
 from ..utils.common import generate_id, get_current_time
+from ..utils.pagination import cursor_condition, fetch_page, keyset_sort
+from ..utils.text_search import build_search_query, build_search_text, inline_plain_text
 from ..config.constants import Collections
+from .userStats import get_user_stats_model
+
+
+def _bump_user_paper_version(user_paper_id: Optional[str]) -> None:
+    """笔记随个人论文详情一起返回，笔记变化时递增个人论文的版本号"""
+    if not user_paper_id:
+        return
+    from .userPaper import get_user_paper_model
+    get_user_paper_model().bump_version(user_paper_id)
+
+
+# searchText 只用于检索，不返回给调用方
+NOTE_PROJECTION: Dict[str, Any] = {"_id": 0, "searchText": 0}
+
+
+def _note_search_text(note_data: Dict[str, Any]) -> str:
+    """笔记检索字段：优先使用前端提供的 plainText，否则从 InlineContent[] 中提取"""
+    plain_text = note_data.get("plainText")
+    if not isinstance(plain_text, str) or not plain_text.strip():
+        plain_text = inline_plain_text(note_data.get("content"))
+    return build_search_text(plain_text)
 
 
 class NoteModel:
     """Note 数据模型类"""
 
     def __init__(self):
-        """初始化 Note 模型"""
+        """初始化 Note 模型（索引由 models/indexes.py 在启动时统一创建）"""
         self.collection = get_db()[Collections.NOTE]
-        self._ensure_indexes()
-
-    def _ensure_indexes(self):
-        """确保必要的索引存在"""
-        self.collection.create_index("id", unique=True)
-        self.collection.create_index("userId")
-        self.collection.create_index("userPaperId")
-        self.collection.create_index("blockId")
-        self.collection.create_index([("userId", 1), ("userPaperId", 1)])
-        self.collection.create_index([("userPaperId", 1), ("blockId", 1)])
-        self.collection.create_index("createdAt")
 
     def create(self, note_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -49,7 +61,11 @@ class NoteModel:
         if "plainText" in note_data:
             note["plainText"] = note_data["plainText"]
 
+        note["searchText"] = _note_search_text(note_data)
         self.collection.insert_one(note)
+        note.pop("searchText", None)
+        get_user_stats_model().on_notes_changed(note["userId"], 1)
+        _bump_user_paper_version(note["userPaperId"])
         return note
 
     def find_by_id(self, note_id: str) -> Optional[Dict[str, Any]]:
@@ -59,28 +75,30 @@ class NoteModel:
         """
         # 只使用"id"字段查找（前端生成的UUID）
         # 明确排除 _id 字段，防止它覆盖前端传入的 id
-        return self.collection.find_one({"id": note_id}, {"_id": 0})
+        return self.collection.find_one({"id": note_id}, NOTE_PROJECTION)
 
     def find_by_user_paper(
         self,
         user_paper_id: str,
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
         查询某篇个人论文的所有笔记
+
+        传入 cursor 时按 (createdAt, id) 游标分页，忽略 skip
         """
         query = {"userPaperId": user_paper_id}
-        total = self.collection.count_documents(query)
-        
-        notes = list(
-            self.collection.find(query, {"_id": 0})
-            .sort("createdAt", -1)
-            .skip(skip)
-            .limit(limit)
+        return fetch_page(
+            self.collection,
+            query,
+            keyset_sort("createdAt", -1),
+            limit=limit,
+            skip=0 if cursor else skip,
+            projection=NOTE_PROJECTION,
+            page_filter=cursor_condition(cursor, "createdAt", -1),
         )
-        
-        return notes, total
 
     def find_by_block(
         self,
@@ -96,7 +114,7 @@ class NoteModel:
         }
         
         return list(
-            self.collection.find(query, {"_id": 0})
+            self.collection.find(query, NOTE_PROJECTION)
             .sort("createdAt", -1)
         )
 
@@ -105,21 +123,23 @@ class NoteModel:
         user_id: str,
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
         查询用户的所有笔记
+
+        传入 cursor 时按 (createdAt, id) 游标分页，忽略 skip
         """
         query = {"userId": user_id}
-        total = self.collection.count_documents(query)
-        
-        notes = list(
-            self.collection.find(query, {"_id": 0})
-            .sort("createdAt", -1)
-            .skip(skip)
-            .limit(limit)
+        return fetch_page(
+            self.collection,
+            query,
+            keyset_sort("createdAt", -1),
+            limit=limit,
+            skip=0 if cursor else skip,
+            projection=NOTE_PROJECTION,
+            page_filter=cursor_condition(cursor, "createdAt", -1),
         )
-        
-        return notes, total
 
     def search_by_content(
         self,
@@ -130,22 +150,28 @@ class NoteModel:
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
         搜索笔记内容
-        注意：这里简化处理，实际需要遍历 InlineContent[] 中的 text 节点
+
+        查询词按写入 searchText 时相同的规则切分（中文 bigram），通过
+        (userId, searchText) 文本索引查找，按相关度、创建时间排序
         """
-        # 构建正则表达式搜索 content 数组中的 text 节点
+        terms = build_search_query(keyword)
+        if not terms:
+            return [], 0
+
         query = {
             "userId": user_id,
-            "content.content": {"$regex": keyword, "$options": "i"}
+            "$text": {"$search": terms},
         }
-        
-        total = self.collection.count_documents(query)
-        notes = list(
-            self.collection.find(query, {"_id": 0})
-            .sort("createdAt", -1)
-            .skip(skip)
-            .limit(limit)
+        notes, total = fetch_page(
+            self.collection,
+            query,
+            [("score", {"$meta": "textScore"}), ("createdAt", -1)],
+            limit=limit,
+            skip=skip,
+            projection=NOTE_PROJECTION,
         )
-        
+        for note in notes:
+            note.pop("score", None)
         return notes, total
 
     def update(self, note_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -154,6 +180,10 @@ class NoteModel:
         只使用前端生成的UUID格式的id字段
         """
         update_data["updatedAt"] = get_current_time()
+        if "content" in update_data or "plainText" in update_data:
+            # 只更新了 content 时以新内容为准，不使用可能过期的 plainText
+            source = update_data if "plainText" in update_data else {"content": update_data["content"]}
+            update_data["searchText"] = _note_search_text(source)
         
         # 只使用"id"字段更新（前端生成的UUID）
         result = self.collection.update_one(
@@ -163,7 +193,10 @@ class NoteModel:
         
         # 如果更新成功，返回更新后的笔记数据
         if result.modified_count > 0:
-            return self.find_by_id(note_id)
+            note = self.find_by_id(note_id)
+            if note:
+                _bump_user_paper_version(note.get("userPaperId"))
+            return note
         
         # 如果没有修改任何内容，可能是数据相同，仍然返回当前笔记数据
         return self.find_by_id(note_id)
@@ -174,15 +207,23 @@ class NoteModel:
         只使用前端生成的UUID格式的id字段
         """
         # 只使用"id"字段删除（前端生成的UUID）
-        result = self.collection.delete_one({"id": note_id})
-        return result.deleted_count > 0
+        note = self.collection.find_one_and_delete({"id": note_id}, {"_id": 0, "userId": 1, "userPaperId": 1})
+        if not note:
+            return False
+        get_user_stats_model().on_notes_changed(note.get("userId"), -1)
+        _bump_user_paper_version(note.get("userPaperId"))
+        return True
 
     def delete_by_user_paper(self, user_paper_id: str) -> int:
         """
         删除某篇个人论文的所有笔记
         返回删除的数量
         """
+        # 同一篇个人论文的笔记属于同一用户
+        owner = self.collection.find_one({"userPaperId": user_paper_id}, {"_id": 0, "userId": 1})
         result = self.collection.delete_many({"userPaperId": user_paper_id})
+        if owner and result.deleted_count:
+            get_user_stats_model().on_notes_changed(owner.get("userId"), -result.deleted_count)
         return result.deleted_count
 
     def count_by_user_paper(self, user_paper_id: str) -> int:
@@ -195,4 +236,43 @@ class NoteModel:
         """
         统计用户的笔记总数
         """
-        return self.collection.count_documents({"userId": user_id})
\ No newline at end of file
+        return self.collection.count_documents({"userId": user_id})
+
+    def backfill_search_text(self, batch_size: int = 500) -> int:
+        """为缺少 searchText 的历史笔记补齐检索字段，返回处理数量"""
+        from pymongo import UpdateOne
+
+        updated = 0
+        batch = []
+        cursor = self.collection.find(
+            {"searchText": {"$exists": False}},
+            {"_id": 1, "content": 1, "plainText": 1},
+        )
+        for note in cursor:
+            batch.append(UpdateOne({"_id": note["_id"]}, {"$set": {"searchText": _note_search_text(note)}}))
+            if len(batch) >= batch_size:
+                updated += self.collection.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += self.collection.bulk_write(batch, ordered=False).modified_count
+        return updated
+
+
+_note_model: Optional[NoteModel] = None
+
+
+def get_note_model() -> NoteModel:
+    """获取 NoteModel 进程级单例"""
+    global _note_model
+    if _note_model is None:
+        _note_model = NoteModel()
+    return _note_model
+
+
+def init_app(app) -> None:
+    """注册笔记检索字段的回填命令"""
+
+    @app.cli.command("backfill-note-search")
+    def backfill_note_search_command():
+        """为历史笔记补齐 searchText 检索字段"""
+        print(f"backfilled: {get_note_model().backfill_search_text()}")
@@ -0,0 +1,283 @@
+"""
+论文全文检索索引
+为 AdminPaper / UserPaper 的 search 参数提供进程内 BM25 检索，替代 MongoDB $text
+（$text 不切分中文，且排序后还要再跑一次 count）。
+
+- 索引字段：标题（中英文）、摘要（中英文）、关键词；标题权重更高
+- 分区：AdminPaper 管理端（整个集合）和公开列表（isPublic）各一个分区；UserPaper 每个用户
+  一个分区，首次搜索时加载，按最近使用淘汰（SEARCH_INDEX_MAX_PARTITIONS）
+- 更新：本进程内的论文写入通过 mark_dirty 记录论文 id，下次搜索前重新读取这些论文；
+  其他进程的写入通过定期同步（SEARCH_INDEX_SYNC_SECONDS）发现：按 updatedAt 增量
+  读取，删除通过 PaperDeletions 集合中的删除记录同步；数量仍对不上时重建分区
+- 查询：出现在过半论文中的词视为停用词忽略（SEARCH_MAX_DF_RATIO），
+  只取得分最高的 SEARCH_MAX_CANDIDATES 篇作为候选，候选数和数据库过滤的代价不随论文库增长
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Hashable, List, Optional, Set, Tuple
+
+from ..config.constants import Collections
+from ..utils.common import get_current_time
+from ..utils.inverted_index import InvertedIndex
+from ..utils.text_search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# 删除记录的保留时长（与 PaperDeletions 的 TTL 索引一致）；分区超过该时长未同步时直接重建
+DELETION_RETENTION_SECONDS = 7 * 24 * 3600
+
+# 不同进程的时钟误差余量：按时间水位查询时向前多取一段
+_CLOCK_SKEW = timedelta(seconds=60)
+
+_FIELD_WEIGHTS = {"title": 3, "titleZh": 3, "keywords": 2, "abstract": 1, "abstractZh": 1}
+
+_SOURCE_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "metadata.title": 1,
+    "metadata.titleZh": 1,
+    "abstract": 1,
+    "keywords": 1,
+    "updatedAt": 1,
+}
+
+
+def _index_tokenize(text: str) -> List[str]:
+    return tokenize(text, unigrams=True, stemmed=True)
+
+
+def _query_tokenize(text: str) -> List[str]:
+    return tokenize(text, stemmed=True)
+
+
+def record_paper_deletion(collection, paper_id: str) -> None:
+    """写入论文删除记录（collection 为论文所在的 pymongo 集合）"""
+    collection.database[Collections.PAPER_DELETIONS].insert_one({
+        "collection": collection.name,
+        "paperId": paper_id,
+        "deletedAt": get_current_time(),
+    })
+
+
+def _paper_fields(paper: Dict[str, Any]) -> Dict[str, str]:
+    metadata = paper.get("metadata") or {}
+    abstract = paper.get("abstract") or {}
+    if isinstance(abstract, str):
+        abstract = {"en": abstract}
+    elif not isinstance(abstract, dict):
+        abstract = {}
+    keywords = paper.get("keywords") or []
+    return {
+        "title": metadata.get("title") or "",
+        "titleZh": metadata.get("titleZh") or "",
+        "abstract": abstract.get("en") or "",
+        "abstractZh": abstract.get("zh") or "",
+        "keywords": " ".join(k for k in keywords if isinstance(k, str)),
+    }
+
+
+class _Partition:
+    """一个分区的索引及其同步状态"""
+
+    def __init__(self, query: Dict[str, Any]):
+        self.query = query
+        self.index = InvertedIndex(_index_tokenize, _FIELD_WEIGHTS)
+        self.watermark: Optional[datetime] = None
+        self.deletion_watermark: Optional[datetime] = None
+        self.checked_at = 0.0
+        self.pending: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def _add(self, paper: Dict[str, Any]) -> None:
+        self.index.add(paper["id"], _paper_fields(paper))
+        updated_at = paper.get("updatedAt")
+        if isinstance(updated_at, datetime) and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def rebuild(self, collection) -> None:
+        self.index.clear()
+        self.watermark = None
+        self.deletion_watermark = get_current_time() - _CLOCK_SKEW
+        self.pending.clear()
+        for paper in collection.find(self.query, _SOURCE_PROJECTION):
+            self._add(paper)
+        self.checked_at = time.monotonic()
+
+    def refresh_pending(self, collection) -> None:
+        """重新读取本进程写入过的论文（新增、修改或已删除）"""
+        if not self.pending:
+            return
+        ids = list(self.pending)
+        self.pending.difference_update(ids)
+        found = set()
+        for paper in collection.find({**self.query, "id": {"$in": ids}}, _SOURCE_PROJECTION):
+            found.add(paper["id"])
+            self._add(paper)
+        for paper_id in ids:
+            if paper_id not in found:
+                self.index.remove(paper_id)
+
+    def sync(self, collection) -> None:
+        """与数据库增量同步（发现其他进程的写入和删除）"""
+        if time.monotonic() - self.checked_at >= DELETION_RETENTION_SECONDS:
+            # 期间的删除记录可能已过期，无法增量同步
+            self.rebuild(collection)
+            return
+
+        query = dict(self.query)
+        if self.watermark is not None:
+            # 其他进程的时钟可能落后，写入的 updatedAt 会早于已读到的最大值
+            query["updatedAt"] = {"$gte": self.watermark - _CLOCK_SKEW}
+        for paper in collection.find(query, _SOURCE_PROJECTION):
+            self._add(paper)
+
+        deletions = collection.database[Collections.PAPER_DELETIONS].find(
+            {"collection": collection.name, "deletedAt": {"$gte": self.deletion_watermark}},
+            {"_id": 0, "paperId": 1, "deletedAt": 1},
+        )
+        for deletion in deletions:
+            self.index.remove(deletion["paperId"])
+            deleted_at = deletion.get("deletedAt")
+            if isinstance(deleted_at, datetime) and deleted_at - _CLOCK_SKEW > self.deletion_watermark:
+                self.deletion_watermark = deleted_at - _CLOCK_SKEW
+
+        # 兜底：删除记录写入失败等情况下数量对不上时重建
+        if collection.count_documents(self.query) != len(self.index):
+            self.rebuild(collection)
+        self.checked_at = time.monotonic()
+
+
+class PaperSearchIndex:
+    """按 (集合, 分区) 管理论文倒排索引"""
+
+    def __init__(
+        self,
+        max_partitions: int = 256,
+        sync_seconds: float = 30.0,
+        max_candidates: int = 1000,
+        max_df_ratio: float = 0.5,
+    ):
+        self.max_partitions = max_partitions
+        self.sync_seconds = sync_seconds
+        self.max_candidates = max_candidates
+        self.max_df_ratio = max_df_ratio
+        self._partitions: "OrderedDict[Tuple[str, Hashable], _Partition]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_partition(self, collection_name: str, key: Hashable, query: Dict[str, Any]) -> Tuple[_Partition, bool]:
+        with self._lock:
+            partition = self._partitions.get((collection_name, key))
+            created = partition is None
+            if created:
+                partition = _Partition(query)
+                self._partitions[(collection_name, key)] = partition
+                while len(self._partitions) > self.max_partitions:
+                    self._partitions.popitem(last=False)
+            else:
+                self._partitions.move_to_end((collection_name, key))
+            return partition, created
+
+    def mark_dirty(self, collection_name: str, paper_id: str) -> None:
+        """记录本进程写入过的论文，所在分区下次搜索前会重新读取它"""
+        with self._lock:
+            partitions = [p for (name, _), p in self._partitions.items() if name == collection_name]
+        for partition in partitions:
+            partition.pending.add(paper_id)
+
+    def search(
+        self,
+        collection,
+        partition_key: Hashable,
+        partition_query: Dict[str, Any],
+        text: str,
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        在分区内检索
+
+        Returns:
+            (得分最高的 max_candidates 篇论文，按相关度降序的 [(论文 id, 得分)], 命中总数)
+        """
+        partition, created = self._get_partition(collection.name, partition_key, partition_query)
+        with partition.lock:
+            if created:
+                partition.rebuild(collection)
+            else:
+                partition.refresh_pending(collection)
+                if time.monotonic() - partition.checked_at >= self.sync_seconds:
+                    partition.sync(collection)
+        return partition.index.search(
+            text, _query_tokenize, limit=self.max_candidates, max_df_ratio=self.max_df_ratio
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
+
+
+_paper_search_index: Optional[PaperSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_paper_search_index() -> PaperSearchIndex:
+    """获取 PaperSearchIndex 进程级单例"""
+    global _paper_search_index
+    if _paper_search_index is None:
+        with _index_lock:
+            if _paper_search_index is None:
+                _paper_search_index = PaperSearchIndex(
+                    max_partitions=int(os.getenv("SEARCH_INDEX_MAX_PARTITIONS", "256")),
+                    sync_seconds=float(os.getenv("SEARCH_INDEX_SYNC_SECONDS", "30")),
+                    max_candidates=int(os.getenv("SEARCH_MAX_CANDIDATES", "1000")),
+                    max_df_ratio=float(os.getenv("SEARCH_MAX_DF_RATIO", "0.5")),
+                )
+    return _paper_search_index
+
+
+def search_paper_page(
+    collection,
+    partition_key: Hashable,
+    partition_query: Dict[str, Any],
+    text: str,
+    query: Dict[str, Any],
+    skip: int,
+    limit: int,
+    projection: Dict[str, Any],
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    全文检索分页：倒排索引给出按相关度排序的候选 id，数据库只做过滤和取当前页
+
+    Args:
+        partition_query: 分区条件（决定加载哪些论文进索引）
+        query: 完整的过滤条件（分区条件 + 列表筛选），用于筛掉不符合条件的候选
+
+    Returns:
+        (当前页论文（按相关度排序）, 总数)；只有相关度最高的候选（最多 SEARCH_MAX_CANDIDATES 篇）
+        可以翻页，总数只统计其中符合条件的论文，与可翻到的结果一致
+    """
+    ranked, _ = get_paper_search_index().search(collection, partition_key, partition_query, text)
+    if not ranked:
+        return [], 0
+
+    candidate_ids = [paper_id for paper_id, _ in ranked]
+    if query == partition_query:
+        matched = candidate_ids
+    else:
+        allowed = set(collection.distinct("id", {**query, "id": {"$in": candidate_ids}}))
+        matched = [paper_id for paper_id in candidate_ids if paper_id in allowed]
+    total = len(matched)
+
+    page_ids = matched[skip:skip + limit] if limit > 0 else matched[skip:]
+    if not page_ids:
+        return [], total
+
+    projection = {key: value for key, value in projection.items() if key != "score"}
+    if any(value == 1 for key, value in projection.items() if key != "_id"):
+        projection["id"] = 1
+    # 带上分区条件：其他进程刚改为不属于该分区（如取消公开）、索引尚未同步的论文不会返回
+    page_query = {**partition_query, "id": {"$in": page_ids}}
+    docs = {doc["id"]: doc for doc in collection.find(page_query, projection)}
+    return [docs[paper_id] for paper_id in page_ids if paper_id in docs], total
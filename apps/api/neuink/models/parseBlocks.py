@@ -3,10 +3,28 @@
 用于存储和管理文本解析结果，支持用户确认后再插入论文
 """
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from ..utils.db import get_db_service
 from ..utils.common import generate_id
 
+# 仍需在章节中展示进度占位block的解析状态（consumed 表示已确认/丢弃）
+ACTIVE_PARSE_STATUSES = ("pending", "processing", "completed", "failed")
+
+# 读取章节时合并进度只需要的轻量字段，避免把原始文本和解析结果一起读出
+PARSE_PROGRESS_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "sectionId": 1,
+    "afterBlockId": 1,
+    "insertIndex": 1,
+    "tempBlockId": 1,
+    "status": 1,
+    "stage": 1,
+    "message": 1,
+    "createdAt": 1,
+}
+
+
 class ParseBlocksModel:
     """解析块数据模型"""
     
@@ -43,6 +61,7 @@ class ParseBlocksModel:
             "insertIndex": insert_index,
             "tempBlockId": temp_block_id,
             "status": "pending",
+            "stage": "structuring",
             "progress": 0,
             "message": "准备解析文本",
             "error": None,
@@ -72,12 +91,24 @@ class ParseBlocksModel:
             )
         return result.modified_count > 0
 
+    def set_stage(self, parse_id: str, stage: str, message: str, progress: Optional[int] = None) -> bool:
+        """更新解析进度阶段（只写ParseBlocks记录，不触碰section文档）"""
+        update: Dict[str, Any] = {
+            "status": "processing",
+            "stage": stage,
+            "message": message,
+        }
+        if progress is not None:
+            update["progress"] = progress
+        return self.update_record(parse_id, update)
+
     def set_completed(self, parse_id: str, blocks: List[Dict[str, Any]]) -> bool:
         """标记解析完成"""
         return self.update_record(parse_id, {
             "status": "completed",
+            "stage": "completed",
             "progress": 100,
-            "message": "解析完成",
+            "message": "解析完成，请查看结果并选择要保存的内容",
             "blocks": blocks
         })
 
@@ -85,6 +116,7 @@ class ParseBlocksModel:
         """标记解析失败"""
         return self.update_record(parse_id, {
             "status": "failed",
+            "stage": "failed",
             "progress": 0,
             "message": f"解析失败: {error}",
             "error": error
@@ -110,6 +142,56 @@ class ParseBlocksModel:
             result = self.db.find_one(self.collection, {"id": parse_id})
         return result
 
+    def find_progress_by_sections(
+        self,
+        section_ids: List[str],
+        paper_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        查询指定章节上仍在进行（或等待确认）的解析进度
+
+        只返回 PARSE_PROGRESS_PROJECTION 中的字段，按创建时间升序；
+        指定 paper_id 时只返回该论文发起的解析（章节可能被多篇论文共享）
+        """
+        if not section_ids:
+            return []
+        query: Dict[str, Any] = {
+            "sectionId": {"$in": list(section_ids)},
+            "status": {"$in": list(ACTIVE_PARSE_STATUSES)},
+        }
+        if paper_id:
+            query["paperId"] = paper_id
+        return list(self.db.find(
+            self.collection,
+            query,
+            sort=[("createdAt", 1)],
+            projection=PARSE_PROGRESS_PROJECTION,
+        ))
+
+    def find_progress_stamps(
+        self,
+        section_ids: List[str],
+        paper_id: Optional[str] = None,
+    ) -> List[Tuple[str, Any]]:
+        """
+        查询进行中解析记录的 (id, updatedAt)，用于判断合并进章节的解析进度是否变化
+        """
+        if not section_ids:
+            return []
+        query: Dict[str, Any] = {
+            "sectionId": {"$in": list(section_ids)},
+            "status": {"$in": list(ACTIVE_PARSE_STATUSES)},
+        }
+        if paper_id:
+            query["paperId"] = paper_id
+        records = self.db.find(
+            self.collection,
+            query,
+            sort=[("createdAt", 1)],
+            projection={"_id": 0, "id": 1, "updatedAt": 1},
+        )
+        return [(record.get("id"), record.get("updatedAt")) for record in records]
+
     def delete(self, parse_id: str) -> bool:
         """删除解析记录"""
         # 优先使用_id查询，如果失败则尝试id字段
@@ -158,4 +240,75 @@ def get_parse_blocks_model() -> ParseBlocksModel:
     global _parse_blocks_model
     if _parse_blocks_model is None:
         _parse_blocks_model = ParseBlocksModel()
-    return _parse_blocks_model
\ No newline at end of file
+    return _parse_blocks_model
+
+def build_progress_block(record: Dict[str, Any]) -> Dict[str, Any]:
+    """把解析进度记录转换为前端使用的临时 parsing block"""
+    status = record.get("status")
+    stage = record.get("stage") or ("completed" if status == "completed" else "structuring")
+    if status == "failed":
+        stage = "failed"
+    return {
+        "id": record.get("tempBlockId") or record.get("id"),
+        "type": "parsing",
+        "stage": stage,
+        "message": record.get("message", ""),
+        "parseId": record.get("id"),
+        "createdAt": record.get("createdAt"),
+    }
+
+
+def merge_parse_progress(
+    sections: List[Dict[str, Any]],
+    paper_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    在读取时把解析进度合并进章节内容
+
+    解析进度只保存在 ParseBlocks 中，章节文档本身在用户确认前不会被写入；
+    这里按 afterBlockId 把临时 parsing block 插入到返回给前端的 content 中。
+    所有章节共用一次查询。
+    """
+    if not sections:
+        return sections
+
+    section_ids = [s.get("id") for s in sections if s.get("id")]
+    records = get_parse_blocks_model().find_progress_by_sections(section_ids, paper_id)
+    if not records:
+        return sections
+
+    records_by_section: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        records_by_section.setdefault(record.get("sectionId"), []).append(record)
+
+    for section in sections:
+        section_records = records_by_section.get(section.get("id"))
+        if not section_records:
+            continue
+
+        content = list(section.get("content") or [])
+        existing_ids = {block.get("id") for block in content}
+        for record in section_records:
+            progress_block = build_progress_block(record)
+            # 兼容旧数据：历史上临时block直接写在section里，避免重复展示
+            if progress_block["id"] in existing_ids:
+                continue
+
+            # 未指定 afterBlockId 时追加到末尾；锚点block已不存在时退回记录的 insertIndex
+            position = len(content)
+            after_block_id = record.get("afterBlockId")
+            if after_block_id:
+                insert_index = record.get("insertIndex")
+                if isinstance(insert_index, int):
+                    position = max(0, min(insert_index, len(content)))
+                for i, block in enumerate(content):
+                    if block.get("id") == after_block_id:
+                        position = i + 1
+                        break
+
+            content.insert(position, progress_block)
+            existing_ids.add(progress_block["id"])
+
+        section["content"] = content
+
+    return sections
@@ -5,10 +5,25 @@ PDF解析任务模型
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
 
 from ..utils.db import get_db
 
+# MinerU 侧已结束的状态，不再轮询
+MINERU_FINAL_STATES = ["done", "failed"]
+
+# 结果处理状态机（ingestState）：
+#   None -> done（MinerU 解析完成，等待处理）-> ingesting（已被某个执行者领取）-> ingested / failed
+# done -> ingesting 通过 find_one_and_update 原子完成，跨线程、跨进程每个任务只处理一次；
+# 执行者退出导致 ingesting 租约过期时可被重新领取，可重试的失败退回 done；
+# 处理任务已重试用尽时由轮询线程的补偿扫描（claim_stalled_ingests）退回 done 并重新提交
+INGEST_DONE = "done"
+INGEST_INGESTING = "ingesting"
+INGEST_INGESTED = "ingested"
+INGEST_FAILED = "failed"
+
 
 class PdfParseTaskModel:
     """PDF解析任务模型类"""
@@ -47,6 +62,20 @@ class PdfParseTaskModel:
             "progress": 0,
             "message": "准备开始解析...",
             "mineruTaskId": None,  # MinerU API返回的任务ID
+            # 服务端轮询状态（services/mineruPollerService.py 写入，状态接口直接读取）
+            "mineruState": None,  # MinerU 原始状态: pending/running/converting/done/failed
+            "totalPages": None,
+            "extractedPages": None,
+            "pollCount": 0,
+            "lastPolledAt": None,
+            "nextPollAt": None,  # 为空表示尽快轮询
+            "lastPollError": None,
+            "resultZipUrl": None,
+            # 结果处理状态机（见 INGEST_*）
+            "ingestState": None,
+            "ingestOwner": None,
+            "ingestLeaseExpiresAt": None,
+            "ingestResult": None,
             # 移除以下字段以避免在数据库中存储大文件内容:
             # "markdownContent": None,  # 解析生成的Markdown内容 - 不再存储在数据库中
             # "markdownAttachment": None,  # 上传后的Markdown附件信息 - 不再存储在数据库中
@@ -128,6 +157,227 @@ class PdfParseTaskModel:
         
         return result.modified_count > 0
     
+    def claim_due_for_poll(self, claim_id: str, limit: int, claim_seconds: float) -> List[Dict[str, Any]]:
+        """
+        领取一批到期需要查询 MinerU 状态的任务
+
+        领取时把 nextPollAt 推迟 claim_seconds 并写入 pollClaim，多个进程同时轮询时
+        同一任务只会被一个进程领取；轮询进程中途退出时，到期后由其他进程重新领取。
+
+        Returns:
+            领取到的任务列表（含 id 字段）
+        """
+        now = datetime.utcnow()
+        due = {
+            "status": {"$in": ["pending", "processing"]},
+            "mineruTaskId": {"$ne": None},
+            "mineruState": {"$nin": MINERU_FINAL_STATES},
+            # 同时匹配字段缺失、为空和已到期
+            "nextPollAt": {"$not": {"$gt": now}},
+        }
+        collection = self.db[self.collection_name]
+        ids = [doc["_id"] for doc in collection.find(due, {"_id": 1}).sort("nextPollAt", 1).limit(limit)]
+        if not ids:
+            return []
+
+        collection.update_many(
+            {"_id": {"$in": ids}, **due},
+            {"$set": {"pollClaim": claim_id, "nextPollAt": now + timedelta(seconds=claim_seconds)}},
+        )
+        tasks = list(collection.find({"_id": {"$in": ids}, "pollClaim": claim_id}))
+        for task in tasks:
+            task["id"] = task.pop("_id")
+        return tasks
+
+    def record_poll_results(self, results: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        批量写回一轮轮询的结果（一次 bulk_write）
+
+        Args:
+            results: [(任务ID, 需要 $set 的字段)]，pollCount 自动加一
+
+        Returns:
+            更新的任务数
+        """
+        if not results:
+            return 0
+        now = datetime.utcnow()
+        operations = []
+        for task_id, fields in results:
+            fields = {**fields, "lastPolledAt": now, "updatedAt": now}
+            if fields.get("status") in ["completed", "failed"]:
+                fields["completedAt"] = now
+            operations.append(UpdateOne({"_id": task_id}, {"$set": fields, "$inc": {"pollCount": 1}}))
+        result = self.db[self.collection_name].bulk_write(operations, ordered=False)
+        return result.modified_count
+
+    def claim_stalled_ingests(self, claim_id: str, limit: int, stall_seconds: float) -> List[Dict[str, Any]]:
+        """
+        领取需要重新提交结果处理任务的解析任务，供轮询线程重新提交：
+
+        - ingestState 为 done 且超过 stall_seconds 没有进展（提交前进程退出、提交失败等）
+        - ingestState 为 ingesting 且领取租约已过期（执行者中途退出，处理任务的重试已在租约
+          有效期内用尽，不会再有执行者领取）
+
+        领取时退回 done 并刷新 updatedAt，同一任务在下一个 stall_seconds 内不会被再次领取。
+
+        Returns:
+            领取到的任务列表（含 id、resultZipUrl 字段）
+        """
+        now = datetime.utcnow()
+        stalled = {
+            "$or": [
+                {"ingestState": INGEST_DONE, "updatedAt": {"$lt": now - timedelta(seconds=stall_seconds)}},
+                {"ingestState": INGEST_INGESTING, "ingestLeaseExpiresAt": {"$lt": now}},
+            ],
+            # 历史数据中没有结果地址的任务无法处理，不再反复领取
+            "resultZipUrl": {"$nin": [None, ""]},
+        }
+        collection = self.db[self.collection_name]
+        ids = [doc["_id"] for doc in collection.find(stalled, {"_id": 1}).limit(limit)]
+        if not ids:
+            return []
+
+        collection.update_many(
+            {"_id": {"$in": ids}, **stalled},
+            {
+                "$set": {
+                    "ingestState": INGEST_DONE,
+                    "ingestOwner": None,
+                    "ingestLeaseExpiresAt": None,
+                    "ingestClaim": claim_id,
+                    "updatedAt": now,
+                }
+            },
+        )
+        tasks = list(collection.find(
+            {"_id": {"$in": ids}, "ingestClaim": claim_id, "updatedAt": now},
+            {"_id": 1, "resultZipUrl": 1},
+        ))
+        for task in tasks:
+            task["id"] = task.pop("_id")
+        return tasks
+
+    def mark_result_ready(self, task_id: str, zip_url: str) -> bool:
+        """
+        MinerU 解析完成：进入 done 状态等待结果处理
+
+        Returns:
+            是否为首次进入（已在处理或处理完成的任务返回 False，不需要再提交处理任务）
+        """
+        result = self.db[self.collection_name].update_one(
+            {"_id": task_id, "ingestState": {"$in": [None, INGEST_DONE]}},
+            {"$set": {"ingestState": INGEST_DONE, "resultZipUrl": zip_url, "updatedAt": datetime.utcnow()}},
+        )
+        return result.matched_count > 0
+
+    def begin_ingest(self, task_id: str, owner: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        原子领取结果处理：done（或租约已过期的 ingesting）-> ingesting
+
+        Returns:
+            领取成功时返回任务记录；已被其他执行者处理中或已处理完成时返回 None
+        """
+        now = datetime.utcnow()
+        task = self.db[self.collection_name].find_one_and_update(
+            {
+                "_id": task_id,
+                "$or": [
+                    # 兼容状态机之前提交、尚未写入 ingestState 的任务
+                    {"ingestState": {"$in": [None, INGEST_DONE]}},
+                    {"ingestState": INGEST_INGESTING, "ingestLeaseExpiresAt": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "ingestState": INGEST_INGESTING,
+                    "ingestOwner": owner,
+                    "ingestLeaseExpiresAt": now + timedelta(seconds=lease_seconds),
+                    "ingestStartedAt": now,
+                    "updatedAt": now,
+                },
+                "$inc": {"ingestAttempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if task:
+            task["id"] = task.pop("_id")
+        return task
+
+    def finish_ingest(self, task_id: str, owner: str, outcome: Dict[str, Any]) -> bool:
+        """ingesting -> ingested，同时把解析任务标记为完成并保存处理结果（仅领取者可写入）"""
+        now = datetime.utcnow()
+        result = self.db[self.collection_name].update_one(
+            {"_id": task_id, "ingestState": INGEST_INGESTING, "ingestOwner": owner},
+            {
+                "$set": {
+                    "ingestState": INGEST_INGESTED,
+                    "ingestResult": outcome,
+                    "ingestOwner": None,
+                    "ingestLeaseExpiresAt": None,
+                    "status": "completed",
+                    "progress": 100,
+                    "message": "PDF解析完成，结果已上传",
+                    "error": None,
+                    "completedAt": now,
+                    "updatedAt": now,
+                }
+            },
+        )
+        return result.modified_count > 0
+
+    def fail_ingest(self, task_id: str, message: str, error: Optional[str] = None, owner: Optional[str] = None) -> bool:
+        """
+        结果处理失败且不再重试：-> failed，同时把解析任务标记为失败
+
+        Args:
+            owner: 指定时仅领取者可写入；重试用尽等由任务队列调用的场景不指定
+        """
+        now = datetime.utcnow()
+        if owner is not None:
+            query: Dict[str, Any] = {"_id": task_id, "ingestState": INGEST_INGESTING, "ingestOwner": owner}
+        else:
+            # 不覆盖已完成或仍由其他执行者处理中（租约未过期）的任务
+            query = {
+                "_id": task_id,
+                "$or": [
+                    {"ingestState": {"$nin": [INGEST_INGESTED, INGEST_INGESTING]}},
+                    {"ingestState": INGEST_INGESTING, "ingestLeaseExpiresAt": {"$lt": now}},
+                ],
+            }
+        result = self.db[self.collection_name].update_one(
+            query,
+            {
+                "$set": {
+                    "ingestState": INGEST_FAILED,
+                    "ingestOwner": None,
+                    "ingestLeaseExpiresAt": None,
+                    "status": "failed",
+                    "message": message,
+                    "error": error,
+                    "completedAt": now,
+                    "updatedAt": now,
+                }
+            },
+        )
+        return result.modified_count > 0
+
+    def release_ingest(self, task_id: str, owner: str, error: str) -> bool:
+        """可重试的失败：ingesting -> done，等待任务队列重试时重新领取"""
+        result = self.db[self.collection_name].update_one(
+            {"_id": task_id, "ingestState": INGEST_INGESTING, "ingestOwner": owner},
+            {
+                "$set": {
+                    "ingestState": INGEST_DONE,
+                    "ingestOwner": None,
+                    "ingestLeaseExpiresAt": None,
+                    "lastIngestError": error,
+                    "updatedAt": datetime.utcnow(),
+                }
+            },
+        )
+        return result.modified_count > 0
+
     # 移除update_markdown_attachment方法，因为不再存储markdownAttachment信息到数据库中
     # Markdown附件信息直接存储在paper的attachments字段中
     
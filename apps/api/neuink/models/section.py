@@ -2,27 +2,52 @@
 Section 数据模型
 处理论文章节相关的数据库操作
 """
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from pymongo import ReturnDocument
 
 from ..utils.db import get_db
 from ..utils.common import generate_id, get_current_time
 from ..config.constants import Collections
+from .contentVersion import next_content_version
+
+
+# 章节投影：只读取标题等元信息（目录、列表等场景）
+SECTION_TITLE_PROJECTION: Dict[str, Any] = {
+    "_id": 0,
+    "id": 1,
+    "paperId": 1,
+    "title": 1,
+    "titleZh": 1,
+}
+
+# 章节投影：读取完整内容（详情页）；searchIndexedAt 是块级检索的内部标记
+SECTION_FULL_PROJECTION: Dict[str, Any] = {"_id": 0, "searchIndexedAt": 0}
+
+# fields= 参数可选择的章节字段（sections.title 等）
+SECTION_SELECTABLE_FIELDS = ("id", "paperId", "title", "titleZh", "content", "createdAt", "updatedAt")
+
+# 流式输出整篇论文时每次查询读取的章节数
+SECTION_STREAM_BATCH_SIZE = 8
+
+
+# 块级检索：章节的块索引与内容一致（见 models/blockSearch.py）
+_SEARCH_INDEX_CURRENT = {"$expr": {"$eq": ["$searchIndexedAt", "$updatedAt"]}}
+
+
+def _stamp_version(update_set: Dict[str, Any], version: int) -> None:
+    """在 $set 中记录同步序号；整体写入 content（或其中的下标路径）时同时更新 contentVersion"""
+    update_set["version"] = version
+    if any(key == "content" or key.startswith("content.") for key in update_set):
+        update_set["contentVersion"] = version
 
 
 class SectionModel:
     """Section 数据模型类"""
 
     def __init__(self):
-        """初始化 Section 模型"""
+        """初始化 Section 模型（索引由 models/indexes.py 在启动时统一创建）"""
         self.collection = get_db()[Collections.SECTION]
-        self._ensure_indexes()
-
-    def _ensure_indexes(self):
-        """确保必要的索引存在"""
-        self.collection.create_index("id", unique=True)
-        self.collection.create_index("paperId")
-        self.collection.create_index("createdAt")
-        self.collection.create_index("updatedAt")
 
     def create(self, section_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -30,6 +55,7 @@ class SectionModel:
         """
         section_id = section_data.get("id") or generate_id()
         current_time = get_current_time()
+        version = next_content_version()
 
         section = {
             "id": section_id,
@@ -39,17 +65,30 @@ class SectionModel:
             "content": section_data.get("content", []),
             "createdAt": current_time,
             "updatedAt": current_time,
+            "version": version,
+            "contentVersion": version,
         }
 
         self.collection.insert_one(section)
         # 返回前查询一次，确保不包含任何MongoDB特定对象
         return self.find_by_id(section_id)
 
-    def find_by_id(self, section_id: str) -> Optional[Dict[str, Any]]:
+    def find_by_id(
+        self,
+        section_id: str,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """
         根据ID查找章节
+
+        Args:
+            section_id: 章节ID
+            projection: 可选的字段投影，例如 {"id": 1, "paperId": 1} 只读取章节元信息
         """
-        return self.collection.find_one({"id": section_id}, {"_id": 0})
+        fields: Dict[str, Any] = {"_id": 0}
+        if projection:
+            fields.update(projection)
+        return self.collection.find_one({"id": section_id}, fields)
 
     def find_by_paper_id(self, paper_id: str) -> List[Dict[str, Any]]:
         """
@@ -65,30 +104,332 @@ class SectionModel:
         """
         更新章节
         """
-        # 检查是否是嵌套字段更新（如 content.0）
-        has_nested_fields = any('.' in key for key in update_data.keys())
-        
-        if has_nested_fields:
-            # 对于嵌套字段，不添加updatedAt到根级别
-            result = self.collection.update_one({"id": section_id}, {"$set": update_data})
-        else:
-            # 对于非嵌套字段，添加updatedAt
-            update_data["updatedAt"] = get_current_time()
-            result = self.collection.update_one({"id": section_id}, {"$set": update_data})
-        
+        # 嵌套字段更新（如 content.0）同样刷新根级 updatedAt：
+        # 增量同步水位和块索引补建都依赖序号与 updatedAt 在同一次写入中更新
+        _stamp_version(update_data, next_content_version())
+        update_data["updatedAt"] = get_current_time()
+        result = self.collection.update_one({"id": section_id}, {"$set": update_data})
+
         return result.modified_count > 0
 
-    def update_direct(self, section_id: str, update_operation: Dict[str, Any]) -> bool:
+    def update_direct(
+        self,
+        section_id: str,
+        update_operation: Dict[str, Any],
+        version: Optional[int] = None,
+        keep_search_index: bool = False,
+    ) -> bool:
         """
         直接使用MongoDB更新操作（如$pull, $push等）
+
+        Args:
+            version: 本次写入的同步序号，调用方已分配（例如写入了带序号的block）时传入
+            keep_search_index: 见 _write_block
         """
         # 添加updatedAt到根级别
         update_operation["$set"] = update_operation.get("$set", {})
         update_operation["$set"]["updatedAt"] = get_current_time()
-        
-        result = self.collection.update_one({"id": section_id}, update_operation)
+        _stamp_version(update_operation["$set"], version or next_content_version())
+
+        result = self._write_block(
+            self.collection.update_one, {"id": section_id}, update_operation, keep_search_index
+        )
         return result.modified_count > 0
 
+    def _write_block(self, write, query, update, keep_search_index: bool, **kwargs):
+        """
+        执行 block 写入
+
+        keep_search_index=True 表示调用方会增量更新被修改 block 的块索引：写入前章节索引
+        已是最新时，在同一次写入中推进 searchIndexedAt，章节不会进入后台补建；
+        否则（或索引本来就落后）按普通写入处理，由后台补建整个章节。
+        update 可以是更新文档，也可以是最后一个阶段为 $set 的管道更新
+        """
+        if keep_search_index:
+            if isinstance(update, list):
+                last = update[-1]["$set"]
+                marked = [*update[:-1], {"$set": {**last, "searchIndexedAt": last["updatedAt"]}}]
+            else:
+                marked = {**update, "$set": {**update["$set"], "searchIndexedAt": update["$set"]["updatedAt"]}}
+            result = write({**query, **_SEARCH_INDEX_CURRENT}, marked, **kwargs)
+            # update_one 返回 UpdateResult，find_one_and_update 返回文档
+            if getattr(result, "matched_count", result):
+                return result
+        return write(query, update, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Block 级别的写操作：按 blockId 定位，只传输单个 block，不重写整个 content 数组
+    # ------------------------------------------------------------------
+    def find_block(self, section_id: str, block_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查找章节中的单个block（通过 $elemMatch 投影，只返回该block）
+        """
+        section = self.collection.find_one(
+            {"id": section_id, "content.id": block_id},
+            {"_id": 0, "content": {"$elemMatch": {"id": block_id}}},
+        )
+        if not section or not section.get("content"):
+            return None
+        return section["content"][0]
+
+    def locate_block(self, section_id: str, block_id: Optional[str]) -> Optional[Tuple[int, int]]:
+        """
+        在数据库端计算block在content中的位置
+
+        Returns:
+            (block下标, content长度)，block不存在时下标为-1；章节不存在时返回None
+        """
+        section = self.collection.find_one(
+            {"id": section_id},
+            {
+                "_id": 0,
+                "index": {"$indexOfArray": [{"$ifNull": ["$content.id", []]}, block_id]},
+                "size": {"$size": {"$ifNull": ["$content", []]}},
+            },
+        )
+        if section is None:
+            return None
+        return section.get("index", -1), section.get("size", 0)
+
+    def find_blocks(
+        self,
+        section_id: str,
+        offset: int = 0,
+        limit: int = 50,
+        after_block_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        分页读取章节的block：$slice 投影只传输请求范围内的block，同时返回block总数
+
+        Args:
+            offset: 起始下标（指定 after_block_id 时忽略）
+            after_block_id: 从该block之后开始读取
+
+        Returns:
+            {"blocks": [...], "offset": 起始下标, "total": block总数}；章节不存在时返回None；
+            after_block_id 不存在时 offset 为 -1、blocks 为空
+        """
+        content = {"$ifNull": ["$content", []]}
+        if after_block_id:
+            anchor = {"$indexOfArray": [{"$ifNull": ["$content.id", []]}, after_block_id]}
+            start: Any = {"$cond": [{"$lt": [anchor, 0]}, -1, {"$add": [anchor, 1]}]}
+            blocks: Any = {"$cond": [
+                {"$lt": [anchor, 0]},
+                [],
+                {"$slice": [content, {"$add": [anchor, 1]}, limit]},
+            ]}
+        else:
+            start = {"$literal": offset}
+            blocks = {"$slice": [content, offset, limit]}
+
+        return self.collection.find_one(
+            {"id": section_id},
+            {
+                "_id": 0,
+                "blocks": blocks,
+                "offset": start,
+                "total": {"$size": content},
+            },
+        )
+
+    def get_insert_position(self, section_id: str, after_block_id: Optional[str]) -> Optional[int]:
+        """
+        计算在 after_block_id 之后插入的位置；未指定或找不到时返回末尾位置
+        """
+        located = self.locate_block(section_id, after_block_id)
+        if located is None:
+            return None
+        index, size = located
+        if after_block_id and index >= 0:
+            return index + 1
+        return size
+
+    def insert_blocks(
+        self,
+        section_id: str,
+        blocks: List[Dict[str, Any]],
+        position: Optional[int] = None,
+        keep_search_index: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        使用 $push + $position 插入blocks，position为None时追加到末尾
+
+        Returns:
+            实际写入的blocks（带 version 的副本，不修改传入的block）；章节不存在或blocks为空时返回None
+        """
+        if not blocks:
+            return None
+        version = next_content_version()
+        stamped = [{**block, "version": version} for block in blocks]
+        push_spec: Dict[str, Any] = {"$each": stamped}
+        if position is not None and position >= 0:
+            push_spec["$position"] = position
+        if not self.update_direct(
+            section_id, {"$push": {"content": push_spec}}, version=version, keep_search_index=keep_search_index
+        ):
+            return None
+        return stamped
+
+    def update_block(
+        self,
+        section_id: str,
+        block_id: str,
+        fields: Dict[str, Any],
+        keep_search_index: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        使用 arrayFilters 只更新指定block的部分字段
+
+        Returns:
+            更新后的block；章节或block不存在时返回None
+        """
+        version = next_content_version()
+        update_set: Dict[str, Any] = {f"content.$[blk].{key}": value for key, value in fields.items()}
+        update_set["content.$[blk].version"] = version
+        update_set["updatedAt"] = get_current_time()
+        update_set["version"] = version
+
+        section = self._write_block(
+            self.collection.find_one_and_update,
+            {"id": section_id, "content.id": block_id},
+            {"$set": update_set},
+            keep_search_index,
+            projection={"_id": 0, "content": {"$elemMatch": {"id": block_id}}},
+            array_filters=[{"blk.id": block_id}],
+            return_document=ReturnDocument.AFTER,
+        )
+        if not section or not section.get("content"):
+            return None
+        return section["content"][0]
+
+    def replace_block(
+        self,
+        section_id: str,
+        block_id: str,
+        block: Dict[str, Any],
+        keep_search_index: bool = False,
+    ) -> bool:
+        """
+        使用 arrayFilters 整体替换指定block（写入带 version 的副本，不修改传入的block）
+        """
+        version = next_content_version()
+        result = self._write_block(
+            self.collection.update_one,
+            {"id": section_id, "content.id": block_id},
+            {"$set": {
+                "content.$[blk]": {**block, "version": version},
+                "updatedAt": get_current_time(),
+                "version": version,
+            }},
+            keep_search_index,
+            array_filters=[{"blk.id": block_id}],
+        )
+        return result.matched_count > 0
+
+    def delete_block(self, section_id: str, block_id: str, keep_search_index: bool = False) -> bool:
+        """
+        使用 $pull 删除指定block
+        """
+        result = self._write_block(
+            self.collection.update_one,
+            {"id": section_id, "content.id": block_id},
+            {
+                "$pull": {"content": {"id": block_id}},
+                "$set": {"updatedAt": get_current_time(), "version": next_content_version()},
+            },
+            keep_search_index,
+        )
+        return result.modified_count > 0
+
+    def move_block(self, section_id: str, block_id: str, after_block_id: Optional[str] = None) -> bool:
+        """
+        移动block到 after_block_id 之后（after_block_id为None时移动到最前面）
+
+        使用一次管道更新完成：$filter 取出block，再用 $concatArrays 在目标位置放回；
+        查询条件要求两个block都存在，任一不存在时不做任何修改并返回 False。
+        块索引不记录 block 的位置，移动后仍然有效，同一次写入中推进 searchIndexedAt
+        """
+        if block_id == after_block_id:
+            return False
+
+        query: Dict[str, Any] = {"id": section_id, "content.id": block_id}
+        if after_block_id:
+            query["content.id"] = {"$all": [block_id, after_block_id]}
+
+        version = next_content_version()
+        rest = {"$filter": {"input": "$content", "cond": {"$ne": ["$$this.id", block_id]}}}
+        moved = {"$arrayElemAt": [
+            {"$filter": {"input": "$content", "cond": {"$eq": ["$$this.id", block_id]}}}, 0
+        ]}
+        if after_block_id:
+            position: Any = {"$add": [{"$indexOfArray": ["$$rest.id", after_block_id]}, 1]}
+        else:
+            position = 0
+
+        update = [{
+            "$set": {
+                "content": {"$let": {
+                    "vars": {"rest": rest, "moved": moved},
+                    "in": {"$let": {
+                        "vars": {"position": position},
+                        "in": {"$concatArrays": [
+                            {"$slice": ["$$rest", "$$position"]},
+                            [{"$mergeObjects": ["$$moved", {"version": version}]}],
+                            {"$slice": ["$$rest", "$$position", {"$max": [{"$size": "$$rest"}, 1]}]},
+                        ]},
+                    }},
+                }},
+                "updatedAt": get_current_time(),
+                "version": version,
+            }
+        }]
+        result = self._write_block(self.collection.update_one, query, update, keep_search_index=True)
+        return result.modified_count > 0
+
+    def find_fork(
+        self,
+        paper_id: str,
+        source_section_id: str,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        查找某篇论文从 source_section_id 复制出的章节副本
+        """
+        fields: Dict[str, Any] = {"_id": 0}
+        if projection:
+            fields.update(projection)
+        return self.collection.find_one(
+            {"paperId": paper_id, "sourceSectionId": source_section_id}, fields
+        )
+
+    def fork(self, section_id: str, paper_id: str) -> Optional[Dict[str, Any]]:
+        """
+        复制章节给指定论文（写时复制），副本记录 sourceSectionId 指向原章节
+
+        block ID 保持不变，已有笔记对 blockId 的引用在副本中仍然有效；
+        副本还没有块索引，不复制原章节的 searchIndexedAt，由调用方建立索引（或由后台补建）
+        """
+        source = self.find_by_id(section_id)
+        if source is None:
+            return None
+
+        current_time = get_current_time()
+        version = next_content_version()
+        section = dict(source)
+        section.pop("searchIndexedAt", None)
+        section.update({
+            "id": generate_id(),
+            "paperId": paper_id,
+            "sourceSectionId": section_id,
+            "createdAt": current_time,
+            "updatedAt": current_time,
+            "version": version,
+            "contentVersion": version,
+        })
+        self.collection.insert_one(section)
+        section.pop("_id", None)
+        return section
+
     def delete(self, section_id: str) -> bool:
         """
         删除章节
@@ -121,6 +462,7 @@ class SectionModel:
         批量创建章节
         """
         current_time = get_current_time()
+        version = next_content_version()
         sections = []
         
         for section_data in sections_data:
@@ -133,6 +475,8 @@ class SectionModel:
                 "content": section_data.get("content", []),
                 "createdAt": current_time,
                 "updatedAt": current_time,
+                "version": version,
+                "contentVersion": version,
             }
             sections.append(section)
         
@@ -145,15 +489,166 @@ class SectionModel:
                 "content": section["content"], "createdAt": section["createdAt"],
                 "updatedAt": section["updatedAt"]} for section in sections]
 
-    def find_sections_by_ids(self, section_ids: List[str]) -> List[Dict[str, Any]]:
+    def find_sections_by_ids(
+        self,
+        section_ids: List[str],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
         """
-        根据ID列表查找多个章节
+        根据ID列表查找多个章节，返回顺序与 section_ids 一致（不存在的ID会被跳过）
         """
         if not section_ids:
             return []
-        
-        sections = list(self.collection.find({"id": {"$in": section_ids}}, {"_id": 0}).sort("createdAt", 1))
-        return sections
+
+        sections_by_id = self._fetch_sections_by_ids(section_ids, projection)
+        return [sections_by_id[sid] for sid in section_ids if sid in sections_by_id]
+
+    def iter_section_batches(
+        self,
+        section_ids: List[str],
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = SECTION_STREAM_BATCH_SIZE,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        按 section_ids 顺序分批读取章节，每批一次 $in 查询，读完一批产出一批
+
+        用于流式输出整篇论文：同一时刻只持有一批章节（不存在的ID会被跳过）
+        """
+        for start in range(0, len(section_ids), batch_size):
+            batch_ids = section_ids[start:start + batch_size]
+            sections_by_id = self._fetch_sections_by_ids(batch_ids, projection)
+            batch = [sections_by_id[sid] for sid in batch_ids if sid in sections_by_id]
+            if batch:
+                yield batch
+
+    def load_sections_for_papers(
+        self,
+        papers: List[Dict[str, Any]],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        一次查询批量加载多篇论文的章节
+
+        Args:
+            papers: 论文列表，每篇论文需包含 id 和 sectionIds
+            projection: 章节投影，默认读取完整内容
+
+        Returns:
+            {论文ID: 按该论文 sectionIds 顺序排列的章节列表}
+        """
+        all_ids: List[str] = []
+        for paper in papers:
+            all_ids.extend(paper.get("sectionIds") or [])
+
+        sections_by_id = self._fetch_sections_by_ids(all_ids, projection) if all_ids else {}
+
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for paper in papers:
+            result[paper.get("id")] = [
+                sections_by_id[sid]
+                for sid in (paper.get("sectionIds") or [])
+                if sid in sections_by_id
+            ]
+        return result
+
+    def get_update_stamps(self, section_ids: List[str]) -> Dict[str, Any]:
+        """
+        批量读取章节的 updatedAt（{章节ID: updatedAt}），由 (id, updatedAt) 索引覆盖，不读取章节内容
+        """
+        if not section_ids:
+            return {}
+        cursor = self.collection.find(
+            {"id": {"$in": list(dict.fromkeys(section_ids))}},
+            {"_id": 0, "id": 1, "updatedAt": 1},
+        )
+        return {section["id"]: section.get("updatedAt") for section in cursor}
+
+    def find_changes(self, section_ids: List[str], since: int) -> List[Dict[str, Any]]:
+        """
+        读取 since 序号之后写入过的章节（增量同步），返回顺序与 section_ids 一致
+
+        - 内容整体写入过（contentVersion > since）或 since 为 0 时返回全部 block，full 为 True
+        - 否则只返回 version > since 的 block，blockIds 为当前完整的 block 顺序，
+          客户端据此删除和重排本地 block
+
+        未记录序号的旧数据按序号 0 处理。
+        """
+        if not section_ids:
+            return []
+
+        query: Dict[str, Any] = {"id": {"$in": list(dict.fromkeys(section_ids))}}
+        content = {"$ifNull": ["$content", []]}
+        if since > 0:
+            query["version"] = {"$gt": since}
+            full: Any = {"$gt": [{"$ifNull": ["$contentVersion", 0]}, since]}
+            blocks: Any = {"$cond": [
+                full,
+                content,
+                {"$filter": {
+                    "input": content,
+                    "cond": {"$gt": [{"$ifNull": ["$$this.version", 0]}, since]},
+                }},
+            ]}
+        else:
+            full = {"$literal": True}
+            blocks = content
+
+        cursor = self.collection.find(
+            query,
+            {
+                "_id": 0,
+                "id": 1,
+                "title": 1,
+                "titleZh": 1,
+                "version": 1,
+                "updatedAt": 1,
+                "full": full,
+                "blocks": blocks,
+                "blockIds": {"$ifNull": ["$content.id", []]},
+            },
+        )
+        sections_by_id = {section["id"]: section for section in cursor}
+        return [sections_by_id[sid] for sid in section_ids if sid in sections_by_id]
+
+    def count_blocks_by_ids(self, section_ids: List[str]) -> Dict[str, int]:
+        """
+        在数据库端统计每个章节的block数量，不读取content本身
+
+        Returns:
+            {章节ID: block数量}
+        """
+        if not section_ids:
+            return {}
+
+        pipeline = [
+            {"$match": {"id": {"$in": list(dict.fromkeys(section_ids))}}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "id": 1,
+                    "blockCount": {"$size": {"$ifNull": ["$content", []]}},
+                }
+            },
+        ]
+        return {doc["id"]: doc["blockCount"] for doc in self.collection.aggregate(pipeline)}
+
+    def _fetch_sections_by_ids(
+        self,
+        section_ids: List[str],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """按ID批量读取章节，返回 {章节ID: 章节}（单次 $in 查询，顺序由调用方决定）"""
+        fields = dict(projection or SECTION_FULL_PROJECTION)
+        fields["_id"] = 0
+        if any(value for key, value in fields.items() if key != "_id"):
+            # 包含式投影需要带上id，用于还原顺序
+            fields["id"] = 1
+
+        unique_ids = list(dict.fromkeys(section_ids))
+        return {
+            section["id"]: section
+            for section in self.collection.find({"id": {"$in": unique_ids}}, fields)
+        }
 
 
 _section_model: Optional[SectionModel] = None
@@ -166,9 +661,47 @@ def get_section_model() -> SectionModel:
     return _section_model
 
 
-def find_sections_by_ids(section_ids: List[str]) -> List[Dict[str, Any]]:
+def find_sections_by_ids(
+    section_ids: List[str],
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
     """
-    根据ID列表查找多个章节（独立函数）
+    根据ID列表查找多个章节（独立函数），保持 section_ids 的顺序
     """
     model = get_section_model()
-    return model.find_sections_by_ids(section_ids)
\ No newline at end of file
+    return model.find_sections_by_ids(section_ids, projection)
+
+
+def attach_sections(
+    papers: List[Dict[str, Any]],
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    为多篇论文填充 sections 字段（独立函数），所有论文共用一次查询
+    """
+    if not papers:
+        return papers
+
+    sections_by_paper = get_section_model().load_sections_for_papers(papers, projection)
+    for paper in papers:
+        paper["sections"] = sections_by_paper.get(paper.get("id"), [])
+    return papers
+
+
+def attach_section_stats(papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    为论文列表填充 sectionCount / blockCount（独立函数），所有论文共用一次聚合
+    """
+    if not papers:
+        return papers
+
+    all_ids: List[str] = []
+    for paper in papers:
+        all_ids.extend(paper.get("sectionIds") or [])
+    block_counts = get_section_model().count_blocks_by_ids(all_ids)
+
+    for paper in papers:
+        section_ids = paper.get("sectionIds") or []
+        paper["sectionCount"] = len(section_ids)
+        paper["blockCount"] = sum(block_counts.get(sid, 0) for sid in section_ids)
+    return papers
@@ -1,6 +1,7 @@
 from typing import Dict, Any, Optional, List
 from neuink.utils.db import get_user_col
 from neuink.utils.common import generate_id, get_current_time
+from neuink.utils.pagination import apply_cursor, keyset_sort
 from neuink.utils.password_utils import hash_password, verify_password, migrate_plain_password
 from neuink.config.constants import ADMIN_USERNAME
 
@@ -11,15 +12,8 @@ class UserModel:
     """用户数据访问层"""
 
     def __init__(self):
+        # 索引由 models/indexes.py 在启动时统一创建
         self.collection = get_user_col()
-        # 可选：确保索引（幂等）
-        try:
-            self.collection.create_index("id", unique=True)
-            self.collection.create_index("username", unique=True)
-            self.collection.create_index("role")
-        except Exception:
-            # 索引已存在等情况忽略
-            pass
 
     def create_user(self, username: str, password: str, nickname: str, *,
                     role: str = ROLE_USER) -> Dict[str, Any]:
@@ -135,12 +129,21 @@ class UserModel:
         cursor = self.collection.find(query, {"_id": 0}).skip(skip).limit(limit)
         return list(cursor)
 
-    def get_all_users(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_all_users(self, skip: int = 0, limit: int = 10,
+                      cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         获取所有用户列表（分页）
+
+        按 (createdAt, id) 升序，保证翻页顺序稳定；传入 cursor 时忽略 skip
         """
-        cursor = self.collection.find({}, {"_id": 0}).skip(skip).limit(limit)
-        return list(cursor)
+        query = apply_cursor({}, cursor, "createdAt", 1)
+        result = (
+            self.collection.find(query, {"_id": 0})
+            .sort(keyset_sort("createdAt", 1))
+            .skip(0 if cursor else skip)
+            .limit(limit)
+        )
+        return list(result)
 
     def set_role(self, user_id: str, role: str) -> bool:
         """
@@ -4,10 +4,25 @@ UserPaper 数据模型
 """
 import logging
 from typing import Dict, Any, List, Optional, Tuple
-from .basePaper import BasePaperModel
+from .basePaper import BasePaperModel, SYNC_VERSION_FIELD, VERSION_FIELD
 from ..config.constants import Collections
 from ..utils.common import get_current_time
+from ..utils.pagination import (
+    InvalidCursorError,
+    cursor_condition,
+    fetch_page,
+    include_sort_field,
+    invalidate_cached_totals,
+    keyset_sort,
+    total_cache_key,
+)
+from .contentVersion import next_content_version
 from .section import find_sections_by_ids
+from .userStats import get_user_stats_model
+from .paperSearchIndex import search_paper_page
+
+# 影响统计分类的字段，更新这些字段时需要同步调整统计
+_STATS_FIELDS = ("userId", "readingStatus", "priority", "sourcePaperId")
 
 # 初始化logger
 logger = logging.getLogger(__name__)
@@ -16,96 +31,23 @@ logger = logging.getLogger(__name__)
 class UserPaperModel(BasePaperModel):
     """UserPaper 数据模型类"""
 
+    SELECTABLE_FIELDS = BasePaperModel.SELECTABLE_FIELDS + (
+        "userId",
+        "sourcePaperId",
+        "customTags",
+        "readingStatus",
+        "priority",
+        "readingPosition",
+        "totalReadingTime",
+        "lastReadTime",
+        "remarks",
+        "addedAt",
+    )
+
     def get_collection_name(self) -> str:
         """返回集合名称"""
         return Collections.USER_PAPER
 
-    def _ensure_indexes(self):
-        """确保必要的索引存在"""
-        import logging
-        logger = logging.getLogger(__name__)
-        collection_name = self.get_collection_name()
-        
-        logger.info(f"开始为集合 {collection_name} 创建用户论文特有索引")
-        
-        # 先调用父类的索引创建方法
-        super()._ensure_indexes()
-        
-        # 添加用户论文特有的索引
-        try:
-            self.collection.create_index("userId")
-            logger.info(f"集合 {collection_name}: 创建索引 userId")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 userId 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("sourcePaperId")
-            logger.info(f"集合 {collection_name}: 创建索引 sourcePaperId")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 sourcePaperId 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index([("userId", 1), ("sourcePaperId", 1)])
-            logger.info(f"集合 {collection_name}: 创建复合索引 userId, sourcePaperId")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建复合索引失败 - {str(e)}")
-        
-        # 全文搜索索引 - 添加异常处理避免索引冲突
-        try:
-            self.collection.create_index([
-                ("metadata.title", "text"),
-                ("metadata.titleZh", "text"),
-                ("abstract.en", "text"),
-                ("abstract.zh", "text"),
-            ])
-            logger.info(f"集合 {collection_name}: 创建扩展全文索引 metadata.title, metadata.titleZh, abstract.en, abstract.zh")
-        except Exception as e:
-            # 如果索引已存在或类似索引已存在，忽略错误
-            # 这通常发生在数据库结构变更后，旧索引仍存在的情况
-            error_msg = str(e).lower()
-            logger.warning(f"集合 {collection_name}: 创建扩展全文索引失败 - {str(e)}")
-            if any(keyword in error_msg for keyword in ["already exists", "indexoptionsconflict", "duplicate"]):
-                # 索引已存在，跳过创建
-                logger.info(f"集合 {collection_name}: 索引已存在，跳过创建")
-                pass
-            else:
-                # 其他类型的错误，重新抛出
-                logger.error(f"集合 {collection_name}: 创建索引时发生未知错误 - {str(e)}")
-                raise e
-                 
-        try:
-            self.collection.create_index("customTags")
-            logger.info(f"集合 {collection_name}: 创建索引 customTags")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 customTags 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("readingStatus")
-            logger.info(f"集合 {collection_name}: 创建索引 readingStatus")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 readingStatus 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("priority")
-            logger.info(f"集合 {collection_name}: 创建索引 priority")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 priority 索引失败 - {str(e)}")
-            
-        try:
-            self.collection.create_index("addedAt")
-            logger.info(f"集合 {collection_name}: 创建索引 addedAt")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 addedAt 索引失败 - {str(e)}")
-            
-        # 新增：阅读相关索引
-        try:
-            self.collection.create_index("lastReadTime")
-            logger.info(f"集合 {collection_name}: 创建索引 lastReadTime")
-        except Exception as e:
-            logger.warning(f"集合 {collection_name}: 创建 lastReadTime 索引失败 - {str(e)}")
-            
-        logger.info(f"集合 {collection_name} 用户论文特有索引创建完成")
-
     def get_specific_fields(self, paper_data: Dict[str, Any]) -> Dict[str, Any]:
         """获取用户论文特有的字段"""
         return {
@@ -141,10 +83,18 @@ class UserPaperModel(BasePaperModel):
         search: Optional[str],
         filters: Optional[Dict[str, Any]],
         user_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        cached_total: bool = False,
+        projection: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
         根据用户或筛选条件查询论文列表
+
+        当前页用索引查询取回，总数在本页未取满时直接得出，否则单独计数；
+        cached_total 为 True 时总数允许使用短时缓存（无限滚动场景），命中时不再计数。
+        传入 cursor 时使用游标分页（忽略 skip），全文搜索按相关度排序，不支持游标；
+        传入 projection（fields= 参数）时代替列表投影
         """
         base_query = {"userId": user_id}
         
@@ -163,30 +113,29 @@ class UserPaperModel(BasePaperModel):
                     base_query["sourcePaperId"] = None
 
         # 使用列表页面的投影，只返回必要字段，不包括完整的论文数据
-        projection = self._list_summary_projection(include_score=bool(search))
+        projection = include_sort_field(
+            dict(projection) if projection else self._list_summary_projection(include_score=bool(search)),
+            sort_by,
+        )
         
-        # 全文搜索
+        # 全文搜索：进程内倒排索引（支持中文），每个用户一个分区
         if search:
-            query = dict(base_query)
-            query["$text"] = {"$search": search}
-            
-            cursor = (
-                self.collection.find(query, projection)
-                .sort([("score", {"$meta": "textScore"}), (sort_by, sort_order)])
-                .skip(skip)
-                .limit(limit)
+            if cursor:
+                raise InvalidCursorError("全文搜索结果不支持游标分页")
+            papers, total = search_paper_page(
+                self.collection, user_id, {"userId": user_id}, search, base_query, skip, limit, projection,
             )
-            total = self.collection.count_documents(query)
         else:
-            cursor = (
-                self.collection.find(base_query, projection)
-                .sort(sort_by, sort_order)
-                .skip(skip)
-                .limit(limit)
+            papers, total = fetch_page(
+                self.collection,
+                base_query,
+                keyset_sort(sort_by, sort_order),
+                limit=limit,
+                skip=0 if cursor else skip,
+                projection=projection,
+                page_filter=cursor_condition(cursor, sort_by, sort_order),
+                total_key=total_cache_key(self.get_collection_name(), user_id, base_query) if cached_total else None,
             )
-            total = self.collection.count_documents(base_query)
-
-        papers = list(cursor)
         for paper in papers:
             paper.pop("score", None)
         
@@ -201,6 +150,9 @@ class UserPaperModel(BasePaperModel):
         sort_order: int,
         search: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        cached_total: bool = False,
+        projection: Optional[Dict[str, Any]] = None,
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
         查询用户的个人论文库列表
@@ -212,8 +164,53 @@ class UserPaperModel(BasePaperModel):
             sort_order=sort_order,
             search=search,
             filters=filters,
-            user_id=user_id
+            user_id=user_id,
+            cursor=cursor,
+            cached_total=cached_total,
+            projection=projection,
+        )
+
+    def create(self, paper_data: Dict[str, Any]) -> Dict[str, Any]:
+        """创建个人论文，同步用户统计并清除该用户缓存的列表总数"""
+        paper = super().create(paper_data)
+        if paper:
+            get_user_stats_model().on_paper_added(paper)
+        invalidate_cached_totals(self.get_collection_name(), paper_data["userId"])
+        return paper
+
+    def update(self, paper_id: str, update_data: Dict[str, Any]) -> bool:
+        """更新个人论文；阅读状态/优先级/来源变化时同步用户统计并清除该用户缓存的列表总数"""
+        if not any(field in update_data for field in _STATS_FIELDS[1:]):
+            return super().update(paper_id, update_data)
+
+        update_data["updatedAt"] = get_current_time()
+        update_data[SYNC_VERSION_FIELD] = next_content_version()
+        before = self.collection.find_one_and_update(
+            {"id": paper_id},
+            {"$set": update_data, "$inc": {VERSION_FIELD: 1}},
+            projection={"_id": 0, **{field: 1 for field in _STATS_FIELDS}},
+        )
+        if not before:
+            return False
+        self._mark_search_dirty(paper_id)
+        after = {**before, **{field: update_data[field] for field in _STATS_FIELDS[1:] if field in update_data}}
+        get_user_stats_model().on_paper_changed(before, after)
+        # 这些字段也是列表筛选条件，按它们筛选的总数已失效
+        invalidate_cached_totals(self.get_collection_name(), before.get("userId"))
+        return True
+
+    def delete(self, paper_id: str) -> bool:
+        """删除个人论文，同步用户统计并清除该用户缓存的列表总数"""
+        paper = self.collection.find_one_and_delete(
+            {"id": paper_id},
+            {"_id": 0, **{field: 1 for field in _STATS_FIELDS}},
         )
+        if not paper:
+            return False
+        self._mark_search_dirty(paper_id, deleted=True)
+        get_user_stats_model().on_paper_removed(paper)
+        invalidate_cached_totals(self.get_collection_name(), paper.get("userId"))
+        return True
 
     def count_by_user(self, user_id: str) -> int:
         """
@@ -221,6 +218,22 @@ class UserPaperModel(BasePaperModel):
         """
         return self.collection.count_documents({"userId": user_id})
 
+    def is_section_referenced(self, section_id: str, exclude_paper_id: Optional[str] = None) -> bool:
+        """
+        检查是否有个人论文仍在引用该章节（添加公共论文时共享的章节）
+        """
+        query: Dict[str, Any] = {"sectionIds": section_id}
+        if exclude_paper_id:
+            query["id"] = {"$ne": exclude_paper_id}
+        return self.collection.count_documents(query, limit=1) > 0
+
+    def get_section_ids_by_user(self, user_id: str) -> Dict[str, List[str]]:
+        """
+        获取用户所有个人论文的章节ID列表：{个人论文ID: sectionIds}
+        """
+        cursor = self.collection.find({"userId": user_id}, {"_id": 0, "id": 1, "sectionIds": 1})
+        return {paper["id"]: paper.get("sectionIds") or [] for paper in cursor}
+
     def get_user_statistics(self, user_id: str) -> Dict[str, Any]:
         """
         获取用户的统计信息
@@ -338,4 +351,15 @@ class UserPaperModel(BasePaperModel):
                 
         except Exception as e:
             logger.error(f"添加参考文献到个人论文异常: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+_user_paper_model: Optional[UserPaperModel] = None
+
+
+def get_user_paper_model() -> UserPaperModel:
+    """获取 UserPaperModel 进程级单例"""
+    global _user_paper_model
+    if _user_paper_model is None:
+        _user_paper_model = UserPaperModel()
+    return _user_paper_model
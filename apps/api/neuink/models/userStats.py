@@ -0,0 +1,237 @@
+"""
+UserStats 数据模型
+每个用户一份个人论文库统计文档，由论文/笔记的增删改路径通过 $inc 增量维护，
+仪表盘读取统计信息只需一次按 userId 的索引点查。
+
+增量更新只作用于已存在的统计文档（不 upsert）：统计文档缺失时由读取方
+按原始数据完整计算一次再写入，避免只含部分计数的文档。
+定期对账任务（reconcile_all）重新计算所有用户的统计，修正并发或异常导致的偏差：
+各 Web 服务进程都登记了对账线程，通过 Counters 集合中的执行租约保证每个间隔只有一个进程执行。
+"""
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Any, Iterable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from ..utils.db import get_db
+from ..utils.common import get_current_time
+from ..utils.workers import register_worker
+from ..config.constants import Collections
+
+logger = logging.getLogger(__name__)
+
+READING_STATUSES = ("unread", "reading", "finished")
+PRIORITIES = ("high", "medium", "low")
+
+# 定期对账的执行租约（Counters 集合中的一条文档，所有进程共享）
+_RECONCILE_LEASE_ID = "userStatsReconcile"
+# 各进程检查执行租约的间隔上限（秒）
+_RECONCILE_CHECK_SECONDS = 300
+
+
+def _paper_counters(paper: Dict[str, Any]) -> Dict[str, int]:
+    """一篇个人论文对统计文档各计数字段的贡献"""
+    counters = {"total": 1}
+    status = paper.get("readingStatus", "unread")
+    if status in READING_STATUSES:
+        counters[f"readingStatus.{status}"] = 1
+    priority = paper.get("priority", "medium")
+    if priority in PRIORITIES:
+        counters[f"priority.{priority}"] = 1
+    if paper.get("sourcePaperId") is not None:
+        counters["fromPublic"] = 1
+    else:
+        counters["uploaded"] = 1
+    return counters
+
+
+class UserStatsModel:
+    """UserStats 数据模型类"""
+
+    def __init__(self):
+        """初始化 UserStats 模型（索引由 models/indexes.py 在启动时统一创建）"""
+        self.collection = get_db()[Collections.USER_STATS]
+
+    def find_by_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"userId": user_id}, {"_id": 0})
+
+    def _inc(self, user_id: Optional[str], counters: Dict[str, int]) -> None:
+        counters = {key: value for key, value in counters.items() if value}
+        if not user_id or not counters:
+            return
+        try:
+            self.collection.update_one(
+                {"userId": user_id},
+                {"$inc": counters, "$set": {"updatedAt": get_current_time()}},
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            # 统计偏差由对账任务修正，不影响主流程
+            logger.warning(f"更新用户统计失败 user_id={user_id}: {exc}")
+
+    def on_paper_added(self, paper: Dict[str, Any]) -> None:
+        self._inc(paper.get("userId"), _paper_counters(paper))
+
+    def on_paper_removed(self, paper: Dict[str, Any]) -> None:
+        counters = {key: -value for key, value in _paper_counters(paper).items()}
+        self._inc(paper.get("userId"), counters)
+
+    def on_paper_changed(self, before: Dict[str, Any], after: Dict[str, Any]) -> None:
+        """阅读状态/优先级/来源变化时，从旧分类移到新分类"""
+        counters: Dict[str, int] = {}
+        for key, value in _paper_counters(before).items():
+            counters[key] = counters.get(key, 0) - value
+        for key, value in _paper_counters(after).items():
+            counters[key] = counters.get(key, 0) + value
+        self._inc(before.get("userId"), counters)
+
+    def on_notes_changed(self, user_id: Optional[str], delta: int) -> None:
+        self._inc(user_id, {"totalNotes": delta})
+
+    def compute(self, user_id: str) -> Dict[str, Any]:
+        """从原始数据完整计算用户统计"""
+        from .userPaper import get_user_paper_model
+        from .note import get_note_model
+
+        stats = get_user_paper_model().get_user_statistics(user_id)
+        stats["totalNotes"] = get_note_model().count_by_user(user_id)
+        return stats
+
+    def reconcile(self, user_id: str) -> Dict[str, Any]:
+        """
+        重新计算并覆盖写入用户统计，返回最新统计
+
+        计算期间统计文档有增量更新（updatedAt 变化）时不覆盖：计算结果可能不含这次增量，
+        覆盖会丢失它，偏差留给下次对账修正
+        """
+        current = self.collection.find_one({"userId": user_id}, {"_id": 0, "updatedAt": 1})
+        stats = self.compute(user_id)
+        now = get_current_time()
+        doc = {**stats, "userId": user_id, "updatedAt": now, "reconciledAt": now}
+        if current is None:
+            try:
+                self.collection.insert_one(doc)
+            except DuplicateKeyError:
+                logger.info(f"用户统计已由其他请求创建，跳过写入 user_id={user_id}")
+            return stats
+
+        result = self.collection.update_one(
+            {"userId": user_id, "updatedAt": current.get("updatedAt")},
+            {"$set": doc},
+        )
+        if result.matched_count == 0:
+            logger.info(f"用户统计在对账期间有更新，跳过写入 user_id={user_id}")
+        return stats
+
+    def claim_reconcile_run(self, interval: float) -> bool:
+        """
+        领取一轮定期对账：距上一轮领取已超过 interval 秒时记录本次领取并返回 True
+
+        租约记录在 Counters 集合中，多个进程同时检查时只有一个领取成功
+        """
+        now = get_current_time()
+        try:
+            get_db()[Collections.COUNTERS].update_one(
+                {"_id": _RECONCILE_LEASE_ID, "$or": [{"nextRunAt": None}, {"nextRunAt": {"$lte": now}}]},
+                {"$set": {"nextRunAt": now + timedelta(seconds=interval), "claimedAt": now}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # 租约文档存在且未到期：条件不匹配时 upsert 插入同一 _id 失败
+            return False
+        return True
+
+    def get_or_rebuild(self, user_id: str) -> Dict[str, Any]:
+        """读取用户统计；统计文档不存在时完整计算一次"""
+        doc = self.find_by_user(user_id)
+        if doc is None:
+            return self.reconcile(user_id)
+        return {
+            "total": doc.get("total", 0),
+            "readingStatus": {status: doc.get("readingStatus", {}).get(status, 0) for status in READING_STATUSES},
+            "priority": {priority: doc.get("priority", {}).get(priority, 0) for priority in PRIORITIES},
+            "fromPublic": doc.get("fromPublic", 0),
+            "uploaded": doc.get("uploaded", 0),
+            "totalNotes": doc.get("totalNotes", 0),
+        }
+
+    def reconcile_all(self, user_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        对账：重新计算用户统计
+
+        默认处理已有统计文档的用户以及拥有个人论文或笔记的用户，返回处理的用户数
+        """
+        if user_ids is None:
+            db = get_db()
+            ids = set(self.collection.distinct("userId"))
+            ids.update(db[Collections.USER_PAPER].distinct("userId"))
+            ids.update(db[Collections.NOTE].distinct("userId"))
+            user_ids = sorted(uid for uid in ids if uid)
+
+        count = 0
+        for user_id in user_ids:
+            try:
+                self.reconcile(user_id)
+                count += 1
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning(f"用户统计对账失败 user_id={user_id}: {exc}")
+        return count
+
+
+_user_stats_model: Optional[UserStatsModel] = None
+
+
+def get_user_stats_model() -> UserStatsModel:
+    """获取 UserStatsModel 进程级单例"""
+    global _user_stats_model
+    if _user_stats_model is None:
+        _user_stats_model = UserStatsModel()
+    return _user_stats_model
+
+
+_reconcile_thread: Optional[threading.Thread] = None
+
+
+def _reconcile_loop(app, interval: float) -> None:
+    # 每个进程定期检查执行租约，只有领取到本轮的进程执行对账
+    while True:
+        time.sleep(min(interval, _RECONCILE_CHECK_SECONDS))
+        try:
+            with app.app_context():
+                model = get_user_stats_model()
+                if not model.claim_reconcile_run(interval):
+                    continue
+                count = model.reconcile_all()
+            app.logger.info("[STATS] user statistics reconciled for %s users", count)
+        except Exception as exc:  # pylint: disable=broad-except
+            app.logger.warning("[STATS] user statistics reconciliation failed: %s", exc)
+
+
+def init_app(app) -> None:
+    """
+    注册对账命令，并登记 Web 服务进程内的定期对账线程
+
+    USER_STATS_RECONCILE_INTERVAL：对账间隔（秒），默认 21600（6小时），0 表示只通过命令对账；
+    所有进程共享同一个间隔，每个间隔只有一个进程执行
+    """
+
+    @app.cli.command("reconcile-user-stats")
+    def reconcile_user_stats_command():
+        """重新计算所有用户的个人论文库统计"""
+        count = get_user_stats_model().reconcile_all()
+        print(f"reconciled: {count}")
+
+    register_worker(app, _start_reconcile_thread)
+
+
+def _start_reconcile_thread(app) -> None:
+    global _reconcile_thread
+    interval = float(os.getenv("USER_STATS_RECONCILE_INTERVAL", "21600"))
+    if interval > 0 and _reconcile_thread is None:
+        _reconcile_thread = threading.Thread(
+            target=_reconcile_loop, args=(app, interval), name="user-stats-reconcile", daemon=True
+        )
+        _reconcile_thread.start()
@@ -10,3 +10,15 @@ def health():
         return jsonify(status="ok", mongo=pong), 200
     except Exception as e:
         return jsonify(status="error", error=str(e)), 500
+
+
+@bp.get("/tasks")
+def task_queues():
+    """
+    持久化后台任务指标：各任务类型待执行（pending）、执行中（leased）和死信（buried）的任务数，
+    最久排队任务的等待时间，以及最近开始执行的任务的排队时间（见 BackgroundJobModel.get_stats）
+    """
+    from neuink.models.backgroundJob import get_background_job_model
+    from neuink.utils.background_tasks import load_queue_configs
+
+    return jsonify(status="ok", jobs=get_background_job_model().get_stats(list(load_queue_configs()))), 200
@@ -82,7 +82,8 @@ def get_user_paper_notes(entry_id):
             page_size=page_size,
             sort_by=sort_by,
             sort_order=sort_order,
-            search=search
+            search=search,
+            cursor=request.args.get("cursor"),
         )
 
         if result["code"] == BusinessCode.SUCCESS:
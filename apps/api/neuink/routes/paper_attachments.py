@@ -11,6 +11,7 @@ from neuink.utils.common import (
     bad_request_response,
     internal_error_response,
 )
+from neuink.utils.etag import etag_matches, not_modified_response, with_etag
 from neuink.config.constants import BusinessCode
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,11 @@ def get_admin_paper_pdf_content(paper_id):
     获取管理员论文的PDF文件内容（base64格式）
     """
     try:
+        # 附件信息未变化时直接返回304，不再读取论文和七牛云文件
+        etag = get_paper_service().get_paper_etag(paper_id, kind="pdf-content", include_sections=False)
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
         service = get_paper_service()
         result = service.get_admin_paper_detail(
             paper_id=paper_id,
@@ -59,10 +65,11 @@ def get_admin_paper_pdf_content(paper_id):
         if not pdf_result["success"]:
             return internal_error_response(f"获取PDF内容失败: {pdf_result.get('error', '未知错误')}")
 
-        return success_response({
+        response = success_response({
             "pdfContent": pdf_result["content"],
             "attachment": pdf_attachment
         }, "成功获取PDF内容")
+        return with_etag(response, etag)
 
     except Exception as exc:
         return internal_error_response(f"服务器错误: {exc}")
@@ -75,6 +82,13 @@ def get_user_paper_pdf_content(entry_id):
     获取用户论文的PDF文件内容（base64格式）
     """
     try:
+        # 附件信息未变化时直接返回304，不再读取论文和七牛云文件
+        etag = get_user_paper_service().get_paper_etag(
+            entry_id, kind="pdf-content", query={"userId": g.current_user["user_id"]}, include_sections=False
+        )
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
         service = get_user_paper_service()
         result = service.get_user_paper_detail(
             user_paper_id=entry_id,
@@ -108,10 +122,11 @@ def get_user_paper_pdf_content(entry_id):
         if not pdf_result["success"]:
             return internal_error_response(f"获取PDF内容失败: {pdf_result.get('error', '未知错误')}")
 
-        return success_response({
+        response = success_response({
             "pdfContent": pdf_result["content"],
             "attachment": pdf_attachment
         }, "成功获取PDF内容")
+        return with_etag(response, etag)
 
     except Exception as exc:
         return internal_error_response(f"服务器错误: {exc}")
@@ -124,6 +139,11 @@ def get_admin_paper_content_list(paper_id):
     获取管理员论文的content_list.json文件内容
     """
     try:
+        # 附件信息未变化时直接返回304，不再读取论文和七牛云文件
+        etag = get_paper_service().get_paper_etag(paper_id, kind="content-list", include_sections=False)
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
         logger.info(f"获取管理员论文content_list - paper_id: {paper_id}, user_id: {g.current_user['user_id']}")
         
         service = get_paper_service()
@@ -178,10 +198,11 @@ def get_admin_paper_content_list(paper_id):
             logger.error(f"解析content_list.json内容失败 - paper_id: {paper_id}, error: {str(e)}")
             return internal_error_response(f"解析content_list.json内容失败: {str(e)}")
 
-        return success_response({
+        response = success_response({
             "contentList": content_list_json,
             "attachment": content_list_attachment
         }, "成功获取content_list.json内容")
+        return with_etag(response, etag)
 
     except Exception as exc:
         logger.error(f"获取content_list.json服务器错误 - paper_id: {paper_id}, error: {str(exc)}", exc_info=True)
@@ -195,6 +216,13 @@ def get_user_paper_content_list(entry_id):
     获取用户论文的content_list.json文件内容
     """
     try:
+        # 附件信息未变化时直接返回304，不再读取论文和七牛云文件
+        etag = get_user_paper_service().get_paper_etag(
+            entry_id, kind="content-list", query={"userId": g.current_user["user_id"]}, include_sections=False
+        )
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
         logger.info(f"获取用户论文content_list - entry_id: {entry_id}, user_id: {g.current_user['user_id']}")
         
         service = get_user_paper_service()
@@ -249,10 +277,11 @@ def get_user_paper_content_list(entry_id):
             logger.error(f"解析用户论文content_list.json内容失败 - entry_id: {entry_id}, error: {str(e)}")
             return internal_error_response(f"解析content_list.json内容失败: {str(e)}")
 
-        return success_response({
+        response = success_response({
             "contentList": content_list_json,
             "attachment": content_list_attachment
         }, "成功获取content_list.json内容")
+        return with_etag(response, etag)
 
     except Exception as exc:
         logger.error(f"获取用户论文content_list.json服务器错误 - entry_id: {entry_id}, error: {str(exc)}", exc_info=True)
@@ -266,6 +295,13 @@ def get_user_paper_markdown_content(user_paper_id):
     获取用户论文的Markdown文件内容（base64格式）
     """
     try:
+        # 附件信息未变化时直接返回304，不再读取论文和七牛云文件
+        etag = get_user_paper_service().get_paper_etag(
+            user_paper_id, kind="markdown-content", query={"userId": g.current_user["user_id"]}, include_sections=False
+        )
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
         logger.info(f"获取用户论文Markdown内容 - user_paper_id: {user_paper_id}, user_id: {g.current_user['user_id']}")
         
         # 验证用户论文是否存在
@@ -298,10 +334,11 @@ def get_user_paper_markdown_content(user_paper_id):
         if not markdown_result["success"]:
             return internal_error_response(f"获取Markdown内容失败: {markdown_result.get('error', '未知错误')}")
         
-        return success_response({
+        response = success_response({
             "markdownContent": markdown_result["content"],
             "attachment": markdown_attachment
         }, "成功获取Markdown内容")
+        return with_etag(response, etag)
     
     except Exception as exc:
         logger.error(f"获取用户论文Markdown内容异常 - user_paper_id: {user_paper_id}, error: {str(exc)}", exc_info=True)
@@ -315,6 +352,11 @@ def get_admin_paper_markdown_content(paper_id):
     获取管理员论文的Markdown文件内容（base64格式）
     """
     try:
+        # 附件信息未变化时直接返回304，不再读取论文和七牛云文件
+        etag = get_paper_service().get_paper_etag(paper_id, kind="markdown-content", include_sections=False)
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
         logger.info(f"获取管理员论文Markdown内容 - paper_id: {paper_id}, user_id: {g.current_user['user_id']}")
         
         # 验证管理员论文是否存在
@@ -347,10 +389,11 @@ def get_admin_paper_markdown_content(paper_id):
         if not markdown_result["success"]:
             return internal_error_response(f"获取Markdown内容失败: {markdown_result.get('error', '未知错误')}")
         
-        return success_response({
+        response = success_response({
             "markdownContent": markdown_result["content"],
             "attachment": markdown_attachment
         }, "成功获取Markdown内容")
+        return with_etag(response, etag)
     
     except Exception as exc:
         logger.error(f"获取管理员论文Markdown内容异常 - paper_id: {paper_id}, error: {str(exc)}", exc_info=True)
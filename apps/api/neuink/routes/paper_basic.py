@@ -10,6 +10,8 @@ from neuink.utils.common import (
     validate_required_fields,
     internal_error_response,
 )
+from neuink.utils.etag import etag_matches, not_modified_response, with_etag
+from neuink.utils.json_stream import stream_response
 from neuink.config.constants import BusinessCode
 
 logger = logging.getLogger(__name__)
@@ -29,6 +31,17 @@ def _parse_sort_args():
     sort_order = request.args.get("sortOrder", "desc")
     return sort_by, sort_order
 
+def _detail_kind(fields):
+    """详情 ETag 的资源类型：不同的 fields= 选择对应不同的表示"""
+    return f"detail:{fields.key}" if fields else "detail"
+
+def _parse_since():
+    """增量同步的 since 参数：非负整数，缺省为 0（全量）"""
+    since = int(request.args.get("since", 0))
+    if since < 0:
+        raise ValueError
+    return since
+
 def _parse_admin_filters():
     """管理员论文库筛选参数"""
     filters = {}
@@ -73,14 +86,19 @@ def list_admin_papers():
     """
     管理员查看自己管理范围内的论文。
     默认仅返回本人创建的条目，如需查看他人创建的论文，可在 filters 中扩展。
+    fields= 只返回所选字段（可选 sectionCount / blockCount，未选择时不做章节统计）。
     """
     try:
         page, page_size = _parse_pagination_args()
         sort_by, sort_order = _parse_sort_args()
         search = request.args.get("search")
+        cursor = request.args.get("cursor")
+        # total=cached：总数允许使用短时缓存
+        cached_total = request.args.get("total") == "cached"
         filters = _parse_admin_filters()
 
         service = get_paper_service()
+        fields = service.parse_list_fields(request.args.get("fields"))
         result = service.get_admin_papers(
             user_id=g.current_user["user_id"],
             page=page,
@@ -89,6 +107,9 @@ def list_admin_papers():
             sort_order=sort_order,
             search=search,
             filters=filters,
+            cursor=cursor,
+            fields=fields,
+            cached_total=cached_total,
         )
 
         if result["code"] != BusinessCode.SUCCESS:
@@ -105,14 +126,19 @@ def list_admin_papers():
 def list_user_papers():
     """
     个人论文库列表：包括收藏的公共论文和上传的私有论文
+    fields= 只返回所选字段
     """
     try:
         page, page_size = _parse_pagination_args()
         sort_by, sort_order = _parse_sort_args()
         search = request.args.get("search")
+        cursor = request.args.get("cursor")
+        # total=cached：无限滚动时总数允许使用短时缓存
+        cached_total = request.args.get("total") == "cached"
         filters = _parse_user_paper_filters()
 
         service = get_user_paper_service()
+        fields = service.parse_list_fields(request.args.get("fields"))
         result = service.get_user_papers(
             user_id=g.current_user["user_id"],
             page=page,
@@ -121,6 +147,9 @@ def list_user_papers():
             sort_order=sort_order,
             search=search,
             filters=filters,
+            cursor=cursor,
+            cached_total=cached_total,
+            fields=fields,
         )
 
         if result["code"] != BusinessCode.SUCCESS:
@@ -305,21 +334,33 @@ def create_user_paper_from_text():
 def get_admin_paper_detail(paper_id):
     """
     管理员查看论文详情。
+
+    支持 If-None-Match：论文、章节和解析进度均未变化时返回304；章节流式输出。
+    fields=metadata,sections.title 等只返回所选字段（大纲视图不读取 block 内容）
     """
     try:
         service = get_paper_service()
-        result = service.get_admin_paper_detail(
+        fields = service.parse_detail_fields(request.args.get("fields"))
+        etag = service.get_paper_etag(paper_id, kind=_detail_kind(fields), include_progress=True)
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
+        result = service.stream_admin_paper_detail(
             paper_id=paper_id,
             user_id=g.current_user["user_id"],
+            fields=fields,
         )
 
         if result["code"] == BusinessCode.SUCCESS:
-            return success_response(result["data"], result["message"])
+            data = result["data"]
+            return with_etag(stream_response(data["head"], data["sections"], result["message"]), etag)
         if result["code"] == BusinessCode.PAPER_NOT_FOUND:
             return success_response(result["data"], result["message"], result["code"])
         if result["code"] == BusinessCode.PERMISSION_DENIED:
             return success_response(result["data"], result["message"], result["code"])
         return internal_error_response(result["message"])
+    except ValueError as exc:
+        return bad_request_response(str(exc))
     except Exception as exc:  # pylint: disable=broad-except
         return internal_error_response(f"服务器错误: {exc}")
 
@@ -329,16 +370,31 @@ def get_admin_paper_detail(paper_id):
 def get_user_paper_detail(entry_id):
     """
     获取个人论文详情（包括笔记）
+
+    支持 If-None-Match：论文、笔记（计入论文版本号）、章节和解析进度均未变化时返回304；章节流式输出。
+    fields= 只返回所选字段，可选 notes / noteCount 和 sections.*
     """
     try:
         service = get_user_paper_service()
-        result = service.get_user_paper_detail(
+        fields = service.parse_detail_fields(request.args.get("fields"))
+        etag = service.get_paper_etag(
+            entry_id,
+            kind=_detail_kind(fields),
+            query={"userId": g.current_user["user_id"]},
+            include_progress=True,
+        )
+        if etag_matches(etag):
+            return not_modified_response(etag)
+
+        result = service.stream_user_paper_detail(
             user_paper_id=entry_id,
             user_id=g.current_user["user_id"],
+            fields=fields,
         )
 
         if result["code"] == BusinessCode.SUCCESS:
-            return success_response(result["data"], result["message"])
+            data = result["data"]
+            return with_etag(stream_response(data["head"], data["sections"], result["message"]), etag)
 
         if result["code"] == BusinessCode.PAPER_NOT_FOUND:
             return bad_request_response(result["message"])
@@ -348,6 +404,60 @@ def get_user_paper_detail(entry_id):
 
         return internal_error_response(result["message"])
 
+    except ValueError as exc:
+        return bad_request_response(str(exc))
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/admin/<paper_id>/changes", methods=["GET"])
+@login_required
+def get_admin_paper_changes(paper_id):
+    """
+    管理员论文的增量同步：只返回 since 之后变化的论文字段、章节和 block
+
+    查询参数: since（上次同步返回的 version，缺省为 0 即全量）
+    """
+    try:
+        since = _parse_since()
+    except ValueError:
+        return bad_request_response("since 必须是非负整数")
+
+    try:
+        result = get_paper_service().get_changes(paper_id, since)
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return success_response(result["data"], result["message"], result["code"])
+        return internal_error_response(result["message"])
+    except Exception as exc:  # pylint: disable=broad-except
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/user/<entry_id>/changes", methods=["GET"])
+@login_required
+def get_user_paper_changes(entry_id):
+    """
+    个人论文的增量同步：只返回 since 之后变化的论文字段、章节和 block
+
+    查询参数: since（上次同步返回的 version，缺省为 0 即全量）
+    """
+    try:
+        since = _parse_since()
+    except ValueError:
+        return bad_request_response("since 必须是非负整数")
+
+    try:
+        result = get_user_paper_service().get_changes(
+            entry_id, since, query={"userId": g.current_user["user_id"]}
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
     except Exception as exc:
         return internal_error_response(f"服务器错误: {exc}")
 
@@ -298,12 +298,10 @@ def get_user_paper_pdf_parse_status(user_paper_id):
         if result["code"] != BusinessCode.SUCCESS:
             return bad_request_response(result["message"])
         
-        # 获取PDF解析任务
+        # 获取PDF解析任务（MinerU 状态由服务端轮询写入任务记录，这里只读本地记录）
         from ..models.pdfParseTask import get_pdf_parse_task_model
-        from ..services.mineruService import get_mineru_service
         
         task_model = get_pdf_parse_task_model()
-        mineru_service = get_mineru_service()
         
         # 获取最新的解析任务
         tasks = task_model.get_paper_tasks(
@@ -320,149 +318,6 @@ def get_user_paper_pdf_parse_status(user_paper_id):
         # 获取最新的任务
         latest_task = tasks[0]
         
-        # 如果任务状态是processing，查询MinerU状态
-        if latest_task["status"] == "processing" and latest_task.get("mineruTaskId"):
-            mineru_status = mineru_service.get_parsing_status(latest_task["mineruTaskId"])
-            
-            if mineru_status["success"]:
-                # 更新任务状态
-                task_model.update_task_status(
-                    task_id=latest_task["id"],
-                    status=mineru_status["status"],
-                    progress=mineru_status.get("progress", 0),
-                    message=mineru_status.get("message", "")
-                )
-                
-                latest_task["status"] = mineru_status["status"]
-                latest_task["progress"] = mineru_status.get("progress", 0)
-                latest_task["message"] = mineru_status.get("message", "")
-                
-                # 如果MinerU解析完成，启动后台任务处理结果
-                if mineru_status["status"] == "completed" and mineru_status.get("full_zip_url"):
-                    from ..utils.background_tasks import get_task_manager
-                    
-                    task_manager = get_task_manager()
-                    
-                    # 定义后台处理任务
-                    def process_mineru_result():
-                        try:
-                            # 获取七牛云服务实例
-                            from ..services.qiniuService import get_qiniu_service
-                            qiniu_service = get_qiniu_service()
-                            
-                            # 下载并处理MinerU结果
-                            result = mineru_service.fetch_markdown_content_and_upload(
-                                result_url=mineru_status["full_zip_url"],
-                                paper_id=user_paper_id,
-                                qiniu_service=qiniu_service
-                            )
-                            
-                            if result["success"]:
-                                # 检查result中是否有attachments键
-                                if "attachments" not in result:
-                                    logger.error(f"MinerU结果中缺少attachments键: {result}")
-                                    # 更新任务状态为失败
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="MinerU结果格式错误：缺少attachments键"
-                                    )
-                                    return
-                                
-                                # 更新论文附件
-                                new_attachments = result.get("attachments")
-                                if new_attachments is None:
-                                    logger.error(f"MinerU结果中attachments为None: {result}")
-                                    # 更新任务状态为失败
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="MinerU结果格式错误：attachments为None"
-                                    )
-                                    return
-                                
-                                # 从任务记录中获取用户ID
-                                task_record = task_model.get_task(latest_task["id"])
-                                if not task_record:
-                                    logger.error(f"无法找到任务记录: {latest_task['id']}")
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="无法找到任务记录"
-                                    )
-                                    return
-                                
-                                user_id = task_record.get("userId")
-                                if not user_id:
-                                    logger.error(f"任务记录中缺少用户ID: {latest_task['id']}")
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="任务记录中缺少用户ID"
-                                    )
-                                    return
-                                
-                                # 获取当前论文附件
-                                paper_result = service.get_user_paper_detail(
-                                    user_paper_id=user_paper_id,
-                                    user_id=user_id
-                                )
-                                
-                                if paper_result["code"] == BusinessCode.SUCCESS:
-                                    paper = paper_result["data"]
-                                    current_attachments = paper.get("attachments", {})
-                                    
-                                    # 合并附件信息 - 确保正确更新每个附件类型
-                                    for attachment_type, attachment_data in new_attachments.items():
-                                        if attachment_data:  # 只更新非空的附件
-                                            current_attachments[attachment_type] = attachment_data
-                                    
-                                    # 更新论文附件
-                                    service.update_user_paper(
-                                        entry_id=user_paper_id,
-                                        user_id=user_id,
-                                        update_data={"attachments": current_attachments}
-                                    )
-                                    
-                                    # 更新任务状态为完成
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="completed",
-                                        progress=100,
-                                        message="PDF解析完成，结果已上传"
-                                    )
-                                else:
-                                    # 更新任务状态为失败
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="更新论文附件失败"
-                                    )
-                            else:
-                                # 更新任务状态为失败
-                                task_model.update_task_status(
-                                    task_id=latest_task["id"],
-                                    status="failed",
-                                    message=f"处理解析结果失败: {result['error']}",
-                                    error=result["error"]
-                                )
-                        except Exception as e:
-                            logger.error(f"处理MinerU结果异常: {str(e)}", exc_info=True)
-                            # 更新任务状态为失败
-                            task_model.update_task_status(
-                                task_id=latest_task["id"],
-                                status="failed",
-                                message=f"处理解析结果异常: {str(e)}",
-                                error=str(e)
-                            )
-                    
-                    # 提交后台任务
-                    task_manager.submit_task(
-                        task_id=f"process_mineru_{latest_task['id']}",
-                        func=process_mineru_result,
-                        callback=lambda task_id, result: None
-                    )
-        
         return success_response({
             "hasTask": True,
             "task": latest_task
@@ -492,12 +347,10 @@ def get_admin_paper_pdf_parse_status(paper_id):
         if result["code"] != BusinessCode.SUCCESS:
             return bad_request_response(result["message"])
         
-        # 获取PDF解析任务
+        # 获取PDF解析任务（MinerU 状态由服务端轮询写入任务记录，这里只读本地记录）
         from ..models.pdfParseTask import get_pdf_parse_task_model
-        from ..services.mineruService import get_mineru_service
         
         task_model = get_pdf_parse_task_model()
-        mineru_service = get_mineru_service()
         
         # 获取最新的解析任务
         tasks = task_model.get_paper_tasks(
@@ -514,150 +367,6 @@ def get_admin_paper_pdf_parse_status(paper_id):
         # 获取最新的任务
         latest_task = tasks[0]
         
-        # 如果任务状态是processing，查询MinerU状态
-        if latest_task["status"] == "processing" and latest_task.get("mineruTaskId"):
-            mineru_status = mineru_service.get_parsing_status(latest_task["mineruTaskId"])
-            
-            if mineru_status["success"]:
-                # 更新任务状态
-                task_model.update_task_status(
-                    task_id=latest_task["id"],
-                    status=mineru_status["status"],
-                    progress=mineru_status.get("progress", 0),
-                    message=mineru_status.get("message", "")
-                )
-                
-                latest_task["status"] = mineru_status["status"]
-                latest_task["progress"] = mineru_status.get("progress", 0)
-                latest_task["message"] = mineru_status.get("message", "")
-                
-                # 如果MinerU解析完成，启动后台任务处理结果
-                if mineru_status["status"] == "completed" and mineru_status.get("full_zip_url"):
-                    from ..utils.background_tasks import get_task_manager
-                    
-                    task_manager = get_task_manager()
-                    
-                    # 定义后台处理任务
-                    def process_mineru_result():
-                        try:
-                            # 获取七牛云服务实例
-                            from ..services.qiniuService import get_qiniu_service
-                            qiniu_service = get_qiniu_service()
-                            
-                            # 下载并处理MinerU结果
-                            result = mineru_service.fetch_markdown_content_and_upload(
-                                result_url=mineru_status["full_zip_url"],
-                                paper_id=paper_id,
-                                qiniu_service=qiniu_service
-                            )
-                            
-                            if result["success"]:
-                                # 检查result中是否有attachments键
-                                if "attachments" not in result:
-                                    logger.error(f"MinerU结果中缺少attachments键: {result}")
-                                    # 更新任务状态为失败
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="MinerU结果格式错误：缺少attachments键"
-                                    )
-                                    return
-                                
-                                # 更新论文附件
-                                new_attachments = result.get("attachments")
-                                if new_attachments is None:
-                                    logger.error(f"MinerU结果中attachments为None: {result}")
-                                    # 更新任务状态为失败
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="MinerU结果格式错误：attachments为None"
-                                    )
-                                    return
-                                
-                                # 从任务记录中获取用户ID
-                                task_record = task_model.get_task(latest_task["id"])
-                                if not task_record:
-                                    logger.error(f"无法找到任务记录: {latest_task['id']}")
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="无法找到任务记录"
-                                    )
-                                    return
-                                
-                                user_id = task_record.get("userId")
-                                if not user_id:
-                                    logger.error(f"任务记录中缺少用户ID: {latest_task['id']}")
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="任务记录中缺少用户ID"
-                                    )
-                                    return
-                                
-                                # 获取当前论文附件
-                                paper_result = service.get_admin_paper_detail(
-                                    paper_id=paper_id,
-                                    user_id=user_id
-                                )
-                                
-                                if paper_result["code"] == BusinessCode.SUCCESS:
-                                    paper = paper_result["data"]
-                                    current_attachments = paper.get("attachments", {})
-                                    
-                                    # 合并附件信息 - 确保正确更新每个附件类型
-                                    for attachment_type, attachment_data in new_attachments.items():
-                                        if attachment_data:  # 只更新非空的附件
-                                            current_attachments[attachment_type] = attachment_data
-                                    
-                                    # 更新论文附件
-                                    service.update_paper_attachments(
-                                        paper_id=paper_id,
-                                        attachments=current_attachments,
-                                        user_id=user_id,
-                                        is_admin=True
-                                    )
-                                    
-                                    # 更新任务状态为完成
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="completed",
-                                        progress=100,
-                                        message="PDF解析完成，结果已上传"
-                                    )
-                                else:
-                                    # 更新任务状态为失败
-                                    task_model.update_task_status(
-                                        task_id=latest_task["id"],
-                                        status="failed",
-                                        message="更新论文附件失败"
-                                    )
-                            else:
-                                # 更新任务状态为失败
-                                task_model.update_task_status(
-                                    task_id=latest_task["id"],
-                                    status="failed",
-                                    message=f"处理解析结果失败: {result['error']}",
-                                    error=result["error"]
-                                )
-                        except Exception as e:
-                            logger.error(f"处理MinerU结果异常: {str(e)}", exc_info=True)
-                            # 更新任务状态为失败
-                            task_model.update_task_status(
-                                task_id=latest_task["id"],
-                                status="failed",
-                                message=f"处理解析结果异常: {str(e)}",
-                                error=str(e)
-                            )
-                    
-                    # 提交后台任务
-                    task_manager.submit_task(
-                        task_id=f"process_mineru_{latest_task['id']}",
-                        func=process_mineru_result,
-                        callback=lambda task_id, result: None
-                    )
-        
         return success_response({
             "hasTask": True,
             "task": latest_task
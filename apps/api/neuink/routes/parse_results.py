@@ -6,11 +6,12 @@ import logging
 from flask import Blueprint, request, g
 from ..services.userPaperService import get_user_paper_service
 from ..services.paperService import get_paper_service
-from ..services.paperContentService import PaperContentService
-from ..models.adminPaper import AdminPaperModel
+from ..services.paperContentService import PaperContentService, bump_paper_version
+from ..models.adminPaper import get_admin_paper_model
 from ..models.section import get_section_model
 from ..models.parseBlocks import get_parse_blocks_model
 from ..utils.auth import login_required, admin_required
+from ..utils.job_queue import cancel_job
 from ..utils.common import (
     success_response,
     bad_request_response,
@@ -206,53 +207,37 @@ def _confirm_parse_result_common(paper_id, parse_id):
             if paper_result["code"] != BusinessCode.SUCCESS:
                 return bad_request_response(paper_result["message"])
         
-        # 插入选中的blocks到section
-        paper_model = AdminPaperModel()
-        content_service = PaperContentService(paper_model)
-        
-        # 获取section信息
+        # 插入选中的blocks到section（这是整个文本解析流程中唯一一次写section）
         section_model = get_section_model()
-        section = section_model.find_by_id(section_id)
         
-        if not section:
+        # 兼容旧数据：历史上临时parsing block直接写在section中
+        if temp_block_id:
+            paper_model = get_admin_paper_model()
+            PaperContentService(paper_model)._remove_temp_block(section_id, temp_block_id)
+        
+        after_block_id = parse_record.get("afterBlockId")
+        located = section_model.locate_block(section_id, after_block_id)
+        if located is None:
             return bad_request_response("章节不存在")
         
-        current_content = section.get("content", [])
+        anchor_index, content_size = located
+        if not after_block_id:
+            position = content_size
+        elif anchor_index >= 0:
+            position = anchor_index + 1
+        else:
+            # 锚点block已被删除时，退回到创建解析记录时的位置
+            position = min(insert_index, content_size)
         
-        # 先移除临时parsing block
-        if temp_block_id:
-            # 检查临时block是否存在
-            temp_block_exists = any(block.get("id") == temp_block_id for block in current_content)
-            if temp_block_exists:
-                # 从当前内容中移除临时block
-                current_content = [block for block in current_content if block.get("id") != temp_block_id]
-                # 重新计算插入位置（考虑临时block已被移除）
-                if insert_index >= len(current_content):
-                    insert_index = len(current_content)
-            else:
-                # 临时block不存在，记录日志但继续执行
-                logger.info(f"临时block不存在，可能已被移除 - temp_block_id: {temp_block_id}")
-                # 确保插入位置有效
-                if insert_index >= len(current_content):
-                    insert_index = len(current_content)
-        
-        # 插入选中的blocks
-        new_content = current_content.copy()
-        new_content[insert_index:insert_index] = selected_blocks
-        
-        # 更新section
-        if not section_model.update_direct(section_id, {"$set": {"content": new_content}}):
+        inserted = section_model.insert_blocks(section_id, selected_blocks, position)
+        if not inserted:
             return internal_error_response("更新章节失败")
+        selected_blocks = inserted
+        bump_paper_version(paper_id, is_user_paper)
         
         # 更新解析记录状态为已消费
         parse_model.set_consumed(parse_id)
         
-        # 返回更新后的论文数据
-        if is_user_paper:
-            updated_paper = content_service._get_user_paper_with_sections(paper_id)
-        else:
-            updated_paper = paper_model.find_paper_with_sections(paper_id)
-        
         return success_response({
             "selectedBlocks": selected_blocks,
             "parseId": parse_id
@@ -314,7 +299,7 @@ def _discard_parse_result_common(paper_id, parse_id):
         
         # 移除临时parsing block
         if temp_block_id and section_id:
-            paper_model = AdminPaperModel()
+            paper_model = get_admin_paper_model()
             content_service = PaperContentService(paper_model)
             
             # 尝试移除临时block，但不因为失败而中断整个操作
@@ -326,6 +311,13 @@ def _discard_parse_result_common(paper_id, parse_id):
         
         # 更新解析记录状态为已消费
         parse_model.set_consumed(parse_id)
+
+        # 解析仍在排队或执行时取消后台任务，释放大模型调用（任务ID即解析记录ID）
+        if parse_record.get("status") in ("pending", "processing"):
+            try:
+                cancel_job(parse_id)
+            except Exception as e:
+                logger.warning(f"取消解析任务失败 - parse_id: {parse_id}, error: {e}")
         
         return success_response({
             "parseId": parse_id,
@@ -5,6 +5,8 @@
 from flask import Blueprint, request
 
 from ..services.paperService import get_paper_service
+from ..services.paperContentService import PaperContentService
+from ..models.adminPaper import get_admin_paper_model
 from ..utils.common import (
     success_response,
     bad_request_response,
@@ -12,6 +14,8 @@ from ..utils.common import (
     not_found_response,
     forbidden_response,
 )
+from ..utils.etag import etag_matches, not_modified_response, with_etag
+from ..utils.json_stream import stream_response
 from ..config.constants import BusinessCode
 
 bp = Blueprint("public_papers", __name__)
@@ -72,6 +76,7 @@ def list_public_papers():
         page, page_size = _parse_pagination_args()
         sort_by, sort_order = _parse_sort_args()
         search = request.args.get("search")
+        cursor = request.args.get("cursor")
         filters = _parse_public_filters()
 
         service = get_paper_service()
@@ -93,6 +98,7 @@ def list_public_papers():
             search=search,
             filters=filters,
             user_id=user_id,
+            cursor=cursor,
         )
 
         if result["code"] != BusinessCode.SUCCESS:
@@ -104,3 +110,117 @@ def list_public_papers():
         return internal_error_response(f"服务器错误: {exc}")
 
 
+@bp.route("/<paper_id>", methods=["GET"])
+def get_public_paper_detail(paper_id):
+    """
+    公开论文详情（含sections内容）。支持 If-None-Match 条件请求，章节流式输出。
+    """
+    try:
+        service = get_paper_service()
+        etag = service.get_paper_etag(paper_id, kind="public-detail", query={"isPublic": True})
+        if etag_matches(etag):
+            return not_modified_response(etag, public=True)
+
+        result = service.stream_public_paper(paper_id)
+
+        if result["code"] == BusinessCode.SUCCESS:
+            data = result["data"]
+            response = stream_response(data["head"], data["sections"], result["message"])
+            return with_etag(response, etag, public=True)
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return not_found_response(result["message"])
+        return internal_error_response(result["message"])
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/<paper_id>/content", methods=["GET"])
+def get_public_paper_content(paper_id):
+    """
+    公开论文正文内容：metadata、摘要、关键词、sections、参考文献和附件。支持 If-None-Match 条件请求，章节流式输出。
+    """
+    try:
+        service = get_paper_service()
+        etag = service.get_paper_etag(paper_id, kind="public-content", query={"isPublic": True})
+        if etag_matches(etag):
+            return not_modified_response(etag, public=True)
+
+        result = service.stream_public_paper(paper_id, content_only=True)
+
+        if result["code"] == BusinessCode.SUCCESS:
+            data = result["data"]
+            response = stream_response(data["head"], data["sections"], result["message"])
+            return with_etag(response, etag, public=True)
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return not_found_response(result["message"])
+        return internal_error_response(result["message"])
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/<paper_id>/changes", methods=["GET"])
+def get_public_paper_changes(paper_id):
+    """
+    公开论文的增量同步：只返回 since 之后变化的论文字段、章节和 block，
+    离线阅读的客户端据此更新本地副本。
+
+    查询参数: since（上次同步返回的 version，缺省为 0 即全量）
+    """
+    try:
+        since = int(request.args.get("since", 0))
+        if since < 0:
+            raise ValueError
+    except ValueError:
+        return bad_request_response("since 必须是非负整数")
+
+    try:
+        result = get_paper_service().get_changes(paper_id, since, query={"isPublic": True})
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return not_found_response(result["message"])
+        return internal_error_response(result["message"])
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/<paper_id>/sections/<section_id>/blocks", methods=["GET"])
+def get_public_section_blocks(paper_id, section_id):
+    """
+    分页读取公开论文章节中的block，阅读器先渲染首屏再按需加载。
+
+    查询参数: offset、limit（默认50，最大200），或 afterBlockId（从该block之后读取）
+    """
+    try:
+        offset = int(request.args.get("offset", 0))
+        limit = int(request.args.get("limit", 50))
+        if offset < 0 or limit < 1:
+            return bad_request_response("分页参数无效")
+        limit = min(limit, 200)
+        after_block_id = request.args.get("afterBlockId") or None
+
+        content_service = PaperContentService(get_admin_paper_model())
+        result = content_service.get_section_blocks(
+            paper_id=paper_id,
+            section_id=section_id,
+            user_id=None,
+            offset=offset,
+            limit=limit,
+            after_block_id=after_block_id,
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return not_found_response(result["message"])
+        if result["code"] == BusinessCode.PERMISSION_DENIED:
+            # 非公开论文对未登录用户按不存在处理
+            return not_found_response("论文不存在或不可访问")
+        if result["code"] == BusinessCode.INVALID_PARAMS:
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
+    except ValueError:
+        return bad_request_response("分页参数无效")
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
@@ -6,8 +6,8 @@ from flask import request, g, Blueprint
 
 from neuink.services.paperService import get_paper_service
 from neuink.services.userPaperService import get_user_paper_service
-from neuink.services.paperContentService import PaperContentService, get_parsed_blocks_from_cache
-from neuink.models.adminPaper import AdminPaperModel
+from neuink.services.paperContentService import PaperContentService
+from neuink.models.adminPaper import get_admin_paper_model
 from neuink.models.section import get_section_model
 from neuink.models.parseBlocks import get_parse_blocks_model
 from neuink.utils.auth import login_required, admin_required
@@ -25,6 +25,26 @@ logger = logging.getLogger(__name__)
 bp = Blueprint("sections", __name__)
 
 
+def _parse_search_args():
+    """解析章节内容检索参数：q / page / pageSize（1~100），非正数抛出 ValueError"""
+    keyword = request.args.get("q", "").strip()
+    page = int(request.args.get("page", 1))
+    page_size = int(request.args.get("pageSize", 20))
+    if page < 1 or page_size < 1:
+        raise ValueError("page/pageSize 必须为正整数")
+    return keyword, page, min(page_size, 100)
+
+
+def _parse_block_page_args():
+    """解析 block 分页参数：offset / limit（1~200）或 afterBlockId，参数无效时抛出 ValueError"""
+    offset = int(request.args.get("offset", 0))
+    limit = int(request.args.get("limit", 50))
+    if offset < 0 or limit < 1:
+        raise ValueError("offset 不能为负数，limit 必须为正整数")
+    after_block_id = request.args.get("afterBlockId") or None
+    return offset, min(limit, 200), after_block_id
+
+
 # ==================== 管理员论文章节操作 ====================
 
 @bp.route("/admin/<paper_id>/add-section", methods=["POST"])
@@ -55,7 +75,7 @@ def add_admin_section(paper_id):
         # 添加调试日志
         logger.info(f"管理员添加章节 - paper_id: {paper_id}, position: {position}, section_data: {section_data}")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.add_section(
             paper_id=paper_id,
@@ -109,7 +129,7 @@ def add_block_to_admin_section(paper_id, section_id):
         if not block_data.get("type"):
             return bad_request_response("block类型不能为空")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.add_block_directly(
             paper_id=paper_id,
@@ -156,7 +176,7 @@ def add_block_from_text_to_admin_section(paper_id, section_id):
         text = data.get("text")
         after_block_id = data.get("afterBlockId")  # 获取插入位置
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.add_block_from_text(
             paper_id=paper_id,
@@ -173,6 +193,8 @@ def add_block_from_text_to_admin_section(paper_id, section_id):
             return success_response(result["data"], result["message"], result["code"])
         if result["code"] == BusinessCode.PERMISSION_DENIED:
             return success_response(result["data"], result["message"], result["code"])
+        if result["code"] == BusinessCode.TASK_QUEUE_FULL:
+            return success_response(result["data"], result["message"], result["code"])
         return internal_error_response(result["message"])
     except Exception as exc:
         return internal_error_response(f"服务器错误: {exc}")
@@ -209,7 +231,7 @@ def update_admin_section(paper_id, section_id):
         logger.info(f"请求数据解析成功: {data}")
 
         try:
-            paper_model = AdminPaperModel()
+            paper_model = get_admin_paper_model()
             logger.info(f"AdminPaperModel初始化成功")
         except Exception as e:
             logger.error(f"AdminPaperModel初始化失败: {e}")
@@ -259,7 +281,7 @@ def delete_admin_section(paper_id, section_id):
     管理员删除指定论文的指定section
     """
     try:
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.delete_section(
             paper_id=paper_id,
@@ -298,7 +320,7 @@ def update_admin_block(paper_id, section_id, block_id):
         if not data:
             return bad_request_response("更新数据不能为空")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.update_block(
             paper_id=paper_id,
@@ -328,7 +350,7 @@ def delete_admin_block(paper_id, section_id, block_id):
     管理员删除指定论文的指定section中的指定block
     """
     try:
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.delete_block(
             paper_id=paper_id,
@@ -349,6 +371,113 @@ def delete_admin_block(paper_id, section_id, block_id):
         return internal_error_response(f"服务器错误: {exc}")
 
 
+@bp.route("/admin/<paper_id>/sections/<section_id>/blocks/<block_id>/move", methods=["POST"])
+@login_required
+@admin_required
+def move_admin_block(paper_id, section_id, block_id):
+    """
+    管理员移动指定section中的指定block
+    
+    请求体示例:
+    {
+        "afterBlockId": "block_123"  // 可选：移动到该block之后，为空时移动到章节最前面
+    }
+    """
+    try:
+        data = request.get_json() or {}
+
+        paper_model = get_admin_paper_model()
+        content_service = PaperContentService(paper_model)
+        result = content_service.move_block(
+            paper_id=paper_id,
+            section_id=section_id,
+            block_id=block_id,
+            user_id=g.current_user["user_id"],
+            is_admin=True,
+            after_block_id=data.get("afterBlockId"),
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return success_response(result["data"], result["message"], result["code"])
+        if result["code"] == BusinessCode.PERMISSION_DENIED:
+            return success_response(result["data"], result["message"], result["code"])
+        return internal_error_response(result["message"])
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/admin/<paper_id>/search", methods=["GET"])
+@login_required
+@admin_required
+def search_admin_paper_blocks(paper_id):
+    """
+    管理员在指定论文的章节内容中检索
+
+    查询参数: q（关键词）、page、pageSize
+    返回命中的 block 列表 hits: [{paperId, sectionId, blockId, snippet}] 及分页信息
+    """
+    try:
+        keyword, page, page_size = _parse_search_args()
+
+        paper_model = get_admin_paper_model()
+        content_service = PaperContentService(paper_model)
+        result = content_service.search_blocks(
+            paper_id=paper_id,
+            keyword=keyword,
+            user_id=g.current_user["user_id"],
+            is_admin=True,
+            page=page,
+            page_size=page_size,
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] in (BusinessCode.PAPER_NOT_FOUND, BusinessCode.INVALID_PARAMS):
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
+    except ValueError:
+        return bad_request_response("分页参数无效")
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/admin/<paper_id>/sections/<section_id>/blocks", methods=["GET"])
+@login_required
+@admin_required
+def get_admin_section_blocks(paper_id, section_id):
+    """
+    管理员分页读取章节中的block
+
+    查询参数: offset、limit（默认50，最大200），或 afterBlockId（从该block之后读取）
+    返回 blocks、offset、total（block总数）、hasMore、nextAfterBlockId
+    """
+    try:
+        offset, limit, after_block_id = _parse_block_page_args()
+
+        content_service = PaperContentService(get_admin_paper_model())
+        result = content_service.get_section_blocks(
+            paper_id=paper_id,
+            section_id=section_id,
+            user_id=g.current_user["user_id"],
+            is_admin=True,
+            offset=offset,
+            limit=limit,
+            after_block_id=after_block_id,
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] in (BusinessCode.PAPER_NOT_FOUND, BusinessCode.INVALID_PARAMS):
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
+    except ValueError:
+        return bad_request_response("分页参数无效")
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
 # ==================== 用户论文章节操作 ====================
 
 @bp.route("/user/<entry_id>/add-section", methods=["POST"])
@@ -397,7 +526,7 @@ def add_user_section(entry_id):
         if not paper_id:
             return bad_request_response("无效的论文ID")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.add_section(
             paper_id=paper_id,
@@ -469,7 +598,7 @@ def add_block_to_user_section(entry_id, section_id):
         if not paper_id:
             return bad_request_response("无效的论文ID")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.add_block_directly(
             paper_id=paper_id,
@@ -542,7 +671,7 @@ def add_block_from_text_to_user_section(entry_id, section_id):
         if not paper_id:
             return bad_request_response("无效的论文ID")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.add_block_from_text(
             paper_id=paper_id,
@@ -562,6 +691,8 @@ def add_block_from_text_to_user_section(entry_id, section_id):
             return bad_request_response(result["message"])
         if result["code"] == BusinessCode.PERMISSION_DENIED:
             return bad_request_response(result["message"])
+        if result["code"] == BusinessCode.TASK_QUEUE_FULL:
+            return success_response(result["data"], result["message"], result["code"])
         return internal_error_response(result["message"])
 
     except Exception as exc:
@@ -609,7 +740,7 @@ def update_user_section(entry_id, section_id):
         if not paper_id:
             return bad_request_response("无效的论文ID")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
 
         logger.info(f"用户论文章节更新请求 - entry_id: {entry_id}, section_id: {section_id}, paper_id: {paper_id}")
@@ -656,7 +787,7 @@ def delete_user_section(entry_id, section_id):
         logger.info(f"准备删除章节 - paper_id: {paper_id}, section_id: {section_id}")
         logger.info(f"请求头信息: {dict(request.headers)}")
         
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.delete_section(
             paper_id=paper_id,
@@ -728,7 +859,7 @@ def update_user_block(entry_id, section_id, block_id):
         if not paper_id:
             return bad_request_response("无效的论文ID")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.update_block(
             paper_id=paper_id,
@@ -790,7 +921,7 @@ def delete_user_block(entry_id, section_id, block_id):
         if not paper_id:
             return bad_request_response("无效的论文ID")
 
-        paper_model = AdminPaperModel()
+        paper_model = get_admin_paper_model()
         content_service = PaperContentService(paper_model)
         result = content_service.delete_block(
             paper_id=paper_id,
@@ -812,4 +943,170 @@ def delete_user_block(entry_id, section_id, block_id):
         return internal_error_response(result["message"])
 
     except Exception as exc:
-        return internal_error_response(f"服务器错误: {exc}")
\ No newline at end of file
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/user/<entry_id>/sections/<section_id>/blocks/<block_id>/move", methods=["POST"])
+@login_required
+def move_user_block(entry_id, section_id, block_id):
+    """
+    移动指定 block
+    """
+    try:
+        data = request.get_json() or {}
+
+        service = get_user_paper_service()
+        user_paper_result = service.get_user_paper_detail(
+            user_paper_id=entry_id,
+            user_id=g.current_user["user_id"],
+        )
+
+        if user_paper_result["code"] != BusinessCode.SUCCESS:
+            return bad_request_response(user_paper_result["message"])
+
+        user_paper = user_paper_result["data"]
+        if not user_paper:
+            return bad_request_response("论文数据不存在")
+
+        paper_id = user_paper.get("id")
+        if not paper_id:
+            return bad_request_response("无效的论文ID")
+
+        paper_model = get_admin_paper_model()
+        content_service = PaperContentService(paper_model)
+        result = content_service.move_block(
+            paper_id=paper_id,
+            section_id=section_id,
+            block_id=block_id,
+            user_id=g.current_user["user_id"],
+            is_admin=False,
+            after_block_id=data.get("afterBlockId"),
+            is_user_paper=True,
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+
+        if result["code"] == BusinessCode.PAPER_NOT_FOUND:
+            return bad_request_response(result["message"])
+        if result["code"] == BusinessCode.PERMISSION_DENIED:
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
+
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/user/search", methods=["GET"])
+@login_required
+def search_user_library_blocks():
+    """
+    在当前用户个人论文库的全部论文中检索章节内容
+
+    查询参数: q（关键词）、page、pageSize；hits 中的 paperId 为个人论文ID
+    """
+    try:
+        keyword, page, page_size = _parse_search_args()
+
+        content_service = PaperContentService(get_admin_paper_model())
+        result = content_service.search_library_blocks(
+            user_id=g.current_user["user_id"],
+            keyword=keyword,
+            page=page,
+            page_size=page_size,
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.INVALID_PARAMS:
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
+    except ValueError:
+        return bad_request_response("分页参数无效")
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/user/<entry_id>/search", methods=["GET"])
+@login_required
+def search_user_paper_blocks(entry_id):
+    """
+    在个人论文库中指定论文的章节内容中检索
+
+    查询参数: q（关键词）、page、pageSize
+    """
+    try:
+        keyword, page, page_size = _parse_search_args()
+
+        content_service = PaperContentService(get_admin_paper_model())
+        result = content_service.search_blocks(
+            paper_id=entry_id,
+            keyword=keyword,
+            user_id=g.current_user["user_id"],
+            is_admin=False,
+            is_user_paper=True,
+            page=page,
+            page_size=page_size,
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.PERMISSION_DENIED:
+            return (
+                {
+                    "code": ResponseCode.FORBIDDEN,
+                    "message": result["message"],
+                    "data": None,
+                },
+                ResponseCode.FORBIDDEN,
+            )
+        if result["code"] in (BusinessCode.PAPER_NOT_FOUND, BusinessCode.INVALID_PARAMS):
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
+    except ValueError:
+        return bad_request_response("分页参数无效")
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
+
+
+@bp.route("/user/<entry_id>/sections/<section_id>/blocks", methods=["GET"])
+@login_required
+def get_user_section_blocks(entry_id, section_id):
+    """
+    分页读取个人论文章节中的block
+
+    查询参数: offset、limit（默认50，最大200），或 afterBlockId（从该block之后读取）
+    """
+    try:
+        offset, limit, after_block_id = _parse_block_page_args()
+
+        content_service = PaperContentService(get_admin_paper_model())
+        result = content_service.get_section_blocks(
+            paper_id=entry_id,
+            section_id=section_id,
+            user_id=g.current_user["user_id"],
+            is_admin=False,
+            is_user_paper=True,
+            offset=offset,
+            limit=limit,
+            after_block_id=after_block_id,
+        )
+
+        if result["code"] == BusinessCode.SUCCESS:
+            return success_response(result["data"], result["message"])
+        if result["code"] == BusinessCode.PERMISSION_DENIED:
+            return (
+                {
+                    "code": ResponseCode.FORBIDDEN,
+                    "message": result["message"],
+                    "data": None,
+                },
+                ResponseCode.FORBIDDEN,
+            )
+        if result["code"] in (BusinessCode.PAPER_NOT_FOUND, BusinessCode.INVALID_PARAMS):
+            return bad_request_response(result["message"])
+        return internal_error_response(result["message"])
+    except ValueError:
+        return bad_request_response("分页参数无效")
+    except Exception as exc:
+        return internal_error_response(f"服务器错误: {exc}")
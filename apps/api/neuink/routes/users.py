@@ -232,9 +232,10 @@ def get_users():
         page = int(request.args.get("page", 1))
         limit = int(request.args.get("limit", 10))
         keyword = request.args.get("keyword", "").strip()
+        cursor = request.args.get("cursor")
         
         # 调用服务层获取用户列表
-        result = user_service.get_users_paginated(page, limit, keyword if keyword else None)
+        result = user_service.get_users_paginated(page, limit, keyword if keyword else None, cursor)
         
         return success_response(result, "获取用户列表成功")
         
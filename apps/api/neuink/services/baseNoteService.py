@@ -5,6 +5,7 @@ BaseNoteService 抽象基类
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List, Tuple
 from ..models.context import PaperContext, check_paper_permission
+from ..utils.pagination import InvalidCursorError, next_cursor
 
 
 class BaseNoteService(ABC):
@@ -74,6 +75,7 @@ class BaseNoteService(ABC):
         context: PaperContext,
         page: int = 1,
         page_size: int = 100,
+        cursor: Optional[str] = None,
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         """获取某篇论文的所有笔记 - 支持上下文感知"""
         try:
@@ -90,13 +92,18 @@ class BaseNoteService(ABC):
                 user_paper_id=context.user_paper_id,
                 skip=skip,
                 limit=page_size,
+                cursor=cursor,
             )
+            pagination = self._build_pagination(total, page, page_size)
+            pagination["nextCursor"] = next_cursor(notes, page_size, "createdAt", -1)
 
             return True, "获取笔记列表成功", {
                 "notes": self._serialize_notes(notes),
-                "pagination": self._build_pagination(total, page, page_size),
+                "pagination": pagination,
             }
             
+        except InvalidCursorError as exc:
+            return False, str(exc), None
         except Exception as exc:
             return False, f"获取笔记列表失败: {str(exc)}", None
     
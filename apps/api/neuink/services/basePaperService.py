@@ -3,14 +3,19 @@ BasePaperService 抽象基类
 处理论文相关的通用业务逻辑
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List, Tuple, Generator
+from typing import Dict, Any, Iterator, Optional, List, Tuple, Generator
 from ..models.context import PaperContext, check_paper_permission
 from ..config.constants import BusinessCode
+from ..utils.fieldsets import FieldSelection, parse_fields
 
 
 class BasePaperService(ABC):
     """BasePaper 业务逻辑服务抽象基类"""
 
+    # 由服务端计算、不在论文文档中的字段（fields= 可选择，不进入数据库投影）
+    DETAIL_COMPUTED_FIELDS: Tuple[str, ...] = ()
+    LIST_COMPUTED_FIELDS: Tuple[str, ...] = ()
+
     def __init__(self):
         """初始化 BasePaper 服务"""
         pass
@@ -26,7 +31,8 @@ class BasePaperService(ABC):
     def get_paper(
         self, 
         paper_id: str, 
-        context: PaperContext
+        context: PaperContext,
+        fields: Optional[FieldSelection] = None,
     ) -> Dict[str, Any]:
         """
         获取论文详情
@@ -34,6 +40,7 @@ class BasePaperService(ABC):
         Args:
             paper_id: 论文ID
             context: 论文上下文
+            fields: 字段选择（fields= 参数），转换为论文和章节的投影；None 表示完整数据
             
         Returns:
             论文数据
@@ -47,7 +54,10 @@ class BasePaperService(ABC):
                 )
             
             # 获取论文数据
-            paper = self.get_paper_model().find_by_id(paper_id)
+            paper = self.get_paper_model().find_by_id(
+                paper_id,
+                fields.paper_projection(computed=self.DETAIL_COMPUTED_FIELDS) if fields else None,
+            )
             if not paper:
                 return self._wrap_failure(
                     BusinessCode.PAPER_NOT_FOUND, 
@@ -55,12 +65,166 @@ class BasePaperService(ABC):
                 )
             
             # 加载sections数据
-            paper = self._load_sections_for_paper(paper)
+            paper = self._load_sections_for_paper(paper, fields)
             
             return self._wrap_success("获取论文成功", paper)
         except Exception as exc:
             return self._wrap_error(f"获取论文失败: {exc}")
 
+    def stream_paper(
+        self,
+        paper_id: str,
+        context: PaperContext,
+        fields: Optional[FieldSelection] = None,
+    ) -> Dict[str, Any]:
+        """
+        获取论文详情的流式版本（权限检查与 get_paper 相同）
+
+        Returns:
+            data 为 {"head": 不含sections的论文数据, "sections": 章节迭代器}，
+            由 utils.json_stream.stream_response 边读章节边输出；
+            fields 未请求章节时 sections 为 None
+        """
+        try:
+            if not check_paper_permission(context, "read"):
+                return self._wrap_failure(
+                    BusinessCode.PERMISSION_DENIED,
+                    "无权访问此论文"
+                )
+
+            paper = self.get_paper_model().find_by_id(
+                paper_id,
+                fields.paper_projection(computed=self.DETAIL_COMPUTED_FIELDS) if fields else None,
+            )
+            if not paper:
+                return self._wrap_failure(
+                    BusinessCode.PAPER_NOT_FOUND,
+                    "论文不存在"
+                )
+
+            return self._wrap_success(
+                "获取论文成功",
+                {"head": paper, "sections": self._iter_sections_with_progress(paper, fields)},
+            )
+        except Exception as exc:
+            return self._wrap_error(f"获取论文失败: {exc}")
+
+    def parse_detail_fields(self, raw: Optional[str]) -> Optional[FieldSelection]:
+        """
+        解析详情接口的 fields= 参数：论文模型的 SELECTABLE_FIELDS、DETAIL_COMPUTED_FIELDS 和 sections.*
+
+        Raises:
+            ValueError: 字段格式错误或不支持
+        """
+        from ..models.section import SECTION_SELECTABLE_FIELDS
+
+        return parse_fields(
+            raw,
+            self.get_paper_model().SELECTABLE_FIELDS + self.DETAIL_COMPUTED_FIELDS,
+            SECTION_SELECTABLE_FIELDS,
+        )
+
+    def parse_list_fields(self, raw: Optional[str]) -> Optional[FieldSelection]:
+        """
+        解析列表接口的 fields= 参数：论文模型的 SELECTABLE_FIELDS 和 LIST_COMPUTED_FIELDS（列表不返回章节）
+
+        Raises:
+            ValueError: 字段格式错误或不支持
+        """
+        return parse_fields(raw, self.get_paper_model().SELECTABLE_FIELDS + self.LIST_COMPUTED_FIELDS)
+
+    def get_paper_etag(
+        self,
+        paper_id: str,
+        kind: str = "detail",
+        query: Optional[Dict[str, Any]] = None,
+        include_sections: bool = True,
+        include_progress: bool = False,
+    ) -> Optional[str]:
+        """
+        计算论文资源的 ETag，只做投影查询，不加载论文和章节内容
+
+        Args:
+            kind: 资源类型（详情、附件等），同一论文的不同资源 ETag 不同
+            query: 额外的访问条件（如 isPublic、userId），不满足时返回 None
+            include_sections: 是否包含各章节的 updatedAt（共享章节被其他论文修改时也能感知）
+            include_progress: 是否包含合并进章节的文本解析进度
+
+        Returns:
+            ETag（不含引号）；论文不存在或不满足条件时返回 None，由调用方走正常流程
+        """
+        from ..models.section import get_section_model
+        from ..models.parseBlocks import get_parse_blocks_model
+        from ..utils.etag import compute_etag
+
+        info = self.get_paper_model().get_version_info(paper_id, query)
+        if info is None:
+            return None
+
+        parts: List[Any] = [kind, paper_id, info["version"]]
+        if include_sections:
+            section_ids = info.get("sectionIds") or []
+            stamps = get_section_model().get_update_stamps(section_ids)
+            parts.append([[section_id, stamps.get(section_id)] for section_id in section_ids])
+            if include_progress:
+                parts.append(get_parse_blocks_model().find_progress_stamps(section_ids, paper_id))
+        return compute_etag(*parts)
+
+    def get_changes(
+        self,
+        paper_id: str,
+        since: int,
+        query: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        增量同步：返回内容同步序号 since 之后变化的论文字段、章节和 block
+
+        Args:
+            since: 客户端上次同步得到的 version，0 表示全量
+            query: 额外的访问条件（如 isPublic、userId），不满足时视为论文不存在
+
+        Returns:
+            data 为 {
+                "version": 本次同步的序号水位（下次作为 since 传回），见 contentVersion.settled_version,
+                "paperVersion": 论文版本号,
+                "sectionIds": 当前章节顺序（不在其中的本地章节即已删除）,
+                "paper": 论文字段有变化时为不含 sectionIds 的论文文档，否则为 None,
+                "sections": 变化的章节，见 SectionModel.find_changes,
+            }
+        """
+        from ..models.section import get_section_model
+        from ..models.contentVersion import settled_version
+        from ..models.basePaper import SYNC_VERSION_FIELD
+
+        try:
+            paper_model = self.get_paper_model()
+            info = paper_model.get_sync_info(paper_id, query)
+            if info is None:
+                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "论文不存在")
+
+            paper = None
+            if since <= 0 or info[SYNC_VERSION_FIELD] > since:
+                paper = paper_model.find_by_id(paper_id, {"_id": 0, "sectionIds": 0})
+
+            section_ids = info["sectionIds"]
+            sections = get_section_model().find_changes(section_ids, max(since, 0))
+
+            # 水位取本次读到的、已落定的写入序号，而不是计数器当前值：
+            # 已分配序号但尚未落库的写入不会被跳过
+            writes = [(section.get("version"), section.get("updatedAt")) for section in sections]
+            if paper is not None:
+                writes.append((paper.get(SYNC_VERSION_FIELD), paper.get("updatedAt")))
+
+            return self._wrap_success("获取变更成功", {
+                "version": settled_version(since, writes),
+                "paperVersion": info["version"],
+                "sectionIds": section_ids,
+                "paper": paper,
+                "sections": sections,
+            })
+        except Exception as exc:
+            return self._wrap_error(f"获取变更失败: {exc}")
+
     def create_paper(
         self, 
         paper_data: Dict[str, Any], 
@@ -334,6 +498,7 @@ class BasePaperService(ABC):
             from ..models.section import get_section_model
             section_model = get_section_model()
             if section_model.update(section_id, update_data):
+                self.get_paper_model().bump_version(paper_id)
                 return self._wrap_success("章节更新成功", section_model.find_by_id(section_id))
             
             return self._wrap_error("章节更新失败")
@@ -384,8 +549,13 @@ class BasePaperService(ABC):
                     "章节不存在"
                 )
             
-            # 删除章节
-            if section_model.delete(section_id):
+            # 删除章节（仍被个人论文共享引用的章节只移除引用，保留文档）
+            from ..models.userPaper import get_user_paper_model
+            if get_user_paper_model().is_section_referenced(section_id, exclude_paper_id=paper_id):
+                deleted = True
+            else:
+                deleted = section_model.delete(section_id)
+            if deleted:
                 # 从论文的sectionIds中移除
                 section_ids = paper.get("sectionIds", [])
                 if section_id in section_ids:
@@ -401,20 +571,55 @@ class BasePaperService(ABC):
     # ------------------------------------------------------------------
     # 辅助方法
     # ------------------------------------------------------------------
-    def _load_sections_for_paper(self, paper: Dict[str, Any]) -> Dict[str, Any]:
+    def _load_sections_for_paper(
+        self,
+        paper: Dict[str, Any],
+        fields: Optional[FieldSelection] = None,
+    ) -> Dict[str, Any]:
         """
-        为论文加载sections数据
+        为论文加载sections数据，并合并尚未确认的文本解析进度
+
+        fields 未请求章节时不加载；章节投影不含 content 时不合并解析进度
         """
-        from ..models.section import find_sections_by_ids
+        from ..models.section import attach_sections
+        from ..models.parseBlocks import merge_parse_progress
         
-        if "sectionIds" in paper and paper["sectionIds"]:
-            sections = find_sections_by_ids(paper["sectionIds"])
-            paper["sections"] = sections
-        else:
-            paper["sections"] = []
+        if fields is not None and not fields.include_sections:
+            return paper
+
+        attach_sections([paper], fields.section_projection() if fields else None)
+        if fields is None or fields.includes_section_field("content"):
+            merge_parse_progress(paper["sections"], paper.get("id"))
         
         return paper
 
+    @staticmethod
+    def _iter_sections_with_progress(
+        paper: Dict[str, Any],
+        fields: Optional[FieldSelection] = None,
+    ) -> Optional[Iterator[Dict[str, Any]]]:
+        """
+        按 sectionIds 顺序分批读取章节并合并文本解析进度（每批一次进度查询），逐个产出
+
+        fields 未请求章节时返回 None
+        """
+        from ..models.section import get_section_model
+        from ..models.parseBlocks import merge_parse_progress
+
+        if fields is not None and not fields.include_sections:
+            return None
+
+        projection = fields.section_projection() if fields else None
+        merge_progress = fields is None or fields.includes_section_field("content")
+
+        def generate() -> Iterator[Dict[str, Any]]:
+            for batch in get_section_model().iter_section_batches(paper.get("sectionIds") or [], projection):
+                if merge_progress:
+                    merge_parse_progress(batch, paper.get("id"))
+                yield from batch
+
+        return generate()
+
     @staticmethod
     def _build_pagination(total: int, page: int, page_size: int) -> Dict[str, int]:
         """构建分页信息"""
@@ -0,0 +1,175 @@
+"""
+MinerU 解析结果处理服务
+MinerU 解析完成后，下载结果压缩包、上传附件到七牛云并写回论文附件。
+作为持久化后台任务（mineru-ingest）执行，进程重启后由其他工作线程继续处理。
+
+每个解析任务只处理一次：处理前通过 PdfParseTask 的 ingestState 状态机原子领取
+（done -> ingesting），完成后写入 ingested 和处理结果，重复提交或并发执行的处理任务直接跳过。
+"""
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from ..config.constants import BusinessCode
+from ..utils.cancellation import CancellationToken
+from ..utils.background_tasks import PRIORITY_NORMAL, QUEUE_MINERU_INGEST, load_queue_configs
+from ..utils.job_queue import enqueue_job, register_job_handler
+
+logger = logging.getLogger(__name__)
+
+
+def submit_mineru_ingest(task_id: str, zip_url: str, priority: int = PRIORITY_NORMAL) -> Optional[Dict[str, Any]]:
+    """
+    提交结果处理任务；同一解析任务只会产生一个处理任务
+
+    Returns:
+        持久化任务记录；解析任务已在处理或已处理完成时返回 None
+
+    Raises:
+        TaskQueueFullError: 结果处理队列已满
+    """
+    from ..models.pdfParseTask import get_pdf_parse_task_model
+
+    if not get_pdf_parse_task_model().mark_result_ready(task_id, zip_url):
+        logger.info(f"解析结果已在处理或已处理完成，跳过提交: {task_id}")
+        return None
+    # 解析任务处于 done 说明还没有处理完成：之前的处理任务已结束（如执行者退出后重试用尽）时重新排队
+    return enqueue_job(
+        QUEUE_MINERU_INGEST,
+        {"taskId": task_id, "zipUrl": zip_url},
+        priority=priority,
+        job_id=f"process_mineru_{task_id}",
+        revive=True,
+    )
+
+
+def _ingest_lease_seconds() -> float:
+    """结果处理的领取期限：覆盖处理任务的执行时限，执行者退出后到期可被重新领取"""
+    config = load_queue_configs().get(QUEUE_MINERU_INGEST)
+    return (config.timeout_seconds if config else 900) + 60
+
+
+def _merge_attachments(task: Dict[str, Any], new_attachments: Dict[str, Any]) -> Dict[str, Any]:
+    """把新附件合并进论文当前附件并写回，返回业务结果"""
+    paper_id = task["paperId"]
+    user_id = task["userId"]
+
+    if task.get("isAdmin"):
+        from .paperService import get_paper_service
+        service = get_paper_service()
+    else:
+        from .userPaperService import get_user_paper_service
+        service = get_user_paper_service()
+
+    paper = service.get_paper_model().find_by_id(paper_id, {"_id": 0, "id": 1, "attachments": 1})
+    if not paper:
+        return {"code": BusinessCode.PAPER_NOT_FOUND, "message": "论文不存在"}
+
+    # 合并附件信息 - 只更新非空的附件
+    current_attachments = paper.get("attachments") or {}
+    for attachment_type, attachment_data in new_attachments.items():
+        if attachment_data:
+            current_attachments[attachment_type] = attachment_data
+
+    if task.get("isAdmin"):
+        return service.update_paper_attachments(
+            paper_id=paper_id,
+            attachments=current_attachments,
+            user_id=user_id,
+            is_admin=True,
+        )
+    return service.update_user_paper(
+        entry_id=paper_id,
+        user_id=user_id,
+        update_data={"attachments": current_attachments},
+    )
+
+
+def _on_ingest_dead(payload: Dict[str, Any], error: str) -> None:
+    """重试用尽：解析任务标记为失败（已处理完成的任务不受影响）"""
+    from ..models.pdfParseTask import get_pdf_parse_task_model
+
+    get_pdf_parse_task_model().fail_ingest(payload["taskId"], f"处理解析结果异常: {error}", error)
+
+
+@register_job_handler(QUEUE_MINERU_INGEST, max_attempts=3, on_dead=_on_ingest_dead)
+def process_mineru_result(payload: Dict[str, Any], cancel_token: CancellationToken) -> None:
+    """
+    持久化后台任务 mineru-ingest：下载 MinerU 结果、上传附件并更新论文
+
+    下载或上传失败时抛出异常，由任务队列退避重试；结果格式错误、任务记录缺失等
+    重试无意义的错误直接把解析任务标记为失败。取消或超时在下载中途、每个文件上传前生效。
+    """
+    from ..models.pdfParseTask import (
+        INGEST_INGESTED,
+        INGEST_INGESTING,
+        get_pdf_parse_task_model,
+    )
+
+    task_id = payload["taskId"]
+    task_model = get_pdf_parse_task_model()
+    owner = uuid.uuid4().hex
+
+    task = task_model.begin_ingest(task_id, owner, _ingest_lease_seconds())
+    if not task:
+        current = task_model.get_task(task_id)
+        if not current:
+            logger.error(f"无法找到任务记录: {task_id}")
+        elif current.get("ingestState") == INGEST_INGESTING:
+            # 其他执行者正在处理（租约未过期），稍后重试时再确认结果
+            raise Exception(f"解析结果正在由其他执行者处理: {task_id}")
+        elif current.get("ingestState") == INGEST_INGESTED:
+            logger.info(f"解析结果已处理完成，跳过: {task_id}")
+        return
+
+    try:
+        _ingest(task, payload["zipUrl"], owner, cancel_token)
+    except Exception as exc:
+        # 可重试的失败（下载/上传失败、取消、超时）：退回 done，由任务队列重试时重新领取
+        task_model.release_ingest(task_id, owner, str(exc))
+        raise
+
+
+def _ingest(task: Dict[str, Any], zip_url: str, owner: str, cancel_token: CancellationToken) -> None:
+    """已领取的结果处理：下载、上传并写回论文附件，最后原子地进入 ingested"""
+    from ..models.pdfParseTask import get_pdf_parse_task_model
+    from .mineruService import get_mineru_service
+    from .qiniuService import get_qiniu_service
+
+    task_id = task["id"]
+    task_model = get_pdf_parse_task_model()
+
+    if not task.get("userId"):
+        logger.error(f"任务记录中缺少用户ID: {task_id}")
+        task_model.fail_ingest(task_id, "任务记录中缺少用户ID", owner=owner)
+        return
+
+    # 下载并处理MinerU结果
+    result = get_mineru_service().fetch_markdown_content_and_upload(
+        result_url=zip_url,
+        paper_id=task["paperId"],
+        qiniu_service=get_qiniu_service(),
+        cancel_token=cancel_token,
+    )
+    if not result["success"]:
+        raise Exception(f"处理解析结果失败: {result['error']}")
+
+    cancel_token.raise_if_cancelled()
+    new_attachments = result.get("attachments")
+    if new_attachments is None:
+        logger.error(f"MinerU结果中缺少attachments: {result}")
+        task_model.fail_ingest(task_id, "MinerU结果格式错误：缺少attachments", owner=owner)
+        return
+
+    update_result = _merge_attachments(task, new_attachments)
+    if update_result["code"] != BusinessCode.SUCCESS:
+        logger.error(f"更新论文附件失败: {task_id}, {update_result['message']}")
+        task_model.fail_ingest(task_id, "更新论文附件失败", update_result["message"], owner=owner)
+        return
+
+    outcome = {
+        "attachments": {name: data for name, data in new_attachments.items() if data},
+        "imageCount": len(result.get("uploaded_images") or []),
+    }
+    if not task_model.finish_ingest(task_id, owner, outcome):
+        logger.warning(f"解析结果已处理，但领取已失效，未记录处理结果: {task_id}")
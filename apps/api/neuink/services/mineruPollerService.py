@@ -0,0 +1,239 @@
+"""
+MinerU 解析状态轮询服务
+由服务端统一轮询进行中的 PdfParseTasks，把 MinerU 状态写回任务文档；
+状态接口只读本地文档，不再随客户端轮询向 MinerU 发请求，客户端关闭页面后解析也会继续处理。
+
+每轮领取一批到期的任务（models/pdfParseTask.py 的 claim_due_for_poll），并发查询状态后
+一次性批量写回。下次查询时间按已耗时和页数指数退避：刚提交时频繁查询，
+长时间未完成、页数多的任务查询间隔逐渐变长，预计即将完成时再缩短。
+
+解析完成时在同一次写入中把 ingestState 置为 done，再提交结果处理任务；提交失败时恢复轮询，
+提交前进程退出、处理中途退出且重试已用尽等情况由每轮的补偿扫描（sweep_stalled_ingests）
+重新提交，任务不会停留在处理中。
+
+配置（环境变量）：
+
+- MINERU_POLLER_ENABLED：1（默认）表示在 Web 服务进程内启动轮询线程（见 utils/workers.py）
+- MINERU_POLL_TICK：轮询线程检查到期任务的间隔（秒），默认 2
+- MINERU_POLL_BATCH_SIZE / MINERU_POLL_CONCURRENCY：每轮最多领取的任务数 / 并发查询数，默认 50 / 4
+- MINERU_POLL_MIN_INTERVAL / MINERU_POLL_MAX_INTERVAL：单个任务的查询间隔上下限（秒），默认 3 / 60
+- MINERU_POLL_DOUBLING_SECONDS：已耗时每增加多少秒查询间隔翻倍，默认 60
+- MINERU_POLL_SECONDS_PER_PAGE：预计每页解析耗时（秒），用于估算剩余时间，默认 1
+- MINERU_POLL_MAX_AGE：提交后超过该时长（秒）仍未完成则标记失败，默认 21600（6小时）
+- MINERU_INGEST_STALL_SECONDS：解析完成后超过该时长（秒）仍未开始处理结果则重新提交，默认 120
+"""
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.background_tasks import TaskQueueFullError
+from ..utils.workers import register_worker
+
+logger = logging.getLogger(__name__)
+
+
+class MinerUStatusPoller:
+    """服务端 MinerU 状态轮询线程"""
+
+    def __init__(self, app):
+        self.app = app
+        self.tick = float(os.getenv("MINERU_POLL_TICK", "2"))
+        self.batch_size = int(os.getenv("MINERU_POLL_BATCH_SIZE", "50"))
+        self.concurrency = max(1, int(os.getenv("MINERU_POLL_CONCURRENCY", "4")))
+        self.min_interval = float(os.getenv("MINERU_POLL_MIN_INTERVAL", "3"))
+        self.max_interval = float(os.getenv("MINERU_POLL_MAX_INTERVAL", "60"))
+        self.doubling_seconds = float(os.getenv("MINERU_POLL_DOUBLING_SECONDS", "60"))
+        self.seconds_per_page = float(os.getenv("MINERU_POLL_SECONDS_PER_PAGE", "1"))
+        self.max_age = float(os.getenv("MINERU_POLL_MAX_AGE", "21600"))
+        self.ingest_stall_seconds = float(os.getenv("MINERU_INGEST_STALL_SECONDS", "120"))
+        self.claim_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="mineru-poll")
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="mineru-poller", daemon=True)
+        self._thread.start()
+        logger.info("MinerU 状态轮询线程已启动")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.tick):
+            try:
+                with self.app.app_context():
+                    # 一轮领满说明还有积压，立即继续下一轮
+                    while self.poll_once() >= self.batch_size and not self._stop.is_set():
+                        pass
+                    self.sweep_stalled_ingests()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error(f"MinerU 状态轮询异常: {exc}")
+
+    def poll_once(self) -> int:
+        """领取一批到期任务，并发查询状态并批量写回；返回本轮处理的任务数"""
+        from ..models.pdfParseTask import get_pdf_parse_task_model
+        from .mineruService import get_mineru_service
+
+        task_model = get_pdf_parse_task_model()
+        # 领取期限覆盖一轮查询的最长耗时，超时未写回的任务由下一轮重新领取
+        tasks = task_model.claim_due_for_poll(self.claim_id, self.batch_size, self.max_interval * 2)
+        if not tasks:
+            return 0
+
+        mineru_service = get_mineru_service()
+        statuses = list(self._executor.map(
+            lambda task: mineru_service.get_parsing_status(task["mineruTaskId"], fetch_content=False),
+            tasks,
+        ))
+
+        results: List[Tuple[str, Dict[str, Any]]] = []
+        completed: List[Tuple[str, str]] = []
+        for task, status in zip(tasks, statuses):
+            fields = self._apply_status(task, status)
+            results.append((task["id"], fields))
+            if fields.get("mineruState") == "done" and fields.get("resultZipUrl"):
+                completed.append((task["id"], fields["resultZipUrl"]))
+
+        task_model.record_poll_results(results)
+        for task_id, zip_url in completed:
+            self._submit_ingest(task_id, zip_url)
+        return len(tasks)
+
+    def _apply_status(self, task: Dict[str, Any], status: Dict[str, Any]) -> Dict[str, Any]:
+        """把一次状态查询结果转换为需要写回任务文档的字段"""
+        now = datetime.utcnow()
+        elapsed = (now - task["createdAt"]).total_seconds() if task.get("createdAt") else 0.0
+
+        if not status.get("success"):
+            if elapsed > self.max_age:
+                return self._failed_fields("PDF解析超时，未能获取解析结果", status.get("error"))
+            return {
+                "lastPollError": status.get("error"),
+                "nextPollAt": now + timedelta(seconds=self.next_delay(elapsed, task.get("totalPages"))),
+            }
+
+        state = status.get("state")
+        if state == "done" and not status.get("full_zip_url"):
+            # 没有结果地址就无法处理结果，直接标记失败，不进入结果处理和补偿扫描
+            fields = self._failed_fields("PDF解析完成但未返回结果文件", "MinerU 未返回 full_zip_url")
+            fields["mineruState"] = state
+            return fields
+        if state == "done":
+            from ..models.pdfParseTask import INGEST_DONE
+
+            # ingestState 与 mineruState 同时写入：之后提交处理任务失败或进程退出时，
+            # 补偿扫描能找到该任务并重新提交
+            return {
+                "mineruState": state,
+                "ingestState": INGEST_DONE,
+                "status": "processing",
+                "progress": 100,
+                "message": "PDF解析完成，正在处理结果...",
+                "resultZipUrl": status.get("full_zip_url"),
+                "lastPollError": None,
+                "nextPollAt": None,
+            }
+        if state == "failed":
+            fields = self._failed_fields(status.get("message") or "PDF解析失败", status.get("message"))
+            fields["mineruState"] = state
+            return fields
+        if elapsed > self.max_age:
+            return self._failed_fields("PDF解析超时", f"MinerU 任务超过 {self.max_age:.0f} 秒未完成")
+
+        total_pages = status.get("total_pages") or task.get("totalPages")
+        extracted_pages = status.get("extracted_pages") or 0
+        delay = self.next_delay(elapsed, total_pages, extracted_pages)
+        return {
+            "mineruState": state,
+            "status": "processing",
+            "progress": status.get("progress", 0),
+            "message": status.get("message", ""),
+            "totalPages": total_pages or None,
+            "extractedPages": extracted_pages or None,
+            "lastPollError": None,
+            "nextPollAt": now + timedelta(seconds=delay),
+        }
+
+    @staticmethod
+    def _failed_fields(message: str, error: Optional[str]) -> Dict[str, Any]:
+        return {"status": "failed", "message": message, "error": error, "nextPollAt": None}
+
+    def next_delay(
+        self,
+        elapsed: float,
+        total_pages: Optional[int] = None,
+        extracted_pages: int = 0,
+    ) -> float:
+        """
+        下次查询前的等待秒数
+
+        基础间隔随已耗时指数增长（每 doubling_seconds 翻倍），页数越多增长越快；
+        已知剩余页数时不超过预计剩余时间，避免任务完成后长时间无人处理。
+        """
+        pages = total_pages or 0
+        doublings = min(elapsed / self.doubling_seconds, 16)
+        delay = self.min_interval * 2 ** doublings * (1 + pages / 100)
+        if pages and extracted_pages:
+            remaining = max(0, pages - extracted_pages) * self.seconds_per_page
+            delay = min(delay, remaining)
+        return max(self.min_interval, min(self.max_interval, delay))
+
+    def sweep_stalled_ingests(self) -> int:
+        """重新提交解析完成后长时间未开始处理、或处理租约已过期的任务；返回本轮提交的任务数"""
+        from ..models.pdfParseTask import get_pdf_parse_task_model
+
+        tasks = get_pdf_parse_task_model().claim_stalled_ingests(
+            self.claim_id, self.batch_size, self.ingest_stall_seconds
+        )
+        for task in tasks:
+            if task.get("resultZipUrl"):
+                logger.warning(f"MinerU结果长时间未处理，重新提交 - task_id: {task['id']}")
+                self._submit_ingest(task["id"], task["resultZipUrl"])
+        return len(tasks)
+
+    def _submit_ingest(self, task_id: str, zip_url: str) -> None:
+        """
+        解析完成后提交结果处理任务（按任务ID去重，重复提交无副作用）
+
+        提交失败（队列已满、数据库异常等）时恢复轮询，下一轮重新提交；
+        恢复轮询也失败时由补偿扫描重新提交
+        """
+        from ..models.pdfParseTask import get_pdf_parse_task_model
+        from .mineruIngestService import submit_mineru_ingest
+
+        try:
+            submit_mineru_ingest(task_id, zip_url)
+            return
+        except TaskQueueFullError as exc:
+            logger.warning(f"MinerU结果处理排队已满 - task_id: {task_id}, error: {exc}")
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(f"提交MinerU结果处理失败 - task_id: {task_id}, error: {exc}")
+
+        try:
+            get_pdf_parse_task_model().record_poll_results([(task_id, {
+                "mineruState": None,
+                "message": "解析完成，等待处理结果...",
+                "nextPollAt": datetime.utcnow() + timedelta(seconds=self.max_interval),
+            })])
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(f"恢复MinerU状态轮询失败 - task_id: {task_id}, error: {exc}")
+
+
+_poller: Optional[MinerUStatusPoller] = None
+
+
+def init_app(app) -> None:
+    """登记 Web 服务进程内的 MinerU 状态轮询线程"""
+    register_worker(app, _start_poller)
+
+
+def _start_poller(app) -> None:
+    global _poller
+    if os.getenv("MINERU_POLLER_ENABLED", "1") == "1" and _poller is None:
+        _poller = MinerUStatusPoller(app)
+        _poller.start()
@@ -13,6 +13,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
 from ..config.constants import BusinessCode
+from ..utils.cancellation import CancellationToken, TaskCancelledError, check_cancelled
 
 # 初始化logger
 logger = logging.getLogger(__name__)
@@ -125,12 +126,14 @@ class MinerUService:
                 "error": f"服务器错误: {str(e)}"
             }
     
-    def get_parsing_status(self, task_id: str) -> Dict[str, Any]:
+    def get_parsing_status(self, task_id: str, fetch_content: bool = True) -> Dict[str, Any]:
         """
         查询PDF解析任务状态
         
         Args:
             task_id: 解析任务ID
+            fetch_content: 解析完成时是否下载结果压缩包读取Markdown内容；
+                只需要状态的调用方（如状态轮询）传 False，避免每次查询都下载结果
             
         Returns:
             解析状态结果
@@ -175,6 +178,8 @@ class MinerUService:
                             "progress": progress,
                             "message": msg,
                             "state": state,
+                            "total_pages": total_pages,
+                            "extracted_pages": extracted_pages,
                             "data": data
                         }
                     elif state == "done":
@@ -183,7 +188,7 @@ class MinerUService:
                         
                         # 尝试从full_zip_url获取Markdown内容
                         full_zip_url = data.get("full_zip_url")
-                        if full_zip_url:
+                        if full_zip_url and fetch_content:
                             markdown_content = self._fetch_result_from_url(full_zip_url)
                         
                         return {
@@ -297,7 +302,35 @@ class MinerUService:
             logger.error(f"获取解析结果异常: {str(e)}")
             return ""
     
-    def fetch_markdown_content_and_upload(self, result_url: str, paper_id: str, qiniu_service=None) -> Dict[str, Any]:
+    def _download_result_zip(self, result_url: str, cancel_token: Optional[CancellationToken] = None):
+        """
+        下载结果压缩包，返回 (状态码, 内容)
+
+        传入 cancel_token 时分块读取并检查令牌，取消或超时时断开连接
+        """
+        if cancel_token is None:
+            response = requests.get(result_url, timeout=self.timeout)
+            return response.status_code, response.content
+
+        cancel_token.raise_if_cancelled()
+        response = requests.get(result_url, timeout=self.timeout, stream=True)
+        with response, cancel_token.bind_response(response):
+            if response.status_code != 200:
+                return response.status_code, b""
+            buffer = io.BytesIO()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                cancel_token.raise_if_cancelled()
+                buffer.write(chunk)
+        cancel_token.raise_if_cancelled()
+        return response.status_code, buffer.getvalue()
+
+    def fetch_markdown_content_and_upload(
+        self,
+        result_url: str,
+        paper_id: str,
+        qiniu_service=None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
         """
         从结果URL获取Markdown内容、图片、content_list.json、model.json和layout.json并上传到七牛云
         
@@ -305,17 +338,21 @@ class MinerUService:
             result_url: 结果文件的URL（ZIP格式）
             paper_id: 论文ID，用于生成文件名
             qiniu_service: 七牛云服务实例
+            cancel_token: 后台任务的取消令牌，下载中途及每个文件上传前检查
             
         Returns:
             上传结果，包含Markdown内容、图片信息、JSON文件内容和附件信息
+
+        Raises:
+            TaskCancelledError: 任务已被取消或超时
         """
         try:
             logger.info(f"开始下载ZIP文件: {result_url}")
-            response = requests.get(result_url, timeout=self.timeout)
+            status_code, zip_content = self._download_result_zip(result_url, cancel_token)
             
-            if response.status_code == 200:
+            if status_code == 200:
                 # 使用内存中的字节数据创建ZIP文件对象
-                zip_data = io.BytesIO(response.content)
+                zip_data = io.BytesIO(zip_content)
                 
                 # 打开ZIP文件
                 with zipfile.ZipFile(zip_data, 'r') as zip_file:
@@ -413,6 +450,7 @@ class MinerUService:
                         }
                         
                         # 上传Markdown文件
+                        check_cancelled(cancel_token)
                         markdown_result = qiniu_service.upload_file_data(
                             file_data=markdown_content.encode('utf-8'),
                             file_extension=".md",
@@ -438,6 +476,7 @@ class MinerUService:
                         
                         # 上传content_list.json文件
                         if content_list_json_content:
+                            check_cancelled(cancel_token)
                             content_list_result = qiniu_service.upload_file_data(
                                 file_data=content_list_json_content.encode('utf-8'),
                                 file_extension=".json",
@@ -460,6 +499,7 @@ class MinerUService:
                         
                         # 上传model.json文件
                         if model_json_content:
+                            check_cancelled(cancel_token)
                             model_result = qiniu_service.upload_file_data(
                                 file_data=model_json_content.encode('utf-8'),
                                 file_extension=".json",
@@ -482,6 +522,7 @@ class MinerUService:
                         
                         # 上传layout.json文件
                         if layout_json_content:
+                            check_cancelled(cancel_token)
                             layout_result = qiniu_service.upload_file_data(
                                 file_data=layout_json_content.encode('utf-8'),
                                 file_extension=".json",
@@ -505,6 +546,7 @@ class MinerUService:
                         # 上传图片文件到neuink/{paper_id}/images/目录
                         uploaded_images = []
                         for image_file in image_files:
+                            check_cancelled(cancel_token)
                             try:
                                 # 读取图片文件内容
                                 with zip_file.open(image_file) as image_file_content:
@@ -582,12 +624,14 @@ class MinerUService:
                         
                         return result_data
             else:
-                logger.error(f"下载ZIP文件失败，状态码: {response.status_code}")
+                logger.error(f"下载ZIP文件失败，状态码: {status_code}")
                 return {
                     "success": False,
-                    "error": f"下载ZIP文件失败，状态码: {response.status_code}"
+                    "error": f"下载ZIP文件失败，状态码: {status_code}"
                 }
                 
+        except TaskCancelledError:
+            raise
         except zipfile.BadZipFile:
             logger.error("下载的文件不是有效的ZIP格式")
             return {
@@ -8,9 +8,10 @@ from bson import ObjectId
 
 from ..utils.common import generate_id
 
-from ..models.note import NoteModel
-from ..models.userPaper import UserPaperModel
+from ..models.note import get_note_model
+from ..models.userPaper import get_user_paper_model
 from ..config.constants import BusinessCode
+from ..utils.pagination import InvalidCursorError, next_cursor
 from .baseNoteService import BaseNoteService
 from ..models.context import PaperContext, create_paper_context
 
@@ -20,8 +21,8 @@ class NoteService(BaseNoteService):
 
     def __init__(self) -> None:
         # 先初始化子类属性
-        self._note_model_instance = NoteModel()
-        self._user_paper_model_instance = UserPaperModel()
+        self._note_model_instance = get_note_model()
+        self._user_paper_model_instance = get_user_paper_model()
         # 为了兼容性，添加note_model属性
         self.note_model = self._note_model_instance
         # 再调用父类初始化
@@ -57,11 +58,12 @@ class NoteService(BaseNoteService):
         sort_by: str = "createdAt",
         sort_order: str = "desc",
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         """获取论文的所有笔记 - 支持上下文感知的新接口"""
         try:
             # 调用基类方法
-            result = super().get_notes_by_paper(context, page, page_size)
+            result = super().get_notes_by_paper(context, page, page_size, cursor)
             if result[0]:  # 成功
                 return self._wrap_success(result[1], result[2])
             else:  # 失败
@@ -153,6 +155,7 @@ class NoteService(BaseNoteService):
         sort_by: str = "createdAt",
         sort_order: str = "desc",
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         """获取用户的所有笔记 - 支持上下文感知的新接口"""
         try:
@@ -170,15 +173,22 @@ class NoteService(BaseNoteService):
                     user_id=context.user_id,
                     skip=skip,
                     limit=page_size,
+                    cursor=cursor,
                 )
+            pagination = self._build_pagination(total, page, page_size)
+            pagination["nextCursor"] = (
+                None if search else next_cursor(notes, page_size, "createdAt", -1)
+            )
 
             return self._wrap_success(
                 "获取用户笔记成功",
                 {
                     "notes": self._serialize_notes(notes),
-                    "pagination": self._build_pagination(total, page, page_size),
+                    "pagination": pagination,
                 },
             )
+        except InvalidCursorError as exc:
+            return self._wrap_failure(BusinessCode.INVALID_PARAMS, str(exc))
         except Exception as exc:
             return self._wrap_error(f"获取用户笔记失败: {exc}")
 
@@ -224,6 +234,7 @@ class NoteService(BaseNoteService):
         user_id: str,
         page: int = 1,
         page_size: int = 50,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         获取用户的所有笔记（跨论文）
@@ -234,16 +245,21 @@ class NoteService(BaseNoteService):
                 user_id=user_id,
                 skip=skip,
                 limit=page_size,
+                cursor=cursor,
             )
+            pagination = self._build_pagination(total, page, page_size)
+            pagination["nextCursor"] = next_cursor(notes, page_size, "createdAt", -1)
 
             return self._wrap_success(
                 "获取用户笔记成功",
                 {
                     "notes": self._serialize_notes(notes),
-                    "pagination": self._build_pagination(total, page, page_size),
+                    "pagination": pagination,
                 },
             )
 
+        except InvalidCursorError as exc:
+            return self._wrap_failure(BusinessCode.INVALID_PARAMS, str(exc))
         except Exception as exc:  # pylint: disable=broad-except
             return self._wrap_error(f"获取用户笔记失败: {exc}")
 
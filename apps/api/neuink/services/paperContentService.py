@@ -2,7 +2,6 @@
 Paper 内容操作服务
 处理论文内容相关的操作（章节、块、参考文献）
 """
-import time
 import uuid
 import re
 import json
@@ -10,9 +9,13 @@ import logging
 from typing import Dict, Any, Optional, List, Tuple
 from ..models.adminPaper import AdminPaperModel
 from ..models.section import get_section_model
+from ..models.blockSearch import get_block_search_model
 from ..config.constants import BusinessCode
 from ..utils.llm_utils import get_llm_utils
 from ..utils.common import get_current_time, generate_id
+from ..utils.background_tasks import QUEUE_LLM_PARSE, TaskQueueFullError
+from ..utils.job_queue import enqueue_job, register_job_handler
+from ..utils.cancellation import CancellationToken, check_cancelled
 from ..utils.llm_prompts import (
     TEXT_TO_BLOCKS_SYSTEM_PROMPT,
     TEXT_TO_BLOCKS_USER_PROMPT_TEMPLATE
@@ -20,23 +23,16 @@ from ..utils.llm_prompts import (
 
 # 初始化logger
 logger = logging.getLogger(__name__)
-_PARSED_BLOCKS_CACHE: Dict[str, Dict[str, Any]] = {}
-
-def remember_parsed_blocks(temp_block_id: str, section_id: str, parsed_block_ids: List[str]) -> None:
-    """将解析结果记录到内存缓存"""
-    _PARSED_BLOCKS_CACHE[temp_block_id] = {
-        "sectionId": section_id,
-        "parsedBlockIds": parsed_block_ids,
-        "ts": time.time(),
-    }
-
-def get_parsed_blocks_from_cache(temp_block_id: str) -> Optional[Dict[str, Any]]:
-    """从内存缓存中获取解析结果"""
-    return _PARSED_BLOCKS_CACHE.get(temp_block_id)
 
 class PaperContentService:
     """Paper 内容操作服务类"""
 
+    # update_block 允许修改的block字段
+    UPDATABLE_BLOCK_FIELDS = (
+        "content", "type", "metadata", "src", "alt", "width", "height",
+        "caption", "description", "uploadedFilename",
+    )
+
     def __init__(self, paper_model: AdminPaperModel) -> None:
         self.paper_model = paper_model
         self.section_model = get_section_model()
@@ -48,9 +44,11 @@ class PaperContentService:
         self,
         text: str,
         section_context: str = "",
+        cancel_token: Optional[CancellationToken] = None,
     ) -> List[Dict[str, Any]]:
         """
         使用大模型将原始文本解析为 blocks，并在服务层完成结构校验和补全。
+        在后台任务中调用时传入 cancel_token，取消或超时时中断大模型请求。
         """
         llm_utils = get_llm_utils()
 
@@ -70,7 +68,9 @@ class PaperContentService:
         ]
 
         # 1. 调用大模型
-        response = llm_utils.call_llm(messages, temperature=0.1, max_tokens=50000)
+        response = llm_utils.call_llm(
+            messages, temperature=0.1, max_tokens=50000, cancel_token=cancel_token
+        )
         if not response or "choices" not in response or not response["choices"]:
             raise Exception("LLM解析失败：未返回有效内容")
 
@@ -198,9 +198,6 @@ class PaperContentService:
             if not is_user_paper and not is_admin and paper.get("createdBy") != user_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此论文")
 
-            # 获取当前sections
-            sections = self.section_model.find_by_paper_id(paper_id)
-            
             # 确保新章节有必要的字段
             title_data = section_data.get("title", {})
             title_zh_data = section_data.get("titleZh", "")
@@ -257,6 +254,7 @@ class PaperContentService:
             logger.info(f"添加章节结果 - success: {success}")
             
             if success:
+                self._reindex_section(created_section["id"])
                 # 不获取完整的论文数据，只返回添加结果
                 return self._wrap_success(
                     "成功添加章节",
@@ -306,8 +304,8 @@ class PaperContentService:
             if not is_user_paper and not is_admin and paper.get("createdBy") != user_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此论文")
 
-            # 查找section
-            target_section = self.section_model.find_by_id(section_id)
+            # 查找section（个人论文中共享的section在此时复制）
+            target_section = self._find_writable_section(paper_id, section_id, is_user_paper)
             
             if target_section is None:
                 logger.error(f"未找到匹配的section - 请求的section_id: {section_id}")
@@ -316,6 +314,7 @@ class PaperContentService:
             # 验证section属于该论文
             if target_section.get("paperId") != paper_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
+            section_id = target_section["id"]
 
             # 更新section数据
             section_update_data = {}
@@ -336,6 +335,9 @@ class PaperContentService:
 
             # 更新section
             if self.section_model.update(section_id, section_update_data):
+                if "content" in section_update_data:
+                    self._reindex_section(section_id)
+                self._bump_paper_version(paper_id, is_user_paper)
                 updated_section = self.section_model.find_by_id(section_id)
                 
                 return self._wrap_success(
@@ -367,13 +369,14 @@ class PaperContentService:
             
             # 检查论文是否存在及权限
             # 对于个人论文库，需要特殊处理
+            user_paper = None
             if is_user_paper:
                 # 个人论文库中的论文，需要验证用户权限
                 logger.info(f"个人论文库模式，验证用户权限: {paper_id}, user_id: {user_id}")
                 
                 # 首先尝试在UserPaperModel中查找
-                from ..models.userPaper import UserPaperModel
-                user_paper_model = UserPaperModel()
+                from ..models.userPaper import get_user_paper_model
+                user_paper_model = get_user_paper_model()
                 user_paper = user_paper_model.find_by_id(paper_id)
                 
                 if user_paper:
@@ -417,22 +420,33 @@ class PaperContentService:
 
             # 查找section
             logger.info(f"查找section: {section_id}")
-            target_section = self.section_model.find_by_id(section_id)
+            target_section = self.section_model.find_by_id(section_id, projection={"id": 1, "paperId": 1})
            
             if target_section is None:
                 logger.error(f"section不存在: {section_id}")
                 return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的section不存在")
             
             logger.info(f"找到section: {target_section}")
+
+            # 个人论文中仍共享公共论文的section：只移除引用，不删除公共section；
+            # 已复制过的section（客户端仍持有原ID）则删除对应的副本
+            shared_reference = False
+            if is_user_paper and target_section.get("paperId") != paper_id:
+                fork = self.section_model.find_fork(paper_id, section_id, projection={"id": 1, "paperId": 1})
+                if fork:
+                    target_section = fork
+                    section_id = fork["id"]
+                elif user_paper and section_id in (user_paper.get("sectionIds") or []):
+                    shared_reference = True
            
             # 验证section属于该论文
-            if target_section.get("paperId") != paper_id:
+            if not shared_reference and target_section.get("paperId") != paper_id:
                 logger.error(f"section不属于该论文 - section paperId: {target_section.get('paperId')}, 期望paperId: {paper_id}")
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
 
             # 删除section
-            logger.info(f"开始删除section: {section_id}")
-            if self.section_model.delete(section_id):
+            logger.info(f"开始删除section: {section_id}, shared_reference: {shared_reference}")
+            if shared_reference or self._delete_section_document(section_id, paper_id):
                 logger.info(f"section删除成功: {section_id}")
                 
                 # 从论文中移除sectionId引用
@@ -501,8 +515,8 @@ class PaperContentService:
             if not text or not text.strip():
                 return self._wrap_error("文本内容不能为空")
 
-            # 查找目标section
-            target_section = self.section_model.find_by_id(section_id)
+            # 查找目标section（个人论文中共享的section在此时复制）
+            target_section = self._find_writable_section(paper_id, section_id, is_user_paper)
             
             if target_section is None:
                 return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的section不存在")
@@ -510,6 +524,7 @@ class PaperContentService:
             # 验证section属于该论文
             if target_section.get("paperId") != paper_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
+            section_id = target_section["id"]
 
             # 获取section上下文信息
             section_context = f"Section标题: {target_section.get('title', '未知')}"
@@ -525,43 +540,15 @@ class PaperContentService:
             if not new_blocks:
                 return self._wrap_error("文本解析失败，无法生成有效的blocks")
 
-            # 将新blocks添加到section中
-            if "content" not in target_section:
-                target_section["content"] = []
-            
-            # 根据after_block_id确定插入位置
-            current_blocks = target_section["content"]
-            insert_index = len(current_blocks)
-            
-            if after_block_id:
-                for i, block in enumerate(current_blocks):
-                    if block.get("id") == after_block_id:
-                        insert_index = i + 1
-                        break
-            
-            # 使用MongoDB原子更新操作
-            if insert_index == len(current_blocks):
-                # 在末尾添加，使用$push
-                update_operation = {
-                    "$push": {
-                        "content": {
-                            "$each": new_blocks
-                        }
-                    }
-                }
-            else:
-                # 在中间插入，使用$push配合$position，避免替换整个数组
-                update_operation = {
-                    "$push": {
-                        "content": {
-                            "$each": new_blocks,
-                            "$position": insert_index
-                        }
-                    }
-                }
+            # 根据after_block_id确定插入位置（LLM解析期间content可能已变化，重新在数据库端计算）
+            insert_index = self.section_model.get_insert_position(section_id, after_block_id)
             
-            # 执行原子更新 - 使用update_direct处理MongoDB操作符
-            if self.section_model.update_direct(section_id, update_operation):
+            # 使用$push配合$position原子插入，避免替换整个数组
+            inserted = self.section_model.insert_blocks(section_id, new_blocks, insert_index, keep_search_index=True)
+            if inserted:
+                new_blocks = inserted
+                self._reindex_blocks(section_id, paper_id, new_blocks)
+                self._bump_paper_version(paper_id, is_user_paper)
                 return self._wrap_success(
                     f"成功向section添加了{len(new_blocks)}个blocks",
                     {
@@ -607,8 +594,10 @@ class PaperContentService:
             if not is_user_paper and not is_admin and paper.get("createdBy") != user_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此论文")
 
-            # 查找目标section
-            target_section = self.section_model.find_by_id(section_id)
+            # 查找目标section（只读取元信息，不加载content；个人论文中共享的section在此时复制）
+            target_section = self._find_writable_section(
+                paper_id, section_id, is_user_paper, projection={"id": 1, "paperId": 1}
+            )
             
             if target_section is None:
                 return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的section不存在")
@@ -616,41 +605,34 @@ class PaperContentService:
             # 验证section属于该论文
             if target_section.get("paperId") != paper_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
+            section_id = target_section["id"]
 
-            # 查找并更新block
-            blocks = target_section.get("content", [])
-            target_block_index = -1
-            
-            for i, block in enumerate(blocks):
-                if block.get("id") == block_id:
-                    target_block_index = i
-                    break
-            
-            if target_block_index == -1:
-                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的block不存在")
-
-            # 更新block数据
-            target_block = blocks[target_block_index]
-            for key, value in update_data.items():
-                if key in ["content", "type", "metadata", "src", "alt", "width", "height", "caption", "description", "uploadedFilename"]:
-                    target_block[key] = value
-
-            blocks[target_block_index] = target_block
-            target_section["content"] = blocks
-
-            # 更新section
-            target_section["content"] = blocks
-            if self.section_model.update(section_id, {"content": blocks}):
-                return self._wrap_success(
-                    "block更新成功",
-                    {
-                        "updatedBlock": target_block,
-                        "blockId": target_block["id"],
-                        "sectionId": section_id
-                    }
+            # 只更新允许修改的字段，通过arrayFilters定位block，不重写整个content数组
+            block_fields = {
+                key: value for key, value in update_data.items()
+                if key in self.UPDATABLE_BLOCK_FIELDS
+            }
+            if block_fields:
+                updated_block = self.section_model.update_block(
+                    section_id, block_id, block_fields, keep_search_index=True
                 )
             else:
-                return self._wrap_error("更新章节失败")
+                updated_block = self.section_model.find_block(section_id, block_id)
+
+            if updated_block is None:
+                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的block不存在")
+            if block_fields:
+                self._reindex_blocks(section_id, paper_id, [updated_block])
+                self._bump_paper_version(paper_id, is_user_paper)
+
+            return self._wrap_success(
+                "block更新成功",
+                {
+                    "updatedBlock": updated_block,
+                    "blockId": updated_block.get("id", block_id),
+                    "sectionId": section_id
+                }
+            )
 
         except Exception as exc:
             return self._wrap_error(f"更新block失败: {exc}")
@@ -686,8 +668,10 @@ class PaperContentService:
             if not is_user_paper and not is_admin and paper.get("createdBy") != user_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此论文")
 
-            # 查找目标section
-            target_section = self.section_model.find_by_id(section_id)
+            # 查找目标section（只读取元信息，不加载content；个人论文中共享的section在此时复制）
+            target_section = self._find_writable_section(
+                paper_id, section_id, is_user_paper, projection={"id": 1, "paperId": 1}
+            )
             
             if target_section is None:
                 return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的section不存在")
@@ -695,35 +679,83 @@ class PaperContentService:
             # 验证section属于该论文
             if target_section.get("paperId") != paper_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
+            section_id = target_section["id"]
 
-            # 查找并删除block
-            blocks = target_section.get("content", [])
-            target_block_index = -1
-            
-            for i, block in enumerate(blocks):
-                if block.get("id") == block_id:
-                    target_block_index = i
-                    break
-            
-            if target_block_index == -1:
+            # 使用$pull按blockId删除，不重写整个content数组
+            if not self.section_model.delete_block(section_id, block_id, keep_search_index=True):
                 return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的block不存在")
+            self._reindex_blocks(section_id, paper_id, removed_block_ids=[block_id])
+            self._bump_paper_version(paper_id, is_user_paper)
 
-            # 删除block
-            blocks.pop(target_block_index)
-            target_section["content"] = blocks
+            return self._wrap_success("block删除成功", {
+                "deletedBlockId": block_id,
+                "sectionId": section_id
+            })
 
-            # 更新section
-            target_section["content"] = blocks
-            if self.section_model.update(section_id, {"content": blocks}):
-                return self._wrap_success("block删除成功", {
-                    "deletedBlockId": block_id,
-                    "sectionId": section_id
-                })
+        except Exception as exc:
+            return self._wrap_error(f"删除block失败: {exc}")
+
+    def move_block(
+        self,
+        paper_id: str,
+        section_id: str,
+        block_id: str,
+        user_id: str,
+        is_admin: bool = False,
+        after_block_id: Optional[str] = None,
+        is_user_paper: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        移动指定block到 after_block_id 之后（after_block_id 为空时移动到章节最前面）
+        """
+        # 参数校验放在查找章节之前：无效请求不会触发共享章节的写时复制
+        if after_block_id == block_id:
+            return self._wrap_failure(BusinessCode.INVALID_PARAMS, "不能将block移动到自身之后")
+
+        try:
+            # 检查论文是否存在及权限
+            if is_user_paper:
+                paper = {"id": paper_id}  # 创建一个虚拟的paper对象用于后续验证
             else:
-                return self._wrap_error("更新章节失败")
+                paper = self.paper_model.find_by_id(paper_id)
+                if not paper:
+                    return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "论文不存在")
+
+            if not is_user_paper and not is_admin and paper.get("createdBy") != user_id:
+                return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此论文")
+
+            # 查找目标section（只读取元信息，不加载content；个人论文中共享的section在此时复制）
+            target_section = self._find_writable_section(
+                paper_id, section_id, is_user_paper, projection={"id": 1, "paperId": 1}
+            )
+
+            if target_section is None:
+                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的section不存在")
+
+            # 验证section属于该论文
+            if target_section.get("paperId") != paper_id:
+                return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
+            section_id = target_section["id"]
+
+            # 先确认目标位置的block存在，避免被静默移动到末尾
+            if after_block_id:
+                located = self.section_model.locate_block(section_id, after_block_id)
+                if located is None or located[0] < 0:
+                    return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "目标位置的block不存在")
+
+            # 一次管道更新完成移动，不重写整个content数组，也不会在中途丢失block
+            if not self.section_model.move_block(section_id, block_id, after_block_id):
+                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的block不存在")
+            self._bump_paper_version(paper_id, is_user_paper)
+
+            return self._wrap_success("block移动成功", {
+                "blockId": block_id,
+                "afterBlockId": after_block_id,
+                "sectionId": section_id
+            })
 
         except Exception as exc:
-            return self._wrap_error(f"删除block失败: {exc}")
+            return self._wrap_error(f"移动block失败: {exc}")
 
     def add_block_directly(
         self,
@@ -761,8 +793,10 @@ class PaperContentService:
             if not block_data or not block_data.get("type"):
                 return self._wrap_error("block数据不完整，缺少type字段")
 
-            # 查找目标section
-            target_section = self.section_model.find_by_id(section_id)
+            # 查找目标section（只读取元信息，不加载content；个人论文中共享的section在此时复制）
+            target_section = self._find_writable_section(
+                paper_id, section_id, is_user_paper, projection={"id": 1, "paperId": 1}
+            )
             
             if target_section is None:
                 return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的section不存在")
@@ -770,20 +804,10 @@ class PaperContentService:
             # 验证section属于该论文
             if target_section.get("paperId") != paper_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
+            section_id = target_section["id"]
 
-            # 确保section有content字段
-            if "content" not in target_section:
-                target_section["content"] = []
-            
-            # 根据after_block_id确定插入位置
-            current_blocks = target_section["content"]
-            insert_index = len(current_blocks)
-            
-            if after_block_id:
-                for i, block in enumerate(current_blocks):
-                    if block.get("id") == after_block_id:
-                        insert_index = i + 1
-                        break
+            # 根据after_block_id在数据库端计算插入位置
+            insert_index = self.section_model.get_insert_position(section_id, after_block_id)
             
             # 创建新block
             frontend_id = block_data.get("id")
@@ -849,27 +873,12 @@ class PaperContentService:
                     if field in block_data:
                         new_block[field] = block_data[field]
             
-            # 使用MongoDB原子更新操作
-            if insert_index == len(current_blocks):
-                # 在末尾添加，使用$push
-                update_operation = {
-                    "$push": {
-                        "content": new_block
-                    }
-                }
-            else:
-                # 在中间插入，使用$push配合$position，避免替换整个数组
-                update_operation = {
-                    "$push": {
-                        "content": {
-                            "$each": [new_block],
-                            "$position": insert_index
-                        }
-                    }
-                }
-            
-            # 执行原子更新 - 使用update_direct处理MongoDB操作符
-            if self.section_model.update_direct(section_id, update_operation):
+            # 使用$push配合$position原子插入，避免替换整个数组
+            inserted = self.section_model.insert_blocks(section_id, [new_block], insert_index, keep_search_index=True)
+            if inserted:
+                new_block = inserted[0]
+                self._reindex_blocks(section_id, paper_id, [new_block])
+                self._bump_paper_version(paper_id, is_user_paper)
                 return self._wrap_success(
                     "成功添加block",
                     {
@@ -898,10 +907,11 @@ class PaperContentService:
         使用大模型解析文本并将生成的block添加到指定section中（基于ParseBlocks临时表版本）
         
         工作流程：
-        1. 创建ParseBlocks记录和临时进度block
+        1. 创建ParseBlocks记录（解析进度只写入该记录，不写section文档）
         2. 启动后台任务进行解析
         3. 解析完成后将结果存储在ParseBlocks表中，不直接插入section
-        4. 返回parseId，前端通过轮询检测解析状态
+        4. 返回parseId，前端通过轮询检测解析状态；读取章节时由
+           merge_parse_progress 把进度合并为临时 parsing block
         """
         try:
             # 检查论文是否存在及权限
@@ -926,8 +936,12 @@ class PaperContentService:
             if not text or not text.strip():
                 return self._wrap_error("文本内容不能为空")
 
-            # 查找目标section
-            target_section = self.section_model.find_by_id(section_id)
+            # 查找目标section（只读取元信息，不读取content；个人论文中共享的section在此时复制，
+            # 解析进度和确认写入都只作用于该个人论文自己的副本）
+            target_section = self._find_writable_section(
+                paper_id, section_id, is_user_paper,
+                projection={"id": 1, "paperId": 1, "title": 1, "titleZh": 1},
+            )
             
             if target_section is None:
                 return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "指定的section不存在")
@@ -935,31 +949,15 @@ class PaperContentService:
             # 验证section属于该论文
             if target_section.get("paperId") != paper_id:
                 return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此章节")
+            section_id = target_section["id"]
 
             # 生成临时进度block ID和解析记录ID
+            # 临时block不再写入section，只作为读取时合并进度的占位ID
             temp_block_id = "temp_" + generate_id()
             parse_id = "pb_" + generate_id()
             
-            # 确保section有content字段
-            if "content" not in target_section:
-                target_section["content"] = []
-            
-            # 计算插入位置
-            insert_index = self._calculate_insert_index(target_section, after_block_id)
-            
-            # 插入临时parsing block（注意：不再预先插入parsed blocks）
-            temp_block = {
-                "id": temp_block_id,
-                "type": "parsing",
-                "stage": "structuring",
-                "message": "正在解析文本...",
-                "createdAt": get_current_time().isoformat(),
-                "parseId": parse_id  # 新增：方便前端拿
-            }
-            
-            content = target_section["content"]
-            content.insert(insert_index, temp_block)
-            self.section_model.update_direct(section_id, {"$set": {"content": content}})
+            # 记录插入位置，锚点block被删除时作为兜底
+            insert_index = self.section_model.get_insert_position(section_id, after_block_id) or 0
 
             # 在ParseBlocks表中创建记录
             from ..models.parseBlocks import get_parse_blocks_model
@@ -977,69 +975,21 @@ class PaperContentService:
                 user_paper_id=paper_id if is_user_paper else None
             )
 
-            # 启动后台任务进行解析
-            from ..utils.background_tasks import get_task_manager
-            task_manager = get_task_manager()
-            
-            # 定义后台解析任务
-            def background_parse_task():
-                """后台解析任务"""
-                try:
-                    # 创建应用上下文
-                    try:
-                        from flask import current_app
-                        app_context = current_app.app_context()
-                    except (RuntimeError, ImportError):
-                        from neuink import create_app
-                        app = create_app()
-                        app_context = app.app_context()
-                    
-                    with app_context:
-                        # 阶段1: 解析文本结构
-                        logger.info(f"开始解析文本结构 - parse_id: {parse_id}")
-                        
-                        # 更新进度block状态
-                        self._update_temp_block_stage(section_id, temp_block_id, "structuring", "正在解析文本...")
-                        
-                        # 获取section上下文
-                        section_title = target_section.get("title", "") or target_section.get("titleZh", "")
-                        section_context = f"章节: {section_title}"
-                        
-                        # 解析文本为blocks
-                        parsed_blocks = self._parse_text_to_blocks_with_llm(text, section_context)
-                        
-                        if not parsed_blocks:
-                            raise Exception("文本解析失败，无法生成有效的blocks")
-                        
-                        logger.info(f"解析完成 - 生成 {len(parsed_blocks)} 个blocks")
-                        
-                        # 写入ParseBlocks表
-                        parse_model.set_completed(parse_id, parsed_blocks)
-                        
-                        # 更新临时block状态（但不要插入parsed_blocks到section）
-                        self._update_temp_block_stage(
-                            section_id, temp_block_id, "completed",
-                            "解析完成，请查看结果并选择要保存的内容",
-                            extra_fields={"parseId": parse_id}
-                        )
-                        
-                        logger.info(f"后台解析任务完成 - parse_id: {parse_id}")
-                        
-                except Exception as e:
-                    logger.error(f"后台解析任务失败: {e}")
-                    # 更新ParseBlocks记录为失败状态
-                    parse_model.set_failed(parse_id, str(e))
-                    # 更新临时block为错误状态
-                    self._update_temp_block_stage(
-                        section_id, temp_block_id, "failed",
-                        f"解析失败: {str(e)}"
-                    )
-            
-            # 提交后台任务
-            task_manager.submit_task(
-                task_id=temp_block_id,
-                func=background_parse_task
-            )
+            # 提交持久化后台任务进行解析（进程重启后由其他工作线程继续执行）
+            section_title = target_section.get("title", "") or target_section.get("titleZh", "")
+            try:
+                enqueue_job(
+                    QUEUE_LLM_PARSE,
+                    {
+                        "parseId": parse_id,
+                        "text": text,
+                        "sectionContext": f"章节: {section_title}",
+                    },
+                    job_id=parse_id,
+                )
+            except TaskQueueFullError as exc:
+                parse_model.set_failed(parse_id, str(exc))
+                return self._wrap_failure(BusinessCode.TASK_QUEUE_FULL, str(exc))
             
             # 立即返回，包含parseId信息
             return self._wrap_success(
@@ -1057,135 +1007,306 @@ class PaperContentService:
             error_details = f"从文本添加block到section失败: {exc}\n详细错误: {traceback.format_exc()}"
             return self._wrap_error(error_details)
     
-    def _update_temp_block_stage(self, section_id: str, temp_block_id: str, stage: str, message: str, extra_fields: Optional[Dict[str, Any]] = None):
-        """更新临时进度block的阶段"""
-        try:
-            section = self.section_model.find_by_id(section_id)
-            if not section:
-                return
-            
-            content = section.get("content", [])
-            for i, block in enumerate(content):
-                if block.get("id") == temp_block_id:
-                    content[i]["stage"] = stage
-                    content[i]["message"] = message
-                    
-                    # 添加额外字段，如parseId
-                    if extra_fields:
-                        for key, value in extra_fields.items():
-                            content[i][key] = value
-                    
-                    break
-            
-            self.section_model.update_direct(section_id, {"$set": {"content": content}})
-        except Exception as e:
-            logger.error(f"更新临时block阶段失败: {e}")
- 
-         
-    def _calculate_insert_index(self, section: Dict[str, Any], after_block_id: Optional[str]) -> int:
-        """计算插入位置"""
-        content = section.get("content", []) or []
-        if not after_block_id:
-            return len(content)
-        
-        for i, block in enumerate(content):
-            if block.get("id") == after_block_id:
-                return i + 1
-        
-        return len(content)
+    def run_text_parse(
+        self,
+        parse_id: str,
+        text: str,
+        section_context: str = "",
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> None:
+        """
+        执行一次文本解析（持久化后台任务 llm-parse 的处理函数调用）
 
-    def _remove_temp_block(self, section_id: str, temp_block_id: str) -> bool:
-        """从section中移除临时parsing block"""
+        解析结果只写入 ParseBlocks 记录，等待用户确认；记录已完成、已消费或已删除时直接跳过。
+        失败时抛出异常，由任务队列按退避策略重试，重试用尽后再标记记录失败；
+        任务被取消（如用户放弃解析结果）时在各阶段之间及大模型请求中途中止，不写入结果。
+        """
+        from ..models.parseBlocks import get_parse_blocks_model
+        parse_model = get_parse_blocks_model()
+
+        record = parse_model.find_by_id(parse_id)
+        if not record or record.get("status") not in ("pending", "processing"):
+            logger.info(f"解析记录已结束或不存在，跳过 - parse_id: {parse_id}")
+            return
+
+        # 阶段1: 解析文本结构
+        logger.info(f"开始解析文本结构 - parse_id: {parse_id}")
+        parse_model.set_stage(parse_id, "structuring", "正在解析文本...", progress=10)
+
+        parsed_blocks = self._parse_text_to_blocks_with_llm(text, section_context, cancel_token)
+        if not parsed_blocks:
+            raise Exception("文本解析失败，无法生成有效的blocks")
+
+        logger.info(f"解析完成 - 生成 {len(parsed_blocks)} 个blocks")
+        check_cancelled(cancel_token)
+
+        # 写入ParseBlocks表（不插入section，等待用户确认）
+        parse_model.set_completed(parse_id, parsed_blocks)
+        logger.info(f"后台解析任务完成 - parse_id: {parse_id}")
+
+    # ------------------------------------------------------------------
+    # 块级全文检索
+    # ------------------------------------------------------------------
+    def search_blocks(
+        self,
+        paper_id: str,
+        keyword: str,
+        user_id: str,
+        is_admin: bool = False,
+        is_user_paper: bool = False,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        在一篇论文的章节内容中检索，返回命中的 (paperId, sectionId, blockId, snippet)
+        """
         try:
-            section = self.section_model.find_by_id(section_id)
-            if not section:
-                logger.info(f"Section不存在，跳过移除临时block - section_id: {section_id}")
-                return True  # Section不存在也算成功，因为block肯定不存在
-            
-            content = section.get("content", []) or []
-            # 检查临时block是否存在
-            temp_block_exists = any(b.get("id") == temp_block_id for b in content)
-            
-            if not temp_block_exists:
-                logger.info(f"临时block不存在，跳过移除 - temp_block_id: {temp_block_id}")
-                return True  # Block不存在也算成功
-            
-            new_content = [b for b in content if b.get("id") != temp_block_id]
-            
-            return self.section_model.update_direct(section_id, {"$set": {"content": new_content}})
-        except Exception as e:
-            logger.error(f"移除临时block失败: {e}")
-            return False
+            if not keyword or not keyword.strip():
+                return self._wrap_failure(BusinessCode.INVALID_PARAMS, "搜索关键词不能为空")
+
+            paper, failure = self._find_readable_paper(paper_id, user_id, is_admin, is_user_paper)
+            if failure:
+                return failure
 
-    def _replace_temp_block_with_parsed(
+            section_ids = paper.get("sectionIds") or []
+            return self._search_blocks_in(
+                {section_id: paper_id for section_id in section_ids}, keyword, page, page_size
+            )
+        except Exception as exc:
+            return self._wrap_error(f"搜索章节内容失败: {exc}")
+
+    def get_section_blocks(
         self,
+        paper_id: str,
         section_id: str,
-        temp_block_id: str,
-        insert_index: int,
-        parsed_blocks: List[Dict[str, Any]],
-    ):
+        user_id: Optional[str],
+        is_admin: bool = False,
+        is_user_paper: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+        after_block_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
-        用解析后的 blocks 替换临时进度 block：
-        - 只记录真正新增的 blockId
-        - 同时把 parsed_block_ids 写到临时 block 与内存缓存中，方便轮询兜底使用
+        分页读取章节中的block（offset/limit 或 afterBlockId），只传输当前页的block
+
+        阅读器先渲染首屏，其余部分按需加载；尚未确认的文本解析进度不在分页结果中，
+        由论文详情接口返回
         """
         try:
-            section = self.section_model.find_by_id(section_id)
-            if not section:
-                return
+            if offset < 0 or limit <= 0:
+                return self._wrap_failure(BusinessCode.INVALID_PARAMS, "分页参数无效")
+
+            paper, failure = self._find_readable_paper(paper_id, user_id, is_admin, is_user_paper)
+            if failure:
+                return failure
+            if section_id not in (paper.get("sectionIds") or []):
+                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "章节不存在")
+
+            page = self.section_model.find_blocks(section_id, offset, limit, after_block_id)
+            if page is None:
+                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "章节不存在")
+            if page["offset"] < 0:
+                return self._wrap_failure(BusinessCode.INVALID_PARAMS, "afterBlockId 对应的block不存在")
+
+            blocks = page.get("blocks") or []
+            next_offset = page["offset"] + len(blocks)
+            has_more = next_offset < page["total"]
+            return self._wrap_success("获取block成功", {
+                "sectionId": section_id,
+                "blocks": blocks,
+                "offset": page["offset"],
+                "limit": limit,
+                "total": page["total"],
+                "hasMore": has_more,
+                # 下一页可直接用 afterBlockId 续读，插入/删除前面的block时不会错位
+                "nextAfterBlockId": blocks[-1].get("id") if has_more and blocks else None,
+            })
+        except Exception as exc:
+            return self._wrap_error(f"获取block失败: {exc}")
 
-            content = section.get("content", []) or []
+    def search_library_blocks(
+        self,
+        user_id: str,
+        keyword: str,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        在用户个人论文库的全部论文中检索章节内容，paperId 为个人论文ID
+        """
+        try:
+            if not keyword or not keyword.strip():
+                return self._wrap_failure(BusinessCode.INVALID_PARAMS, "搜索关键词不能为空")
+
+            from ..models.userPaper import get_user_paper_model
+            section_owner: Dict[str, str] = {}
+            for user_paper_id, section_ids in get_user_paper_model().get_section_ids_by_user(user_id).items():
+                for section_id in section_ids:
+                    section_owner.setdefault(section_id, user_paper_id)
+            return self._search_blocks_in(section_owner, keyword, page, page_size)
+        except Exception as exc:
+            return self._wrap_error(f"搜索章节内容失败: {exc}")
 
-            # ① 记录当前已经存在的 blockId（排除临时 block 自己）
-            existing_ids = {
-                b.get("id") for b in content
-                if b.get("id") and b.get("id") != temp_block_id
-            }
+    def _search_blocks_in(
+        self,
+        section_owner: Dict[str, str],
+        keyword: str,
+        page: int,
+        page_size: int,
+    ) -> Dict[str, Any]:
+        """section_owner: sectionId -> 命中结果中返回的 paperId"""
+        page = max(page, 1)
+        hits, total = get_block_search_model().search(
+            list(section_owner), keyword, skip=(page - 1) * page_size, limit=page_size
+        )
+        for hit in hits:
+            hit["paperId"] = section_owner.get(hit["sectionId"])
+        total_pages = (total + page_size - 1) // page_size if page_size else 0
+        return self._wrap_success("搜索成功", {
+            "hits": hits,
+            "pagination": {
+                "page": page,
+                "pageSize": page_size,
+                "total": total,
+                "totalPages": total_pages,
+            },
+        })
+
+    def _find_readable_paper(
+        self,
+        paper_id: str,
+        user_id: Optional[str],
+        is_admin: bool = False,
+        is_user_paper: bool = False,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        读取当前用户可访问的论文（只含sectionIds，不加载章节内容）
 
-            # ② 只把"原来不存在"的 id 当成真正新增的 id
-            parsed_block_ids: List[str] = []
-            for block in parsed_blocks:
-                bid = block.get("id")
-                if not bid:
-                    continue
-                if bid not in existing_ids:
-                    parsed_block_ids.append(bid)
+        user_id 为 None（未登录访问公开论文接口）时只能读取 isPublic 的论文
 
-            # ③ 先在原位置插入解析后的 blocks，但保留临时 block
-            content[insert_index:insert_index] = parsed_blocks
+        Returns:
+            (论文, None)；不存在或无权访问时返回 (None, 失败结果)
+        """
+        if is_user_paper:
+            paper = self._get_user_paper_with_sections(paper_id)
+            if not paper:
+                return None, self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "论文不存在")
+            if user_id is None or paper.get("userId") != user_id:
+                return None, self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权访问此论文")
+        else:
+            paper = self.paper_model.find_by_id(paper_id)
+            if not paper:
+                return None, self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "论文不存在")
+            is_owner = user_id is not None and paper.get("createdBy") == user_id
+            if not is_admin and not paper.get("isPublic") and not is_owner:
+                return None, self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权访问此论文")
+        return paper, None
 
-            # ④ 在临时 block 上写入完成状态 & parsedBlockIds
-            for i, block in enumerate(content):
-                if block.get("id") == temp_block_id:
-                    content[i]["stage"] = "completed"
-                    content[i]["message"] = "解析完成"
-                    content[i]["parsedBlockIds"] = parsed_block_ids
-                    break
+    # ------------------------------------------------------------------
+    # 写时复制（个人论文共享公共论文的section）
+    # ------------------------------------------------------------------
+    def _find_writable_section(
+        self,
+        paper_id: str,
+        section_id: str,
+        is_user_paper: bool = False,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        查找待修改的section
 
-            # ⑤ 更新 section，确保临时 block 和新添加的 blocks 都存在
-            self.section_model.update_direct(section_id, {"$set": {"content": content}})
+        个人论文添加公共论文时直接引用公共论文的section，第一次写入时才复制
+        到个人论文并原位替换 sectionIds 中的引用。返回的section可能是新副本，
+        调用方应使用返回值中的id继续写入。
+        """
+        section = self.section_model.find_by_id(section_id, projection=projection)
+        if section is None or not is_user_paper or section.get("paperId") == paper_id:
+            return section
+
+        forked_id = self._fork_shared_section(paper_id, section_id)
+        if forked_id is None:
+            # 既不属于该个人论文也不在其引用列表中，交给调用方做权限判断
+            return section
+        return self.section_model.find_by_id(forked_id, projection=projection)
+
+    def _fork_shared_section(self, user_paper_id: str, section_id: str) -> Optional[str]:
+        """把个人论文引用的共享section复制为私有副本，返回副本ID"""
+        existing = self.section_model.find_fork(user_paper_id, section_id, projection={"id": 1})
+        if existing:
+            return existing["id"]
+
+        forked = self.section_model.fork(section_id, user_paper_id)
+        if forked is None:
+            return None
 
-            # ⑥ 同时把 parsedBlockIds 记到内存缓存（兜底用）
-            try:
-                # 这里假设你在同文件或可 import 的模块里实现了这个函数
-                remember_parsed_blocks(temp_block_id, section_id, parsed_block_ids)
-            except Exception as cache_err:
-                logger.warning(f"记录解析结果到内存缓存失败: {cache_err}")
+        from ..models.userPaper import get_user_paper_model
+        if get_user_paper_model().replace_section_id(user_paper_id, section_id, forked["id"]):
+            logger.info(f"写时复制section - user_paper_id: {user_paper_id}, {section_id} -> {forked['id']}")
+            # 副本立即建立块索引，/user/search 不必等后台补建
+            self._reindex_section(forked["id"])
+            return forked["id"]
+
+        # 引用已被并发请求替换，或该section不属于此个人论文：撤销本次复制
+        self.section_model.delete(forked["id"])
+        existing = self.section_model.find_fork(user_paper_id, section_id, projection={"id": 1})
+        return existing["id"] if existing else None
+
+    def _delete_section_document(self, section_id: str, paper_id: str) -> bool:
+        """删除section文档；仍被其他个人论文共享引用时只保留文档"""
+        from ..models.userPaper import get_user_paper_model
+        if get_user_paper_model().is_section_referenced(section_id, exclude_paper_id=paper_id):
+            logger.info(f"section仍被个人论文引用，保留文档只移除引用: {section_id}")
+            return True
+        if not self.section_model.delete(section_id):
+            return False
+        try:
+            get_block_search_model().remove_section(section_id)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"删除章节块索引失败 section_id={section_id}: {exc}")
+        return True
 
-            # 给轮询一点时间，确保有机会读到 completed + parsedBlockIds
-            time.sleep(0.5)
+    # ------------------------------------------------------------------
+    # 块级全文检索索引
+    # ------------------------------------------------------------------
+    def _reindex_section(self, section_id: str) -> None:
+        """整章写入成功后重建章节的块索引；失败只记录日志，由后台按 updatedAt 补建"""
+        try:
+            get_block_search_model().index_section(section_id)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"重建章节块索引失败 section_id={section_id}: {exc}")
 
-            # ⑦ 移除临时 block
-            content = [block for block in content if block.get("id") != temp_block_id]
+    def _reindex_blocks(
+        self,
+        section_id: str,
+        paper_id: str,
+        blocks: Optional[List[Dict[str, Any]]] = None,
+        removed_block_ids: Optional[List[str]] = None,
+    ) -> None:
+        """block 写入（keep_search_index=True）成功后只更新被修改 block 的索引（paper_id 为章节的所属论文）"""
+        try:
+            get_block_search_model().index_blocks(
+                section_id, paper_id, blocks or [], removed_block_ids or []
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"更新block索引失败 section_id={section_id}: {exc}")
 
-            # ⑧ 最终更新 section
-            self.section_model.update_direct(section_id, {"$set": {"content": content}})
+    def _bump_paper_version(self, paper_id: str, is_user_paper: bool = False) -> None:
+        bump_paper_version(paper_id, is_user_paper, self.paper_model)
 
-            logger.info(
-                f"成功替换临时block - temp_id: {temp_block_id}, 记录新增 {len(parsed_block_ids)} 个blockId"
-            )
+    def _remove_temp_block(self, section_id: str, temp_block_id: str) -> bool:
+        """
+        从section中移除临时parsing block
+
+        新的解析流程不会把临时block写入section，这里只用于清理历史数据，
+        block不存在时 $pull 不做任何修改
+        """
+        try:
+            if self.section_model.delete_block(section_id, temp_block_id):
+                logger.info(f"已移除历史临时block - temp_block_id: {temp_block_id}")
+            return True
         except Exception as e:
-            logger.error(f"替换临时block失败: {e}")
+            logger.error(f"移除临时block失败: {e}")
+            return False
 
     # ------------------------------------------------------------------
     # 辅助方法
@@ -1219,8 +1340,8 @@ class PaperContentService:
         获取个人论文库中的论文，不包含完整的sections数据，只返回sectionIds
         """
         try:
-            from ..models.userPaper import UserPaperModel
-            user_paper_model = UserPaperModel()
+            from ..models.userPaper import get_user_paper_model
+            user_paper_model = get_user_paper_model()
             user_paper = user_paper_model.find_by_id(user_paper_id)
             
             if not user_paper:
@@ -1237,48 +1358,20 @@ class PaperContentService:
 
     def _add_section_id_to_user_paper(self, user_paper_id: str, section_id: str, position: int) -> bool:
         """
-        向个人论文库中的论文添加section ID引用
+        向个人论文库中的论文添加section ID引用（-1表示添加到末尾）
+
+        使用 $push + $position 原子插入，不读取再整体写回 sectionIds，
+        避免覆盖并发的章节复制（replace_section_id）等写入
         """
         try:
-            from ..models.userPaper import UserPaperModel
-            user_paper_model = UserPaperModel()
-            
-            # 获取当前个人论文
-            user_paper = user_paper_model.find_by_id(user_paper_id)
-            if not user_paper:
-                logger.error(f"个人论文不存在: {user_paper_id}")
-                return False
-                
-            # 获取当前的sectionIds
-            section_ids = user_paper.get("sectionIds", [])
-            logger.info(f"添加前的sectionIds: {section_ids}, 要添加的section_id: {section_id}, position: {position}")
-            
-            # 确定插入位置
-            if position == -1 or position >= len(section_ids):
-                # 在末尾添加
-                section_ids.append(section_id)
-                logger.info(f"在末尾添加section")
-            elif position == 0:
-                # 在最顶部插入
-                section_ids.insert(0, section_id)
-                logger.info(f"在顶部插入section")
-            elif position > 0:
-                # 在指定位置插入（确保position是正数）
-                section_ids.insert(position, section_id)
-                logger.info(f"在位置{position}插入section")
-            else:
-                # position是负数但不是-1，默认添加到末尾
-                section_ids.append(section_id)
-                logger.info(f"position为负数但不是-1，默认添加到末尾")
-            
-            logger.info(f"添加后的sectionIds: {section_ids}")
-            
-            # 使用update_direct方法进行原子更新，确保updatedAt字段正确更新
-            result = user_paper_model.update_direct(user_paper_id, {
-                "$set": {"sectionIds": section_ids}
+            from ..models.basePaper import section_push
+            from ..models.userPaper import get_user_paper_model
+
+            result = get_user_paper_model().update_direct(user_paper_id, {
+                "$push": {"sectionIds": section_push(section_id, position)}
             })
-            
-            logger.info(f"更新个人论文sectionIds结果: {result}")
+            if not result:
+                logger.error(f"个人论文不存在: {user_paper_id}")
             return result
         except Exception as e:
             logger.error(f"更新个人论文库sectionIds失败: {e}", exc_info=True)
@@ -1286,35 +1379,52 @@ class PaperContentService:
 
     def _remove_section_id_from_user_paper(self, user_paper_id: str, section_id: str) -> bool:
         """
-        从个人论文库中的论文移除section ID引用
+        从个人论文库中的论文移除section ID引用（$pull 原子移除）
         """
         try:
-            from ..models.userPaper import UserPaperModel
-            user_paper_model = UserPaperModel()
-            
-            # 获取当前个人论文
-            user_paper = user_paper_model.find_by_id(user_paper_id)
-            if not user_paper:
-                logger.error(f"个人论文不存在: {user_paper_id}")
-                return False
-                
-            # 获取当前的sectionIds并移除指定的section_id
-            section_ids = user_paper.get("sectionIds", [])
-            logger.info(f"移除前的sectionIds: {section_ids}, 要移除的section_id: {section_id}")
-            
-            if section_id in section_ids:
-                section_ids.remove(section_id)
-                logger.info(f"移除后的sectionIds: {section_ids}")
-            else:
-                logger.warning(f"section_id {section_id} 不在sectionIds中")
-            
-            # 使用update_direct方法进行原子更新，确保updatedAt字段正确更新
-            result = user_paper_model.update_direct(user_paper_id, {
-                "$set": {"sectionIds": section_ids}
+            from ..models.userPaper import get_user_paper_model
+
+            result = get_user_paper_model().update_direct(user_paper_id, {
+                "$pull": {"sectionIds": section_id}
             })
-            
-            logger.info(f"更新个人论文sectionIds结果: {result}")
+            if not result:
+                logger.error(f"个人论文不存在: {user_paper_id}")
             return result
         except Exception as e:
             logger.error(f"从个人论文库移除sectionId失败: {e}", exc_info=True)
             return False
+
+
+def bump_paper_version(paper_id: str, is_user_paper: bool = False, paper_model=None) -> None:
+    """
+    章节内容写入后递增所属论文的版本号，使详情缓存和 ETag 失效；失败只记录日志
+
+    Args:
+        paper_model: 管理员论文模型，默认使用 get_admin_paper_model()
+    """
+    try:
+        if is_user_paper:
+            from ..models.userPaper import get_user_paper_model
+            get_user_paper_model().bump_version(paper_id)
+        else:
+            if paper_model is None:
+                from ..models.adminPaper import get_admin_paper_model
+                paper_model = get_admin_paper_model()
+            paper_model.bump_version(paper_id)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning(f"递增论文版本号失败 paper_id={paper_id}: {exc}")
+
+
+def _fail_text_parse(payload: Dict[str, Any], error: str) -> None:
+    """文本解析任务重试用尽：把解析记录标记为失败，前端轮询时展示错误"""
+    from ..models.parseBlocks import get_parse_blocks_model
+    get_parse_blocks_model().set_failed(payload["parseId"], error)
+
+
+@register_job_handler(QUEUE_LLM_PARSE, max_attempts=3, on_dead=_fail_text_parse)
+def run_text_parse_job(payload: Dict[str, Any], cancel_token: CancellationToken) -> None:
+    """持久化后台任务 llm-parse：解析文本为 blocks（只使用 LLM 和 ParseBlocks，与论文模型无关）"""
+    from ..models.adminPaper import get_admin_paper_model
+    PaperContentService(get_admin_paper_model()).run_text_parse(
+        payload["parseId"], payload["text"], payload.get("sectionContext", ""), cancel_token
+    )
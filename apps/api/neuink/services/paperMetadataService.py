@@ -217,8 +217,8 @@ class PaperMetadataService:
             }
 
             # 创建论文
-            from ..models.adminPaper import AdminPaperModel
-            paper_model = AdminPaperModel()
+            from ..models.adminPaper import get_admin_paper_model
+            paper_model = get_admin_paper_model()
             paper_data["createdBy"] = creator_id
             
             # 如果paper_data中包含sections，需要先创建sections并更新paper
@@ -323,8 +323,8 @@ class PaperMetadataService:
             }
 
             # 创建论文
-            from ..models.adminPaper import AdminPaperModel
-            paper_model = AdminPaperModel()
+            from ..models.adminPaper import get_admin_paper_model
+            paper_model = get_admin_paper_model()
             paper_data["createdBy"] = creator_id
             
             # 如果paper_data中包含sections，需要先创建sections并更新paper
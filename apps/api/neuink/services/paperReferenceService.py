@@ -39,8 +39,8 @@ class PaperReferenceService:
         try:
             # 根据是否是用户论文选择不同的模型
             if is_user_paper:
-                from ..models.userPaper import UserPaperModel
-                paper_model = UserPaperModel()
+                from ..models.userPaper import get_user_paper_model
+                paper_model = get_user_paper_model()
                 
                 # 检查用户论文是否存在及权限
                 paper = paper_model.find_by_id(paper_id)
@@ -51,8 +51,8 @@ class PaperReferenceService:
                 if paper["userId"] != user_id:
                     return self._wrap_failure(BusinessCode.PERMISSION_DENIED, "无权修改此论文")
             else:
-                from ..models.adminPaper import AdminPaperModel
-                paper_model = AdminPaperModel()
+                from ..models.adminPaper import get_admin_paper_model
+                paper_model = get_admin_paper_model()
                 
                 # 检查论文是否存在及权限
                 paper = paper_model.find_by_id(paper_id)
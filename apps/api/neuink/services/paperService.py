@@ -2,15 +2,18 @@
 Paper 业务逻辑服务 - 主服务类
 处理论文的基础CRUD操作和查询功能
 """
+import os
 import time
 import logging
 import json
-from typing import Dict, Any, Optional, List, Tuple, Generator
-from ..models.adminPaper import AdminPaperModel
+from typing import Dict, Any, Iterator, Optional, List, Tuple, Generator
+from ..models.adminPaper import get_admin_paper_model
 from ..config.constants import BusinessCode
 from ..utils.llm_utils import get_llm_utils
 from ..utils.common import get_current_time, generate_id
-from ..utils.background_tasks import get_task_manager
+from ..utils.pagination import InvalidCursorError, next_cursor
+from ..utils.cache import LRUCache, create_object_cache
+from ..utils.fieldsets import FieldSelection
 from .paperContentService import PaperContentService
 from .paperTranslationService import PaperTranslationService
 from .paperMetadataService import get_paper_metadata_service
@@ -24,9 +27,12 @@ logger = logging.getLogger(__name__)
 class PaperService(BasePaperService):
     """Paper 业务逻辑服务类 - 主服务"""
 
+    # 管理端列表由一次聚合统计的字段
+    LIST_COMPUTED_FIELDS = ("sectionCount", "blockCount")
+
     def __init__(self) -> None:
         super().__init__()
-        self.paper_model = AdminPaperModel()
+        self.paper_model = get_admin_paper_model()
         self.content_service = PaperContentService(self.paper_model)
         self.translation_service = PaperTranslationService(self.paper_model)
     
@@ -50,6 +56,7 @@ class PaperService(BasePaperService):
         search: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
         user_id: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         try:
             skip = self._calc_skip(page, page_size)
@@ -64,50 +71,89 @@ class PaperService(BasePaperService):
                 search=search,
                 filters=filters,
                 user_id=user_id,
+                cursor=cursor,
             )
 
+            pagination = self._build_pagination(total, page, page_size)
+            pagination["nextCursor"] = (
+                None if search else next_cursor(papers, page_size, sort_by, sort_direction)
+            )
             payload = [self._build_public_summary(paper) for paper in papers]
             return self._wrap_success(
                 "获取公开论文成功",
                 {
                     "papers": payload,
-                    "pagination": self._build_pagination(total, page, page_size),
+                    "pagination": pagination,
                 },
             )
+        except InvalidCursorError as exc:
+            return self._wrap_failure(BusinessCode.INVALID_PARAMS, str(exc))
         except Exception as exc:  # pylint: disable=broad-except
             return self._wrap_error(f"获取公开论文失败: {exc}")
 
-    def get_public_paper_detail(self, paper_id: str) -> Dict[str, Any]:
+    def stream_public_paper(self, paper_id: str, content_only: bool = False) -> Dict[str, Any]:
+        """
+        公开论文详情 / 正文的流式版本
+
+        命中详情缓存时直接从缓存输出；未命中时分批读取章节边读边输出，
+        论文的 block 总数不超过 PAPER_CACHE_FILL_MAX_BLOCKS 时输出完毕后写入详情缓存
+
+        Returns:
+            data 为 {"head": 除sections外的字段, "sections": 章节迭代器}
+        """
         try:
-            # 获取论文详情，默认包含sections数据
-            paper = self.paper_model.find_public_paper_by_id(paper_id)
-            if not paper:
+            version = self.paper_model.get_version(paper_id, {"isPublic": True})
+            if version is None:
                 return self._wrap_failure(
                     BusinessCode.PAPER_NOT_FOUND, "论文不存在或不可访问"
                 )
-           
-            # 自动检查并补全翻译 - 已禁用
-            # paper = self._auto_check_and_complete_translation(paper)
-           
-            return self._wrap_success("获取论文成功", paper)
+
+            cache = get_paper_detail_cache()
+            cache_key = ("public", paper_id, version)
+            paper = cache.get(cache_key)
+            if paper is not None:
+                sections = iter(paper.get("sections", []))
+            else:
+                paper = self.paper_model.find_public_paper_by_id(paper_id, include_sections=False)
+                if not paper:
+                    return self._wrap_failure(
+                        BusinessCode.PAPER_NOT_FOUND, "论文不存在或不可访问"
+                    )
+                sections = self._iter_public_sections(paper, cache, cache_key)
+
+            if content_only:
+                return self._wrap_success(
+                    "获取论文内容成功",
+                    {"head": self._build_public_content(paper), "sections": sections},
+                )
+            head = {key: value for key, value in paper.items() if key != "sections"}
+            return self._wrap_success("获取论文成功", {"head": head, "sections": sections})
         except Exception as exc:  # pylint: disable=broad-except
             return self._wrap_error(f"获取论文失败: {exc}")
 
-    def get_public_paper_content(self, paper_id: str) -> Dict[str, Any]:
-        detail = self.get_public_paper_detail(paper_id)
-        if detail["code"] != BusinessCode.SUCCESS or not detail["data"]:
-            return detail
+    @staticmethod
+    def _iter_public_sections(
+        paper: Dict[str, Any],
+        cache,
+        cache_key: Tuple[Any, ...],
+    ) -> Iterator[Dict[str, Any]]:
+        """分批读取公开论文的章节逐个产出；论文不大时顺便收集完整数据写入详情缓存"""
+        from ..models.section import get_section_model
+
+        max_blocks = int(os.getenv("PAPER_CACHE_FILL_MAX_BLOCKS", "5000"))
+        collected: Optional[List[Dict[str, Any]]] = []
+        block_count = 0
+        for batch in get_section_model().iter_section_batches(paper.get("sectionIds") or []):
+            if collected is not None:
+                block_count += sum(len(section.get("content") or []) for section in batch)
+                if block_count > max_blocks:
+                    collected = None
+                else:
+                    collected.extend(batch)
+            yield from batch
 
-        paper = detail["data"]
-        content = {
-            "metadata": paper.get("metadata", {}),
-            "abstract": paper.get("abstract"),
-            "keywords": paper.get("keywords", []),
-            "sections": paper.get("sections", []),  # 现在返回完整的sections数据
-            "references": paper.get("references", []),
-            "attachments": paper.get("attachments", {}),
-        }
-        return self._wrap_success("获取论文内容成功", content)
+        if collected is not None:
+            cache.set(cache_key, {**paper, "sections": collected})
 
     # ------------------------------------------------------------------
     # 管理端接口
@@ -121,7 +167,14 @@ class PaperService(BasePaperService):
         sort_order: str = "desc",
         search: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[FieldSelection] = None,
+        cached_total: bool = False,
     ) -> Dict[str, Any]:
+        """
+        管理端论文列表；传入 fields 时只读取所选字段，未选择 sectionCount / blockCount 时不做章节统计；
+        cached_total 为 True 时总数可能来自短时缓存
+        """
         try:
             skip = self._calc_skip(page, page_size)
             sort_direction = self._parse_sort_order(sort_order)
@@ -129,6 +182,15 @@ class PaperService(BasePaperService):
             # 添加调试日志
             logger.info(f"get_admin_papers - user_id: {user_id}, sort_by: {sort_by}, sort_order: {sort_order}, search: {search}, filters: {filters}")
 
+            projection = None
+            with_stats = True
+            if fields is not None:
+                with_stats = any(fields.includes(name) for name in self.LIST_COMPUTED_FIELDS)
+                projection = fields.paper_projection(
+                    required=("sectionIds",) if with_stats else (),
+                    computed=self.LIST_COMPUTED_FIELDS,
+                )
+
             papers, total = self.paper_model.find_admin_papers(
                 user_id=user_id,
                 skip=skip,
@@ -137,13 +199,26 @@ class PaperService(BasePaperService):
                 sort_order=sort_direction,
                 search=search,
                 filters=filters or {},
+                cursor=cursor,
+                projection=projection,
+                with_stats=with_stats,
+                cached_total=cached_total,
+            )
+            pagination = self._build_pagination(total, page, page_size)
+            pagination["nextCursor"] = (
+                None if search else next_cursor(papers, page_size, sort_by, sort_direction)
             )
 
             # 添加调试日志
             logger.info(f"get_admin_papers - 查询结果: papers数量: {len(papers)}, total: {total}")
 
-            # 确保每个论文都有 sections 字段，即使是空数组
             for paper in papers:
+                if fields is not None:
+                    # 只保留请求的字段（统计用的 sectionIds 不返回）
+                    if not fields.includes("sectionIds"):
+                        paper.pop("sectionIds", None)
+                    continue
+                # 确保每个论文都有 sections 字段，即使是空数组
                 if "sections" not in paper:
                     paper["sections"] = []
 
@@ -151,9 +226,11 @@ class PaperService(BasePaperService):
                 "获取论文列表成功",
                 {
                     "papers": papers,
-                    "pagination": self._build_pagination(total, page, page_size),
+                    "pagination": pagination,
                 },
             )
+        except InvalidCursorError as exc:
+            return self._wrap_failure(BusinessCode.INVALID_PARAMS, str(exc))
         except Exception as exc:  # pylint: disable=broad-except
             logger.error(f"get_admin_papers - 异常: {exc}")
             return self._wrap_error(f"获取论文列表失败: {exc}")
@@ -164,11 +241,42 @@ class PaperService(BasePaperService):
         if not paper:
             return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "论文不存在")
         
+        # 合并尚未确认的文本解析进度（进度只存放在ParseBlocks中）
+        from ..models.parseBlocks import merge_parse_progress
+        merge_parse_progress(paper.get("sections", []), paper_id)
+        
         # 自动检查并补全翻译 - 已禁用
         # paper = self._auto_check_and_complete_translation(paper)
         
         return self._wrap_success("获取论文成功", paper)
 
+    def stream_admin_paper_detail(
+        self,
+        paper_id: str,
+        user_id: str,
+        fields: Optional[FieldSelection] = None,
+    ) -> Dict[str, Any]:
+        """
+        管理员论文详情的流式版本：data 为 {"head": 不含sections的论文数据, "sections": 章节迭代器}
+
+        fields 转换为论文和章节投影；未请求章节时 sections 为 None
+        """
+        try:
+            paper = self.paper_model.find_admin_paper_by_id(
+                paper_id,
+                include_sections=False,
+                projection=fields.paper_projection() if fields else None,
+            )
+            if not paper:
+                return self._wrap_failure(BusinessCode.PAPER_NOT_FOUND, "论文不存在")
+
+            return self._wrap_success(
+                "获取论文成功",
+                {"head": paper, "sections": self._iter_sections_with_progress(paper, fields)},
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            return self._wrap_error(f"获取论文失败: {exc}")
+
     def create_paper(self, paper_data: Dict[str, Any], context: PaperContext) -> Dict[str, Any]:
         """创建论文 - 支持上下文感知"""
         try:
@@ -383,6 +491,10 @@ class PaperService(BasePaperService):
         """删除block"""
         return self.content_service.delete_block(*args, **kwargs)
 
+    def move_block(self, *args, **kwargs):
+        """移动block"""
+        return self.content_service.move_block(*args, **kwargs)
+
     def add_block_directly(self, *args, **kwargs):
         """直接添加block"""
         return self.content_service.add_block_directly(*args, **kwargs)
@@ -653,6 +765,17 @@ class PaperService(BasePaperService):
 
         return merged, public_total + user_total
 
+    @staticmethod
+    def _build_public_content(paper: Dict[str, Any]) -> Dict[str, Any]:
+        """公开论文正文接口返回的字段（不含sections）"""
+        return {
+            "metadata": paper.get("metadata", {}),
+            "abstract": paper.get("abstract"),
+            "keywords": paper.get("keywords", []),
+            "references": paper.get("references", []),
+            "attachments": paper.get("attachments", {}),
+        }
+
     @staticmethod
     def _build_public_summary(paper: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -688,7 +811,11 @@ class PaperService(BasePaperService):
         }
 
 
-    def _load_sections_for_paper(self, paper: Dict[str, Any]) -> Dict[str, Any]:
+    def _load_sections_for_paper(
+        self,
+        paper: Dict[str, Any],
+        fields: Optional[FieldSelection] = None,
+    ) -> Dict[str, Any]:
         """
         为论文加载sections数据
         注意：此方法已弃用，不再动态添加sections字段
@@ -768,3 +895,32 @@ def get_paper_service() -> PaperService:
     if _paper_service is None:
         _paper_service = PaperService()
     return _paper_service
+
+
+_paper_detail_cache = None
+
+
+def get_paper_detail_cache():
+    """
+    获取论文详情缓存（进程级单例）
+
+    PAPER_CACHE_URL：配置为 redis:// 地址时多进程共享缓存，否则为进程内 LRU 缓存
+    PAPER_CACHE_MAX_ENTRIES / PAPER_CACHE_MAX_MB：进程内缓存的条目数和总大小上限（MB，0 表示不缓存）
+    PAPER_CACHE_TTL：共享缓存条目的过期时间（秒）
+    """
+    global _paper_detail_cache
+    if _paper_detail_cache is None:
+        max_entries = int(os.getenv("PAPER_CACHE_MAX_ENTRIES", "512"))
+        max_bytes = int(float(os.getenv("PAPER_CACHE_MAX_MB", "128")) * 1024 * 1024)
+        try:
+            _paper_detail_cache = create_object_cache(
+                url=os.getenv("PAPER_CACHE_URL", ""),
+                prefix="neuink:paper",
+                max_entries=max_entries,
+                max_bytes=max_bytes,
+                ttl_seconds=float(os.getenv("PAPER_CACHE_TTL", "86400")),
+            )
+        except ImportError as e:
+            logger.warning(f"共享缓存不可用，改用进程内缓存: {str(e)}")
+            _paper_detail_cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+    return _paper_detail_cache
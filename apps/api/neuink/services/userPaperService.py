@@ -4,10 +4,13 @@ UserPaper 业务逻辑服务
 """
 from typing import Dict, Any, List, Optional, Tuple
 
-from ..models.adminPaper import AdminPaperModel
-from ..models.userPaper import UserPaperModel
-from ..models.note import NoteModel
+from ..models.adminPaper import get_admin_paper_model
+from ..models.userPaper import get_user_paper_model
+from ..models.note import get_note_model
+from ..models.userStats import get_user_stats_model
 from ..config.constants import BusinessCode
+from ..utils.pagination import InvalidCursorError, next_cursor
+from ..utils.fieldsets import FieldSelection
 from .basePaperService import BasePaperService
 from ..models.context import PaperContext, check_paper_permission, create_paper_context
 
@@ -15,11 +18,14 @@ from ..models.context import PaperContext, check_paper_permission, create_paper_
 class UserPaperService(BasePaperService):
     """UserPaper 业务逻辑服务类"""
 
+    # 详情中附加的笔记字段
+    DETAIL_COMPUTED_FIELDS = ("notes", "noteCount")
+
     def __init__(self) -> None:
         super().__init__()
-        self.paper_model = AdminPaperModel()
-        self._user_paper_model_instance = UserPaperModel()
-        self._note_model_instance = NoteModel()
+        self.paper_model = get_admin_paper_model()
+        self._user_paper_model_instance = get_user_paper_model()
+        self._note_model_instance = get_note_model()
     
     def get_paper_model(self):
         """获取论文模型实例"""
@@ -55,10 +61,16 @@ class UserPaperService(BasePaperService):
         sort_order: str = "desc",
         search: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        cached_total: bool = False,
+        fields: Optional[FieldSelection] = None,
     ) -> Dict[str, Any]:
         """
         获取用户的个人论文库列表
         优化版本：只返回列表页面需要的字段，不包括完整的论文内容和笔记数量
+        传入 cursor（上一页返回的 nextCursor）时按游标翻页；
+        cached_total 为 True 时总数可能来自短时缓存（无限滚动列表使用）；
+        传入 fields 时只读取所选字段
         """
         try:
             skip = self._calc_skip(page, page_size)
@@ -72,28 +84,38 @@ class UserPaperService(BasePaperService):
                 sort_order=sort_direction,
                 search=search,
                 filters=filters or {},
+                cursor=cursor,
+                cached_total=cached_total,
+                projection=fields.paper_projection() if fields else None,
+            )
+            pagination = self._build_pagination(total, page, page_size)
+            pagination["nextCursor"] = (
+                None if search else next_cursor(papers, page_size, sort_by, sort_direction)
             )
 
-            # 扁平化数据结构，确保所有字段都在顶层
-            for paper in papers:
-                # 确保每篇论文都包含阅读时长字段
-                if "totalReadingTime" not in paper:
-                    paper["totalReadingTime"] = 0
-                if "lastReadTime" not in paper:
-                    paper["lastReadTime"] = None
+            # 扁平化数据结构，确保所有字段都在顶层（指定了 fields 时只返回所选字段）
+            if fields is None:
+                for paper in papers:
+                    # 确保每篇论文都包含阅读时长字段
+                    if "totalReadingTime" not in paper:
+                        paper["totalReadingTime"] = 0
+                    if "lastReadTime" not in paper:
+                        paper["lastReadTime"] = None
 
             return self._wrap_success(
                 "获取个人论文库成功",
                 {
                     "papers": papers,
-                    "pagination": self._build_pagination(total, page, page_size),
+                    "pagination": pagination,
                 },
             )
+        except InvalidCursorError as exc:
+            return self._wrap_failure(BusinessCode.INVALID_PARAMS, str(exc))
         except Exception as exc:  # pylint: disable=broad-except
             return self._wrap_error(f"获取个人论文库失败: {exc}")
 
     # ------------------------------------------------------------------
-    # 添加公共论文到个人库（副本机制）
+    # 添加公共论文到个人库（写时复制）
     # ------------------------------------------------------------------
     def add_public_paper(
         self,
@@ -102,11 +124,14 @@ class UserPaperService(BasePaperService):
         extra: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
-        将公共论文添加到个人论文库（创建副本）
+        将公共论文添加到个人论文库
+
+        个人论文直接引用公共论文的sections，不复制章节内容；用户第一次修改
+        某个section时才由 PaperContentService 复制出该section的私有副本
         """
         try:
-            # 1. 检查公共论文是否存在
-            public_paper = self.paper_model.find_public_paper_by_id(paper_id)
+            # 1. 检查公共论文是否存在（不需要加载sections）
+            public_paper = self.paper_model.find_public_paper_by_id(paper_id, include_sections=False)
             if not public_paper:
                 return self._wrap_failure(
                     BusinessCode.PAPER_NOT_FOUND,
@@ -124,8 +149,9 @@ class UserPaperService(BasePaperService):
                     "该论文已在您的个人库中"
                 )
 
-            # 3. 创建副本
-            paper_data, section_ids = self._extract_paper_data_and_copy_sections(public_paper)
+            # 3. 创建个人论文，sections 共享公共论文的引用
+            paper_data = self._extract_paper_data(public_paper)
+            section_ids = list(public_paper.get("sectionIds") or [])
             
             user_paper_data = {
                 "userId": user_id,
@@ -136,7 +162,7 @@ class UserPaperService(BasePaperService):
                 "keywords": paper_data["keywords"],
                 "references": paper_data["references"],
                 "attachments": paper_data["attachments"],
-                "sectionIds": section_ids,  # 复制的section ID列表
+                "sectionIds": section_ids,  # 共享公共论文的section ID列表
                 "customTags": extra.get("customTags", []) if extra else [],
                 "readingStatus": extra.get("readingStatus", "unread") if extra else "unread",
                 "priority": extra.get("priority", "medium") if extra else "medium",
@@ -144,13 +170,6 @@ class UserPaperService(BasePaperService):
 
             user_paper = self.user_paper_model.create(user_paper_data)
             
-            # 4. 更新sections的paperId为用户论文ID
-            if section_ids and user_paper.get("id"):
-                from ..models.section import get_section_model
-                section_model = get_section_model()
-                for section_id in section_ids:
-                    section_model.update(section_id, {"paperId": user_paper["id"]})
-            
             return self._wrap_success("添加到个人论文库成功", user_paper)
 
         except Exception as exc:  # pylint: disable=broad-except
@@ -284,6 +303,31 @@ class UserPaperService(BasePaperService):
         else:  # 失败
             return self._wrap_failure(result.get("code", BusinessCode.PAPER_NOT_FOUND), result.get("message", "获取论文失败"))
 
+    def stream_user_paper_detail(
+        self,
+        user_paper_id: str,
+        user_id: str,
+        fields: Optional[FieldSelection] = None,
+    ) -> Dict[str, Any]:
+        """
+        个人论文详情（包括笔记）的流式版本：data 为 {"head": 不含sections的论文数据, "sections": 章节迭代器}
+
+        fields 未选择 notes / noteCount 时不查询笔记
+        """
+        context = create_paper_context(user_id, "user")
+        result = self.stream_paper(user_paper_id, context, fields)
+        if result.get("code") != BusinessCode.SUCCESS:
+            return self._wrap_failure(result.get("code", BusinessCode.PAPER_NOT_FOUND), result.get("message", "获取论文失败"))
+
+        user_paper = result["data"]["head"]
+        if fields is None or any(fields.includes(name) for name in self.DETAIL_COMPUTED_FIELDS):
+            notes, _ = self.note_model.find_by_user_paper(user_paper_id)
+            if fields is None or fields.includes("notes"):
+                user_paper["notes"] = notes
+            if fields is None or fields.includes("noteCount"):
+                user_paper["noteCount"] = len(notes)
+        return self._wrap_success("获取论文详情成功", result["data"])
+
     # ------------------------------------------------------------------
     # 更新个人论文
     # ------------------------------------------------------------------
@@ -328,11 +372,10 @@ class UserPaperService(BasePaperService):
     # ------------------------------------------------------------------
     def get_user_statistics(self, user_id: str) -> Dict[str, Any]:
         """
-        获取用户的统计信息
+        获取用户的统计信息（读取增量维护的统计文档，缺失时完整计算一次）
         """
         try:
-            stats = self._get_paper_model().get_user_statistics(user_id)
-            stats["totalNotes"] = self.note_model.count_by_user(user_id)
+            stats = get_user_stats_model().get_or_rebuild(user_id)
             
             return self._wrap_success("获取统计信息成功", stats)
         
@@ -348,7 +391,7 @@ class UserPaperService(BasePaperService):
         从公共论文中提取需要复制的数据，并复制sections到新的section记录
         返回: (paper_data, new_section_ids)
         """
-        from ..models.section import get_section_model
+        from ..models.section import get_section_model, find_sections_by_ids
         from ..utils.common import generate_id
         
         section_model = get_section_model()
@@ -356,18 +399,14 @@ class UserPaperService(BasePaperService):
         # 获取原始sections数据
         sections = public_paper.get("sections", [])
         
-        # 如果sections仍然为空，尝试从数据库加载（作为后备方案）
+        # 如果sections为空但paper有sectionIds，按sectionIds顺序一次性加载
+        if not sections and public_paper.get("sectionIds"):
+            sections = find_sections_by_ids(public_paper["sectionIds"])
+        
+        # 如果仍然没有sections，尝试按paperId加载（最后的后备方案）
         if not sections and "id" in public_paper:
             sections = section_model.find_by_paper_id(public_paper["id"])
         
-        # 如果仍然没有sections，但paper有sectionIds，尝试通过sectionIds加载（最后的后备方案）
-        if not sections and "sectionIds" in public_paper and public_paper["sectionIds"]:
-            sections = []
-            for section_id in public_paper["sectionIds"]:
-                section = section_model.find_by_id(section_id)
-                if section:
-                    sections.append(section)
-        
         # 复制sections并生成新的ID
         new_section_ids = []
         for section in sections:
@@ -402,28 +441,9 @@ class UserPaperService(BasePaperService):
     @staticmethod
     def _extract_paper_data(public_paper: Dict[str, Any]) -> Dict[str, Any]:
         """
-        从公共论文中提取需要复制的数据（保留原方法用于向后兼容）
+        从公共论文中提取个人论文需要的字段（不含sections，sections通过sectionIds共享）
         """
-        # 直接使用已经加载的sections数据，不需要重新加载
-        # find_public_paper_by_id方法已经确保sections数据被正确加载
-        sections = public_paper.get("sections", [])
-        
-        # 如果sections仍然为空，尝试从数据库加载（作为后备方案）
-        if not sections and "id" in public_paper:
-            from ..models.section import get_section_model
-            section_model = get_section_model()
-            sections = section_model.find_by_paper_id(public_paper["id"])
-        
-        # 如果仍然没有sections，但paper有sectionIds，尝试通过sectionIds加载（最后的后备方案）
-        if not sections and "sectionIds" in public_paper and public_paper["sectionIds"]:
-            from ..models.section import get_section_model
-            section_model = get_section_model()
-            sections = []
-            for section_id in public_paper["sectionIds"]:
-                section = section_model.find_by_id(section_id)
-                if section:
-                    sections.append(section)
-        
+        # sections 不再随论文数据返回，因此无需加载
         return {
             "id": public_paper.get("id"),  # 添加论文ID
             "metadata": public_paper.get("metadata", {}),
@@ -5,6 +5,7 @@ from typing import Dict, Any, Optional, List
 from neuink.models.user import get_user_model
 from neuink.utils.auth import generate_token
 from neuink.utils.common import sanitize_user_data
+from neuink.utils.pagination import next_cursor
 from neuink.config.constants import BusinessCode, BusinessMessage
 
 ALLOWED_ROLES = {"admin", "user"}
@@ -183,8 +184,9 @@ class UserService:
         return sanitize_user_data(updated)
     
     def get_users_paginated(self, page: int, limit: int, 
-                           keyword: Optional[str] = None) -> Dict[str, Any]:
-        """获取用户列表（分页）"""
+                           keyword: Optional[str] = None,
+                           cursor: Optional[str] = None) -> Dict[str, Any]:
+        """获取用户列表（分页），无关键词时支持 cursor 游标翻页"""
         # 参数验证
         page = max(1, page)
         limit = max(1, min(100, limit))
@@ -200,7 +202,7 @@ class UserService:
             ]})
         else:
             # 你现有的 Model 若已实现 get_all_users，这里保持调用
-            users = self.user_model.get_all_users(skip, limit)
+            users = self.user_model.get_all_users(skip, limit, cursor)
             total = self.user_model.count_users()
         
         # 清理数据
@@ -212,7 +214,8 @@ class UserService:
                 "page": page,
                 "limit": limit,
                 "total": total,
-                "pages": (total + limit - 1) // limit
+                "pages": (total + limit - 1) // limit,
+                "nextCursor": None if keyword else next_cursor(users, limit, "createdAt", 1),
             }
         }
 
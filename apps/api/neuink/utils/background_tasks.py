@@ -1,232 +1,66 @@
 """
-后台任务管理器
-用于管理需要在后台运行的任务，即使前端断开连接也能继续执行
+后台任务队列配置
+后台任务统一通过持久化任务队列（utils/job_queue.py）执行，这里定义任务类型、优先级，
+以及每个任务类型的并发数、最大排队数和执行时限：排队任务数达到上限时拒绝提交
+（TaskQueueFullError），避免突发请求压垮 LLM 服务和七牛云。
+
+每个进程按 WORKERS 启动工作线程，多进程部署（gunicorn 多 worker、独立消费进程）时
+线程总数随进程数增长；对 LLM 服务和七牛云的并发由全局上限 MAX_RUNNING 约束：
+所有进程中执行中的任务数达到上限时，工作线程暂停领取。
+
+队列配置可通过环境变量覆盖（队列名大写、- 换成 _）：
+
+- TASK_QUEUE_<NAME>_WORKERS：每个进程的工作线程数，例如 TASK_QUEUE_LLM_PARSE_WORKERS=8
+- TASK_QUEUE_<NAME>_MAX_RUNNING：所有进程合计的最大并发数，默认与 WORKERS 的默认值相同
+- TASK_QUEUE_<NAME>_MAX_PENDING：最大排队数
+- TASK_QUEUE_<NAME>_TIMEOUT：单个任务的执行时限（秒），超时后通过取消令牌中止
 """
 
-import threading
-import time
-import queue
-from typing import Dict, Any, Optional, Callable
-from enum import Enum
-import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+# 任务队列（持久化任务类型）
+QUEUE_LLM_PARSE = "llm-parse"
+QUEUE_MINERU_INGEST = "mineru-ingest"
+
+# 任务优先级：数值越小越优先
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+# 各队列的默认配置：(最大并发数, 最大排队数, 执行时限秒数)；
+# 最大并发数同时作为每个进程的工作线程数和全局并发上限的默认值
+DEFAULT_QUEUE_LIMITS: Dict[str, Tuple[int, int, float]] = {
+    QUEUE_LLM_PARSE: (4, 200, 600),
+    QUEUE_MINERU_INGEST: (2, 50, 900),
+}
 
-# 配置日志
-logger = logging.getLogger(__name__)
 
-class TaskStatus(Enum):
-    """任务状态枚举"""
-    PENDING = "pending"
-    RUNNING = "running"
-    COMPLETED = "completed"
-    FAILED = "failed"
-    CANCELLED = "cancelled"
+class TaskQueueFullError(Exception):
+    """队列排队数已达上限，任务被拒绝"""
 
-class BackgroundTask:
-    """后台任务类"""
-    
-    def __init__(
-        self,
-        task_id: str,
-        func: Callable,
-        args: tuple = (),
-        kwargs: dict = None,
-        callback: Optional[Callable] = None
-    ):
-        """
-        初始化后台任务
-        
-        Args:
-            task_id: 任务唯一标识
-            func: 要执行的函数
-            args: 函数位置参数
-            kwargs: 函数关键字参数
-            callback: 完成后的回调函数
-        """
-        self.task_id = task_id
-        self.func = func
-        self.args = args
-        self.kwargs = kwargs or {}
-        self.callback = callback
-        self.status = TaskStatus.PENDING
-        self.result = None
-        self.error = None
-        self.progress = 0
-        self.message = "任务准备中..."
-        self.created_at = time.time()
-        self.started_at = None
-        self.completed_at = None
-        self.thread = None
-        
-    def start(self):
-        """启动任务"""
-        if self.status != TaskStatus.PENDING:
-            return False
-            
-        self.status = TaskStatus.RUNNING
-        self.started_at = time.time()
-        self.thread = threading.Thread(target=self._run)
-        self.thread.daemon = True  # 设置为守护线程，主程序退出时自动结束
-        self.thread.start()
-        return True
-    
-    def _run(self):
-        """执行任务"""
-        try:
-            logger.info(f"开始执行后台任务: {self.task_id}")
-            self.result = self.func(*self.args, **self.kwargs)
-            self.status = TaskStatus.COMPLETED
-            self.message = "任务完成"
-            logger.info(f"后台任务完成: {self.task_id}")
-            
-            # 执行回调
-            if self.callback:
-                try:
-                    self.callback(self.task_id, self.result)
-                except Exception as e:
-                    logger.error(f"任务回调执行失败: {self.task_id}, 错误: {e}")
-                    
-        except Exception as e:
-            self.status = TaskStatus.FAILED
-            self.error = str(e)
-            self.message = f"任务失败: {e}"
-            logger.error(f"后台任务失败: {self.task_id}, 错误: {e}")
-        finally:
-            self.completed_at = time.time()
-    
-    def cancel(self):
-        """取消任务"""
-        if self.status == TaskStatus.RUNNING:
-            self.status = TaskStatus.CANCELLED
-            self.message = "任务已取消"
-            logger.info(f"后台任务已取消: {self.task_id}")
-            return True
-        return False
-    
-    def update_progress(self, progress: int, message: str = ""):
-        """更新任务进度"""
-        self.progress = max(0, min(100, progress))
-        if message:
-            self.message = message
-        logger.debug(f"任务进度更新: {self.task_id}, 进度: {self.progress}%, 消息: {self.message}")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        return {
-            "taskId": self.task_id,
-            "status": self.status.value,
-            "progress": self.progress,
-            "message": self.message,
-            "result": self.result,
-            "error": self.error,
-            "createdAt": self.created_at,
-            "startedAt": self.started_at,
-            "completedAt": self.completed_at
-        }
 
-class BackgroundTaskManager:
-    """后台任务管理器"""
-    
-    def __init__(self):
-        self.tasks: Dict[str, BackgroundTask] = {}
-        self._lock = threading.Lock()
-        
-        # 启动清理线程
-        self._cleanup_thread = threading.Thread(target=self._cleanup_old_tasks, daemon=True)
-        self._cleanup_thread.start()
-    
-    def submit_task(
-        self,
-        task_id: str,
-        func: Callable,
-        args: tuple = (),
-        kwargs: dict = None,
-        callback: Optional[Callable] = None
-    ) -> BackgroundTask:
-        """
-        提交后台任务
-        
-        Args:
-            task_id: 任务唯一标识
-            func: 要执行的函数
-            args: 函数位置参数
-            kwargs: 函数关键字参数
-            callback: 完成后的回调函数
-            
-        Returns:
-            创建的任务对象
-        """
-        with self._lock:
-            if task_id in self.tasks:
-                # 如果任务已存在，先取消旧任务
-                self.tasks[task_id].cancel()
-            
-            task = BackgroundTask(task_id, func, args, kwargs, callback)
-            self.tasks[task_id] = task
-            task.start()
-            
-            logger.info(f"提交后台任务: {task_id}")
-            return task
-    
-    def get_task(self, task_id: str) -> Optional[BackgroundTask]:
-        """获取任务"""
-        with self._lock:
-            return self.tasks.get(task_id)
-    
-    def cancel_task(self, task_id: str) -> bool:
-        """取消任务"""
-        with self._lock:
-            task = self.tasks.get(task_id)
-            if task:
-                return task.cancel()
-            return False
-    
-    def remove_task(self, task_id: str) -> bool:
-        """移除任务"""
-        with self._lock:
-            if task_id in self.tasks:
-                task = self.tasks[task_id]
-                if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
-                    del self.tasks[task_id]
-                    logger.info(f"移除已完成任务: {task_id}")
-                    return True
-            return False
-    
-    def get_all_tasks(self) -> Dict[str, Dict[str, Any]]:
-        """获取所有任务状态"""
-        with self._lock:
-            return {task_id: task.to_dict() for task_id, task in self.tasks.items()}
-    
-    def _cleanup_old_tasks(self):
-        """清理旧任务的后台线程"""
-        while True:
-            try:
-                current_time = time.time()
-                tasks_to_remove = []
-                
-                with self._lock:
-                    for task_id, task in self.tasks.items():
-                        # 清理超过24小时的已完成任务
-                        if (task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED] and
-                            task.completed_at and current_time - task.completed_at > 24 * 3600):
-                            tasks_to_remove.append(task_id)
-                    
-                    for task_id in tasks_to_remove:
-                        del self.tasks[task_id]
-                        logger.info(f"自动清理旧任务: {task_id}")
-                
-                # 每小时检查一次
-                time.sleep(3600)
-                
-            except Exception as e:
-                logger.error(f"清理旧任务时出错: {e}")
-                time.sleep(300)  # 出错时5分钟后重试
+@dataclass(frozen=True)
+class QueueConfig:
+    """单个任务队列的配置"""
+    name: str
+    max_workers: int  # 每个进程的工作线程数
+    max_running: int  # 所有进程合计的最大并发数
+    max_pending: int
+    timeout_seconds: float
 
-# 全局任务管理器实例
-_task_manager: Optional[BackgroundTaskManager] = None
 
-def get_task_manager() -> BackgroundTaskManager:
-    """获取全局任务管理器实例"""
-    global _task_manager
-    if _task_manager is None:
-        _task_manager = BackgroundTaskManager()
-    return _task_manager
\ No newline at end of file
+def load_queue_configs() -> Dict[str, QueueConfig]:
+    """读取各队列配置（默认值 + 环境变量覆盖）"""
+    configs = {}
+    for name, (workers, pending, timeout) in DEFAULT_QUEUE_LIMITS.items():
+        env_name = name.upper().replace("-", "_")
+        configs[name] = QueueConfig(
+            name=name,
+            max_workers=max(1, int(os.getenv(f"TASK_QUEUE_{env_name}_WORKERS", str(workers)))),
+            max_running=max(1, int(os.getenv(f"TASK_QUEUE_{env_name}_MAX_RUNNING", str(workers)))),
+            max_pending=max(1, int(os.getenv(f"TASK_QUEUE_{env_name}_MAX_PENDING", str(pending)))),
+            timeout_seconds=float(os.getenv(f"TASK_QUEUE_{env_name}_TIMEOUT", str(timeout))),
+        )
+    return configs
@@ -0,0 +1,232 @@
+"""
+缓存工具
+
+TTLCache：带过期时间和条目上限的小型缓存，线程安全。
+用于列表总数等"允许短暂不精确"的数据，多进程部署时各进程各自缓存。
+
+LRUCache / RedisCache：接口相同（get / set / invalidate / clear）的对象缓存，
+用于论文详情等大对象。LRUCache 在进程内按最近使用淘汰，同时限制条目数和总字节数；
+RedisCache 供多进程部署共享，通过 create_object_cache 按配置选择。
+键由调用方保证包含版本号，旧版本的条目不主动删除，由淘汰策略或过期时间回收。
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """按写入时间过期的缓存，超过 max_entries 时淘汰最早写入的条目"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取未过期的值，不存在或已过期时返回 None"""
+        if self.ttl_seconds <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate) -> int:
+        """删除所有 predicate(key) 为真的条目，返回删除数量"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def dumps_value(value: Any) -> bytes:
+    """序列化缓存值（datetime 可还原）"""
+    return json.dumps(value, ensure_ascii=False, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads_value(data: bytes) -> Any:
+    return json.loads(data, object_hook=_json_object_hook)
+
+
+def estimate_size(value: Any) -> int:
+    """估算缓存值占用的字节数（按序列化后的长度计）"""
+    return len(dumps_value(value))
+
+
+class LRUCache:
+    """按最近使用淘汰的进程内缓存，同时限制条目数和总字节数，线程安全"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 128 * 1024 * 1024,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0 or self.max_bytes <= 0:
+            return
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            # 单个对象超过总上限时不缓存，避免清空整个缓存
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[0]
+            self._data[key] = (size, value)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[0]
+
+    def invalidate_where(self, predicate) -> int:
+        """删除所有 predicate(key) 为真的条目，返回删除数量"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                self._bytes -= self._data.pop(key)[0]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class RedisCache:
+    """
+    Redis 共享缓存（多进程/多实例部署），值以 JSON 存储并设置过期时间
+
+    需要安装 redis 库；只在配置了 Redis 地址时才会创建。
+    Redis 不可用时读写按未命中处理，不影响请求
+    """
+
+    def __init__(self, url: str, ttl_seconds: float = 86400, prefix: str = "neuink:cache", max_bytes: int = 0):
+        try:
+            import redis  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError(f"无法导入 redis 模块，请确保已安装 redis 库: {str(e)}")
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+
+    def _key(self, key: Hashable) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+        return ":".join([self.prefix, *(str(part) for part in parts)])
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        try:
+            data = self._client.get(self._key(key))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"读取 Redis 缓存失败: {exc}")
+            return None
+        return loads_value(data) if data is not None else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        data = dumps_value(value)
+        if self.max_bytes and len(data) > self.max_bytes:
+            return
+        try:
+            self._client.set(self._key(key), data, ex=max(int(self.ttl_seconds), 1))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"写入 Redis 缓存失败: {exc}")
+
+    def invalidate(self, key: Hashable) -> None:
+        try:
+            self._client.delete(self._key(key))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"删除 Redis 缓存失败: {exc}")
+
+    def clear(self) -> None:
+        for redis_key in self._client.scan_iter(match=f"{self.prefix}:*"):
+            self._client.delete(redis_key)
+
+
+def create_object_cache(
+    url: str = "",
+    prefix: str = "neuink:cache",
+    max_entries: int = 512,
+    max_bytes: int = 128 * 1024 * 1024,
+    ttl_seconds: float = 86400,
+):
+    """按配置创建对象缓存：url 为 redis:// 地址时使用 RedisCache，否则使用进程内 LRUCache"""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url, ttl_seconds=ttl_seconds, prefix=prefix, max_bytes=max_bytes)
+    return LRUCache(max_entries=max_entries, max_bytes=max_bytes)
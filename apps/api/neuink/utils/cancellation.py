@@ -0,0 +1,128 @@
+"""
+后台任务的协作式取消
+
+任务执行端为每个任务创建一个 CancellationToken，传入任务函数；任务函数在阶段之间调用
+raise_if_cancelled()，长时间的 HTTP 请求通过 bind_response() 绑定到令牌，
+取消或超时时主动断开连接，阻塞中的读取立即抛出异常，工作线程随即释放。
+"""
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+
+class TaskCancelledError(Exception):
+    """任务已被取消"""
+
+
+class TaskTimeoutError(TaskCancelledError):
+    """任务执行超过时限"""
+
+
+class CancellationToken:
+    """
+    取消令牌：可由其他线程调用 cancel()，设置 timeout 时由执行端的看门狗在到期后调用 expire()
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason: Optional[str] = None
+        self.timed_out = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        """是否已超过时限（尚未调用 expire() 时也返回 True）"""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def cancel(self, reason: str = "任务已取消") -> bool:
+        """取消任务并执行已注册的回调（如断开 HTTP 连接）；重复取消返回 False"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                pass
+        return True
+
+    def expire(self) -> bool:
+        """超时取消"""
+        self.timed_out = True
+        return self.cancel("任务执行超时")
+
+    def raise_if_cancelled(self) -> None:
+        """已取消或超时时抛出 TaskCancelledError / TaskTimeoutError"""
+        if self.expired and not self.cancelled:
+            self.expire()
+        if self.cancelled:
+            raise (TaskTimeoutError if self.timed_out else TaskCancelledError)(self.reason)
+
+    def wait(self, timeout: float) -> bool:
+        """等待至多 timeout 秒，期间被取消时提前返回 True"""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        注册取消时执行的回调，已取消时立即执行
+
+        Returns:
+            注销函数
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                registered = True
+            else:
+                registered = False
+        if not registered:
+            callback()
+
+        def unregister() -> None:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+        return unregister
+
+    @contextmanager
+    def bind_response(self, response) -> Iterator[None]:
+        """在 with 块内，取消时断开 requests 响应的连接"""
+        unregister = self.on_cancel(lambda: abort_response(response))
+        try:
+            yield
+        finally:
+            unregister()
+
+
+def abort_response(response) -> None:
+    """
+    断开 requests 响应的底层连接
+
+    只 close() 不能唤醒另一个线程中阻塞的 recv，先 shutdown 套接字再关闭
+    """
+    raw = getattr(response, "raw", None)
+    connection = getattr(raw, "_connection", None) or getattr(raw, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
+
+
+def check_cancelled(token: Optional[CancellationToken]) -> None:
+    """token 可为 None 的便捷检查"""
+    if token is not None:
+        token.raise_if_cancelled()
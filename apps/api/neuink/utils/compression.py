@@ -0,0 +1,118 @@
+"""
+响应压缩
+
+对论文相关接口（/papers/*、/public-papers）的 JSON 响应按 Accept-Encoding 协商压缩：
+优先 brotli（需安装 brotli 库），其次 gzip；小于阈值的响应不压缩。
+
+- COMPRESS_MIN_BYTES：压缩阈值（字节），默认 1024
+- COMPRESS_LEVEL：gzip 压缩级别，默认 6；COMPRESS_BR_QUALITY：brotli 质量，默认 5
+- COMPRESS_ENABLED：0 表示关闭（例如由网关统一压缩时）
+
+流式响应（utils/json_stream.py）逐块增量压缩并逐块刷新，不缓冲完整响应体，也不受阈值限制。
+"""
+import gzip
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli 为可选依赖
+    brotli = None
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """按客户端 Accept-Encoding 选择压缩方式，不接受任何压缩时返回 None"""
+    if brotli is not None and accept_encodings.quality("br") > 0:
+        return "br"
+    if accept_encodings.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+def compress_body(data: bytes, encoding: str, gzip_level: int = 6, br_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=br_quality)
+    return gzip.compress(data, compresslevel=gzip_level)
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, gzip_level: int = 6, br_quality: int = 5) -> Iterator[bytes]:
+    """
+    增量压缩流式响应体
+
+    每个输入块（一个章节）压缩后立即同步刷新压缩器，客户端收到即可解压渲染，
+    不会被压缩器内部缓冲拖到缓冲区写满才下发
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=br_quality)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        # wbits=31：带 gzip 头和校验
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+        def flush() -> bytes:
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        for chunk in chunks:
+            data = process(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _weaken_etag(response) -> None:
+    """压缩后的表示与原始字节不同，强 ETag 改为弱 ETag（If-None-Match 按弱比较匹配）"""
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+
+
+def init_app(app, path_prefixes: Iterable[str]) -> None:
+    """为指定路径前缀下的 JSON 响应注册压缩"""
+    if os.getenv("COMPRESS_ENABLED", "1") != "1":
+        return
+
+    prefixes = tuple(path_prefixes)
+    min_bytes = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+    gzip_level = int(os.getenv("COMPRESS_LEVEL", "6"))
+    br_quality = int(os.getenv("COMPRESS_BR_QUALITY", "5"))
+
+    @app.after_request
+    def compress_response(response):
+        if not request.path.startswith(prefixes):
+            return response
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype != "application/json"
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, gzip_level, br_quality)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            _weaken_etag(response)
+            return response
+
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+
+        response.set_data(compress_body(data, encoding, gzip_level, br_quality))
+        response.headers["Content-Encoding"] = encoding
+        _weaken_etag(response)
+        return response
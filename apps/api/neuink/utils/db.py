@@ -44,9 +44,9 @@ def get_db_service():
             """查找单个文档"""
             return self.db[collection_name].find_one(query)
         
-        def find(self, collection_name, query, sort=None):
+        def find(self, collection_name, query, sort=None, projection=None):
             """查找多个文档"""
-            cursor = self.db[collection_name].find(query)
+            cursor = self.db[collection_name].find(query, projection)
             if sort:
                 cursor = cursor.sort(sort)
             return cursor
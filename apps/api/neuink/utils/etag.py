@@ -0,0 +1,49 @@
+"""
+条件请求（ETag / If-None-Match）工具
+
+ETag 由调用方提供的版本信息（论文版本号、章节 updatedAt 等）计算，
+在加载和序列化完整数据之前比较：未变化时直接返回不带响应体的 304。
+"""
+import hashlib
+import json
+from typing import Any, Optional, Tuple
+
+from flask import current_app, request
+
+# 轮询类接口：允许客户端缓存，但每次使用前必须带 If-None-Match 重新校验
+_CACHE_CONTROL_PRIVATE = "private, no-cache"
+_CACHE_CONTROL_PUBLIC = "public, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """由版本信息计算强 ETag（不含引号）"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def etag_matches(etag: Optional[str]) -> bool:
+    """
+    请求的 If-None-Match 是否包含当前 ETag
+
+    按弱比较匹配：压缩后的响应回传的是弱 ETag（W/"..."），客户端原样带回
+    """
+    if not etag:
+        return False
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag: str, public: bool = False):
+    """304 响应：不带响应体，回传 ETag"""
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = _CACHE_CONTROL_PUBLIC if public else _CACHE_CONTROL_PRIVATE
+    return response
+
+
+def with_etag(result: Tuple[Any, int], etag: Optional[str], public: bool = False) -> Tuple[Any, int]:
+    """为 success_response 等返回的 (响应, 状态码) 附加 ETag"""
+    response, status = result
+    if etag and status == 200:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = _CACHE_CONTROL_PUBLIC if public else _CACHE_CONTROL_PRIVATE
+    return response, status
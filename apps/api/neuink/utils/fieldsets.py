@@ -0,0 +1,139 @@
+"""
+稀疏字段集（fields= 查询参数）
+
+客户端用逗号分隔的字段路径指定需要的字段，例如：
+
+- fields=metadata.title,sectionIds：只返回标题和章节ID
+- fields=metadata,sections.title,sections.titleZh：大纲视图，章节只含标题，不含 block 内容
+- fields=sections：完整章节
+
+字段路径直接转换为 MongoDB 包含式投影，传到论文查询和章节加载；
+sections.* 作用于章节文档，未请求 sections 时不加载章节。id 总是返回。
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+SECTIONS_FIELD = "sections"
+MAX_FIELDS = 50
+
+_FIELD_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9]*(\.[A-Za-z0-9]+)*$")
+
+
+def _collapse(paths: Iterable[str]) -> Tuple[str, ...]:
+    """去重、排序，并去掉已被父路径覆盖的子路径（MongoDB 不允许投影路径冲突）"""
+    unique = sorted(set(paths))
+    return tuple(
+        path for path in unique
+        if not any(path.startswith(other + ".") for other in unique)
+    )
+
+
+@dataclass(frozen=True)
+class FieldSelection:
+    """解析后的字段选择"""
+    paper_fields: Tuple[str, ...]
+    # None 表示未请求章节；空元组表示完整章节
+    section_fields: Optional[Tuple[str, ...]] = None
+
+    @property
+    def include_sections(self) -> bool:
+        return self.section_fields is not None
+
+    @property
+    def key(self) -> str:
+        """规范化的字段列表，用于区分 ETag / 缓存"""
+        sections = [
+            f"{SECTIONS_FIELD}.{name}" if name else SECTIONS_FIELD
+            for name in (self.section_fields or ("",) if self.include_sections else ())
+        ]
+        return ",".join(self.paper_fields + tuple(sections))
+
+    def includes(self, name: str) -> bool:
+        """是否请求了某个顶层字段（含其子路径）"""
+        return any(path == name or path.startswith(name + ".") for path in self.paper_fields)
+
+    def paper_projection(self, required: Iterable[str] = (), computed: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        论文文档的包含式投影
+
+        Args:
+            required: 服务端处理需要额外读取的字段（如统计用的 sectionIds）
+            computed: 由服务端计算、不在文档中的字段（如 sectionCount），不进入投影
+        """
+        computed = set(computed)
+        paths = {"id", *required}
+        paths.update(path for path in self.paper_fields if path.split(".")[0] not in computed)
+        if self.include_sections:
+            paths.add("sectionIds")
+        projection: Dict[str, Any] = {"_id": 0}
+        projection.update({path: 1 for path in _collapse(paths)})
+        return projection
+
+    def section_projection(self) -> Optional[Dict[str, Any]]:
+        """章节文档的投影；请求完整章节时返回 None（由章节加载使用默认投影）"""
+        if not self.section_fields:
+            return None
+        projection: Dict[str, Any] = {"_id": 0, "id": 1}
+        projection.update({path: 1 for path in self.section_fields})
+        return projection
+
+    def includes_section_field(self, name: str) -> bool:
+        """章节是否包含某个字段（完整章节时总是包含）"""
+        if self.section_fields is None:
+            return False
+        if not self.section_fields:
+            return True
+        return any(path == name or path.startswith(name + ".") for path in self.section_fields)
+
+
+def parse_fields(
+    raw: Optional[str],
+    allowed: Iterable[str],
+    allowed_section_fields: Iterable[str] = (),
+) -> Optional[FieldSelection]:
+    """
+    解析 fields 参数，未传或为空时返回 None（返回完整数据）
+
+    Args:
+        allowed: 可选择的论文顶层字段
+        allowed_section_fields: 可选择的章节顶层字段，为空时不支持 sections
+
+    Raises:
+        ValueError: 字段格式错误或不支持
+    """
+    if not raw or not raw.strip():
+        return None
+
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    if len(names) > MAX_FIELDS:
+        raise ValueError(f"fields 最多指定 {MAX_FIELDS} 个字段")
+
+    allowed = set(allowed)
+    allowed_section_fields = set(allowed_section_fields)
+    paper_fields = []
+    section_fields = []
+    want_sections = False
+    full_sections = False
+    for name in names:
+        if not _FIELD_PATTERN.match(name):
+            raise ValueError(f"无效的字段: {name}")
+        top, _, rest = name.partition(".")
+        if top == SECTIONS_FIELD and allowed_section_fields:
+            want_sections = True
+            if not rest:
+                full_sections = True
+            elif rest.split(".")[0] in allowed_section_fields:
+                section_fields.append(rest)
+            else:
+                raise ValueError(f"不支持的字段: {name}")
+        elif top in allowed:
+            paper_fields.append(name)
+        else:
+            raise ValueError(f"不支持的字段: {name}")
+
+    sections: Optional[Tuple[str, ...]] = None
+    if want_sections:
+        # 请求了完整章节时忽略其他 sections.* 字段
+        sections = () if full_sections else _collapse(section_fields)
+    return FieldSelection(paper_fields=_collapse(paper_fields), section_fields=sections)
@@ -0,0 +1,232 @@
+"""
+进程内倒排索引（BM25 排序）
+
+- 词项映射为整数 id，倒排表用 array 存储（文档序号 + 词频），比 dict/list 紧凑得多
+- 文档按序号追加；更新 = 删除旧序号 + 追加新序号，删除只记墓碑，
+  墓碑超过一定比例时整体压缩
+- 支持多字段加权：字段权重直接乘到词频上（简化的 BM25F）
+
+本模块不依赖数据库，可单独使用；线程安全由调用方（或 RLock）保证。
+"""
+import heapq
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Tokenizer = Callable[[str], List[str]]
+
+# 墓碑占比超过该值时压缩倒排表
+_COMPACT_RATIO = 0.25
+# 词频上限（array 'H' 为 16 位无符号整数）
+_MAX_TF = 0xFFFF
+
+
+class InvertedIndex:
+    """BM25 倒排索引"""
+
+    def __init__(
+        self,
+        tokenizer: Tokenizer,
+        field_weights: Optional[Dict[str, int]] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.tokenizer = tokenizer
+        self.field_weights = field_weights or {}
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._term_ids: Dict[str, int] = {}
+        self._postings_docs: List[array] = []   # term id -> 文档序号
+        self._postings_tf: List[array] = []     # term id -> 加权词频
+        self._df = array("I")                   # term id -> 有效文档数
+        self._doc_ids: List[Optional[str]] = []  # 文档序号 -> 外部 id（None 表示已删除）
+        self._doc_len = array("I")              # 文档序号 -> 加权长度
+        self._doc_terms: List[Optional[array]] = []  # 文档序号 -> 词项 id，用于删除时维护 df
+        self._ordinal: Dict[str, int] = {}      # 外部 id -> 当前文档序号
+        self._total_len = 0
+        self._tombstones = 0
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    def _term_id(self, term: str) -> int:
+        tid = self._term_ids.get(term)
+        if tid is None:
+            tid = len(self._postings_docs)
+            self._term_ids[term] = tid
+            self._postings_docs.append(array("I"))
+            self._postings_tf.append(array("H"))
+            self._df.append(0)
+        return tid
+
+    def _weighted_counts(self, fields: Dict[str, str]) -> Counter:
+        counts: Counter = Counter()
+        for name, text in fields.items():
+            if not text:
+                continue
+            weight = self.field_weights.get(name, 1)
+            for token in self.tokenizer(text):
+                counts[token] += weight
+        return counts
+
+    def add(self, doc_id: str, fields: Dict[str, str]) -> None:
+        """添加或替换文档"""
+        counts = self._weighted_counts(fields)
+        with self._lock:
+            self._remove_locked(doc_id)
+            ordinal = len(self._doc_ids)
+            terms = array("I")
+            length = 0
+            for term, tf in counts.items():
+                tid = self._term_id(term)
+                self._postings_docs[tid].append(ordinal)
+                self._postings_tf[tid].append(min(tf, _MAX_TF))
+                self._df[tid] += 1
+                terms.append(tid)
+                length += tf
+            self._doc_ids.append(doc_id)
+            self._doc_len.append(length)
+            self._doc_terms.append(terms)
+            self._ordinal[doc_id] = ordinal
+            self._total_len += length
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            removed = self._remove_locked(doc_id)
+            if removed and self._tombstones > _COMPACT_RATIO * max(len(self._doc_ids), 1):
+                self._compact_locked()
+            return removed
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        ordinal = self._ordinal.pop(doc_id, None)
+        if ordinal is None:
+            return False
+        for tid in self._doc_terms[ordinal] or ():
+            self._df[tid] -= 1
+        self._total_len -= self._doc_len[ordinal]
+        self._doc_ids[ordinal] = None
+        self._doc_terms[ordinal] = None
+        self._tombstones += 1
+        return True
+
+    def _compact_locked(self) -> None:
+        """重新编号文档并重建倒排表，丢弃墓碑和不再出现的词项"""
+        old_doc_ids = self._doc_ids
+        old_docs, old_tf = self._postings_docs, self._postings_tf
+        old_terms = {tid: term for term, tid in self._term_ids.items()}
+        old_len = self._doc_len
+
+        remap = array("i", [-1]) * len(old_doc_ids)
+        new_doc_ids: List[Optional[str]] = []
+        new_len = array("I")
+        for ordinal, doc_id in enumerate(old_doc_ids):
+            if doc_id is not None:
+                remap[ordinal] = len(new_doc_ids)
+                new_doc_ids.append(doc_id)
+                new_len.append(old_len[ordinal])
+
+        self._term_ids = {}
+        self._postings_docs, self._postings_tf = [], []
+        self._df = array("I")
+        new_doc_terms: List[Optional[array]] = [array("I") for _ in new_doc_ids]
+        for old_tid, docs in enumerate(old_docs):
+            tfs = old_tf[old_tid]
+            kept_docs, kept_tf = array("I"), array("H")
+            for ordinal, tf in zip(docs, tfs):
+                new_ordinal = remap[ordinal]
+                if new_ordinal >= 0:
+                    kept_docs.append(new_ordinal)
+                    kept_tf.append(tf)
+            if not kept_docs:
+                continue
+            tid = len(self._postings_docs)
+            self._term_ids[old_terms[old_tid]] = tid
+            self._postings_docs.append(kept_docs)
+            self._postings_tf.append(kept_tf)
+            self._df.append(len(kept_docs))
+            for ordinal in kept_docs:
+                new_doc_terms[ordinal].append(tid)
+
+        self._doc_ids = new_doc_ids
+        self._doc_len = new_len
+        self._doc_terms = new_doc_terms
+        self._ordinal = {doc_id: ordinal for ordinal, doc_id in enumerate(new_doc_ids)}
+        self._tombstones = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._ordinal)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._ordinal
+
+    def doc_ids(self) -> Iterable[str]:
+        return list(self._ordinal)
+
+    def search(
+        self,
+        query: str,
+        query_tokenizer: Optional[Tokenizer] = None,
+        limit: Optional[int] = None,
+        max_df_ratio: Optional[float] = None,
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        BM25 检索
+
+        查询词之间为"或"关系；query_tokenizer 默认与写入时相同
+
+        Args:
+            limit: 只返回得分最高的 limit 个文档
+            max_df_ratio: 出现在超过该比例文档中的词（如 of、the）视为停用词忽略；
+                所有查询词都超过该比例时仍按原样检索
+
+        Returns:
+            (按得分降序排列的 [(文档 id, 得分)], 命中的文档总数)
+        """
+        terms = list(dict.fromkeys((query_tokenizer or self.tokenizer)(query)))
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            doc_count = len(self._ordinal)
+            if doc_count == 0:
+                return [], 0
+            postings = [
+                (tid, self._df[tid])
+                for tid in (self._term_ids.get(term) for term in terms)
+                if tid is not None and self._df[tid] > 0
+            ]
+            if max_df_ratio is not None:
+                selective = [(tid, df) for tid, df in postings if df <= max_df_ratio * doc_count]
+                if selective:
+                    postings = selective
+
+            avg_len = self._total_len / doc_count if doc_count else 0.0
+            scores: Dict[int, float] = {}
+            k1, b = self.k1, self.b
+            for tid, df in postings:
+                idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+                doc_ids, doc_len = self._doc_ids, self._doc_len
+                for ordinal, tf in zip(self._postings_docs[tid], self._postings_tf[tid]):
+                    if doc_ids[ordinal] is None:
+                        continue
+                    norm = k1 * (1.0 - b + b * doc_len[ordinal] / avg_len) if avg_len else k1
+                    scores[ordinal] = scores.get(ordinal, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+
+            if limit is not None and limit < len(scores):
+                ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            else:
+                ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return [(self._doc_ids[ordinal], score) for ordinal, score in ranked], len(scores)
@@ -0,0 +1,346 @@
+"""
+持久化后台任务队列
+任务写入 BackgroundJobs 集合（models/backgroundJob.py），由各进程的工作线程通过租约领取执行，
+进程重启或崩溃后，租约过期的任务会被回收并由其他工作线程继续执行。
+
+- 处理函数通过 register_job_handler(kind) 按任务类型注册，参数为任务的 payload（需可写入 MongoDB）
+  和取消令牌 cancel_token（utils/cancellation.py）
+- 每个任务类型的工作线程数、全局并发上限、最大排队数、执行时限沿用 background_tasks 中的队列配置
+- 失败或超时按指数退避重试，重试用尽转入死信并调用 on_dead 回调（如把解析记录标记为失败）
+- cancel_job() 取消任务：排队中直接取消；执行中由监视线程在一秒内发现并取消令牌，
+  处理函数在阶段之间或 HTTP 读取时中止
+
+配置（环境变量）：
+
+- JOB_WORKERS_ENABLED：1（默认）表示在 Web 服务进程内启动工作线程（见 utils/workers.py，
+  命令行进程不启动）；0 表示只入队，由 `flask --app run run-jobs` 启动的独立进程消费
+- JOB_LEASE_SECONDS：租约时长（秒），默认 60，执行期间每 1/3 租约续约一次
+- JOB_POLL_INTERVAL：空闲时轮询间隔（秒），默认 1
+- JOB_CANCEL_POLL_INTERVAL：执行期间检查取消请求和时限的间隔（秒），默认 1
+- JOB_RETRY_BASE_DELAY / JOB_RETRY_MAX_DELAY：重试退避的初始 / 最大间隔（秒），默认 5 / 300
+"""
+import logging
+import os
+import random
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .background_tasks import PRIORITY_NORMAL, TaskQueueFullError, load_queue_configs
+from .cancellation import CancellationToken, TaskCancelledError
+from .workers import register_worker, start_workers
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[Dict[str, Any], CancellationToken], Any]
+DeadCallback = Callable[[Dict[str, Any], str], None]
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    """任务类型的处理函数注册信息"""
+    kind: str
+    func: JobFunc
+    max_attempts: int
+    on_dead: Optional[DeadCallback] = None
+
+
+_handlers: Dict[str, JobHandler] = {}
+
+LEASE_LOST_REASON = "租约已丢失"
+
+
+def register_job_handler(
+    kind: str,
+    max_attempts: int = 3,
+    on_dead: Optional[DeadCallback] = None,
+) -> Callable[[JobFunc], JobFunc]:
+    """
+    注册任务类型的处理函数（装饰器）
+
+    Args:
+        max_attempts: 最多执行次数（含首次）
+        on_dead: 重试用尽转入死信时调用，参数为 (payload, 错误信息)
+    """
+    def decorator(func: JobFunc) -> JobFunc:
+        _handlers[kind] = JobHandler(kind, func, max_attempts, on_dead)
+        return func
+    return decorator
+
+
+def enqueue_job(
+    kind: str,
+    payload: Dict[str, Any],
+    priority: int = PRIORITY_NORMAL,
+    job_id: Optional[str] = None,
+    revive: bool = False,
+) -> Dict[str, Any]:
+    """
+    提交持久化后台任务
+
+    Args:
+        job_id: 业务上唯一的任务ID（如解析记录ID），重复提交同一ID不会产生第二个任务
+        revive: 同ID任务已结束（完成、死信、取消）时重新排队，而不是直接返回已结束的任务
+
+    Raises:
+        TaskQueueFullError: 该类型的待执行任务数已达上限
+        ValueError: 未注册的任务类型
+    """
+    from ..models.backgroundJob import get_background_job_model
+
+    handler = _handlers.get(kind)
+    if handler is None:
+        raise ValueError(f"未注册的任务类型: {kind}")
+
+    model = get_background_job_model()
+    config = load_queue_configs().get(kind)
+    if config is not None and model.count_pending(kind) >= config.max_pending:
+        raise TaskQueueFullError(f"任务队列 {kind} 已满（{config.max_pending}），请稍后重试")
+
+    job = model.enqueue(kind, payload, priority, handler.max_attempts, job_id, revive)
+    logger.info(f"提交持久化任务: {job['id']}, 类型: {kind}, 优先级: {priority}")
+    return job
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    取消持久化后台任务
+
+    Returns:
+        任务是否处于可取消的状态（已结束或不存在时返回 False）
+    """
+    from ..models.backgroundJob import get_background_job_model
+
+    cancelled = get_background_job_model().request_cancel(job_id)
+    if cancelled:
+        logger.info(f"已请求取消持久化任务: {job_id}")
+    return cancelled
+
+
+class JobRunner:
+    """
+    持久化任务的执行端：每个已注册的任务类型启动若干工作线程轮询领取任务，
+    另有一个回收线程定期回收租约过期的任务
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+        self.retry_base_delay = float(os.getenv("JOB_RETRY_BASE_DELAY", "5"))
+        self.retry_max_delay = float(os.getenv("JOB_RETRY_MAX_DELAY", "300"))
+        self.cancel_poll_interval = float(os.getenv("JOB_CANCEL_POLL_INTERVAL", "1"))
+        configs = load_queue_configs()
+        self.timeouts = {kind: config.timeout_seconds for kind, config in configs.items()}
+        self.max_running = {kind: config.max_running for kind, config in configs.items()}
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        configs = load_queue_configs()
+        for kind, handler in _handlers.items():
+            workers = configs[kind].max_workers if kind in configs else 1
+            for index in range(workers):
+                worker_id = f"{self.worker_prefix}:{kind}-{index + 1}"
+                self._spawn(self._worker_loop, (handler, worker_id), f"job-{kind}-{index + 1}")
+        self._spawn(self._reaper_loop, (), "job-reaper")
+        logger.info(f"持久化任务工作线程已启动: {', '.join(_handlers) or '无已注册任务类型'}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _spawn(self, target, args, name: str) -> None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _worker_loop(self, handler: JobHandler, worker_id: str) -> None:
+        from ..models.backgroundJob import get_background_job_model
+
+        max_running = self.max_running.get(handler.kind)
+        while not self._stop.is_set():
+            job = None
+            try:
+                with self.app.app_context():
+                    model = get_background_job_model()
+                    # 全局并发上限：所有进程中执行中的任务数已达上限时本轮不领取
+                    # （并发领取时可能短暂超出，超出量不超过同时领取的线程数）
+                    if max_running is None or model.count_running(handler.kind) < max_running:
+                        job = model.claim(handler.kind, worker_id, self.lease_seconds)
+                    if job is not None:
+                        self._execute(handler, job, worker_id)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error(f"持久化任务工作线程异常: {worker_id}, 错误: {exc}")
+            if job is None:
+                self._stop.wait(self.poll_interval)
+
+    def _execute(self, handler: JobHandler, job: Dict[str, Any], worker_id: str) -> None:
+        from ..models.backgroundJob import get_background_job_model
+
+        model = get_background_job_model()
+        job_id = job["id"]
+        token = CancellationToken(self.timeouts.get(handler.kind))
+        finished = threading.Event()
+        watcher = threading.Thread(
+            target=self._watch_loop,
+            args=(job_id, worker_id, token, finished),
+            name=f"job-watch-{job_id}",
+            daemon=True,
+        )
+        watcher.start()
+
+        logger.info(f"开始执行持久化任务: {job_id}, 类型: {handler.kind}, 第 {job['attempts']} 次")
+        try:
+            result = handler.func(job.get("payload") or {}, token)
+        except TaskCancelledError as exc:
+            finished.set()
+            self._handle_cancelled(handler, job, worker_id, token, exc)
+            return
+        except Exception as exc:  # pylint: disable=broad-except
+            finished.set()
+            if token.cancelled:
+                # 连接被主动断开时处理函数抛出的是网络异常，按取消原因处理
+                self._handle_cancelled(handler, job, worker_id, token, exc)
+            else:
+                self._handle_failure(handler, job, worker_id, str(exc))
+            return
+        finally:
+            finished.set()
+
+        if model.complete(job_id, worker_id, result):
+            logger.info(f"持久化任务完成: {job_id}")
+        else:
+            logger.warning(f"持久化任务完成但租约已丢失，结果未记录: {job_id}")
+
+    def _handle_cancelled(
+        self,
+        handler: JobHandler,
+        job: Dict[str, Any],
+        worker_id: str,
+        token: CancellationToken,
+        exc: Exception,
+    ) -> None:
+        from ..models.backgroundJob import get_background_job_model
+
+        if token.timed_out or (not token.cancelled and token.expired):
+            self._handle_failure(handler, job, worker_id, "任务执行超时")
+        elif token.reason == LEASE_LOST_REASON:
+            logger.warning(f"持久化任务租约已丢失，已中止执行: {job['id']}")
+        elif get_background_job_model().mark_cancelled(job["id"], worker_id, token.reason or str(exc)):
+            logger.info(f"持久化任务已取消: {job['id']}")
+
+    def _handle_failure(self, handler: JobHandler, job: Dict[str, Any], worker_id: str, error: str) -> None:
+        from ..models.backgroundJob import get_background_job_model
+
+        model = get_background_job_model()
+        attempts = job.get("attempts", 1)
+        if attempts >= job.get("maxAttempts", handler.max_attempts):
+            if model.bury(job["id"], worker_id, error):
+                logger.error(f"持久化任务重试用尽，转入死信: {job['id']}, 错误: {error}")
+                self._notify_dead(handler, job.get("payload") or {}, error)
+            return
+
+        # 指数退避，加入随机抖动避免同时重试
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+        delay *= random.uniform(0.8, 1.2)
+        if model.retry(job["id"], worker_id, error, delay):
+            logger.warning(f"持久化任务失败，{delay:.0f} 秒后重试: {job['id']}, 错误: {error}")
+
+    @staticmethod
+    def _notify_dead(handler: Optional[JobHandler], payload: Dict[str, Any], error: str) -> None:
+        if handler is None or handler.on_dead is None:
+            return
+        try:
+            handler.on_dead(payload, error)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(f"死信回调执行失败: {handler.kind}, 错误: {exc}")
+
+    def _watch_loop(
+        self,
+        job_id: str,
+        worker_id: str,
+        token: CancellationToken,
+        finished: threading.Event,
+    ) -> None:
+        """
+        执行期间的监视线程：到达时限时取消令牌；检查取消请求；每 1/3 租约续约一次，
+        租约丢失（已被其他工作线程重新领取）时中止本次执行
+        """
+        from ..models.backgroundJob import get_background_job_model
+
+        renew_every = max(1, int(self.lease_seconds / 3 / self.cancel_poll_interval))
+        ticks = 0
+        while not finished.wait(self.cancel_poll_interval):
+            if token.expired:
+                token.expire()
+                return
+            ticks += 1
+            try:
+                with self.app.app_context():
+                    model = get_background_job_model()
+                    if ticks % renew_every == 0:
+                        state = model.heartbeat(job_id, worker_id, self.lease_seconds)
+                        if state is None:
+                            token.cancel(LEASE_LOST_REASON)
+                            return
+                        cancel_requested = bool(state.get("cancelRequested"))
+                    else:
+                        cancel_requested = model.is_cancel_requested(job_id)
+                if cancel_requested:
+                    token.cancel("任务已被取消")
+                    return
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning(f"持久化任务续约失败: {job_id}, 错误: {exc}")
+
+    def _reaper_loop(self) -> None:
+        from ..models.backgroundJob import get_background_job_model
+
+        while not self._stop.wait(self.lease_seconds):
+            try:
+                with self.app.app_context():
+                    recovered = get_background_job_model().requeue_expired()
+                    for entry in recovered["requeued"]:
+                        logger.warning(f"回收租约过期的持久化任务并重新排队: {entry['id']}")
+                    for entry in recovered["dead"]:
+                        logger.error(f"租约过期且重试用尽，转入死信: {entry['id']}")
+                        self._notify_dead(_handlers.get(entry["kind"]), entry["payload"], "租约过期且重试次数用尽")
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error(f"回收持久化任务失败: {exc}")
+
+
+_runner: Optional[JobRunner] = None
+
+
+def init_app(app) -> None:
+    """注册独立消费命令，并登记 Web 服务进程内的工作线程"""
+
+    @app.cli.command("run-jobs")
+    def run_jobs_command():
+        """以独立进程消费持久化后台任务（Ctrl+C 退出），同时运行 MinerU 轮询等后台线程"""
+        start_workers(app)
+        # JOB_WORKERS_ENABLED=0 只关闭 Web 进程内的工作线程，独立消费进程总是启动
+        runner = _runner or _start_runner(app)
+        try:
+            runner.join()
+        except KeyboardInterrupt:
+            runner.stop()
+
+    register_worker(app, _start_enabled_runner)
+
+
+def _start_enabled_runner(app) -> None:
+    if os.getenv("JOB_WORKERS_ENABLED", "1") == "1" and _runner is None:
+        _start_runner(app)
+
+
+def _start_runner(app) -> JobRunner:
+    global _runner
+    _runner = JobRunner(app)
+    _runner.start()
+    return _runner
@@ -0,0 +1,164 @@
+"""
+JSON 序列化
+
+OrjsonProvider：基于 orjson 的 Flask JSON provider，序列化深层嵌套的 block 树比标准库快一个数量级。
+输出与默认 provider 保持一致：datetime 仍按 HTTP 日期格式输出、键排序；
+中文直接输出 UTF-8，不再转义为 \\uXXXX（体积更小，语义相同）。
+
+orjson 为可选依赖：未安装或 JSON_PROVIDER=default 时使用 Flask 默认 provider。
+"""
+import json
+import os
+import time
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装时退回默认 provider
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """基于 orjson 的 JSON provider"""
+
+    option = (
+        (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        if orjson else 0
+    )
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        option = self.option | orjson.OPT_INDENT_2 if indent else self.option
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # 调用方指定了 orjson 不支持的参数（cls、ensure_ascii 等）时交给标准库
+        if set(kwargs) - {"indent", "separators", "sort_keys"}:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # 直接输出 bytes，省去一次 str 编码
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype)
+
+
+def init_app(app) -> None:
+    """
+    按配置设置 JSON provider，并注册序列化基准测试命令
+
+    JSON_PROVIDER：orjson（默认，未安装时自动退回）或 default
+    """
+    name = os.getenv("JSON_PROVIDER", "orjson").lower()
+    if name == "orjson" and orjson is not None:
+        app.json = OrjsonProvider(app)
+        app.logger.info("[CONFIG] JSON provider: orjson")
+    elif name == "orjson":
+        app.logger.info("[CONFIG] orjson not installed, using default JSON provider")
+
+    @app.cli.command("bench-json")
+    def bench_json_command():
+        """对比 500 个 block 的论文在不同 JSON provider / 压缩方式下的耗时和体积"""
+        for line in run_payload_benchmark(app):
+            print(line)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+def build_sample_paper(block_count: int = 500, blocks_per_section: int = 25) -> dict:
+    """构造一篇结构与真实数据一致的论文（中英文段落、公式、列表、图片）"""
+    from datetime import datetime
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def inline(text: str) -> list:
+        return [
+            {"type": "text", "content": text, "style": {}},
+            {"type": "inline-math", "latex": "\\alpha_i = \\frac{e^{s_i}}{\\sum_j e^{s_j}}"},
+            {"type": "link", "url": "https://example.com", "children": [{"type": "text", "content": "ref"}]},
+        ]
+
+    sections = []
+    for s in range(max(block_count // blocks_per_section, 1)):
+        content = []
+        for b in range(blocks_per_section):
+            idx = s * blocks_per_section + b
+            kind = idx % 4
+            if kind == 0:
+                block = {"type": "paragraph", "content": {
+                    "en": inline(f"Paragraph {idx}: attention weights are normalized over all positions. " * 3),
+                    "zh": inline(f"第{idx}段：注意力权重在所有位置上归一化，模型据此聚合上下文信息。" * 3),
+                }}
+            elif kind == 1:
+                block = {"type": "heading", "level": 2, "content": {
+                    "en": inline(f"Heading {idx}"), "zh": inline(f"标题 {idx}"),
+                }}
+            elif kind == 2:
+                block = {"type": "unordered-list", "items": [
+                    {"content": {"en": inline(f"Item {i} of block {idx}"), "zh": inline(f"第{idx}块第{i}项")}}
+                    for i in range(4)
+                ]}
+            else:
+                block = {"type": "figure", "src": f"https://cdn.example.com/fig-{idx}.png",
+                         "alt": f"figure {idx}", "width": 800, "height": 600,
+                         "caption": {"en": inline(f"Figure {idx}."), "zh": inline(f"图 {idx}。")}}
+            block.update({"id": f"block-{idx}", "createdAt": now})
+            content.append(block)
+        sections.append({
+            "id": f"section-{s}", "paperId": "paper-bench", "title": f"Section {s}",
+            "titleZh": f"第{s}节", "content": content, "createdAt": now, "updatedAt": now,
+        })
+
+    return {
+        "code": 0,
+        "message": "获取论文成功",
+        "data": {
+            "id": "paper-bench",
+            "metadata": {"title": "Benchmark Paper", "titleZh": "基准论文", "authors": [{"name": "A"}]},
+            "abstract": {"en": "Abstract " * 50, "zh": "摘要" * 50},
+            "keywords": ["attention", "transformer"],
+            "sectionIds": [section["id"] for section in sections],
+            "sections": sections,
+            "createdAt": now,
+            "updatedAt": now,
+        },
+    }
+
+
+def run_payload_benchmark(app, block_count: int = 500, rounds: int = 20) -> list:
+    """返回基准测试结果（每行一条）"""
+    import gzip
+
+    payload = build_sample_paper(block_count)
+    providers = [("default", DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider(app)))
+
+    lines = [f"payload: {block_count} blocks, {rounds} rounds"]
+    for name, provider in providers:
+        with app.app_context():
+            start = time.perf_counter()
+            for _ in range(rounds):
+                body = provider.response(payload).get_data()
+            elapsed = (time.perf_counter() - start) / rounds * 1000
+        lines.append(f"{name:8s} serialize: {elapsed:8.2f} ms  raw: {len(body):>9,d} B  "
+                     f"gzip: {len(gzip.compress(body, 6)):>8,d} B")
+        try:
+            import brotli
+            lines[-1] += f"  br: {len(brotli.compress(body, quality=5)):>8,d} B"
+        except ImportError:
+            pass
+    # 确认输出语义一致
+    if len(providers) > 1:
+        with app.app_context():
+            same = json.loads(providers[0][1].dumps(payload)) == json.loads(providers[1][1].dumps(payload))
+        lines.append(f"decoded payload identical: {same}")
+    return lines
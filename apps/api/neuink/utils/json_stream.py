@@ -0,0 +1,86 @@
+"""
+流式 JSON 响应
+
+整篇论文的接口（详情、正文）不再先拼出完整的 dict 再整体序列化：
+依次输出响应信封、论文的其余字段，再逐个输出从数据库读到的章节，
+单个请求的内存峰值只与一批章节有关，不随论文长度增长。
+
+输出与 success_response 的结构一致（{"code", "message", "data"}），
+只是 data 中的 sections 固定位于最后。
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from flask import current_app, stream_with_context
+
+from .common import success_response
+
+logger = logging.getLogger(__name__)
+
+
+def _get_dumps() -> Callable[[Any], bytes]:
+    """当前 app 的 JSON provider 序列化函数（统一输出 bytes）"""
+    provider = current_app.json
+    dumps_bytes = getattr(provider, "dumps_bytes", None)
+    if dumps_bytes is not None:
+        return dumps_bytes
+    return lambda obj: provider.dumps(obj).encode("utf-8")
+
+
+def iter_envelope(
+    head: Dict[str, Any],
+    sections: Iterable[Dict[str, Any]],
+    message: str,
+    code: int = 0,
+    sections_key: str = "sections",
+) -> Iterator[bytes]:
+    """
+    逐段产出 {"code", "message", "data": {**head, sections_key: [...]}} 的 JSON 字节
+
+    Args:
+        head: data 中除章节以外的字段（不能包含 sections_key）
+        sections: 章节迭代器，每个章节序列化后即释放
+    """
+    dumps = _get_dumps()
+    yield b'{"code":' + dumps(code) + b',"message":' + dumps(message) + b',"data":'
+
+    head_bytes = dumps(head)
+    # 去掉 head 的右花括号，接着写章节数组
+    yield head_bytes[:-1] + (b"," if len(head) else b"") + dumps(sections_key) + b":["
+
+    separator = b""
+    for section in sections:
+        yield separator + dumps(section)
+        separator = b","
+    yield b"]}}\n"
+
+
+def stream_response(
+    head: Dict[str, Any],
+    sections: Optional[Iterable[Dict[str, Any]]],
+    message: str,
+    code: int = 0,
+    sections_key: str = "sections",
+):
+    """
+    构造流式 JSON 响应，返回 (响应, 状态码)，可直接交给 with_etag
+
+    sections 为 None（fields= 未请求章节）时按普通响应返回 head。
+    响应头发出后无法再修改状态码：中途出错时记录日志并中断输出，
+    客户端会收到不完整的 JSON（按解析失败处理）
+    """
+    if sections is None:
+        return success_response(head, message, code)
+
+    chunks = iter_envelope(head, sections, message, code, sections_key)
+
+    def generate() -> Iterator[bytes]:
+        try:
+            yield from chunks
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error(f"流式响应中断: {exc}")
+
+    response = current_app.response_class(
+        stream_with_context(generate()), mimetype=current_app.json.mimetype
+    )
+    return response, 200
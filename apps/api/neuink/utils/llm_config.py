@@ -4,10 +4,13 @@
 """
 
 import os
+import json
 from typing import Dict, Any, Optional, TYPE_CHECKING
 from enum import Enum
 import requests
 
+from .cancellation import CancellationToken
+
 if TYPE_CHECKING:
     pass
 
@@ -73,10 +76,19 @@ class GLMProvider(LLMProvider):
         }
     
     def call_api(self, messages: list, temperature: float = 0.1, 
-                max_tokens: int = 100000, **kwargs) -> Dict[str, Any]:
-        """调用GLM API"""
+                max_tokens: int = 100000, cancel_token: Optional[CancellationToken] = None,
+                **kwargs) -> Dict[str, Any]:
+        """
+        调用GLM API
+
+        传入 cancel_token 时改用流式请求并逐段检查令牌，取消或超时时断开连接，
+        不必等待整段响应生成完毕；返回结构与非流式调用一致
+        """
         if not self.api_key:
             raise ValueError("未设置 GLM_API_KEY 环境变量")
+
+        if cancel_token is not None:
+            return self._call_api_cancellable(messages, temperature, max_tokens, cancel_token, **kwargs)
         
         payload = self._build_payload(messages, temperature, max_tokens, stream=False, **kwargs)
         headers = self._build_headers()
@@ -91,6 +103,57 @@ class GLMProvider(LLMProvider):
         response.raise_for_status()
         return response.json()
     
+    def _call_api_cancellable(self, messages: list, temperature: float, max_tokens: int,
+                              cancel_token: CancellationToken, **kwargs) -> Dict[str, Any]:
+        """可取消的调用：流式读取并拼接为非流式响应的结构"""
+        cancel_token.raise_if_cancelled()
+        payload = self._build_payload(messages, temperature, max_tokens, stream=True, **kwargs)
+
+        response = requests.post(
+            self.base_url,
+            json=payload,
+            headers=self._build_headers(),
+            stream=True,
+            timeout=300
+        )
+
+        chunks = []
+        usage: Dict[str, Any] = {}
+        finish_reason = None
+        with response, cancel_token.bind_response(response):
+            response.raise_for_status()
+            for line in response.iter_lines():
+                cancel_token.raise_if_cancelled()
+                if not line:
+                    continue
+                line = line.decode('utf-8')
+                if not line.startswith('data: '):
+                    continue
+                data_str = line[6:]
+                if data_str.strip() == '[DONE]':
+                    break
+                try:
+                    data = json.loads(data_str)
+                except json.JSONDecodeError:
+                    continue
+                usage = data.get("usage") or usage
+                if data.get('choices'):
+                    choice = data['choices'][0]
+                    chunks.append(choice.get('delta', {}).get('content') or "")
+                    finish_reason = choice.get('finish_reason') or finish_reason
+        # 连接被断开时 iter_lines 可能正常结束，再检查一次避免返回半截内容
+        cancel_token.raise_if_cancelled()
+
+        return {
+            "model": self.model.value,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(chunks)},
+                "finish_reason": finish_reason,
+            }],
+            "usage": usage,
+        }
+
     def call_api_stream(self, messages: list, temperature: float = 0.1, 
                        max_tokens: int = 100000, **kwargs):
         """流式调用GLM API"""
@@ -121,7 +184,6 @@ class GLMProvider(LLMProvider):
                         break
                     
                     try:
-                        import json
                         data = json.loads(data_str)
                         if 'choices' in data and len(data['choices']) > 0:
                             delta = data['choices'][0].get('delta', {})
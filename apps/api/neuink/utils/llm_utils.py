@@ -9,6 +9,7 @@ import json
 import logging
 from typing import Dict, Any, Optional, List
 from .llm_config import LLMModel, LLMFactory, LLMProvider
+from .cancellation import CancellationToken, TaskCancelledError
 
 # 设置简单的日志
 logging.basicConfig(level=logging.INFO)
@@ -40,6 +41,7 @@ class LLMUtils:
         model: LLMModel = LLMModel.GLM_4_6,
         temperature: float = 0.1,
         max_tokens: int = 100000,
+        cancel_token: Optional[CancellationToken] = None,
         **kwargs
     ) -> Optional[Dict[str, Any]]:
         """
@@ -50,16 +52,27 @@ class LLMUtils:
             model: 使用的模型
             temperature: 温度参数，控制随机性
             max_tokens: 最大输出 token 数
+            cancel_token: 后台任务的取消令牌，取消或超时时中断请求
             **kwargs: 其他模型特定参数
             
         Returns:
             模型响应结果或 None（如果出错）
+
+        Raises:
+            TaskCancelledError: 任务已被取消或超时（不转换为 None，由任务执行端处理）
         """
         try:
             provider = self._get_provider(model)
             logger.info(f"调用 {model.value} 模型，消息数量: {len(messages)}")
+            if cancel_token is not None:
+                kwargs["cancel_token"] = cancel_token
             return provider.call_api(messages, temperature, max_tokens, **kwargs)
+        except TaskCancelledError:
+            raise
         except Exception as e:
+            if cancel_token is not None and cancel_token.cancelled:
+                # 连接被主动断开导致的网络异常
+                cancel_token.raise_if_cancelled()
             logger.error(f"LLM调用失败: {e}")
             return None
     
@@ -0,0 +1,240 @@
+"""
+游标分页（keyset pagination）工具
+
+游标是对 (排序字段值, id) 的不透明编码。下一页通过
+`排序字段 < 上一页最后一条的值`（值相同时再比较 id）定位，
+配合 (过滤字段, 排序字段, id) 复合索引，第 N 页与第 1 页的代价相同。
+
+与原有 page/pageSize 分页并存：请求中带 cursor 时忽略 page。
+
+fetch_page 用索引支持的 find().sort().limit() 取回当前页，总数用 count_documents 计算：
+当前页未取满时总数可以直接由 skip + 本页条数得出，不再计数；其余情况下总数可以按
+(集合, 所属用户, 查询条件) 缓存一小段时间（LIST_TOTAL_CACHE_TTL 秒），
+供公开论文列表、无限滚动等不需要精确总数的列表使用，命中时只有一次查询。
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from .cache import TTLCache
+
+
+class InvalidCursorError(ValueError):
+    """游标无法解析，或与当前排序条件不匹配"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def _get_field(doc: Dict[str, Any], path: str) -> Any:
+    """按点号路径读取字段，例如 metadata.year"""
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def encode_cursor(doc: Dict[str, Any], sort_by: str, sort_order: int) -> str:
+    """根据一条记录生成指向其之后位置的游标"""
+    payload = {
+        "f": sort_by,
+        "o": sort_order,
+        "v": _encode_value(_get_field(doc, sort_by)),
+        "id": doc.get("id"),
+    }
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: str, sort_order: int) -> Tuple[Any, str]:
+    """
+    解析游标
+
+    Returns:
+        (排序字段值, id)
+
+    Raises:
+        InvalidCursorError: 游标格式错误，或生成游标时的排序条件与本次请求不同
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        field, order, value, doc_id = payload["f"], payload["o"], payload["v"], payload["id"]
+    except Exception as exc:
+        raise InvalidCursorError("无效的分页游标") from exc
+
+    if field != sort_by or order != sort_order or not doc_id:
+        raise InvalidCursorError("分页游标与排序条件不匹配")
+    return _decode_value(value), doc_id
+
+
+def keyset_sort(sort_by: str, sort_order: int) -> List[Tuple[str, int]]:
+    """排序字段 + id 作为唯一的决胜字段，保证翻页顺序稳定"""
+    if sort_by == "id":
+        return [("id", sort_order)]
+    return [(sort_by, sort_order), ("id", sort_order)]
+
+
+def cursor_condition(
+    cursor: Optional[str],
+    sort_by: str,
+    sort_order: int,
+) -> Optional[Dict[str, Any]]:
+    """
+    游标对应的位置条件（"排在游标之后"），cursor 为空时返回 None
+
+    MongoDB 中 null 在升序时排最前、降序时排最后，这里按同样的规则处理缺失的排序字段
+    """
+    if not cursor:
+        return None
+
+    value, doc_id = decode_cursor(cursor, sort_by, sort_order)
+    op = "$lt" if sort_order < 0 else "$gt"
+
+    if sort_by == "id":
+        return {"id": {op: doc_id}}
+    if value is None:
+        same_value_after = {sort_by: None, "id": {op: doc_id}}
+        if sort_order < 0:
+            # 降序时 null 已在末尾，只剩同为 null 的记录
+            return same_value_after
+        return {"$or": [same_value_after, {sort_by: {"$ne": None}}]}
+
+    branches: List[Dict[str, Any]] = [
+        {sort_by: {op: value}},
+        {sort_by: value, "id": {op: doc_id}},
+    ]
+    if sort_order < 0:
+        # 降序时缺失排序字段的记录排在最后
+        branches.append({sort_by: None})
+    return {"$or": branches}
+
+
+def apply_cursor(
+    query: Dict[str, Any],
+    cursor: Optional[str],
+    sort_by: str,
+    sort_order: int,
+) -> Dict[str, Any]:
+    """在查询条件上追加游标位置条件，cursor 为空时原样返回"""
+    position = cursor_condition(cursor, sort_by, sort_order)
+    if position is None:
+        return query
+    if not query:
+        return position
+    return {"$and": [query, position]}
+
+
+def next_cursor(
+    items: List[Dict[str, Any]],
+    limit: int,
+    sort_by: str,
+    sort_order: int,
+) -> Optional[str]:
+    """本页已满时返回下一页游标，否则返回 None（已到末尾）"""
+    if not items or limit <= 0 or len(items) < limit:
+        return None
+    return encode_cursor(items[-1], sort_by, sort_order)
+
+
+def include_sort_field(projection: Dict[str, Any], sort_by: str) -> Dict[str, Any]:
+    """确保投影中包含排序字段，生成游标时需要读取它（排除式投影本就包含全部字段）"""
+    is_inclusion = any(value == 1 for key, value in projection.items() if key != "_id")
+    top_level = sort_by.split(".")[0]
+    if is_inclusion and top_level not in projection and sort_by not in projection:
+        projection[sort_by] = 1
+    return projection
+
+
+# ----------------------------------------------------------------------
+# 分页查询
+# ----------------------------------------------------------------------
+_total_cache = TTLCache(
+    ttl_seconds=float(os.getenv("LIST_TOTAL_CACHE_TTL", "30")),
+    max_entries=4096,
+)
+
+TotalCacheKey = Tuple[str, Optional[str], str]
+
+
+def total_cache_key(collection_name: str, owner: Optional[str], query: Dict[str, Any]) -> TotalCacheKey:
+    """总数缓存键：集合 + 所属用户（用于失效）+ 查询条件"""
+    return (
+        collection_name,
+        owner,
+        json.dumps(query, sort_keys=True, ensure_ascii=False, default=str),
+    )
+
+
+def invalidate_cached_totals(collection_name: str, owner: Optional[str] = None) -> None:
+    """用户的数据发生增删时清除其缓存的总数，owner 为空时清除整个集合"""
+    _total_cache.invalidate_where(
+        lambda key: key[0] == collection_name and (owner is None or key[1] == owner)
+    )
+
+
+def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    sort: List[Tuple[str, Any]],
+    limit: int,
+    skip: int = 0,
+    projection: Optional[Dict[str, Any]] = None,
+    page_filter: Optional[Dict[str, Any]] = None,
+    total_key: Optional[TotalCacheKey] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    取回一页数据和总数
+
+    当前页用 find().sort().limit() 查询，游标条件与查询条件一起放在顶层，
+    由 (过滤字段, 排序字段, id) 复合索引支持；没有游标条件且本页未取满时总数为 skip + 本页条数，
+    否则传入 total_key 时优先取缓存，最后才用 count_documents 单独计算（索引计数）。
+
+    Args:
+        query: 计算总数所用的条件
+        sort: [(字段, 方向)]，方向可以是 {"$meta": "textScore"}
+        page_filter: 只作用于当前页的附加条件（如游标位置），不影响总数
+        total_key: 传入时总数优先取缓存，命中则只查询当前页
+
+    Returns:
+        (当前页记录, 总数)
+    """
+    match: Dict[str, Any] = query
+    if page_filter:
+        match = {"$and": [query, page_filter]} if query else page_filter
+
+    cursor = collection.find(match, projection).sort(sort)
+    if skip > 0:
+        cursor = cursor.skip(skip)
+    if limit > 0:
+        cursor = cursor.limit(limit)
+    items = list(cursor)
+
+    if not page_filter and 0 < limit and len(items) < limit and (items or skip == 0):
+        # 本页未取满即已到末尾，总数无需再计数
+        total = skip + len(items)
+        if total_key:
+            _total_cache.set(total_key, total)
+        return items, total
+
+    cached_total = _total_cache.get(total_key) if total_key else None
+    if cached_total is not None:
+        return items, cached_total
+
+    total = collection.count_documents(query)
+    if total_key:
+        _total_cache.set(total_key, total)
+    return items, total
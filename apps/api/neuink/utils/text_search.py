@@ -0,0 +1,174 @@
+"""
+全文检索的文本处理工具
+
+- inline_plain_text / block_plain_text：从 InlineContent[] / 块内容中提取纯文本
+- tokenize：CJK 字符按相邻二元组（bigram）切分，其余按 Unicode 字母数字切词并转小写，
+  可选对英文词做轻量词干化（stem）
+- build_search_text：生成写入数据库的检索字段（词元以空格连接），
+  配合 default_language="none" 的 MongoDB 文本索引即可对中文做索引查找。
+  写入时额外保留单字，单字查询也能命中；查询时只用 bigram，保证相关度
+"""
+import re
+from typing import Any, Dict, Iterable, List
+
+# CJK 统一表意文字、扩展 A、兼容表意文字，以及日文假名、韩文音节
+_CJK_RANGES = (
+    "぀-ヿ"
+    "㐀-䶿"
+    "一-鿿"
+    "가-힯"
+    "豈-﫿"
+)
+# 非 CJK 片段按 Unicode 字母数字切词（含带重音的拉丁字母、希腊/西里尔字母等），下划线视为分隔符
+_TOKEN_RE = re.compile(rf"[{_CJK_RANGES}]+|[^\W_{_CJK_RANGES}]+")
+_CJK_RE = re.compile(rf"[{_CJK_RANGES}]")
+
+# 检索字段的最大词元数，避免超长笔记/段落撑大索引
+MAX_SEARCH_TOKENS = 4096
+
+
+def inline_plain_text(nodes: Any) -> str:
+    """从 InlineContent[] 中提取纯文本（兼容旧数据中 text 节点使用 text 字段）"""
+    if isinstance(nodes, str):
+        return nodes
+    if not isinstance(nodes, list):
+        return ""
+
+    parts: List[str] = []
+    for node in nodes:
+        if isinstance(node, str):
+            parts.append(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        node_type = node.get("type")
+        if node_type == "text":
+            parts.append(node.get("content") or node.get("text") or "")
+        elif node_type == "link":
+            parts.append(inline_plain_text(node.get("children")) or node.get("text") or node.get("label") or "")
+        elif node_type == "inline-math":
+            parts.append(node.get("latex") or "")
+        elif node_type == "footnote":
+            parts.append(node.get("content") or node.get("displayText") or "")
+        else:
+            parts.append(node.get("displayText") or "")
+    return "".join(parts)
+
+
+def _bilingual_text(value: Any) -> List[str]:
+    """{"en": InlineContent[], "zh": InlineContent[]} -> [英文文本, 中文文本]"""
+    if isinstance(value, dict):
+        return [inline_plain_text(value.get(lang)) for lang in ("en", "zh")]
+    return [inline_plain_text(value)]
+
+
+def block_plain_text(block: Dict[str, Any]) -> str:
+    """
+    提取一个内容块中可检索的纯文本：正文的中英文、列表项、图表标题/说明、引用作者
+    公式、代码、表格 HTML 等不参与检索
+    """
+    parts: List[str] = []
+    block_type = block.get("type")
+    if block_type in ("ordered-list", "unordered-list"):
+        for item in block.get("items") or []:
+            if isinstance(item, dict):
+                parts.extend(_bilingual_text(item.get("content")))
+    elif block_type in ("heading", "paragraph", "quote"):
+        parts.extend(_bilingual_text(block.get("content")))
+        if block.get("author"):
+            parts.append(block["author"])
+    for key in ("caption", "description"):
+        if block.get(key):
+            parts.extend(_bilingual_text(block[key]))
+    return "\n".join(part for part in parts if part)
+
+
+_VOWELS = set("aeiou")
+
+# (后缀, 替换)，按顺序匹配第一个；词干至少保留 3 个字符
+_SUFFIX_RULES = (
+    ("ational", "ate"), ("tional", "tion"), ("ization", "ize"), ("ation", "ate"),
+    ("fulness", "ful"), ("ousness", "ous"), ("iveness", "ive"), ("biliti", "ble"),
+    ("alism", "al"), ("aliti", "al"), ("iviti", "ive"), ("ement", ""), ("ment", ""),
+    ("ness", ""), ("izer", "ize"), ("ator", "ate"), ("ally", "al"), ("ical", "ic"),
+    ("ful", ""), ("ous", ""), ("ive", ""), ("ize", ""), ("ly", ""),
+)
+
+
+def _has_vowel(word: str) -> bool:
+    return any(ch in _VOWELS for ch in word)
+
+
+def stem(word: str) -> str:
+    """
+    轻量英文词干化（Porter 算法的简化版）：处理复数、-ed/-ing 和常见派生后缀
+    索引与查询使用同一规则即可，不追求语言学上的准确
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies"):
+        word = word[:-3] + "i"
+    elif word.endswith("s") and not word.endswith("ss") and not word.endswith("us"):
+        word = word[:-1]
+
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if word.endswith(("at", "bl", "iz")):
+                word += "e"
+            elif len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+
+    for suffix, replacement in _SUFFIX_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+
+    if word.endswith("y") and _has_vowel(word[:-1]) and len(word) > 3:
+        word = word[:-1] + "i"
+    return word
+
+
+def _cjk_grams(run: str, unigrams: bool) -> Iterable[str]:
+    if len(run) == 1:
+        yield run
+        return
+    for i in range(len(run) - 1):
+        if unigrams:
+            yield run[i]
+        yield run[i:i + 2]
+    if unigrams:
+        yield run[-1]
+
+
+def tokenize(text: str, unigrams: bool = False, stemmed: bool = False) -> List[str]:
+    """
+    切分词元：CJK 连续片段输出 bigram（单字片段输出单字），英文数字按词切分并转小写
+
+    unigrams 为 True 时 CJK 片段同时输出每个单字（用于写入索引）；
+    stemmed 为 True 时英文词做词干化
+    """
+    if not text:
+        return []
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group(0)
+        if _CJK_RE.match(run):
+            tokens.extend(_cjk_grams(run, unigrams))
+        else:
+            tokens.append(stem(run) if stemmed else run)
+    return tokens
+
+
+def build_search_text(text: str) -> str:
+    """生成写入数据库的检索字段"""
+    return " ".join(tokenize(text, unigrams=True)[:MAX_SEARCH_TOKENS])
+
+
+def build_search_query(keyword: str) -> str:
+    """按写入时相同的规则切分查询词，供 $text 查询使用；无有效词元时返回空串"""
+    return " ".join(dict.fromkeys(tokenize(keyword)))
@@ -0,0 +1,72 @@
+"""
+进程内后台线程的启动时机
+持久化任务工作线程、MinerU 状态轮询、统计对账、块索引补建等后台线程只在提供服务的进程中运行：
+flask 命令行（ensure-indexes、reconcile-user-stats 等）和热重载的父进程不启动这些线程。
+
+各模块在 init_app 中通过 register_worker 登记启动函数（启动函数自行读取对应的开关环境变量），
+由服务入口在进程启动时统一启动，每个应用只启动一次：
+
+- python run.py：run.py 在实际提供服务的进程中调用 start_workers
+- flask --app run run：init_app 识别 run 命令的服务进程后立即启动
+- gunicorn：使用 gunicorn.conf.py（post_worker_init 钩子在每个 worker 加载应用后启动）
+- flask --app run run-jobs：独立的任务消费进程，同样启动全部后台线程
+
+其他 WSGI 服务器未调用 start_workers 时，在进程处理第一个请求前兜底启动。
+"""
+import threading
+from typing import Any, Callable, Dict
+
+_EXTENSION_KEY = "neuink_workers"
+
+
+def _state(app) -> Dict[str, Any]:
+    return app.extensions.setdefault(
+        _EXTENSION_KEY, {"starters": [], "started": False, "lock": threading.Lock()}
+    )
+
+
+def register_worker(app, start: Callable[[Any], None]) -> None:
+    """登记后台线程的启动函数，参数为应用对象"""
+    _state(app)["starters"].append(start)
+
+
+def start_workers(app) -> None:
+    """启动已登记的后台线程（重复调用无副作用）"""
+    state = _state(app)
+    with state["lock"]:
+        if state["started"]:
+            return
+        state["started"] = True
+    for start in state["starters"]:
+        try:
+            start(app)
+        except Exception as exc:  # pylint: disable=broad-except
+            app.logger.error("[WORKERS] failed to start %s: %s", getattr(start, "__qualname__", start), exc)
+
+
+def _is_flask_run_server() -> bool:
+    """当前进程是否为 flask run 实际提供服务的进程（启用热重载时为子进程）"""
+    import click
+    from flask.helpers import get_debug_flag
+    from werkzeug.serving import is_running_from_reloader
+
+    ctx = click.get_current_context(silent=True)
+    if ctx is None or ctx.info_name != "run":
+        return False
+    reload = ctx.params.get("reload")
+    if reload is None:
+        reload = get_debug_flag()
+    return not reload or is_running_from_reloader()
+
+
+def init_app(app) -> None:
+    """flask run 的服务进程立即启动后台线程；其他情况在第一个请求前兜底启动"""
+    state = _state(app)
+
+    if _is_flask_run_server():
+        start_workers(app)
+
+    @app.before_request
+    def start_workers_on_first_request():
+        if not state["started"]:
+            start_workers(app)
@@ -12,9 +12,13 @@ if sys.platform == "win32":
 app = create_app()
 
 if __name__ == "__main__":
+    from werkzeug.serving import is_running_from_reloader
+    from neuink.utils.workers import start_workers
+
     # 本地开发启动
     # 在Windows环境下添加额外的参数确保输出不被缓冲
-    if sys.platform == "win32":
-        app.run(host="0.0.0.0", port=5050, debug=True, use_reloader=False)
-    else:
-        app.run(host="0.0.0.0", port=5050, debug=True)
+    use_reloader = sys.platform != "win32"
+    # 热重载时只在实际提供服务的子进程中启动后台线程
+    if not use_reloader or is_running_from_reloader():
+        start_workers(app)
+    app.run(host="0.0.0.0", port=5050, debug=True, use_reloader=use_reloader)
@@ -0,0 +1,298 @@
+"""测试共用的内存版 MongoDB 集合（只实现各测试用到的查询和更新操作）"""
+import copy
+from collections import Counter
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+_MISSING = object()
+
+
+def _get(doc, path):
+    for part in path.split("."):
+        if isinstance(doc, list):
+            values = [_get(item, part) for item in doc]
+            values = [value for value in values if value is not _MISSING]
+            return values if values else _MISSING
+        if not isinstance(doc, dict) or part not in doc:
+            return _MISSING
+        doc = doc[part]
+    return doc
+
+
+def _is_operator(value):
+    return isinstance(value, dict) and bool(value) and all(key.startswith("$") for key in value)
+
+
+def _expr_value(doc, arg):
+    if isinstance(arg, str) and arg.startswith("$"):
+        value = _get(doc, arg[1:])
+        return None if value is _MISSING else value
+    return arg
+
+
+def _match_expr(doc, expr):
+    (op, args), = expr.items()
+    left, right = (_expr_value(doc, arg) for arg in args)
+    if op == "$eq":
+        return left == right
+    if op == "$ne":
+        return left != right
+    raise NotImplementedError(op)
+
+
+def _compare(present, op, arg):
+    if present is None:
+        return False
+    try:
+        return {
+            "$lt": present < arg,
+            "$lte": present <= arg,
+            "$gt": present > arg,
+            "$gte": present >= arg,
+        }[op]
+    except TypeError:
+        return False
+
+
+def _match_value(value, condition):
+    # 数组字段：任一元素满足条件即匹配（与 MongoDB 一致；否定条件按整个数组判断）
+    if isinstance(value, list) and not (_is_operator(condition) and set(condition) & {"$all", "$ne", "$nin", "$not"}):
+        if not _is_operator(condition) and value == condition:
+            return True
+        if any(_match_value(item, condition) for item in value):
+            return True
+    present = None if value is _MISSING else value
+    if not _is_operator(condition):
+        return present == condition
+    for op, arg in condition.items():
+        if op == "$in" and present not in arg:
+            return False
+        if op == "$nin" and present in arg:
+            return False
+        if op == "$ne" and present == arg:
+            return False
+        if op == "$exists" and (value is not _MISSING) != bool(arg):
+            return False
+        if op == "$all" and not (isinstance(value, list) and all(item in value for item in arg)):
+            return False
+        if op in ("$lt", "$lte", "$gt", "$gte") and not _compare(present, op, arg):
+            return False
+        if op == "$not" and _match_value(value, arg):
+            return False
+    return True
+
+
+def matches(doc, query):
+    """doc 是否满足查询条件"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, branch) for branch in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, branch) for branch in condition):
+                return False
+        elif key == "$expr":
+            if not _match_expr(doc, condition):
+                return False
+        elif not _match_value(_get(doc, key), condition):
+            return False
+    return True
+
+
+def _project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    included = [key for key, value in projection.items() if key != "_id" and value]
+    if included:
+        keep = {key.split(".")[0] for key in included} | ({"_id"} if projection.get("_id", 1) else set())
+        doc = {key: value for key, value in doc.items() if key in keep}
+    if projection.get("_id") == 0:
+        doc.pop("_id", None)
+    return doc
+
+
+def _sort_key(value):
+    # None / 缺失排在最前，与 MongoDB 升序一致
+    return (value is not None, value)
+
+
+class FakeResult:
+    def __init__(self, matched=0, modified=None, deleted=0, inserted_id=None):
+        self.matched_count = matched
+        self.modified_count = matched if modified is None else modified
+        self.deleted_count = deleted
+        self.inserted_id = inserted_id
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def sort(self, key, direction=1):
+        keys = [(key, direction)] if isinstance(key, str) else list(key)
+        docs = list(self.docs)
+        for field, order in reversed(keys):
+            docs.sort(key=lambda doc: _sort_key(None if _get(doc, field) is _MISSING else _get(doc, field)),
+                      reverse=order < 0)
+        return FakeCursor(docs)
+
+    def skip(self, count):
+        return FakeCursor(self.docs[count:])
+
+    def limit(self, count):
+        return FakeCursor(self.docs[:count] if count else self.docs)
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __getitem__(self, index):
+        return self.docs[index]
+
+
+class FakeCollection:
+    """
+    内存集合：docs 保存文档，calls 统计各方法的调用次数，writes 记录 (查询, 更新)
+
+    管道更新只应用 $set 中的字面值，表达式计算的字段保持不变
+    """
+
+    def __init__(self, name="fake", database=None, unique_keys=("_id",)):
+        self.name = name
+        self.database = database
+        self.unique_keys = unique_keys
+        self.docs = []
+        self.calls = Counter()
+        self.writes = []
+        self._next_id = 0
+
+    def _apply(self, doc, update):
+        stages = update if isinstance(update, list) else [update]
+        for stage in stages:
+            for key, value in stage.get("$set", {}).items():
+                if isinstance(update, list) and (isinstance(value, dict) or (isinstance(value, str) and value.startswith("$"))):
+                    continue
+                doc[key] = copy.deepcopy(value)
+            for key, value in stage.get("$inc", {}).items():
+                doc[key] = doc.get(key, 0) + value
+            for key in stage.get("$unset", {}):
+                doc.pop(key, None)
+
+    def _matching(self, query):
+        return [doc for doc in self.docs if matches(doc, query)]
+
+    def _upsert(self, query, update):
+        doc = {key: value for key, value in query.items() if not key.startswith("$") and not _is_operator(value)}
+        self._apply(doc, update)
+        self._insert(doc)
+        return doc
+
+    def insert_one(self, doc):
+        self.calls["insert_one"] += 1
+        return self._insert(doc)
+
+    def _insert(self, doc):
+        for key in self.unique_keys:
+            if key in doc and any(existing.get(key) == doc[key] for existing in self.docs):
+                raise DuplicateKeyError("E11000 duplicate key")
+        if "_id" not in doc:
+            self._next_id += 1
+            doc["_id"] = f"oid{self._next_id}"
+        self.docs.append(copy.deepcopy(doc))
+        return FakeResult(inserted_id=doc["_id"])
+
+    def insert_many(self, docs):
+        for doc in docs:
+            self._insert(doc)
+
+    def find(self, query=None, projection=None):
+        self.calls["find"] += 1
+        return FakeCursor(_project(doc, projection) for doc in self._matching(query or {}))
+
+    def find_one(self, query=None, projection=None):
+        self.calls["find_one"] += 1
+        found = self._matching(query or {})
+        return _project(found[0], projection) if found else None
+
+    def find_one_and_update(self, query, update, projection=None, return_document=None, upsert=False, **kwargs):
+        self.calls["find_one_and_update"] += 1
+        self.writes.append((query, update))
+        found = self._matching(query)
+        if not found:
+            if not upsert:
+                return None
+            doc = self._upsert(query, update)
+            return _project(doc, projection) if return_document else None
+        before = _project(found[0], projection)
+        self._apply(found[0], update)
+        return _project(found[0], projection) if return_document else before
+
+    def update_one(self, query, update, upsert=False):
+        self.calls["update_one"] += 1
+        self.writes.append((query, update))
+        found = self._matching(query)
+        if found:
+            self._apply(found[0], update)
+            return FakeResult(1)
+        if upsert:
+            self._upsert(query, update)
+        return FakeResult(0)
+
+    def update_many(self, query, update):
+        self.calls["update_many"] += 1
+        self.writes.append((query, update))
+        found = self._matching(query)
+        for doc in found:
+            self._apply(doc, update)
+        return FakeResult(len(found))
+
+    def delete_many(self, query):
+        self.calls["delete_many"] += 1
+        found = self._matching(query)
+        self.docs = [doc for doc in self.docs if not any(doc is item for item in found)]
+        return FakeResult(deleted=len(found))
+
+    def count_documents(self, query):
+        self.calls["count_documents"] += 1
+        return len(self._matching(query))
+
+    def distinct(self, field, query=None):
+        self.calls["distinct"] += 1
+        values = []
+        for doc in self._matching(query or {}):
+            value = _get(doc, field)
+            if value is not _MISSING and value not in values:
+                values.append(value)
+        return values
+
+
+class FakeDatabase(dict):
+    """按名称自动创建集合的数据库"""
+
+    def __missing__(self, name):
+        collection = FakeCollection(name, self)
+        self[name] = collection
+        return collection
+
+    def collection(self, name, unique_keys=("_id",)):
+        collection = self[name]
+        collection.unique_keys = unique_keys
+        return collection
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """内存数据库；fake_db.patch(module, ...) 让这些模块的 get_db 返回它"""
+    db = FakeDatabase()
+
+    def patch(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, "get_db", lambda: db)
+        return db
+
+    db.patch = patch
+    return db
@@ -0,0 +1,18 @@
+"""background_tasks：队列配置"""
+from neuink.utils.background_tasks import QUEUE_LLM_PARSE, QUEUE_MINERU_INGEST, load_queue_configs
+
+
+def test_max_running_defaults_to_worker_default():
+    configs = load_queue_configs()
+    assert configs[QUEUE_LLM_PARSE].max_running == configs[QUEUE_LLM_PARSE].max_workers == 4
+    assert configs[QUEUE_MINERU_INGEST].max_running == 2
+
+
+def test_env_overrides_workers_and_global_limit_separately(monkeypatch):
+    monkeypatch.setenv("TASK_QUEUE_LLM_PARSE_WORKERS", "8")
+    monkeypatch.setenv("TASK_QUEUE_LLM_PARSE_MAX_RUNNING", "3")
+    monkeypatch.setenv("TASK_QUEUE_MINERU_INGEST_MAX_RUNNING", "0")
+    configs = load_queue_configs()
+    assert configs[QUEUE_LLM_PARSE].max_workers == 8
+    assert configs[QUEUE_LLM_PARSE].max_running == 3
+    assert configs[QUEUE_MINERU_INGEST].max_running == 1
@@ -0,0 +1,57 @@
+"""cache：LRUCache 的字节统计与淘汰"""
+from neuink.utils.cache import LRUCache
+
+
+def _cache(max_entries=10, max_bytes=100):
+    return LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=len)
+
+
+def test_total_bytes_tracks_set_replace_and_invalidate():
+    cache = _cache()
+    cache.set("a", "x" * 30)
+    cache.set("b", "x" * 20)
+    assert cache.total_bytes == 50
+
+    cache.set("a", "x" * 10)
+    assert cache.total_bytes == 30
+
+    cache.invalidate("b")
+    cache.invalidate("missing")
+    assert cache.total_bytes == 10
+
+    cache.set("c", "x" * 5)
+    assert cache.invalidate_where(lambda key: key in ("a", "c")) == 2
+    assert cache.total_bytes == 0
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used_over_byte_limit():
+    cache = _cache()
+    cache.set("a", "x" * 40)
+    cache.set("b", "x" * 40)
+    assert cache.get("a") is not None
+
+    cache.set("c", "x" * 40)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.total_bytes == 80
+
+
+def test_oversized_value_not_cached():
+    cache = _cache()
+    cache.set("a", "x" * 60)
+    cache.set("big", "x" * 101)
+    assert cache.get("big") is None
+    assert cache.get("a") is not None
+    assert cache.total_bytes == 60
+
+
+def test_entry_limit_and_clear():
+    cache = _cache(max_entries=2)
+    for key in "abc":
+        cache.set(key, "x" * 10)
+    assert len(cache) == 2
+    assert cache.total_bytes == 20
+
+    cache.clear()
+    assert cache.total_bytes == 0
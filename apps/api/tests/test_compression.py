@@ -0,0 +1,48 @@
+"""compression：流式响应逐块压缩，客户端可逐块解压"""
+import zlib
+
+import pytest
+
+from neuink.utils.compression import compress_stream
+
+CHUNKS = [b'{"sections":[', b'{"id":"s1","title":"Intro"},', b'{"id":"s2","title":"Method"}', b"]}"]
+
+
+class _Chunks:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def test_gzip_stream_round_trip_chunk_by_chunk():
+    source = _Chunks(CHUNKS)
+    decompressor = zlib.decompressobj(31)
+    received = b""
+    parts = list(compress_stream(source, "gzip"))
+
+    # 每个输入块压缩后立即刷新：收到对应的压缩块即可解出该块
+    for index, part in enumerate(parts[:len(CHUNKS)]):
+        received += decompressor.decompress(part)
+        assert received == b"".join(CHUNKS[:index + 1])
+    received += decompressor.decompress(b"".join(parts[len(CHUNKS):])) + decompressor.flush()
+    assert received == b"".join(CHUNKS)
+    assert decompressor.eof
+    assert source.closed
+
+
+def test_brotli_stream_round_trip():
+    brotli = pytest.importorskip("brotli")
+    decompressor = brotli.Decompressor()
+    received = b""
+    for index, part in enumerate(compress_stream(iter(CHUNKS), "br")):
+        received += decompressor.process(part)
+        if index < len(CHUNKS):
+            assert received == b"".join(CHUNKS[:index + 1])
+    assert received == b"".join(CHUNKS)
+    assert decompressor.is_finished()
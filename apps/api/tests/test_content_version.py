@@ -0,0 +1,36 @@
+"""contentVersion：序号分配与可返回给客户端的同步水位"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from neuink.models import contentVersion
+from neuink.models.contentVersion import SETTLE_SECONDS, next_content_version, settled_version
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch, fake_db):
+    fake_db.patch(contentVersion)
+    monkeypatch.setattr(contentVersion, "get_current_time", lambda: NOW)
+
+
+def test_next_content_version_increments():
+    assert [next_content_version() for _ in range(3)] == [1, 2, 3]
+
+
+def test_settled_version_ignores_recent_writes():
+    settled = NOW - timedelta(seconds=SETTLE_SECONDS)
+    writes = [
+        (5, settled - timedelta(seconds=1)),
+        (8, settled),
+        (9, NOW - timedelta(seconds=1)),
+    ]
+    assert settled_version(3, writes) == 8
+
+
+def test_settled_version_keeps_since_without_settled_writes():
+    assert settled_version(4, [(9, NOW), (None, NOW - timedelta(hours=1)), (7, None)]) == 4
+    assert settled_version(-1, []) == 0
+    # 已落库的旧写入不会让水位回退
+    assert settled_version(10, [(6, NOW - timedelta(hours=1))]) == 10
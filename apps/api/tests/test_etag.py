@@ -0,0 +1,48 @@
+"""etag：压缩响应回传弱 ETag，客户端带回后仍返回 304"""
+import pytest
+from flask import Flask, jsonify
+
+from neuink.utils import compression
+from neuink.utils.etag import compute_etag, etag_matches, not_modified_response, with_etag
+
+ETAG = compute_etag("p1", 3)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("COMPRESS_MIN_BYTES", "16")
+    app = Flask(__name__)
+    compression.init_app(app, ["/papers"])
+
+    @app.route("/papers/p1")
+    def paper():
+        if etag_matches(ETAG):
+            return not_modified_response(ETAG)
+        return with_etag((jsonify({"title": "x" * 200}), 200), ETAG)
+
+    return app.test_client()
+
+
+def test_compressed_response_has_weak_etag(client):
+    response = client.get("/papers/p1", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == f'W/"{ETAG}"'
+
+
+@pytest.mark.parametrize("if_none_match", [f'W/"{ETAG}"', f'"{ETAG}"', f'"other", W/"{ETAG}"'])
+def test_weak_etag_matches(client, if_none_match):
+    response = client.get("/papers/p1", headers={"Accept-Encoding": "gzip", "If-None-Match": if_none_match})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == f'"{ETAG}"'
+
+
+def test_other_etag_does_not_match(client):
+    response = client.get("/papers/p1", headers={"If-None-Match": 'W/"other"'})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+
+
+def test_etag_matches_without_etag():
+    with Flask(__name__).test_request_context(headers={"If-None-Match": "*"}):
+        assert not etag_matches(None)
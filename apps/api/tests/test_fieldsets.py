@@ -0,0 +1,57 @@
+"""fieldsets：fields 参数解析与投影"""
+import pytest
+
+from neuink.utils.fieldsets import parse_fields
+
+ALLOWED = ("metadata", "sectionIds", "createdAt")
+SECTION_FIELDS = ("title", "titleZh", "content")
+
+
+def test_empty_returns_none():
+    assert parse_fields(None, ALLOWED) is None
+    assert parse_fields("  ", ALLOWED) is None
+
+
+def test_paper_projection_collapses_child_paths():
+    selection = parse_fields("metadata.title,metadata", ALLOWED, SECTION_FIELDS)
+    assert selection.paper_fields == ("metadata",)
+    assert not selection.include_sections
+    assert selection.paper_projection() == {"_id": 0, "id": 1, "metadata": 1}
+
+
+def test_section_fields():
+    selection = parse_fields("metadata.title,sections.title,sections.titleZh", ALLOWED, SECTION_FIELDS)
+    assert selection.section_fields == ("title", "titleZh")
+    assert selection.section_projection() == {"_id": 0, "id": 1, "title": 1, "titleZh": 1}
+    assert selection.paper_projection() == {"_id": 0, "id": 1, "metadata.title": 1, "sectionIds": 1}
+    assert selection.includes_section_field("title")
+    assert not selection.includes_section_field("content")
+    assert selection.key == "metadata.title,sections.title,sections.titleZh"
+
+
+def test_full_sections_override_section_fields():
+    selection = parse_fields("sections.title,sections", ALLOWED, SECTION_FIELDS)
+    assert selection.section_fields == ()
+    assert selection.section_projection() is None
+    assert selection.includes_section_field("content")
+    assert selection.key == "sections"
+
+
+def test_computed_fields_not_projected():
+    selection = parse_fields("sectionCount,metadata", ALLOWED + ("sectionCount",))
+    assert selection.includes("sectionCount")
+    assert selection.paper_projection(required=["createdAt"], computed=["sectionCount"]) == {
+        "_id": 0, "createdAt": 1, "id": 1, "metadata": 1,
+    }
+
+
+@pytest.mark.parametrize("raw", ["password", "metadata..title", "$where", "sections.title"])
+def test_rejects_unsupported_fields(raw):
+    # 未传 allowed_section_fields 时不支持 sections
+    with pytest.raises(ValueError):
+        parse_fields(raw, ALLOWED)
+
+
+def test_rejects_unknown_section_field():
+    with pytest.raises(ValueError):
+        parse_fields("sections.secret", ALLOWED, SECTION_FIELDS)
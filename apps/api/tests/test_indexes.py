@@ -0,0 +1,110 @@
+"""indexes：索引注册表与迁移"""
+import logging
+
+from neuink.config.constants import Collections
+from neuink.models.indexes import INDEX_REGISTRY, JOB_RETENTION_SECONDS, ensure_indexes
+
+
+class _IndexError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class _Database:
+    def __init__(self):
+        self.commands = []
+
+    def command(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+
+class _Collection:
+    def __init__(self, name, db):
+        self.name = name
+        self.database = db.database
+        self.db = db
+
+    def drop_index(self, name):
+        raise Exception("index not found")
+
+    def create_index(self, keys, **options):
+        error = self.db.errors.get(options.get("name")) or self.db.errors.get(repr(keys))
+        if error is not None:
+            raise error
+
+    def index_information(self):
+        return self.db.existing
+
+
+class _Db:
+    def __init__(self, errors=None, existing=None):
+        self.database = _Database()
+        self.errors = errors or {}
+        self.existing = existing or {}
+
+    def __getitem__(self, name):
+        return _Collection(name, self)
+
+
+def _ensure_user_stats(db):
+    return ensure_indexes(db, [Collections.USER_STATS])[Collections.USER_STATS]
+
+
+def test_background_jobs_ttl_on_completed_at():
+    ttl = [spec for spec in INDEX_REGISTRY[Collections.BACKGROUND_JOBS] if spec.keys == "completedAt"]
+    assert len(ttl) == 1
+    assert ttl[0].options["expireAfterSeconds"] == JOB_RETENTION_SECONDS
+
+
+def test_changed_ttl_updated_with_coll_mod():
+    db = _Db({"background_jobs_ttl": _IndexError("IndexOptionsConflict", 85)})
+    summary = ensure_indexes(db, [Collections.BACKGROUND_JOBS])
+
+    assert summary[Collections.BACKGROUND_JOBS] == len(INDEX_REGISTRY[Collections.BACKGROUND_JOBS])
+    assert db.database.commands == [(
+        ("collMod", Collections.BACKGROUND_JOBS),
+        {"index": {"name": "background_jobs_ttl", "expireAfterSeconds": JOB_RETENTION_SECONDS}},
+    )]
+
+
+def test_equivalent_index_with_other_name_counts_as_ensured():
+    db = _Db(
+        {repr("userId"): _IndexError("Index already exists with a different name: uid", 85)},
+        {"uid": {"key": [("userId", 1.0)], "unique": True}},
+    )
+    assert _ensure_user_stats(db) == 1
+
+
+def test_duplicate_data_leaves_unique_index_missing(caplog):
+    db = _Db({repr("userId"): _IndexError("E11000 duplicate key error collection: UserStats", 11000)})
+    with caplog.at_level(logging.ERROR):
+        assert _ensure_user_stats(db) == 0
+    assert any(record.levelno == logging.ERROR for record in caplog.records)
+
+
+def test_conflicting_non_unique_index_not_counted(caplog):
+    db = _Db(
+        {repr("userId"): _IndexError("An equivalent index already exists with the same name but different options", 85)},
+        {"userId_1": {"key": [("userId", 1)]}},
+    )
+    with caplog.at_level(logging.ERROR):
+        assert _ensure_user_stats(db) == 0
+    assert any(record.levelno == logging.ERROR for record in caplog.records)
+
+
+def test_existing_text_index_compared_by_fields():
+    text_spec = next(
+        spec for spec in INDEX_REGISTRY[Collections.NOTE] if spec.options.get("name") == "note_search_text"
+    )
+    db = _Db(
+        {"note_search_text": _IndexError("Index already exists with a different name: old_text", 85)},
+        {"old_text": {
+            "key": [("userId", 1), ("_fts", "text"), ("_ftsx", 1)],
+            "weights": {"searchText": 1},
+            "default_language": "none",
+        }},
+    )
+    summary = ensure_indexes(db, [Collections.NOTE])
+    assert summary[Collections.NOTE] == len(INDEX_REGISTRY[Collections.NOTE])
+    assert text_spec.keys == [("userId", 1), ("searchText", "text")]
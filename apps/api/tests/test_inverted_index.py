@@ -0,0 +1,100 @@
+"""InvertedIndex：BM25 排序、字段权重、删除与压缩"""
+from neuink.utils.inverted_index import InvertedIndex
+from neuink.utils.text_search import tokenize
+
+
+def _index(**field_weights):
+    return InvertedIndex(tokenize, field_weights or None)
+
+
+def test_ranks_by_term_frequency_and_length():
+    index = _index()
+    index.add("a", {"body": "graph neural network"})
+    index.add("b", {"body": "graph graph neural"})
+    index.add("c", {"body": "convolution"})
+
+    ranked, total = index.search("graph")
+    assert [doc_id for doc_id, _ in ranked] == ["b", "a"]
+    assert total == 2
+
+
+def test_rare_terms_score_higher():
+    index = _index()
+    index.add("a", {"body": "common rare"})
+    index.add("b", {"body": "common"})
+    index.add("c", {"body": "common"})
+
+    ranked, _ = index.search("common rare")
+    assert ranked[0][0] == "a"
+
+
+def test_field_weights():
+    index = _index(title=3)
+    index.add("title-hit", {"title": "transformer", "body": "other words here"})
+    index.add("body-hit", {"title": "other", "body": "transformer words here"})
+
+    ranked, _ = index.search("transformer")
+    assert [doc_id for doc_id, _ in ranked] == ["title-hit", "body-hit"]
+
+
+def test_limit_keeps_total():
+    index = _index()
+    for i in range(5):
+        index.add(f"d{i}", {"body": "shared " + "extra " * i})
+
+    ranked, total = index.search("shared", limit=2)
+    assert [doc_id for doc_id, _ in ranked] == ["d0", "d1"]
+    assert total == 5
+
+
+def test_max_df_ratio_ignores_common_terms():
+    index = _index()
+    index.add("a", {"body": "the model"})
+    index.add("b", {"body": "the data"})
+    index.add("c", {"body": "the graph"})
+
+    ranked, total = index.search("the graph", max_df_ratio=0.5)
+    assert [doc_id for doc_id, _ in ranked] == ["c"]
+    assert total == 1
+    # 所有查询词都超过比例时仍按原样检索
+    _, total = index.search("the", max_df_ratio=0.5)
+    assert total == 3
+
+
+def test_replace_document():
+    index = _index()
+    index.add("a", {"body": "old words"})
+    index.add("a", {"body": "new words"})
+
+    assert len(index) == 1
+    assert index.search("old") == ([], 0)
+    assert index.search("new")[0][0][0] == "a"
+
+
+def test_remove_and_compact():
+    index = _index()
+    for i in range(8):
+        index.add(f"d{i}", {"body": f"topic{i} common"})
+
+    assert index.remove("d0")
+    assert not index.remove("d0")
+    assert "d0" not in index
+    assert index.search("topic0") == ([], 0)
+
+    # 墓碑超过比例后压缩，剩余文档仍可检索
+    for i in range(1, 5):
+        index.remove(f"d{i}")
+    ranked, total = index.search("common")
+    assert sorted(doc_id for doc_id, _ in ranked) == ["d5", "d6", "d7"]
+    assert total == 3
+    assert index.search("topic6")[0][0][0] == "d6"
+
+
+def test_cjk_query():
+    index = _index()
+    index.add("zh", {"body": "图神经网络的训练方法"})
+    index.add("en", {"body": "graph neural network"})
+
+    ranked, total = index.search("神经网络")
+    assert ranked[0][0] == "zh"
+    assert total == 1
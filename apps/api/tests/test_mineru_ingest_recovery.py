@@ -0,0 +1,66 @@
+"""MinerU 结果处理：执行者退出 -> 处理任务重试用尽 -> 补偿扫描恢复"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from neuink.models import backgroundJob, pdfParseTask
+from neuink.models.backgroundJob import JOB_DEAD, JOB_PENDING, BackgroundJobModel
+from neuink.models.pdfParseTask import INGEST_DONE, INGEST_INGESTING, PdfParseTaskModel
+
+
+@pytest.fixture
+def models(fake_db):
+    fake_db.patch(pdfParseTask, backgroundJob)
+    fake_db.collection(backgroundJob.Collections.BACKGROUND_JOBS, unique_keys=("_id", "id"))
+    task_model = PdfParseTaskModel()
+    return task_model, BackgroundJobModel(), fake_db[task_model.collection_name]
+
+
+def test_crashed_ingest_recovered_after_retries_exhausted(models):
+    task_model, job_model, tasks = models
+    task_id = task_model.create_task("p1", "u1", "https://example.com/a.pdf")["id"]
+    assert task_model.mark_result_ready(task_id, "https://example.com/result.zip")
+    job_id = f"process_mineru_{task_id}"
+    job_model.enqueue("mineru-ingest", {"taskId": task_id}, 5, 3, job_id)
+
+    # 执行者领取后退出，留下长时间有效的领取租约
+    assert task_model.begin_ingest(task_id, "crashed", 960)
+
+    # 任务队列回收并重试：每次都因租约仍有效而失败，重试用尽转入死信
+    assert task_model.begin_ingest(task_id, "retry", 960) is None
+    job_model.collection.update_one({"id": job_id}, {"$set": {"status": JOB_DEAD}})
+    # 死信回调不覆盖仍在有效期内的处理
+    assert not task_model.fail_ingest(task_id, "处理解析结果异常")
+    assert task_model.claim_stalled_ingests("poller", 10, 120) == []
+
+    # 领取租约过期后，补偿扫描退回 done 并允许重新提交
+    tasks.update_one({"_id": task_id}, {"$set": {"ingestLeaseExpiresAt": datetime.utcnow() - timedelta(seconds=1)}})
+    claimed = task_model.claim_stalled_ingests("poller", 10, 120)
+    assert [task["id"] for task in claimed] == [task_id]
+    assert task_model.get_task(task_id)["ingestState"] == INGEST_DONE
+    assert task_model.mark_result_ready(task_id, "https://example.com/result.zip")
+
+    # 重新提交时已进入死信的处理任务重新排队
+    job = job_model.enqueue("mineru-ingest", {"taskId": task_id}, 5, 3, job_id, revive=True)
+    assert job["status"] == JOB_PENDING
+    assert job["attempts"] == 0
+    assert task_model.begin_ingest(task_id, "fresh", 960)["ingestState"] == INGEST_INGESTING
+
+
+def test_enqueue_without_revive_keeps_finished_job(models):
+    _, job_model, _ = models
+    job_model.enqueue("mineru-ingest", {}, 5, 3, "job-1")
+    job_model.collection.update_one({"id": "job-1"}, {"$set": {"status": JOB_DEAD}})
+
+    assert job_model.enqueue("mineru-ingest", {}, 5, 3, "job-1")["status"] == JOB_DEAD
+    assert job_model.enqueue("mineru-ingest", {}, 5, 3, "job-1", revive=True)["status"] == JOB_PENDING
+
+
+def test_revive_leaves_active_job_alone(models):
+    _, job_model, _ = models
+    job_model.enqueue("mineru-ingest", {}, 5, 3, "job-1")
+    job_model.collection.update_one({"id": "job-1"}, {"$set": {"status": "running", "attempts": 2}})
+
+    job = job_model.enqueue("mineru-ingest", {}, 5, 3, "job-1", revive=True)
+    assert job["status"] == "running"
+    assert job["attempts"] == 2
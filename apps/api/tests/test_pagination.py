@@ -0,0 +1,128 @@
+"""pagination：游标编码、位置条件与分页查询"""
+from datetime import datetime
+
+import pytest
+
+from neuink.utils.pagination import (
+    InvalidCursorError,
+    apply_cursor,
+    cursor_condition,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+    invalidate_cached_totals,
+    keyset_sort,
+    next_cursor,
+    total_cache_key,
+)
+
+
+@pytest.mark.parametrize("value", [
+    "Attention Is All You Need",
+    2017,
+    datetime(2024, 5, 1, 12, 30, 15, 123456),
+    None,
+])
+def test_cursor_round_trip(value):
+    token = encode_cursor({"id": "p1", "createdAt": value}, "createdAt", -1)
+    assert "=" not in token
+    assert decode_cursor(token, "createdAt", -1) == (value, "p1")
+
+
+def test_cursor_nested_field():
+    token = encode_cursor({"id": "p1", "metadata": {"year": 2020}}, "metadata.year", 1)
+    assert decode_cursor(token, "metadata.year", 1) == (2020, "p1")
+
+
+def test_cursor_rejects_other_sort():
+    token = encode_cursor({"id": "p1", "createdAt": 1}, "createdAt", -1)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "createdAt", 1)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "updatedAt", -1)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "e30"])
+def test_cursor_rejects_garbage(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "createdAt", -1)
+
+
+def test_cursor_condition_descending():
+    at = datetime(2024, 1, 1)
+    token = encode_cursor({"id": "p1", "createdAt": at}, "createdAt", -1)
+    assert cursor_condition(token, "createdAt", -1) == {"$or": [
+        {"createdAt": {"$lt": at}},
+        {"createdAt": at, "id": {"$lt": "p1"}},
+        {"createdAt": None},
+    ]}
+
+
+def test_cursor_condition_ascending_null():
+    token = encode_cursor({"id": "p1"}, "createdAt", 1)
+    assert cursor_condition(token, "createdAt", 1) == {"$or": [
+        {"createdAt": None, "id": {"$gt": "p1"}},
+        {"createdAt": {"$ne": None}},
+    ]}
+
+
+def test_cursor_condition_by_id():
+    token = encode_cursor({"id": "p1"}, "id", 1)
+    assert cursor_condition(token, "id", 1) == {"id": {"$gt": "p1"}}
+    assert keyset_sort("id", 1) == [("id", 1)]
+    assert keyset_sort("createdAt", -1) == [("createdAt", -1), ("id", -1)]
+
+
+def test_apply_cursor():
+    query = {"userId": "u1"}
+    assert apply_cursor(query, None, "createdAt", -1) is query
+    token = encode_cursor({"id": "p1"}, "id", -1)
+    assert apply_cursor(query, token, "id", -1) == {"$and": [query, {"id": {"$lt": "p1"}}]}
+    assert apply_cursor({}, token, "id", -1) == {"id": {"$lt": "p1"}}
+
+
+def test_next_cursor_only_for_full_page():
+    items = [{"id": "a", "n": 1}, {"id": "b", "n": 2}]
+    assert next_cursor(items, 3, "n", 1) is None
+    assert next_cursor([], 2, "n", 1) is None
+    token = next_cursor(items, 2, "n", 1)
+    assert decode_cursor(token, "n", 1) == (2, "b")
+
+
+@pytest.fixture
+def papers(fake_db):
+    def create(count):
+        collection = fake_db["papers"]
+        collection.insert_many({"id": f"p{i}"} for i in range(count))
+        return collection
+    return create
+
+
+@pytest.mark.parametrize("skip, expected", [(0, 3), (2, 3)])
+def test_fetch_page_short_page_skips_count(papers, skip, expected):
+    collection = papers(3)
+    items, total = fetch_page(collection, {}, [("id", 1)], limit=5, skip=skip)
+    assert total == expected
+    assert len(items) == 3 - skip
+    assert collection.calls["count_documents"] == 0
+
+
+def test_fetch_page_counts_full_or_past_end_pages(papers):
+    collection = papers(7)
+    assert fetch_page(collection, {}, [("id", 1)], limit=5)[1] == 7
+    assert fetch_page(collection, {}, [("id", 1)], limit=5, skip=10)[1] == 7
+    assert fetch_page(collection, {}, [("id", 1)], limit=5, page_filter={"id": {"$gt": "p4"}})[1] == 7
+    assert collection.calls["count_documents"] == 3
+
+
+def test_fetch_page_cached_total(papers):
+    collection = papers(7)
+    key = total_cache_key("papers", "u1", {"userId": "u1"})
+    invalidate_cached_totals("papers")
+    assert fetch_page(collection, {}, [("id", 1)], limit=5, total_key=key)[1] == 7
+    assert fetch_page(collection, {}, [("id", 1)], limit=5, total_key=key)[1] == 7
+    assert collection.calls["count_documents"] == 1
+
+    invalidate_cached_totals("papers", "u1")
+    fetch_page(collection, {}, [("id", 1)], limit=5, total_key=key)
+    assert collection.calls["count_documents"] == 2
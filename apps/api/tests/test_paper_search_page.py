@@ -0,0 +1,69 @@
+"""search_paper_page：总数与可翻页的候选一致；分区增量同步"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from neuink.models import paperSearchIndex
+from neuink.models.paperSearchIndex import PaperSearchIndex, search_paper_page
+
+
+class _Index:
+    def __init__(self, ranked, hit_count):
+        self.ranked = ranked
+        self.hit_count = hit_count
+
+    def search(self, collection, partition_key, partition_query, text):
+        return self.ranked, self.hit_count
+
+
+@pytest.fixture
+def papers(monkeypatch, fake_db):
+    collection = fake_db["papers"]
+    collection.insert_many({"id": f"p{i}", "isPublic": i % 2 == 0} for i in range(10))
+    # 命中 5000 篇，只有得分最高的 10 篇作为候选
+    index = _Index([(paper["id"], 10.0 - i) for i, paper in enumerate(collection.docs)], 5000)
+    monkeypatch.setattr(paperSearchIndex, "get_paper_search_index", lambda: index)
+    return collection
+
+
+def test_total_counts_only_pageable_candidates(papers):
+    page, total = search_paper_page(papers, None, {}, "q", {}, 0, 4, {"_id": 0})
+    assert total == 10
+    assert [paper["id"] for paper in page] == ["p0", "p1", "p2", "p3"]
+
+    page, total = search_paper_page(papers, None, {}, "q", {}, 8, 4, {"_id": 0})
+    assert total == 10
+    assert [paper["id"] for paper in page] == ["p8", "p9"]
+
+
+def test_filtered_total_counts_matching_candidates(papers):
+    page, total = search_paper_page(papers, None, {}, "q", {"isPublic": True}, 0, 2, {"_id": 0})
+    assert total == 5
+    assert [paper["id"] for paper in page] == ["p0", "p2"]
+
+
+def test_page_query_keeps_partition_condition(papers):
+    public = {"isPublic": True}
+    page, _ = search_paper_page(papers, "public", public, "q", public, 0, 3, {"_id": 0})
+    # 索引中残留的非公开论文不会返回
+    assert [paper["id"] for paper in page] == ["p0", "p2"]
+
+
+def test_sync_picks_up_write_with_earlier_updated_at(fake_db):
+    collection = fake_db["papers"]
+    now = datetime(2024, 6, 1, 12, 0, 0)
+    collection.insert_many([
+        {"id": "a", "metadata": {"title": "graph networks"}, "updatedAt": now},
+        {"id": "b", "metadata": {"title": "protein folding"}, "updatedAt": now - timedelta(minutes=5)},
+    ])
+    index = PaperSearchIndex(sync_seconds=0)
+    assert index.search(collection, None, {}, "transformer") == ([], 0)
+
+    # 其他进程修改了 b，其时钟落后，updatedAt 早于索引已读到的水位
+    collection.update_one({"id": "b"}, {"$set": {
+        "metadata": {"title": "transformer"},
+        "updatedAt": now - timedelta(seconds=30),
+    }})
+    ranked, total = index.search(collection, None, {}, "transformer")
+    assert [paper_id for paper_id, _ in ranked] == ["b"]
+    assert total == 1
@@ -0,0 +1,71 @@
+"""section：写时复制与 block 写入对块索引标记的处理"""
+from datetime import datetime
+
+import pytest
+
+from neuink.models import section as section_module
+from neuink.models.section import SectionModel
+
+
+@pytest.fixture
+def sections(monkeypatch, fake_db):
+    indexed_at = datetime(2024, 1, 1)
+    collection = fake_db.patch(section_module)[section_module.Collections.SECTION]
+    collection.insert_one({
+        "id": "s1",
+        "paperId": "p1",
+        "content": [{"id": "b1"}, {"id": "b2"}],
+        "updatedAt": indexed_at,
+        "searchIndexedAt": indexed_at,
+    })
+    monkeypatch.setattr(section_module, "next_content_version", lambda: 7)
+    return SectionModel(), collection
+
+
+def test_fork_does_not_copy_search_marker(sections):
+    model, collection = sections
+    forked = model.fork("s1", "up1")
+
+    assert forked["sourceSectionId"] == "s1"
+    assert forked["paperId"] == "up1"
+    assert "searchIndexedAt" not in forked
+    assert "searchIndexedAt" not in collection.find_one({"id": forked["id"]})
+
+
+def test_move_block_keeps_current_search_index(sections):
+    model, collection = sections
+    assert model.move_block("s1", "b2")
+
+    (query, _), = collection.writes
+    assert "$expr" in query
+    section = collection.find_one({"id": "s1"})
+    assert section["searchIndexedAt"] == section["updatedAt"]
+    assert section["version"] == 7
+
+
+def test_move_block_with_stale_index_leaves_marker(sections):
+    model, collection = sections
+    collection.update_one({"id": "s1"}, {"$set": {"updatedAt": datetime(2024, 1, 2)}})
+    collection.writes.clear()
+    assert model.move_block("s1", "b2", "b1")
+
+    guarded, plain = collection.writes
+    assert "$expr" in guarded[0]
+    assert "$expr" not in plain[0]
+    section = collection.find_one({"id": "s1"})
+    assert section["searchIndexedAt"] == datetime(2024, 1, 1)
+    assert section["updatedAt"] > section["searchIndexedAt"]
+
+
+def test_service_rejects_move_after_itself_before_forking(sections, monkeypatch):
+    from neuink.config.constants import BusinessCode
+    from neuink.services import paperContentService
+
+    model, collection = sections
+    monkeypatch.setattr(paperContentService, "get_section_model", lambda: model)
+    service = paperContentService.PaperContentService(paper_model=None)
+    monkeypatch.setattr(service, "_fork_shared_section", lambda *args: pytest.fail("不应复制共享章节"))
+
+    result = service.move_block("up1", "s1", "b1", "u1", after_block_id="b1", is_user_paper=True)
+    assert result["code"] == BusinessCode.INVALID_PARAMS
+    assert collection.writes == []
@@ -0,0 +1,61 @@
+"""text_search：切词、检索字段与查询词"""
+from neuink.utils.text_search import (
+    block_plain_text,
+    build_search_query,
+    build_search_text,
+    stem,
+    tokenize,
+)
+
+
+def test_tokenize_latin_words_lowercase():
+    assert tokenize("Deep Learning, 2024!") == ["deep", "learning", "2024"]
+
+
+def test_tokenize_keeps_accented_letters():
+    assert tokenize("café résumé") == ["café", "résumé"]
+    assert tokenize("Naïve Ωmega") == ["naïve", "ωmega"]
+
+
+def test_tokenize_underscore_is_separator():
+    assert tokenize("snake_case") == ["snake", "case"]
+
+
+def test_tokenize_cjk_bigrams():
+    assert tokenize("深度学习") == ["深度", "度学", "学习"]
+    assert tokenize("学") == ["学"]
+
+
+def test_tokenize_cjk_unigrams_for_index():
+    assert tokenize("学习", unigrams=True) == ["学", "学习", "习"]
+
+
+def test_tokenize_mixed_scripts_split_at_boundaries():
+    assert tokenize("GPT模型v2") == ["gpt", "模型", "v2"]
+
+
+def test_tokenize_stemmed():
+    assert tokenize("running models", stemmed=True) == ["run", "model"]
+    assert stem("cat") == "cat"
+
+
+def test_search_text_and_query_use_same_tokens():
+    # 写入字段包含单字，查询只用 bigram，且查询词去重
+    assert build_search_text("学习") == "学 学习 习"
+    assert build_search_query("学习 学习 Café") == "学习 café"
+    assert build_search_query("，。!") == ""
+
+
+def test_block_plain_text_bilingual_paragraph():
+    block = {
+        "type": "paragraph",
+        "content": {
+            "en": [{"type": "text", "content": "Hello "}, {"type": "inline-math", "latex": "x^2"}],
+            "zh": [{"type": "text", "content": "你好"}],
+        },
+    }
+    assert block_plain_text(block) == "Hello x^2\n你好"
+
+
+def test_block_plain_text_skips_code():
+    assert block_plain_text({"type": "code", "code": "print(1)"}) == ""
@@ -0,0 +1,48 @@
+"""userPaper：修改阅读状态/优先级后，按这些字段筛选的列表总数重新统计"""
+import pytest
+
+from neuink.models import basePaper, contentVersion, userPaper
+from neuink.models.userPaper import UserPaperModel
+from neuink.utils.pagination import fetch_page, invalidate_cached_totals, total_cache_key
+
+
+class _Stats:
+    def __init__(self):
+        self.changes = []
+
+    def on_paper_changed(self, before, after):
+        self.changes.append((before, after))
+
+
+@pytest.fixture
+def papers(monkeypatch, fake_db):
+    fake_db.patch(basePaper, contentVersion)
+    stats = _Stats()
+    monkeypatch.setattr(userPaper, "get_user_stats_model", lambda: stats)
+    model = UserPaperModel()
+    invalidate_cached_totals(model.get_collection_name())
+    model.collection.insert_many(
+        {"id": f"p{i}", "userId": "u1", "readingStatus": "unread"} for i in range(6)
+    )
+    return model, stats
+
+
+def _unread_total(model):
+    query = {"userId": "u1", "readingStatus": "unread"}
+    key = total_cache_key(model.get_collection_name(), "u1", query)
+    return fetch_page(model.collection, query, [("id", 1)], limit=5, total_key=key)[1]
+
+
+def test_reading_status_change_invalidates_cached_totals(papers):
+    model, stats = papers
+    assert _unread_total(model) == 6
+
+    assert model.update("p0", {"readingStatus": "finished"})
+    assert stats.changes[-1][1]["readingStatus"] == "finished"
+    assert _unread_total(model) == 5
+
+
+def test_update_missing_paper(papers):
+    model, stats = papers
+    assert not model.update("missing", {"priority": "high"})
+    assert stats.changes == []
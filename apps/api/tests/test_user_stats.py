@@ -0,0 +1,70 @@
+"""userStats：对账不覆盖计算期间的增量，定期对账每个间隔只由一个进程执行"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from neuink.models import userStats
+from neuink.models.userStats import UserStatsModel
+
+
+class _Clock:
+    def __init__(self):
+        self.now = datetime(2024, 6, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def stats(monkeypatch, fake_db):
+    fake_db.patch(userStats)
+    fake_db.collection(userStats.Collections.USER_STATS, unique_keys=("_id", "userId"))
+    clock = _Clock()
+    monkeypatch.setattr(userStats, "get_current_time", clock)
+    model = UserStatsModel()
+    monkeypatch.setattr(model, "compute", lambda user_id: {"total": 2, "totalNotes": 3})
+    return model, clock
+
+
+def test_reconcile_creates_and_overwrites(stats):
+    model, clock = stats
+    assert model.reconcile("u1") == {"total": 2, "totalNotes": 3}
+    assert model.find_by_user("u1")["totalNotes"] == 3
+
+    model.collection.update_one({"userId": "u1"}, {"$set": {"totalNotes": 9}})
+    clock.advance(1)
+    model.reconcile("u1")
+    doc = model.find_by_user("u1")
+    assert doc["totalNotes"] == 3
+    assert doc["reconciledAt"] == clock.now
+
+
+def test_reconcile_keeps_increment_made_while_computing(stats, monkeypatch):
+    model, clock = stats
+    model.reconcile("u1")
+
+    def compute(user_id):
+        # 计算期间另一个请求新增了一条笔记
+        clock.advance(1)
+        model.on_notes_changed(user_id, 1)
+        return {"total": 2, "totalNotes": 3}
+
+    monkeypatch.setattr(model, "compute", compute)
+    model.reconcile("u1")
+    assert model.find_by_user("u1")["totalNotes"] == 4
+
+
+def test_reconcile_run_claimed_once_per_interval(stats):
+    model, clock = stats
+    other = UserStatsModel()
+    assert model.claim_reconcile_run(3600)
+    assert not other.claim_reconcile_run(3600)
+
+    clock.advance(3599)
+    assert not model.claim_reconcile_run(3600)
+    clock.advance(1)
+    assert other.claim_reconcile_run(3600)
+    assert not model.claim_reconcile_run(3600)